@@ -7,6 +7,7 @@
 import logging
 import sys
 
+from pdfrebuilder.cli.commands.batch_modifier import add_batch_directory_parser, handle_batch_command
 from pdfrebuilder.engine.batch_modifier import BatchModifier, VariableSubstitution
 from pdfrebuilder.models.universal_idm import UniversalDocument
 from pdfrebuilder.settings import configure_logging
@@ -173,6 +174,7 @@ def create_parser() -> argparse.ArgumentParser:
   %(prog)s replace --input doc.json --search "old text" --replace "new text"
   %(prog)s substitute --input doc.json --variables "VAR1=value1" "VAR2=value2"
   %(prog)s validate --input doc.json
+  %(prog)s batch replace --inputs layouts/ --output-dir out/ --replacements "old:new" --workers 8
         """,
     )
 
@@ -197,6 +199,9 @@ def create_parser() -> argparse.ArgumentParser:
     validate_parser = subparsers.add_parser("validate", help="Validate fonts in document")
     validate_parser.add_argument("--input", "-i", required=True, help="Input JSON document file")
 
+    # Batch command (directory/glob mode)
+    add_batch_directory_parser(subparsers)
+
     return parser
 
 
@@ -219,6 +224,8 @@ def main():
             cmd_substitute(args)
         elif args.command == "validate":
             cmd_validate(args)
+        elif args.command == "batch":
+            handle_batch_command(args)
         else:
             print(f"Unknown command: {args.command}")
             sys.exit(1)
@@ -41,6 +41,13 @@ def create_batch_modifier_parser() -> argparse.ArgumentParser:
   python -m src.cli.batch_modifier_cli validate \\
     --input document.json \\
     --output validation_report.json
+
+  # Directory mode: many documents with a worker pool and a resumable manifest
+  python -m src.cli.batch_modifier_cli batch replace \\
+    --inputs "layouts/**/*.json" \\
+    --output-dir modified/ \\
+    --replacements "old text:new text" \\
+    --workers 8
         """,
     )
 
@@ -111,9 +118,35 @@ def create_batch_modifier_parser() -> argparse.ArgumentParser:
         help="Show variable substitution statistics",
     )
 
+    add_batch_directory_parser(subparsers)
+
     return parser
 
 
+def add_batch_directory_parser(subparsers: Any) -> argparse.ArgumentParser:
+    """Register the directory/glob 'batch' subcommand on an existing subparsers object."""
+    batch_parser = subparsers.add_parser("batch", help="Apply an operation to a directory or glob of documents")
+    batch_parser.add_argument("operation", choices=["replace", "substitute", "validate"], help="Operation to apply")
+    batch_parser.add_argument(
+        "--inputs",
+        "-i",
+        nargs="+",
+        required=True,
+        help="Input directories (searched for *.json), glob patterns or files",
+    )
+    batch_parser.add_argument("--output-dir", "-o", required=True, help="Directory for modified documents/reports")
+    batch_parser.add_argument("--replacements", nargs="+", default=[], help="Text replacements in format 'old:new'")
+    batch_parser.add_argument("--variables", nargs="+", default=[], help="Variables in format 'VAR_NAME:value'")
+    batch_parser.add_argument("--element-ids", nargs="+", help="Specific element IDs to target")
+    batch_parser.add_argument("--page-numbers", type=int, nargs="+", help="Specific page numbers to target")
+    batch_parser.add_argument("--no-font-validation", action="store_true", help="Skip font validation")
+    batch_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    batch_parser.add_argument("--manifest", help="Resumable manifest path (default: <output-dir>/batch_manifest.jsonl)")
+    batch_parser.add_argument("--results", help="Aggregated results path (default: <output-dir>/batch_results.json)")
+    batch_parser.add_argument("--fonts-dir", help="Font directory used for validation")
+    return batch_parser
+
+
 def parse_replacements(replacements: list[str]) -> list[tuple[str, str]]:
     """Parse replacement strings into tuples."""
     result = []
@@ -311,6 +344,47 @@ def handle_stats_command(args: argparse.Namespace) -> None:
         json.dump(stats, f, indent=2, ensure_ascii=False)
 
 
+def handle_batch_command(args: argparse.Namespace) -> None:
+    """Handle the directory/glob batch command."""
+    from pdfrebuilder.engine.batch_runner import BatchOperation, run_batch
+
+    operation = BatchOperation(
+        kind=args.operation,
+        replacements=parse_replacements(args.replacements),
+        variables=parse_variables(args.variables),
+        element_ids=args.element_ids,
+        page_numbers=args.page_numbers,
+        validate_fonts=not args.no_font_validation,
+    )
+    if operation.kind == "replace" and not operation.replacements:
+        logger.error("No valid replacements provided")
+        sys.exit(1)
+    if operation.kind == "substitute" and not operation.variables:
+        logger.error("No valid variables provided")
+        sys.exit(1)
+
+    report = run_batch(
+        inputs=args.inputs,
+        output_dir=args.output_dir,
+        operation=operation,
+        workers=args.workers,
+        manifest_path=args.manifest,
+        results_path=args.results,
+        fonts_dir=args.fonts_dir,
+    )
+
+    summary = report.to_dict()["summary"]
+    print(f"\nBatch {operation.kind} completed:")
+    print(f"  Files: {summary['total_files']}")
+    print(f"  Processed: {summary['processed']}")
+    print(f"  Resumed from manifest: {summary['resumed']}")
+    print(f"  Failed: {summary['failed']}")
+    print(f"  Modified elements: {summary['modified_elements']}")
+
+    if report.failed:
+        sys.exit(1)
+
+
 def main():
     """Main entry point for the batch modifier CLI."""
     parser = create_batch_modifier_parser()
@@ -332,6 +406,8 @@ def main():
         handle_validate_command(args)
     elif args.command == "stats":
         handle_stats_command(args)
+    elif args.command == "batch":
+        handle_batch_command(args)
     else:
         logger.error(f"Unknown command: {args.command}")
         sys.exit(1)
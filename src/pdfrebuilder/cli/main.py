@@ -1,3 +1,4 @@
+import contextlib
 import logging
 import os
 from types import SimpleNamespace
@@ -6,17 +7,34 @@
 import typer
 
 from pdfrebuilder.cli.app import app
-from pdfrebuilder.settings import settings
 
-# Rich console output for better CLI experience
-try:
-    from rich.console import Console
+# Settings, rich and the engines are imported inside the commands that use them so that
+# `pdfrebuilder --help` and `--version` start without loading them.
+# tests/cli/test_import_time.py keeps this import graph in check.
 
-    rich_console: Console | None = Console()
-    HAS_RICH = True
-except ImportError:
-    rich_console = None
-    HAS_RICH = False
+_rich_console: Any = None
+
+
+def _get_rich_console() -> Any:
+    """Rich console for formatted output, created on first use; False when rich is not installed"""
+    global _rich_console
+    if _rich_console is None:
+        try:
+            from rich.console import Console
+
+            _rich_console = Console()
+        except ImportError:
+            _rich_console = False
+    return _rich_console
+
+
+def _config_path(path: str | None) -> str:
+    """The given layout config path, or the configured default"""
+    if path:
+        return path
+    from pdfrebuilder.settings import settings
+
+    return settings.config_path
 
 
 def console_print(message: str, style: str = "default", log_level: int | None = None) -> None:
@@ -28,7 +46,8 @@ def console_print(message: str, style: str = "default", log_level: int | None =
         if not root_logger.isEnabledFor(log_level):
             return
 
-    if HAS_RICH and rich_console:
+    rich_console = _get_rich_console()
+    if rich_console:
         style_map = {
             "success": ("✅", "green"),
             "error": ("❌", "red"),
@@ -99,6 +118,8 @@ def _setup_environment(args: SimpleNamespace) -> Any:
 
     configure_logging(log_file=log_file_path, log_level=log_level_val, log_format="%(levelname)s %(name)s: %(message)s")
 
+    from pdfrebuilder.settings import settings
+
     image_dir = settings.image_dir
     auto_fonts_dir = settings.font_management.downloaded_fonts_dir
     manual_fonts_dir = settings.font_management.manual_fonts_dir
@@ -107,13 +128,14 @@ def _setup_environment(args: SimpleNamespace) -> Any:
     os.makedirs(auto_fonts_dir, exist_ok=True)
     os.makedirs(manual_fonts_dir, exist_ok=True)
 
-    console_print(f"Output directory: {settings.rebuilt_pdf.parent}", "config")
+    console_print(f"Output directory: {os.path.dirname(str(settings.rebuilt_pdf))}", "config")
 
     return config
 
 
 def _run_extract(args: SimpleNamespace, config: Any):
     from pdfrebuilder.engine.document_parser import parse_document
+    from pdfrebuilder.settings import settings
     from pdfrebuilder.tools import serialize_pdf_content_to_config
 
     if not os.path.exists(args.input):
@@ -127,13 +149,26 @@ def _run_extract(args: SimpleNamespace, config: Any):
         "include_drawings_non_background": args.extract_drawings,
         "include_raw_background_drawings": args.extract_raw_backgrounds,
     }
-    content = parse_document(args.input, extraction_flags, engine=args.input_engine)
+    cache = None
+    if getattr(args, "cache", False) or settings.processing.extraction_cache:
+        from pdfrebuilder.engine.extraction_cache import get_extraction_cache
+
+        cache = get_extraction_cache()
+        stats_before = cache.get_statistics()
+    content = parse_document(args.input, extraction_flags, engine=args.input_engine, cache=cache)
     serialize_pdf_content_to_config(content, args.config)
     console_print(f"Extraction complete for {args.input}", "success")
+    if cache is not None:
+        stats = cache.get_statistics()
+        hits, misses = stats["hits"] - stats_before["hits"], stats["misses"] - stats_before["misses"]
+        console_print(f"Extraction cache: {hits} pages reused, {misses} extracted", "info")
 
 
 def _run_generate(args: SimpleNamespace, config: Any):
+    import json
+
     from pdfrebuilder.engine.config_loader import load_engine_config
+    from pdfrebuilder.engine.engine_profiles import AUTO_ENGINE
     from pdfrebuilder.engine.pdf_engine_selector import get_pdf_engine
 
     console_print("Entering generate mode...", "info")
@@ -141,19 +176,52 @@ def _run_generate(args: SimpleNamespace, config: Any):
     engine_config = load_engine_config(cli_args=cli_args)
     engine_name = args.output_engine or engine_config.get("default_engine", "reportlab")
 
-    console_print(f"Using output engine: {engine_name}", "info")
-    engine = get_pdf_engine(engine_name, engine_config)
-
     if not os.path.exists(args.config):
         console_print(f"Config file not found: {args.config}", "error")
         raise typer.Exit(1)
 
     with open(args.config) as f:
-        config_data = f.read()
+        layout = json.load(f)
+
+    console_print(f"Using output engine: {engine_name}", "info")
+    # "auto" is resolved by the generation call, which logs its choice and refines the engine profiles
+    engine = None if engine_name == AUTO_ENGINE else get_pdf_engine(engine_name, engine_config)
 
-    engine.generate(config_data, args.output, args.input)
+    from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+
+    profile_path = getattr(args, "profile", None)
+    profiler = None
+    if profile_path:
+        from pdfrebuilder.engine.render_profiler import RenderProfiler, profile_rendering
+
+        profiler = RenderProfiler(page_budget_ms=getattr(args, "page_budget_ms", None))
+        profiling = profile_rendering(profiler)
+    else:
+        profiling = contextlib.nullcontext()
+
+    with profiling:
+        recreate_pdf_from_layout(
+            layout,
+            args.output,
+            engine_config=engine_config,
+            engine_name=engine_name,
+            original_pdf_for_template=args.input,
+            engine=engine,
+            incremental=getattr(args, "incremental", False),
+        )
     console_print("PDF generation complete.", "success")
 
+    if profiler is None:
+        return None
+    report = profiler.write_report(profile_path)
+    summary = report["summary"]
+    console_print(
+        f"Render profile: {summary['elements']} elements on {summary['pages']} pages, "
+        f"{len(report['pages_over_budget'])} over budget; written to {profile_path}",
+        "info",
+    )
+    return report
+
 
 def _run_debug(args: SimpleNamespace, config: Any):
     from pdfrebuilder.core.generate_debug_pdf_layers import generate_debug_pdf_layers
@@ -180,6 +248,19 @@ def main(
     temp_dir: Annotated[str | None, typer.Option(help="Temporary directory for processing files.")] = None,
     log_level: Annotated[str, typer.Option(help="Set the logging level.")] = "INFO",
     log_file: Annotated[str | None, typer.Option(help="Path to log file.")] = None,
+    metrics_textfile: Annotated[
+        str | None,
+        typer.Option(
+            envvar="PDFREBUILDER_METRICS_TEXTFILE",
+            help="Write metrics for the node exporter textfile collector (*.prom) when the command ends.",
+        ),
+    ] = None,
+    metrics_jsonl: Annotated[
+        str | None,
+        typer.Option(
+            envvar="PDFREBUILDER_METRICS_JSONL", help="Append metrics as JSON lines to this file when the command ends."
+        ),
+    ] = None,
 ):
     """PDFRebuilder CLI"""
     ctx.meta["args"] = SimpleNamespace(
@@ -191,10 +272,25 @@ def main(
         test_output_dir=None,
         reports_output_dir=None,  # These are not global
     )
+    if metrics_textfile or metrics_jsonl:
+        ctx.call_on_close(lambda: _export_metrics(metrics_textfile, metrics_jsonl))
     if ctx.invoked_subcommand is None:
         typer.echo("No command specified. Use --help for available commands.")
 
 
+def _export_metrics(textfile: str | None, jsonl: str | None) -> None:
+    from pdfrebuilder.engine.metrics_export import append_json_lines, get_metrics_registry, write_textfile
+
+    try:
+        families = get_metrics_registry().collect()
+        if textfile:
+            write_textfile(families, textfile)
+        if jsonl:
+            append_json_lines(families, jsonl)
+    except OSError as e:
+        console_print(f"Could not write metrics: {e}", "warning")
+
+
 @app.command()
 def full(
     ctx: typer.Context,
@@ -208,12 +304,21 @@ def full(
     extract_images: Annotated[bool, typer.Option(help="Include image blocks in extraction.")] = True,
     extract_drawings: Annotated[bool, typer.Option(help="Include non-background vector drawings.")] = True,
     extract_raw_backgrounds: Annotated[bool, typer.Option(help="Include raw background drawings.")] = False,
+    cache: Annotated[
+        bool, typer.Option("--cache/--no-cache", help="Reuse unchanged pages from the extraction cache.")
+    ] = False,
+    profile: Annotated[
+        str | None, typer.Option(help="Profile rendering and write the hot-spot report (JSON) to this path.")
+    ] = None,
+    page_budget_ms: Annotated[
+        float | None, typer.Option(help="With --profile, report pages that take longer than this to render.")
+    ] = None,
 ):
     """Runs the full pipeline: extract, generate, and optionally compare."""
     args = ctx.meta["args"]
     args.input = input_file
     args.output = output_file or os.path.join(args.output_dir or "output", os.path.basename(input_file))
-    args.config = config_file or settings.config_path
+    args.config = _config_path(config_file)
     args.debugoutput = debug_output_file
     args.input_engine = input_engine
     args.output_engine = output_engine
@@ -221,10 +326,13 @@ def full(
     args.extract_images = extract_images
     args.extract_drawings = extract_drawings
     args.extract_raw_backgrounds = extract_raw_backgrounds
+    args.cache = cache
+    args.profile = profile
+    args.page_budget_ms = page_budget_ms
 
     config = _setup_environment(args)
     _run_extract(args, config)
-    _run_generate(args, config)
+    render_profile = _run_generate(args, config)
     if args.debugoutput:
         _run_debug(args, config)
 
@@ -232,7 +340,7 @@ def full(
 
     console_print("Comparing PDFs visually...", "info")
     diff_image_path = os.path.join(os.path.dirname(args.output), "diff.png")
-    compare_pdfs_visual(args.input, args.output, diff_image_path)
+    compare_pdfs_visual(args.input, args.output, diff_image_path, render_profile=render_profile)
     console_print("Visual comparison complete.", "success")
 
 
@@ -241,23 +349,28 @@ def extract(
     ctx: typer.Context,
     input_file: Annotated[str, typer.Option("--input", help="Input PDF file path.")] = "input/sample.pdf",
     config_output_file: Annotated[
-        str, typer.Option("--config", help="Layout config JSON file path.")
-    ] = settings.config_path,
+        str | None,
+        typer.Option("--config", help="Layout config JSON file path (defaults to the configured config_path)."),
+    ] = None,
     input_engine: Annotated[str, typer.Option(help="Input processing engine.")] = "auto",
     extract_text: Annotated[bool, typer.Option(help="Include text blocks in extraction.")] = True,
     extract_images: Annotated[bool, typer.Option(help="Include image blocks in extraction.")] = True,
     extract_drawings: Annotated[bool, typer.Option(help="Include non-background vector drawings.")] = True,
     extract_raw_backgrounds: Annotated[bool, typer.Option(help="Include raw background drawings.")] = False,
+    cache: Annotated[
+        bool, typer.Option("--cache/--no-cache", help="Reuse unchanged pages from the extraction cache.")
+    ] = False,
 ):
     """Extracts content and layout from a document into a JSON config file."""
     args = ctx.meta["args"]
     args.input = input_file
-    args.config = config_output_file
+    args.config = _config_path(config_output_file)
     args.input_engine = input_engine
     args.extract_text = extract_text
     args.extract_images = extract_images
     args.extract_drawings = extract_drawings
     args.extract_raw_backgrounds = extract_raw_backgrounds
+    args.cache = cache
 
     config = _setup_environment(args)
     _run_extract(args, config)
@@ -267,18 +380,31 @@ def extract(
 def generate(
     ctx: typer.Context,
     config_input_file: Annotated[
-        str, typer.Option("--config", help="Layout config JSON file path.")
-    ] = settings.config_path,
+        str | None,
+        typer.Option("--config", help="Layout config JSON file path (defaults to the configured config_path)."),
+    ] = None,
     output_file: Annotated[str | None, typer.Option("--output", help="Output PDF file path.")] = None,
     input_file: Annotated[str | None, typer.Option("--input", help="Original input PDF file path (optional).")] = None,
     output_engine: Annotated[str, typer.Option(help="Output rendering engine.")] = "auto",
+    incremental: Annotated[
+        bool, typer.Option(help="Re-render only pages changed since the previous output and reuse the rest.")
+    ] = False,
+    profile: Annotated[
+        str | None, typer.Option(help="Profile rendering and write the hot-spot report (JSON) to this path.")
+    ] = None,
+    page_budget_ms: Annotated[
+        float | None, typer.Option(help="With --profile, report pages that take longer than this to render.")
+    ] = None,
 ):
     """Generates a PDF from a JSON config file."""
     args = ctx.meta["args"]
     args.input = input_file
-    args.config = config_input_file
+    args.config = _config_path(config_input_file)
     args.output = output_file or os.path.join(args.output_dir or "output", "rebuilt.pdf")
     args.output_engine = output_engine
+    args.incremental = incremental
+    args.profile = profile
+    args.page_budget_ms = page_budget_ms
 
     config = _setup_environment(args)
     _run_generate(args, config)
@@ -288,13 +414,14 @@ def generate(
 def debug(
     ctx: typer.Context,
     config_input_file: Annotated[
-        str, typer.Option("--config", help="Layout config JSON file path.")
-    ] = settings.config_path,
+        str | None,
+        typer.Option("--config", help="Layout config JSON file path (defaults to the configured config_path)."),
+    ] = None,
     debug_output_file: Annotated[str | None, typer.Option("--debugoutput", help="Debug output PDF file path.")] = None,
 ):
     """Generates a debug PDF with drawing layers from a JSON config file."""
     args = ctx.meta["args"]
-    args.config = config_input_file
+    args.config = _config_path(config_input_file)
     args.debugoutput = debug_output_file or os.path.join(args.output_dir or "output", "debug.pdf")
 
     config = _setup_environment(args)
@@ -316,5 +443,196 @@ def download_fonts(
     download_essential_fonts(priority_filter=priority, force_redownload=force, verbose=verbose)
 
 
+@app.command()
+def serve(
+    ctx: typer.Context,
+    socket_path: Annotated[str | None, typer.Option("--socket", help="Unix socket path to listen on.")] = None,
+    http: Annotated[
+        str | None, typer.Option("--http", help="Listen for HTTP jobs on HOST:PORT instead of a Unix socket.")
+    ] = None,
+    workers: Annotated[int, typer.Option(help="Number of pre-warmed worker processes.")] = 2,
+    queue_size: Annotated[int, typer.Option(help="Jobs that may wait for a free worker before 'busy'.")] = 8,
+    job_timeout: Annotated[float, typer.Option(help="Default per-job timeout in seconds.")] = 300.0,
+):
+    """Runs a long-lived worker service that accepts extract/generate/compare jobs."""
+    from pdfrebuilder.engine.worker_service import DEFAULT_SOCKET_PATH
+    from pdfrebuilder.engine.worker_service import serve as serve_jobs
+
+    args = ctx.meta["args"]
+    _setup_environment(args)
+    if socket_path is None and http is None:
+        socket_path = DEFAULT_SOCKET_PATH
+    console_print(f"Starting {workers} worker(s) on {socket_path or 'http://' + str(http)}...", "info")
+    serve_jobs(socket_path, http, workers=workers, queue_size=queue_size, job_timeout=job_timeout)
+
+
+engines_app = typer.Typer(help="Inspects and benchmarks the PDF output engines.")
+app.add_typer(engines_app, name="engines")
+
+
+@engines_app.command(name="benchmark")
+def engines_benchmark(
+    ctx: typer.Context,
+    corpus: Annotated[list[str], typer.Argument(help="Layout JSON files, PDFs, or directories containing them.")],
+    engines: Annotated[
+        list[str] | None, typer.Option("--engine", help="Engine to benchmark (repeatable; default: all).")
+    ] = None,
+    repeat: Annotated[int, typer.Option(help="Renders per document and engine; the fastest is recorded.")] = 3,
+    profiles_path: Annotated[
+        str | None, typer.Option("--profiles", help="Profiles file to update (default: the configured one).")
+    ] = None,
+):
+    """Builds the 'auto' engine's throughput profiles by rendering a local corpus with each engine."""
+    from pdfrebuilder.engine.config_loader import load_engine_config
+    from pdfrebuilder.engine.engine_profiles import benchmark_engines, get_engine_profiles
+
+    _setup_environment(ctx.meta["args"])
+    files = []
+    for path in corpus:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.lower().endswith((".json", ".pdf")))
+        else:
+            files.append(path)
+    if not files:
+        console_print("No layout JSON files or PDFs found in the corpus.", "error")
+        raise typer.Exit(1)
+
+    engine_config = load_engine_config()
+    profiles = get_engine_profiles(profiles_path or engine_config.get("auto", {}).get("profiles_path"))
+    console_print(f"Benchmarking {len(files)} document(s), {repeat} render(s) each...", "info")
+    results = benchmark_engines(
+        files,
+        profiles,
+        engines=[e.lower() for e in engines] if engines else None,
+        repeat=repeat,
+        engine_config=engine_config,
+        progress=lambda document, engine, seconds: console_print(
+            f"{os.path.basename(document)}: {engine} {seconds * 1000:.1f} ms", "debug"
+        ),
+    )
+
+    failures = [r for r in results if "error" in r]
+    for result in failures:
+        console_print(f"{result['engine']} failed on {result['document']}: {result['error']}", "warning")
+    for engine, buckets in sorted(profiles.get_profiles().items()):
+        for key, profile in sorted(buckets.items()):
+            per_unit = profile["seconds"] / profile["work_units"] * 1000 if profile["work_units"] else 0.0
+            console_print(f"{engine:<10} {key:<28} {profile['runs']:>4} runs  {per_unit:.3f} ms/unit", "info")
+    console_print(f"Engine profiles saved to {profiles.path}", "success")
+
+
+client_app = typer.Typer(help="Sends jobs to a running 'pdfrebuilder serve' instance.")
+app.add_typer(client_app, name="client")
+
+
+@client_app.callback()
+def client(
+    ctx: typer.Context,
+    address: Annotated[
+        str | None,
+        typer.Option(help="Service address: a Unix socket path (unix:PATH) or http://HOST:PORT."),
+    ] = None,
+    timeout: Annotated[float | None, typer.Option(help="Job timeout in seconds (default: the service's).")] = None,
+):
+    """Sends jobs to a running worker service."""
+    from pdfrebuilder.engine.worker_service import DEFAULT_SOCKET_PATH, ServiceClient
+
+    ctx.meta["client"] = ServiceClient(address or f"unix:{DEFAULT_SOCKET_PATH}")
+    ctx.meta["job_timeout"] = timeout
+
+
+def _submit_job(ctx: typer.Context, job: dict[str, Any]) -> None:
+    import json
+    import uuid
+
+    from pdfrebuilder.engine.worker_service import ServiceError
+
+    job = {"id": uuid.uuid4().hex[:12], **job}
+    if ctx.meta.get("job_timeout"):
+        job["timeout"] = ctx.meta["job_timeout"]
+    try:
+        response = ctx.meta["client"].submit(job)
+    except ServiceError as e:
+        console_print(str(e), "error")
+        raise typer.Exit(1)
+
+    if response.get("status") != "ok":
+        console_print(f"Job {response.get('id')} {response.get('status')}: {response.get('error')}", "error")
+        raise typer.Exit(1)
+    console_print(f"Job {response.get('id')} completed in {response.get('elapsed', 0)}s", "success")
+    typer.echo(json.dumps(response.get("result"), indent=2))
+
+
+def _service_path(path: str | None) -> str | None:
+    # The service resolves paths from its own working directory
+    return os.path.abspath(path) if path else None
+
+
+@client_app.command(name="extract")
+def client_extract(
+    ctx: typer.Context,
+    input_file: Annotated[str, typer.Option("--input", help="Input document path.")],
+    config_output_file: Annotated[str, typer.Option("--config", help="Layout config JSON file path.")],
+    input_engine: Annotated[str, typer.Option(help="Input processing engine.")] = "auto",
+):
+    """Extracts a document into a layout config on the service."""
+    _submit_job(
+        ctx,
+        {
+            "type": "extract",
+            "input": _service_path(input_file),
+            "config": _service_path(config_output_file),
+            "engine": input_engine,
+        },
+    )
+
+
+@client_app.command(name="generate")
+def client_generate(
+    ctx: typer.Context,
+    config_input_file: Annotated[str, typer.Option("--config", help="Layout config JSON file path.")],
+    output_file: Annotated[str, typer.Option("--output", help="Output PDF file path.")],
+    input_file: Annotated[str | None, typer.Option("--input", help="Original input PDF file path (optional).")] = None,
+    output_engine: Annotated[str | None, typer.Option(help="Output rendering engine.")] = None,
+):
+    """Generates a PDF from a layout config on the service."""
+    _submit_job(
+        ctx,
+        {
+            "type": "generate",
+            "config": _service_path(config_input_file),
+            "output": _service_path(output_file),
+            "template": _service_path(input_file),
+            "engine": output_engine,
+        },
+    )
+
+
+@client_app.command(name="compare")
+def client_compare(
+    ctx: typer.Context,
+    original: Annotated[str, typer.Option(help="Original document path.")],
+    generated: Annotated[str, typer.Option(help="Generated document path.")],
+    diff: Annotated[str | None, typer.Option(help="Base path for difference images.")] = None,
+):
+    """Compares two documents visually on the service."""
+    _submit_job(
+        ctx,
+        {
+            "type": "compare",
+            "original": _service_path(original),
+            "generated": _service_path(generated),
+            "diff": _service_path(diff),
+        },
+    )
+
+
+@client_app.command(name="stats")
+def client_stats(ctx: typer.Context):
+    """Shows worker pool statistics."""
+    _submit_job(ctx, {"type": "stats"})
+
+
 if __name__ == "__main__":
     app()
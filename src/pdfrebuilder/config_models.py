@@ -48,6 +48,7 @@ class ReportLabConfig(BaseModel):
     embed_fonts: bool = True
     color_space: str = "RGB"
     output_dpi: int = 300
+    downsample_images: bool = False
 
 
 class PyMuPDFConfig(BaseModel):
@@ -122,6 +123,18 @@ class ProcessingConfig(BaseModel):
     max_memory_mb: int = 2048
     enable_parallel_processing: bool = True
     temp_dir: str = "output/temp"
+    extraction_cache: bool = False
+    master_page_detection: bool = False
+    master_page_min_ratio: float = 0.5
+    span_coalescing: bool = False
+    async_asset_writes: bool = False
+    asset_writer_threads: int = 4
+    asset_writer_queue_size: int = 32
+    asset_writer_fsync: bool = True
+    metrics_sample_interval: float = 0.05
+    metrics_trace_allocations: bool = False
+    metrics_top_allocations: int = 10
+    metrics_history_size: int = 200
 
 
 class TestFrameworkConfig(BaseModel):
@@ -21,7 +21,9 @@
 }
 
 
-def compare_pdfs_visual(original_path, generated_path, diff_image_base_path, visual_diff_threshold=None):
+def compare_pdfs_visual(
+    original_path, generated_path, diff_image_base_path, visual_diff_threshold=None, render_profile=None
+):
     """
     Compare two documents visually using the advanced visual validation system.
 
@@ -31,6 +33,7 @@ def compare_pdfs_visual(original_path, generated_path, diff_image_base_path, vis
         diff_image_base_path: Base path for saving difference images
         visual_diff_threshold: Optional threshold for visual difference detection
                               (if None, use the value from CONFIG)
+        render_profile: Optional render profiler report to include in the validation reports
 
     Returns:
         int: Error code indicating the result of the comparison
@@ -123,6 +126,7 @@ def compare_pdfs_visual(original_path, generated_path, diff_image_base_path, vis
             output_dir=reports_dir,
             report_formats=["json", "html", "ci"],
             font_validation_result=font_validation_result,
+            render_profile=render_profile,
         )
 
         # TASK 3.3: Enhanced console output with file paths and scores
@@ -72,7 +72,10 @@ def _get_element_info_text(element, layer_id, element_index):
         info_parts.extend([f"Text: {text[:20]}...", f"Font: {font_name}", f"Size: {font_size}"])
     elif element_type == "drawing":
         commands = element.get("drawing_commands", [])
-        info_parts.append(f"Commands: {len(commands)} commands")
+        if element.get("path"):
+            info_parts.append(f"Path: {len(element['path'].get('ops', ''))} segments")
+        else:
+            info_parts.append(f"Commands: {len(commands)} commands")
     elif element_type == "image":
         image_file = element.get("image_file", "")
         filename = os.path.basename(image_file) if image_file else "unknown"
@@ -81,6 +84,12 @@ def _get_element_info_text(element, layer_id, element_index):
     return " | ".join(info_parts)
 
 
+def _page_layers(page_data: dict[str, Any], shared_layers: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    """A page's layers in drawing order: the shared layers it references, then its own"""
+    shared = [shared_layers[ref] for ref in page_data.get("shared_layer_refs", []) if ref in shared_layers]
+    return shared + page_data.get("layers", [])
+
+
 def generate_debug_pdf_layers(config_path, output_debug_pdf_base):
     """
     Creates a debug PDF using a fixed-size box and manually wrapped text for maximum compatibility.
@@ -105,8 +114,9 @@ def generate_debug_pdf_layers(config_path, output_debug_pdf_base):
         logger.error(f"Unrecognized config structure. Top-level keys: {list(config_data.keys())}")
         return False
 
-    total_layers = sum(len(p.get("layers", [])) for p in pages)
-    total_elements = sum(len(layer.get("content", [])) for p in pages for layer in p.get("layers", []))
+    shared_layers = {layer.get("layer_id"): layer for layer in config_data.get("shared_layers", [])}
+    total_layers = sum(len(_page_layers(p, shared_layers)) for p in pages)
+    total_elements = sum(len(layer.get("content", [])) for p in pages for layer in _page_layers(p, shared_layers))
     logger.info(f"Config statistics: pages={len(pages)}, layers={total_layers}, elements={total_elements}")
 
     overrides: dict[str, Any] = {}
@@ -131,7 +141,7 @@ def generate_debug_pdf_layers(config_path, output_debug_pdf_base):
             logger.info(f"Generating debug pages for source page {source_page_idx} ...")
             page_overrides = overrides.get("text_block_overrides", {}).get(str(source_page_idx), {})
             page_size = page_data.get("size", (595, 842))
-            for layer in page_data.get("layers", []):
+            for layer in _page_layers(page_data, shared_layers):
                 if element_count >= 10:
                     break
                 for element_idx, element in enumerate(layer.get("content", [])):
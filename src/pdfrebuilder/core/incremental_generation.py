@@ -0,0 +1,290 @@
+"""
+Incremental PDF regeneration.
+
+A page manifest saved next to the generated PDF records a digest of every
+document unit in the layout, including the files it references. Regenerating
+after a small edit renders only the units whose digest is new and copies the
+remaining pages from the previous output with ``insert_pdf``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pymupdf as fitz
+
+from pdfrebuilder.settings import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+RenderFunction = Callable[[dict[str, Any], str], None]
+
+
+@dataclass
+class IncrementalRenderResult:
+    """Outcome of an incremental generation run"""
+
+    total_pages: int
+    rendered_pages: list[int] = field(default_factory=list)
+    reused_pages: int = 0
+    full_render: bool = False
+    reason: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total_pages": self.total_pages,
+            "rendered_pages": self.rendered_pages,
+            "reused_pages": self.reused_pages,
+            "full_render": self.full_render,
+            "reason": self.reason,
+        }
+
+
+def manifest_path_for(output_pdf_path: str) -> Path:
+    """Location of the page manifest for an output PDF"""
+    return Path(f"{output_pdf_path}.pages.json")
+
+
+def _file_fingerprint(path: str | os.PathLike) -> list[int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _collect_referenced_files(node: Any, found: set[str]) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "image_file" and isinstance(value, str):
+                found.add(value)
+            else:
+                _collect_referenced_files(value, found)
+    elif isinstance(node, list):
+        for item in node:
+            _collect_referenced_files(item, found)
+
+
+def _fonts_fingerprint() -> list[Any]:
+    """Fingerprint of the font directories the renderers resolve fonts from"""
+    entries: list[Any] = []
+    fm = settings.font_management
+    for font_dir in (fm.downloaded_fonts_dir, fm.manual_fonts_dir):
+        if not font_dir or not os.path.isdir(font_dir):
+            continue
+        for root, _dirs, files in os.walk(font_dir):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                entries.append([path, _file_fingerprint(path)])
+    return entries
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _position_independent(unit: dict[str, Any]) -> dict[str, Any]:
+    """Drop the page index and the index-derived base layer id from a unit"""
+    base_layer_id = f"page_{unit.get('page_number')}_base_layer"
+    layers = [
+        {**layer, "layer_id": "base_layer"} if layer.get("layer_id") == base_layer_id else layer
+        for layer in unit.get("layers", [])
+    ]
+    return {**{k: v for k, v in unit.items() if k != "page_number"}, "layers": layers}
+
+
+def compute_page_digests(config: dict[str, Any], keep_page_number: bool = False) -> list[str]:
+    """
+    Digest each document unit together with the size and mtime of the files it references.
+
+    The page index is left out so a moved page keeps its digest, unless
+    keep_page_number is set: with a template, the index selects the template
+    page drawn under the unit, so a moved page renders differently.
+    """
+    digests = []
+    for unit in config.get("document_structure", []):
+        files: set[str] = set()
+        _collect_referenced_files(unit, files)
+        digests.append(
+            _digest(
+                {
+                    "unit": unit if keep_page_number else _position_independent(unit),
+                    "files": {p: _file_fingerprint(p) for p in sorted(files)},
+                }
+            )
+        )
+    return digests
+
+
+def compute_global_digest(config: dict[str, Any], render_context: dict[str, Any] | None = None) -> str:
+    """Digest of everything outside the document units that affects every page"""
+    document_level = {k: v for k, v in config.items() if k != "document_structure"}
+    return _digest({"document": document_level, "context": render_context or {}, "fonts": _fonts_fingerprint()})
+
+
+class PageManifest:
+    """Per-page digests of the layout that produced an output PDF"""
+
+    def __init__(self, path: Path, global_digest: str, page_digests: list[str], output_fingerprint: list[int] | None):
+        self.path = path
+        self.global_digest = global_digest
+        self.page_digests = page_digests
+        self.output_fingerprint = output_fingerprint
+
+    @classmethod
+    def load(cls, path: Path) -> "PageManifest | None":
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(path, data.get("global_digest", ""), data.get("page_digests", []), data.get("output_fingerprint"))
+
+    def save(self) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "global_digest": self.global_digest,
+            "page_digests": self.page_digests,
+            "output_fingerprint": self.output_fingerprint,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+def _page_count(pdf_path: str) -> int:
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def _assemble(plan: list[tuple[str, int]], previous_pdf: str, rendered_pdf: str, tmp_output: str) -> None:
+    """Build the new output from (source, page) pairs, copying consecutive runs in one call"""
+    with fitz.open(previous_pdf) as previous, fitz.open(rendered_pdf) as rendered, fitz.open() as result:
+        sources = {"previous": previous, "rendered": rendered}
+        run_start = 0
+        while run_start < len(plan):
+            source, first = plan[run_start]
+            run_end = run_start
+            while (
+                run_end + 1 < len(plan)
+                and plan[run_end + 1][0] == source
+                and plan[run_end + 1][1] == plan[run_end][1] + 1
+            ):
+                run_end += 1
+            result.insert_pdf(sources[source], from_page=first, to_page=plan[run_end][1])
+            run_start = run_end + 1
+
+        # Document-level metadata comes from the freshly rendered subset
+        result.set_metadata(rendered.metadata or previous.metadata or {})
+        result.save(tmp_output, garbage=3, deflate=True)
+
+
+def render_incrementally(
+    config: dict[str, Any],
+    output_pdf_path: str,
+    render: RenderFunction,
+    render_context: dict[str, Any] | None = None,
+) -> IncrementalRenderResult:
+    """
+    Render a layout, re-rendering only the units that changed since the previous output.
+
+    Args:
+        config: Layout configuration (UniversalDocument dictionary)
+        output_pdf_path: Output PDF path; the previous output at this path is reused
+        render: Callable rendering a configuration to a PDF path
+        render_context: Engine name, engine settings and template fingerprint; a change forces a full render
+
+    Returns:
+        IncrementalRenderResult describing which pages were rendered
+    """
+    units = config.get("document_structure", [])
+    # Template pages are picked by page index, so pages only move freely without one
+    page_digests = compute_page_digests(config, keep_page_number=bool((render_context or {}).get("template")))
+    global_digest = compute_global_digest(config, render_context)
+    manifest_path = manifest_path_for(output_pdf_path)
+    result = IncrementalRenderResult(total_pages=len(units))
+
+    previous = PageManifest.load(manifest_path)
+    reason = ""
+    if not units:
+        reason = "empty layout"
+    elif previous is None:
+        reason = "no previous page manifest"
+    elif previous.global_digest != global_digest:
+        reason = "document settings, engine or fonts changed"
+    elif previous.output_fingerprint != _file_fingerprint(output_pdf_path):
+        reason = "previous output is missing or was modified"
+
+    plan: list[tuple[str, int]] = []
+    dirty: list[int] = []
+    if previous is not None and not reason:
+        previous_index: dict[str, int] = {}
+        for index, digest in enumerate(previous.page_digests):
+            previous_index.setdefault(digest, index)
+        for index, digest in enumerate(page_digests):
+            if digest in previous_index:
+                plan.append(("previous", previous_index[digest]))
+            else:
+                plan.append(("rendered", len(dirty)))
+                dirty.append(index)
+
+    if reason:
+        logger.info(f"Incremental generation: full render ({reason})")
+        render(config, output_pdf_path)
+        result.full_render = True
+        result.reason = reason
+        result.rendered_pages = list(range(len(units)))
+    elif plan == [("previous", index) for index in range(len(previous.page_digests))]:  # type: ignore[union-attr]
+        result.reused_pages = len(units)
+        result.reason = "unchanged"
+        logger.info(f"Incremental generation: all {len(units)} pages unchanged, keeping {output_pdf_path}")
+        return result
+    else:
+        output_dir = os.path.dirname(os.path.abspath(output_pdf_path))
+        rendered_pdf = os.path.join(output_dir, f".{os.path.basename(output_pdf_path)}.dirty.pdf")
+        tmp_output = os.path.join(output_dir, f".{os.path.basename(output_pdf_path)}.tmp.pdf")
+        try:
+            if dirty:
+                render({**config, "document_structure": [units[i] for i in dirty]}, rendered_pdf)
+            else:
+                with fitz.open() as empty:
+                    empty.new_page()
+                    empty.save(rendered_pdf)
+
+            if dirty and _page_count(rendered_pdf) != len(dirty):
+                # The engine skipped or split units; page positions cannot be trusted
+                logger.info("Incremental generation: full render (rendered page count mismatch)")
+                render(config, output_pdf_path)
+                result.full_render = True
+                result.reason = "rendered page count mismatch"
+                result.rendered_pages = list(range(len(units)))
+            else:
+                _assemble(plan, output_pdf_path, rendered_pdf, tmp_output)
+                os.replace(tmp_output, output_pdf_path)
+                result.rendered_pages = dirty
+                result.reused_pages = len(units) - len(dirty)
+                logger.info(
+                    f"Incremental generation: re-rendered {len(dirty)} of {len(units)} pages, "
+                    f"reused {result.reused_pages} from {output_pdf_path}"
+                )
+        finally:
+            for path in (rendered_pdf, tmp_output):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    if os.path.exists(output_pdf_path) and _page_count(output_pdf_path) == len(units):
+        PageManifest(manifest_path, global_digest, page_digests, _file_fingerprint(output_pdf_path)).save()
+    else:
+        # Pages do not map one-to-one onto units; do not offer reuse next time
+        manifest_path.unlink(missing_ok=True)
+    return result
@@ -1,10 +1,13 @@
 # src/pdf_engine.py
 
 import logging
+import time
 from typing import Any, ClassVar
 
 import pymupdf as fitz
 
+from pdfrebuilder.engine.master_pages import SharedLayerPlacer
+from pdfrebuilder.engine.render_profiler import get_active_profiler
 from pdfrebuilder.models.universal_idm import UniversalDocument
 
 from .render import _render_element
@@ -80,15 +83,22 @@ def generate(self, config: dict, output_pdf_path: str, original_pdf_for_template
         """
         Generates a PDF from universal JSON config.
         """
+        profiler = get_active_profiler()
         try:
             with fitz.open() as doc:
                 doc: fitz.Document
                 tpl_doc = fitz.open(original_pdf_for_template) if original_pdf_for_template else None
+                shared_layers = SharedLayerPlacer(
+                    config.get("shared_layers", []),
+                    lambda target, element: _render_element(target, element, "shared", {}, config),
+                )
                 for doc_unit_idx, doc_unit_data in enumerate(config.get("document_structure", [])):
                     if doc_unit_data.get("type") != "page":
                         continue
                     page_data = doc_unit_data
                     page_idx = page_data.get("page_number", doc_unit_idx)
+                    if profiler is not None:
+                        profiler.start_page(page_idx)
                     page = doc.new_page(width=page_data["size"][0], height=page_data["size"][1])
                     page_bg_color = page_data.get("page_background_color")
                     if page_bg_color is not None:
@@ -97,10 +107,24 @@ def generate(self, config: dict, output_pdf_path: str, original_pdf_for_template
                         # The 'show_pdf_page' method is valid in PyMuPDF, but the library's type
                         # stubs are incomplete, causing mypy/pyright to raise a false positive.
                         page.show_pdf_page(page.rect, tpl_doc, page_idx)  # type: ignore[attr-defined]
+                    shared_layers.place(page, page_data.get("shared_layer_refs", []))
                     for layer_data in page_data.get("layers", []):
                         for element in layer_data.get("content", []):
+                            if profiler is None:
+                                _render_element(page, element, page_idx, {}, config)
+                                continue
+                            started = time.perf_counter()
                             _render_element(page, element, page_idx, {}, config)
+                            profiler.record_element(
+                                element.get("id", "N/A"),
+                                element.get("type", "unknown"),
+                                (element.get("font_details") or {}).get("name"),
+                                time.perf_counter() - started,
+                            )
+                    if profiler is not None:
+                        profiler.end_page()
                 doc.save(output_pdf_path)
+                shared_layers.close()
                 if tpl_doc:
                     tpl_doc.close()
         except Exception as e:
@@ -2,70 +2,182 @@
 PDF recreation from configuration file.
 
 This module provides functions for generating PDFs from JSON configuration
-using the engine selection system.
+using the engine selection system, either from a config file on disk or from
+an in-memory layout, writing to a path, a binary stream or returned bytes.
 """
 
+import io
 import json
 import logging
-from typing import Any
+import os
+import time
+from typing import Any, BinaryIO
 
 from pdfrebuilder.engine.config_loader import load_engine_config
-from pdfrebuilder.engine.pdf_engine_selector import get_default_pdf_engine, get_pdf_engine
+from pdfrebuilder.engine.engine_profiles import AUTO_ENGINE, DocumentFeatures, get_engine_profiles
+from pdfrebuilder.engine.pdf_engine_selector import choose_pdf_engine, get_default_pdf_engine, get_pdf_engine
 
 logger = logging.getLogger(__name__)
 
 
+def _select_engine(engine_name: str | None, engine_config: dict[str, Any]) -> Any:
+    if engine_name:
+        try:
+            engine = get_pdf_engine(engine_name, engine_config)
+            logger.info(f"Using specified engine: {engine_name}")
+            return engine
+        except Exception as e:
+            logger.warning(f"Could not create engine {engine_name}: {e}")
+            logger.info("Falling back to default engine")
+            return get_default_pdf_engine(engine_config)
+    engine = get_default_pdf_engine(engine_config)
+    logger.info(f"Using default engine: {engine.engine_name}")
+    return engine
+
+
 def recreate_pdf_from_config(
     config_path: str,
-    output_pdf_path: str,
+    output_pdf_path: str | BinaryIO,
     engine_name: str | None = None,
     engine_config: dict[str, Any] | None = None,
     original_pdf_for_template: str | None = None,
     engine: Any = None,
+    incremental: bool = False,
 ) -> None:
     """
     Generate a PDF from a JSON configuration file.
 
     Args:
         config_path: Path to the JSON configuration file
-        output_pdf_path: Path where the generated PDF should be saved
+        output_pdf_path: Path where the generated PDF should be saved, or a writable binary stream
         engine_name: Optional engine name to use (defaults to configured default)
         engine_config: Optional engine configuration dictionary
         original_pdf_for_template: Optional path to original PDF for template mode
+        incremental: Re-render only pages that changed since the previous output at output_pdf_path
     """
     try:
         # Load the document configuration
         with open(config_path) as f:
             config = json.load(f)
 
-        # Load engine configuration if not provided
-        if engine_config is None:
-            engine_config = load_engine_config()
-
-        # Select and create the PDF engine
-        if engine is None:
-            if engine_name:
-                try:
-                    engine = get_pdf_engine(engine_name, engine_config)
-                    logger.info(f"Using specified engine: {engine_name}")
-                except Exception as e:
-                    logger.warning(f"Could not create engine {engine_name}: {e}")
-                    logger.info("Falling back to default engine")
-                    engine = get_default_pdf_engine(engine_config)
-            else:
-                engine = get_default_pdf_engine(engine_config)
-                logger.info(f"Using default engine: {engine.engine_name}")
-
-        # Render the PDF
-        engine.render(config, output_pdf_path, original_pdf_for_template)
-
-        logger.info(f"Successfully generated PDF: {output_pdf_path}")
+        recreate_pdf_from_layout(
+            config,
+            output_pdf_path,
+            engine_name=engine_name,
+            engine_config=engine_config,
+            original_pdf_for_template=original_pdf_for_template,
+            engine=engine,
+            incremental=incremental,
+        )
 
     except Exception as e:
         logger.error(f"Failed to generate PDF from config {config_path}: {e}")
         raise e
 
 
+def recreate_pdf_from_layout(
+    config: dict[str, Any],
+    output: str | BinaryIO | None = None,
+    engine_name: str | None = None,
+    engine_config: dict[str, Any] | None = None,
+    original_pdf_for_template: str | None = None,
+    engine: Any = None,
+    incremental: bool = False,
+) -> bytes | None:
+    """
+    Generate a PDF from an in-memory layout (the dictionary form of a layout config).
+
+    Args:
+        config: Layout dictionary, e.g. ``UniversalDocument.to_dict()``
+        output: Output path or writable binary stream; when omitted the PDF is returned as bytes
+        engine_name: Optional engine name to use (defaults to configured default)
+        engine_config: Optional engine configuration dictionary
+        original_pdf_for_template: Optional path to original PDF for template mode
+        incremental: Re-render only pages that changed since the previous output (path outputs only)
+
+    Returns:
+        The PDF bytes when no output was given, otherwise None
+    """
+    if incremental and not isinstance(output, str):
+        raise ValueError("Incremental generation needs an output path to compare against")
+
+    # Load engine configuration if not provided
+    if engine_config is None:
+        engine_config = load_engine_config()
+
+    # Select and create the PDF engine; "auto" picks the engine predicted to be fastest for this layout
+    auto = False
+    if engine is None:
+        if (engine_name or engine_config.get("default_engine", "")).lower() == AUTO_ENGINE:
+            auto = True
+            engine_name = choose_pdf_engine(config, engine_config, original_pdf_for_template).engine
+        engine = _select_engine(engine_name, engine_config)
+
+    def render(render_config: dict[str, Any], render_target: Any) -> None:
+        started = time.perf_counter()
+        engine.render(render_config, render_target, original_pdf_for_template)
+        if auto:
+            # Filed under the engine that rendered, which is the default engine when the choice could not be created
+            _record_auto_render(
+                getattr(engine, "engine_name", engine_name),
+                render_config,
+                engine_config,
+                original_pdf_for_template,
+                started,
+            )
+
+    buffer = io.BytesIO() if output is None else None
+    target = buffer if buffer is not None else output
+
+    # Render the PDF
+    if incremental:
+        from pdfrebuilder.core.incremental_generation import render_incrementally
+
+        render_context = {
+            "engine": getattr(engine, "engine_name", type(engine).__name__),
+            "engine_config": engine_config,
+            "template": original_pdf_for_template,
+            "template_fingerprint": _template_fingerprint(original_pdf_for_template),
+        }
+        # Incremental renders record the pages they re-render, so profiles see the work actually done
+        render_incrementally(config, target, render, render_context)
+    else:
+        render(config, target)
+
+    if buffer is not None:
+        logger.info(f"Successfully generated PDF in memory ({buffer.tell()} bytes)")
+        return buffer.getvalue()
+    logger.info(f"Successfully generated PDF: {output if isinstance(output, str) else '<stream>'}")
+    return None
+
+
+def _record_auto_render(
+    engine_name: str,
+    config: dict[str, Any],
+    engine_config: dict[str, Any],
+    original_pdf_for_template: str | None,
+    started: float,
+) -> None:
+    """Refine the engine's throughput profile with an ``auto`` render; the file is written later, off the render path"""
+    auto_config = engine_config.get(AUTO_ENGINE, {})
+    if not auto_config.get("learn", True):
+        return
+    profiles = get_engine_profiles(auto_config.get("profiles_path"))
+    profiles.record(
+        engine_name,
+        DocumentFeatures.from_layout(config, original_pdf_for_template),
+        time.perf_counter() - started,
+    )
+    profiles.save_later()
+
+
+def _template_fingerprint(template_path: str | None) -> list[int] | None:
+    if not template_path or not os.path.exists(template_path):
+        return None
+    stat = os.stat(template_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
 def recreate_pdf_with_engine(
     config_path: str,
     output_pdf_path: str,
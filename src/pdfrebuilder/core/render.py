@@ -1,14 +1,20 @@
 import logging
 import math
 import os
-from functools import singledispatch
+import time
+from functools import lru_cache, singledispatch
 from typing import Any, TypedDict
 
 # from pdfrebuilder.pdf_engine import FitzPDFEngine  # Remove if not directly used
 import fitz  # Only for types/constants; all I/O should use FitzPDFEngine
 
+from pdfrebuilder.engine.asset_store import read_memory_asset
+from pdfrebuilder.engine.path_encoding import pdf_path_operators
+from pdfrebuilder.engine.render_profiler import get_active_profiler
+from pdfrebuilder.engine.text_coalescing import glyph_runs, offsets_for_text
 from pdfrebuilder.engine.tool_fritz import _convert_color_to_rgb
-from pdfrebuilder.font.utils import ensure_font_registered
+from pdfrebuilder.font.utils import _find_font_file_for_name, ensure_font_registered
+from pdfrebuilder.models.universal_idm import PathData
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -72,6 +78,23 @@ def _(obj: tuple):
     return list(obj)
 
 
+@lru_cache(maxsize=64)
+def _measuring_font(font_path: str) -> fitz.Font:
+    return fitz.Font(fontfile=font_path)
+
+
+def _glyph_measure(font_name, size):
+    """Width function used to split coalesced text into runs, or None when the font cannot be measured"""
+    if font_name.lower() in fitz.Base14_fontdict:
+        return lambda run: fitz.get_text_length(run, fontname=font_name, fontsize=size)
+
+    font_path = _find_font_file_for_name(font_name)
+    if font_path:
+        font = _measuring_font(font_path)
+        return lambda run: font.text_length(run, fontsize=size)
+    return None
+
+
 def _render_text_with_fallback(
     page,
     rect_obj,
@@ -82,11 +105,13 @@ def _render_text_with_fallback(
     elem_id="N/A",
     use_textbox=False,
     use_htmlbox=False,
+    glyph_offsets=None,
 ):
     """
     Renders text using either a rectangle (insert_textbox), a starting point (insert_text), or insert_htmlbox.
     If use_textbox is True, uses insert_textbox (with fallback logic). Otherwise, uses insert_text at the bottom-left of rect_obj.
     If use_htmlbox is True, uses insert_htmlbox with the rect.
+    With glyph_offsets (coalesced spans), insert_text is called once per run of correctly advancing glyphs.
 
     Enhanced with comprehensive font error handling and registration validation.
     """
@@ -188,7 +213,13 @@ def _render_text_with_fallback(
     else:
         # Use insert_text at the bottom-left corner of the rect
         point = rect_obj.bl  # bottom-left
-        page.insert_text(point, text, **final_kwargs)
+        if glyph_offsets:
+            runs = glyph_runs(text, glyph_offsets, _glyph_measure(actual_font, size))
+            for offset, run_text in runs:
+                page.insert_text((point.x + offset, point.y), run_text, **final_kwargs)
+            final_kwargs["glyph_runs"] = len(runs)
+        else:
+            page.insert_text(point, text, **final_kwargs)
         logger.info(f"Inserted text for ID {elem_id} at point {point} (font='{actual_font}', size={size}).")
         final_kwargs["text_content"] = text
         final_kwargs["point"] = list(point)
@@ -200,6 +231,8 @@ def _render_vector_element(page, element_data):
     Renders a vector element (drawing or shape) by creating a Shape object,
     populating it with drawing commands, and committing it to the page.
     This version properly handles null color values for stroke and fill.
+    Elements extracted from PDFs carry a compact ``path`` (opcode string plus flat
+    coordinate array, see ``PathData``) that is written as PDF path operators directly.
 
     Null color handling:
     - If stroke color is null, no stroke is applied (interpreted as "no stroke")
@@ -259,8 +292,9 @@ def _render_vector_element(page, element_data):
     Returns:
         Dictionary with information about the rendering operation
     """
-    drawing_commands = element_data.get("drawing_commands")
-    if not drawing_commands:
+    drawing_commands = element_data.get("drawing_commands") or []
+    path_data = element_data.get("path")
+    if not drawing_commands and not path_data:
         logger.warning(f"Vector element ID {element_data.get('id', 'N/A')} has no 'drawing_commands'. Skipping.")
         return {"error": "Vector element missing 'drawing_commands'."}
 
@@ -304,6 +338,11 @@ def _render_vector_element(page, element_data):
     try:
         shape = page.new_shape()
 
+        if path_data:
+            # Compact path: emit the path operators in one pass, closing is encoded in the path itself
+            shape.draw_cont += pdf_path_operators(PathData.from_dict(path_data), shape.ipctm)
+            shape.updateRect(fitz.Rect(element_data.get("bbox") or (0, 0, 0, 0)))
+
         # Collect all M and L commands to create a polyline
         polyline_points = []
 
@@ -635,6 +674,7 @@ def _render_element(page, element, page_idx, page_overrides, config, use_htmlbox
             override_data = page_overrides.get(str(element.get("id")), {})
 
             text = override_data.get("text", element.get("text", ""))
+            glyph_offsets = offsets_for_text(text, element.get("raw_text", ""), element.get("glyph_offsets"))
             font_name_from_element = element.get("font_details", {}).get("name")
             requested_font = override_data.get("font", font_name_from_element or config.get("default_font", "helv"))
             font_size_from_element = element.get("font_details", {}).get("size")
@@ -646,7 +686,15 @@ def _render_element(page, element, page_idx, page_overrides, config, use_htmlbox
             try:
                 from pdfrebuilder.font.utils import FontRegistrationError
 
-                actual_font = ensure_font_registered(page, requested_font, verbose=True, text=text)
+                profiler = get_active_profiler()
+                if profiler is None:
+                    actual_font = ensure_font_registered(page, requested_font, verbose=True, text=text)
+                else:
+                    started = time.perf_counter()
+                    actual_font = ensure_font_registered(page, requested_font, verbose=True, text=text)
+                    profiler.record_font(
+                        requested_font, actual_font, time.perf_counter() - started, actual_font != requested_font
+                    )
 
                 # Log font registration details for debugging
                 logger.debug(
@@ -665,6 +713,7 @@ def _render_element(page, element, page_idx, page_overrides, config, use_htmlbox
                     elem_id,
                     use_textbox=False,
                     use_htmlbox=use_htmlbox,
+                    glyph_offsets=glyph_offsets,
                 )
 
             except FontRegistrationError as font_error:
@@ -724,6 +773,7 @@ def _render_element(page, element, page_idx, page_overrides, config, use_htmlbox
                             elem_id,
                             use_textbox=False,
                             use_htmlbox=use_htmlbox,
+                            glyph_offsets=glyph_offsets,
                         )
 
                         # Mark as having font issues but continue
@@ -761,7 +811,19 @@ def _render_element(page, element, page_idx, page_overrides, config, use_htmlbox
                 return {"error": "Image element missing bbox."}
             rect_obj = fitz.Rect(rect_coords)
 
-            if (image_file := element.get("image_file")) and os.path.exists(image_file):
+            image_file = element.get("image_file")
+            if image_file and (image_data := read_memory_asset(image_file)) is not None:
+                page.insert_image(rect_obj, stream=image_data, overlay=True)
+                effective_params.update(
+                    {
+                        "pymupdf_call": "page.insert_image",
+                        "pymupdf_kwargs": {
+                            "rect": [rect_obj.x0, rect_obj.y0, rect_obj.x1, rect_obj.y1],
+                            "stream": image_file,
+                        },
+                    }
+                )
+            elif image_file and os.path.exists(image_file):
                 page.insert_image(rect_obj, filename=image_file, overlay=True)
                 effective_params.update(
                     {
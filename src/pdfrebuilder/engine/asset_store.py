@@ -0,0 +1,375 @@
+"""
+Content-addressed asset storage for the Multi-Format Document Engine.
+
+Extracted images are stored under their full SHA-256 digest in sharded
+directories (``<root>/ab/cd/img_abcd....png``). Identical content maps to the
+same file, so repeated images and repeated extractions never rewrite data that
+is already on disk. Every stored occurrence is recorded in a refcounted
+AssetManifest. Extractors take their references inside ``document_scope``,
+which releases them when the document is done, so a process-wide store only
+counts references for documents that are still being extracted.
+
+When a BackgroundAssetWriter is passed, the path is still decided up front
+but the write happens on the writer's threads. Encoded bytes (``put_bytes``)
+are keyed by their own hash. Decoded images (``put_image``, ``put_encoded``)
+are keyed by a hash of their pixels and the target format, so the key is
+known before encoding and the encoding itself runs on the writer's threads.
+Either way both modes give the same file names.
+
+``InMemoryAssetStore`` keeps the same layout in a dictionary instead of on
+disk, for services that extract and regenerate without a writable
+filesystem; renderers look stored paths up with ``read_memory_asset``.
+"""
+
+import contextlib
+import hashlib
+import io
+import logging
+import os
+import threading
+import weakref
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from pdfrebuilder.engine.asset_writer import BackgroundAssetWriter, write_file_atomic
+
+if TYPE_CHECKING:
+    from pdfrebuilder.engine.document_parser import AssetManifest
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoredAsset:
+    """Location and identity of an asset in the store"""
+
+    content_hash: str
+    path: str
+    size: int
+    written: bool
+
+
+class ContentAddressedAssetStore:
+    """
+    Deduplicating asset store keyed by full content hash.
+
+    Args:
+        root_dir: Directory holding the sharded asset tree
+        shard_levels: Number of directory levels derived from the hash
+        shard_width: Hex characters of the hash consumed per level
+        prefix: File name prefix for stored assets
+    """
+
+    # Whether stored paths outlive the process (and may be cached across runs)
+    persistent = True
+
+    def __init__(self, root_dir: str, shard_levels: int = 2, shard_width: int = 2, prefix: str = "img_"):
+        self.root_dir = root_dir
+        self.shard_levels = shard_levels
+        self.shard_width = shard_width
+        self.prefix = prefix
+        # document_parser imports the extractors, which import this module
+        from pdfrebuilder.engine.document_parser import AssetManifest
+
+        self.manifest = AssetManifest()
+        self._known_dirs: set[str] = set()
+        self._queued: set[str] = set()
+        self._lock = threading.Lock()
+        # Per-thread stack of the document scopes that are open
+        self._scopes = threading.local()
+        self.writes = 0
+        self.dedup_hits = 0
+        self.bytes_written = 0
+
+    @contextlib.contextmanager
+    def document_scope(self) -> Iterator["AssetManifest"]:
+        """
+        Scope the references taken on this thread to one document.
+
+        References recorded inside the block are also counted in a manifest of
+        their own, which the block yields. On exit they are released from the
+        store's manifest. Close any background writer inside the block, so
+        failed writes are settled before the release.
+        """
+        from pdfrebuilder.engine.document_parser import AssetManifest
+
+        scope = AssetManifest()
+        stack = self._scopes.__dict__.setdefault("stack", [])
+        stack.append(scope)
+        try:
+            yield scope
+        finally:
+            stack.remove(scope)
+            with self._lock:
+                for entry in scope.images:
+                    for _ in range(entry["refcount"]):
+                        self.manifest.release_image(entry["content_hash"])
+
+    def _current_scope(self) -> "AssetManifest | None":
+        stack = getattr(self._scopes, "stack", None)
+        return stack[-1] if stack else None
+
+    def _add_reference(
+        self,
+        scope: "AssetManifest | None",
+        path: str,
+        content_hash: str,
+        original_name: str | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """Record a reference in the store's manifest and the document scope; call with the lock held"""
+        self.manifest.add_image(path, original_name, metadata, content_hash=content_hash)
+        if scope is not None:
+            scope.add_image(path, original_name, metadata, content_hash=content_hash)
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, content_hash: str, ext: str) -> str:
+        """Sharded path for a content hash"""
+        shards = [
+            content_hash[level * self.shard_width : (level + 1) * self.shard_width]
+            for level in range(self.shard_levels)
+        ]
+        return os.path.join(self.root_dir, *shards, f"{self.prefix}{content_hash}.{ext.lstrip('.')}")
+
+    def contains(self, content_hash: str, ext: str) -> bool:
+        path = self.path_for(content_hash, ext)
+        with self._lock:
+            if path in self._queued:
+                return True
+        return self._exists(path)
+
+    def _exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    def _write(self, path: str, data: bytes) -> None:
+        self._ensure_dir(os.path.dirname(path))
+        write_file_atomic(path, data)
+
+    def _ensure_dir(self, directory: str) -> None:
+        if directory in self._known_dirs:
+            return
+        os.makedirs(directory, exist_ok=True)
+        self._known_dirs.add(directory)
+
+    def put_bytes(
+        self,
+        data: bytes,
+        ext: str,
+        content_hash: str | None = None,
+        original_name: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        writer: BackgroundAssetWriter | None = None,
+    ) -> StoredAsset:
+        """
+        Store encoded asset bytes, skipping the write when the content already exists.
+
+        Args:
+            data: Encoded asset bytes (e.g. a PNG or JPEG stream)
+            ext: File extension without the dot
+            content_hash: Precomputed SHA-256 of data, if the caller already has it
+            original_name: Optional name recorded in the manifest
+            metadata: Optional metadata recorded in the manifest
+            writer: Optional background writer; the write is queued instead of done inline
+
+        Returns:
+            StoredAsset describing where the content lives
+        """
+        content_hash = content_hash or self.hash_bytes(data)
+        return self._store(content_hash, ext, lambda: data, len(data), original_name, metadata, writer)
+
+    def _store(
+        self,
+        content_hash: str,
+        ext: str,
+        produce: Callable[[], bytes],
+        size: int,
+        original_name: str | None,
+        metadata: dict[str, Any] | None,
+        writer: BackgroundAssetWriter | None,
+    ) -> StoredAsset:
+        path = self.path_for(content_hash, ext)
+        scope = self._current_scope()
+
+        with self._lock:
+            exists = path in self._queued or self._exists(path)
+            if writer is not None and not exists:
+                # Reserve and record the asset before queueing it, so concurrent puts of the
+                # same content deduplicate against it and a failed write can release it
+                self._queued.add(path)
+                self.writes += 1
+                self._add_reference(scope, path, content_hash, original_name, metadata)
+
+        if writer is not None and not exists:
+            # Submitting may block on a full queue, so it happens outside the lock
+            future = writer.submit(path, produce, label=original_name or path)
+            future.add_done_callback(lambda done: self._write_finished(done, path, content_hash, scope))
+            return StoredAsset(content_hash=content_hash, path=path, size=size, written=True)
+
+        if not exists:
+            data = produce()
+            size = len(data)
+            self._write(path, data)
+
+        with self._lock:
+            if exists:
+                self.dedup_hits += 1
+            else:
+                self.writes += 1
+                self.bytes_written += size
+            self._add_reference(scope, path, content_hash, original_name, metadata)
+
+        return StoredAsset(content_hash=content_hash, path=path, size=size, written=not exists)
+
+    def _write_finished(
+        self, future: Future, path: str, content_hash: str, scope: "AssetManifest | None" = None
+    ) -> None:
+        with self._lock:
+            self._queued.discard(path)
+            if future.exception() is None:
+                self.bytes_written += future.result()
+                return
+            # The content never reached the disk; forget every reference taken on it
+            self.writes -= 1
+            while self.manifest.release_image(content_hash):
+                pass
+            while scope is not None and scope.release_image(content_hash):
+                pass
+
+    def add_reference(self, asset: StoredAsset) -> None:
+        """Record another use of an already stored asset without touching the disk"""
+        with self._lock:
+            self.dedup_hits += 1
+            self._add_reference(self._current_scope(), asset.path, asset.content_hash)
+
+    def put_encoded(
+        self,
+        content_hash: str,
+        ext: str,
+        encode: Callable[[], bytes],
+        original_name: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        writer: BackgroundAssetWriter | None = None,
+    ) -> StoredAsset:
+        """
+        Store content that still has to be encoded, under a key derived from what it encodes.
+
+        Args:
+            content_hash: Hash identifying the content, e.g. of the pixels and the target format
+            ext: File extension without the dot
+            encode: Callable returning the encoded bytes; only called when the content is not stored yet,
+                on a writer thread when a writer is given
+            original_name: Optional name recorded in the manifest
+            metadata: Optional metadata recorded in the manifest
+            writer: Optional background writer
+
+        Returns:
+            StoredAsset describing where the content lives; its size is 0 unless it was encoded inline
+        """
+        return self._store(content_hash, ext, encode, 0, original_name, metadata, writer)
+
+    def put_image(
+        self,
+        image: Any,
+        ext: str = "png",
+        original_name: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        writer: BackgroundAssetWriter | None = None,
+    ) -> StoredAsset:
+        """
+        Store a PIL image, encoding it on the writer's threads when a writer is given.
+
+        The image must not change until the writer has been flushed.
+        """
+        image_format = "JPEG" if ext.lower() in ("jpg", "jpeg") else ext.upper()
+
+        def encode() -> bytes:
+            buffer = io.BytesIO()
+            image.save(buffer, format=image_format)
+            return buffer.getvalue()
+
+        return self.put_encoded(
+            pixel_hash(image, image_format), ext, encode, original_name=original_name, metadata=metadata, writer=writer
+        )
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "root_dir": self.root_dir,
+                "writes": self.writes,
+                "dedup_hits": self.dedup_hits,
+                "bytes_written": self.bytes_written,
+                "unique_assets": len(self.manifest.images),
+            }
+
+
+def pixel_hash(image: Any, image_format: str) -> str:
+    """SHA-256 of a PIL image's pixels, mode, size, palette and info, and the format it will be encoded in"""
+    digest = hashlib.sha256()
+    header = [image_format.upper(), image.mode, list(image.size), sorted((k, repr(v)) for k, v in image.info.items())]
+    digest.update(repr(header).encode("utf-8"))
+    palette = image.getpalette() if image.mode in ("P", "PA") else None
+    if palette:
+        digest.update(bytes(palette))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class InMemoryAssetStore(ContentAddressedAssetStore):
+    """
+    Asset store that keeps content in memory under the same sharded paths.
+
+    Stored paths are virtual: they resolve through ``read_memory_asset`` while
+    the store is alive and never touch the filesystem. Background writers are
+    ignored, since there is no disk to wait on.
+    """
+
+    persistent = False
+
+    def __init__(self, root_dir: str = "memory", **kwargs: Any):
+        super().__init__(root_dir, **kwargs)
+        self.assets: dict[str, bytes] = {}
+        _MEMORY_STORES.add(self)
+
+    def _exists(self, path: str) -> bool:
+        return path in self.assets
+
+    def _write(self, path: str, data: bytes) -> None:
+        self.assets[path] = data
+
+    def _store(self, content_hash, ext, produce, size, original_name, metadata, writer):
+        return super()._store(content_hash, ext, produce, size, original_name, metadata, None)
+
+    def read(self, path: str) -> bytes | None:
+        return self.assets.get(path)
+
+
+_MEMORY_STORES: "weakref.WeakSet[InMemoryAssetStore]" = weakref.WeakSet()
+
+
+def read_memory_asset(path: str) -> bytes | None:
+    """Content stored under path by a live InMemoryAssetStore, or None for on-disk assets"""
+    for store in list(_MEMORY_STORES):
+        data = store.read(path)
+        if data is not None:
+            return data
+    return None
+
+
+_STORES: dict[str, ContentAddressedAssetStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_asset_store(root_dir: str) -> ContentAddressedAssetStore:
+    """Get the process-wide asset store for a directory, creating it on first use"""
+    key = os.path.abspath(root_dir)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = ContentAddressedAssetStore(root_dir)
+            _STORES[key] = store
+        return store
@@ -0,0 +1,234 @@
+"""
+Background asset writing for the Multi-Format Document Engine.
+
+Extraction hands encoded (or still-to-be-encoded) assets to a
+``BackgroundAssetWriter`` and carries on with the next page or layer while a
+thread pool encodes and writes them. The queue is bounded, so a slow output
+volume applies back-pressure instead of buffering a whole document in memory.
+``flush`` is the barrier to call before the layout JSON is written: it waits
+for every pending write, fsyncs the touched directories and reports the
+assets that failed.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+from pdfrebuilder.models.universal_idm import ImageElement, Layer, UniversalDocument
+
+logger = logging.getLogger(__name__)
+
+
+def write_file_atomic(path: str, data: bytes, fsync: bool = False) -> None:
+    """Write data to a unique temp file next to path and rename it into place"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@dataclass
+class AssetWriteFailure:
+    """An asset that could not be written"""
+
+    path: str
+    error: BaseException
+    label: str | None = None
+
+
+class AssetWriteError(Exception):
+    """Raised by ``flush(raise_on_error=True)`` when assets failed to write"""
+
+    def __init__(self, failures: list[AssetWriteFailure]):
+        self.failures = failures
+        names = ", ".join(failure.label or failure.path for failure in failures[:5])
+        super().__init__(f"{len(failures)} asset(s) failed to write: {names}")
+
+
+class BackgroundAssetWriter:
+    """
+    Encodes and writes assets on a thread pool behind a bounded queue.
+
+    Args:
+        max_workers: Number of writer threads
+        max_queued: Maximum number of assets queued or in flight; ``submit`` blocks beyond this
+        fsync: Whether to fsync each file and, on flush, the directories written to
+    """
+
+    def __init__(self, max_workers: int = 4, max_queued: int = 32, fsync: bool = True):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.fsync = fsync
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-writer")
+        self._slots = threading.BoundedSemaphore(max_queued)
+        self._lock = threading.Lock()
+        self._pending: set[Future] = set()
+        self._failures: list[AssetWriteFailure] = []
+        self._known_dirs: set[str] = set()
+        self._dirs_to_sync: set[str] = set()
+        self.submitted = 0
+        self.written = 0
+        self.bytes_written = 0
+        self.blocked_seconds = 0.0
+
+    def submit(self, path: str, produce: Callable[[], bytes], label: str | None = None) -> Future:
+        """
+        Queue an asset write.
+
+        Args:
+            path: Destination file path
+            produce: Callable returning the encoded bytes; runs on a writer thread
+            label: Name used when reporting a failure (e.g. the element id)
+
+        Returns:
+            Future resolving to the number of bytes written
+        """
+        if not self._slots.acquire(blocking=False):
+            started = time.perf_counter()
+            self._slots.acquire()
+            with self._lock:
+                self.blocked_seconds += time.perf_counter() - started
+
+        future = self._executor.submit(self._write, path, produce)
+        with self._lock:
+            self.submitted += 1
+            self._pending.add(future)
+        future.add_done_callback(lambda done: self._finished(done, path, label))
+        return future
+
+    def _write(self, path: str, produce: Callable[[], bytes]) -> int:
+        data = produce()
+        directory = os.path.dirname(path)
+        if directory not in self._known_dirs:
+            os.makedirs(directory or ".", exist_ok=True)
+            self._known_dirs.add(directory)
+        write_file_atomic(path, data, fsync=self.fsync)
+        return len(data)
+
+    def _finished(self, future: Future, path: str, label: str | None) -> None:
+        self._slots.release()
+        error = future.exception()
+        with self._lock:
+            self._pending.discard(future)
+            if error is None:
+                self.written += 1
+                self.bytes_written += future.result()
+                self._dirs_to_sync.add(os.path.dirname(path))
+            else:
+                self._failures.append(AssetWriteFailure(path=path, error=error, label=label))
+        if error is not None:
+            logger.error(f"❌ Error writing asset {label or path}: {error}")
+
+    def flush(self, raise_on_error: bool = False) -> list[AssetWriteFailure]:
+        """
+        Wait for all queued writes, fsync the directories written to and collect failures.
+
+        Args:
+            raise_on_error: Raise AssetWriteError instead of returning failures
+
+        Returns:
+            Failures since the previous flush
+        """
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                break
+            wait(pending)
+
+        with self._lock:
+            failures, self._failures = self._failures, []
+            directories, self._dirs_to_sync = self._dirs_to_sync, set()
+        if self.fsync:
+            for directory in directories:
+                _fsync_directory(directory)
+
+        if failures and raise_on_error:
+            raise AssetWriteError(failures)
+        return failures
+
+    def close(self) -> list[AssetWriteFailure]:
+        """Flush pending writes and stop the writer threads"""
+        failures = self.flush()
+        self._executor.shutdown(wait=True)
+        return failures
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "failed": len(self._failures),
+                "pending": len(self._pending),
+                "bytes_written": self.bytes_written,
+                "blocked_seconds": self.blocked_seconds,
+            }
+
+    def __enter__(self) -> "BackgroundAssetWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _fsync_directory(directory: str) -> None:
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return  # Directories cannot be opened for fsync on some platforms
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def create_asset_writer() -> BackgroundAssetWriter | None:
+    """Background writer configured from ``settings.processing``, or None when asynchronous writes are off"""
+    from pdfrebuilder.settings import settings
+
+    processing = settings.processing
+    if not processing.async_asset_writes:
+        return None
+    return BackgroundAssetWriter(
+        max_workers=processing.asset_writer_threads,
+        max_queued=processing.asset_writer_queue_size,
+        fsync=processing.asset_writer_fsync,
+    )
+
+
+def remove_failed_images(document: UniversalDocument, failures: list[AssetWriteFailure]) -> int:
+    """
+    Drop image elements whose file failed to write, as synchronous extraction would have.
+
+    Returns:
+        Number of elements removed
+    """
+    failed_paths = {failure.path for failure in failures}
+    if not failed_paths:
+        return 0
+
+    def prune(layers: list[Layer]) -> int:
+        removed = 0
+        for layer in layers:
+            kept = []
+            for element in layer.content:
+                if isinstance(element, ImageElement) and element.image_file in failed_paths:
+                    logger.error(f"❌ Dropping image element {element.id}: {element.image_file} was not written")
+                    removed += 1
+                else:
+                    kept.append(element)
+            layer.content = kept
+            removed += prune(layer.children)
+        return removed
+
+    return sum(prune(unit.layers) for unit in document.document_structure) + prune(document.shared_layers)
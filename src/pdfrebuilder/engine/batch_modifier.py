@@ -7,9 +7,12 @@
 
 import logging
 import re
+from collections import Counter
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass, field
 from typing import Any
 
+from pdfrebuilder.engine.master_pages import SharedLayerEditor
 from pdfrebuilder.font.font_validator import FontValidator
 from pdfrebuilder.models.universal_idm import PageUnit, TextElement, UniversalDocument
 
@@ -88,63 +91,50 @@ def batch_text_replacement(
         # Track modifications
         modified_count = 0
         skipped_count = 0
-        font_warnings = []
+        font_issues: Counter[str] = Counter()
 
-        # Process each document unit
-        for unit in document.document_structure:
-            if not isinstance(unit, PageUnit):
-                continue
-
-            page_num = unit.page_number
-
-            # Skip if page filtering is applied and this page doesn't match
-            if page_numbers is not None and page_num not in page_numbers:
+        # Process the text of the selected pages and the shared layers they reference
+        for _page_number, element, editable in self._text_elements(document, page_numbers):
+            # Skip if element filtering is applied and this element doesn't match
+            if element_ids is not None and element.id not in element_ids:
+                skipped_count += 1
                 continue
 
-            # Process each layer
-            for layer in unit.layers:
-                for element in layer.content:
-                    if not isinstance(element, TextElement):
-                        continue
-
-                    # Skip if element filtering is applied and this element doesn't match
-                    if element_ids is not None and element.id not in element_ids:
-                        skipped_count += 1
-                        continue
-
-                    # Check if this element's text needs replacement
-                    current_text = element.text
-                    modified = False
-
-                    for old_text, new_text in replacement_map.items():
-                        if old_text in current_text:
-                            # Perform replacement
-                            current_text = current_text.replace(old_text, new_text)
-                            modified = True
-
-                            logger.info(f"Replaced text in element {element.id}: '{old_text}' -> '{new_text}'")
-
-                    if modified:
-                        # Validate font if requested
-                        if validate_fonts:
-                            font_warning = self._validate_text_font(element, current_text)
-                            if font_warning:
-                                font_warnings.append(font_warning)
-
-                        # Update element
-                        element.text = current_text
-                        element.raw_text = current_text  # Keep raw_text in sync
-                        modified_count += 1
-                    else:
-                        skipped_count += 1
+            # Check if this element's text needs replacement
+            current_text = element.text
+            modified = False
+
+            for old_text, new_text in replacement_map.items():
+                if old_text in current_text:
+                    # Perform replacement
+                    current_text = current_text.replace(old_text, new_text)
+                    modified = True
+
+                    logger.info(f"Replaced text in element {element.id}: '{old_text}' -> '{new_text}'")
+
+            if modified:
+                # Validate font if requested
+                if validate_fonts:
+                    font_warning = self._validate_text_font(element, current_text)
+                    if font_warning:
+                        font_issues[font_warning] += 1
+
+                # Update element (in a copy of a shared layer that unselected pages also use)
+                element = editable()
+                element.text = current_text
+                element.raw_text = current_text  # Keep raw_text in sync
+                modified_count += 1
+            else:
+                skipped_count += 1
 
         result.modified_elements = modified_count
         result.skipped_elements = skipped_count
-        result.font_warnings = font_warnings
+        result.font_warnings = self._aggregate_font_warnings(font_issues)
         result.details = {
             "total_replacements": len(replacement_map),
             "targeted_elements": len(element_ids) if element_ids else "all",
             "targeted_pages": len(page_numbers) if page_numbers else "all",
+            "font_validation": self._font_validation_summary(font_issues),
         }
 
         logger.info(f"Batch text replacement completed: {modified_count} modified, {skipped_count} skipped")
@@ -171,68 +161,61 @@ def variable_substitution(
 
         modified_count = 0
         skipped_count = 0
-        font_warnings = []
-
-        # Process each document unit
-        for unit in document.document_structure:
-            if not isinstance(unit, PageUnit):
-                continue
-
-            # Process each layer
-            for layer in unit.layers:
-                for element in layer.content:
-                    if not isinstance(element, TextElement):
-                        continue
-
-                    # Check if this element contains variables
-                    original_text = element.text
-                    modified = False
-
-                    # Handle case-insensitive variable substitution
-                    for var in variables:
-                        if var.case_sensitive:
-                            var_pattern_str = f"${{{var.variable_name}}}"
-                            if var_pattern_str in original_text:
-                                # Perform variable substitution
-                                original_text = original_text.replace(var_pattern_str, var.replacement_value)
-                                modified = True
-
-                                logger.info(
-                                    f"Substituted variable in element {element.id}: {var_pattern_str} -> '{var.replacement_value}'"
-                                )
-                        else:
-                            # Case-insensitive matching
-                            import re
-
-                            var_pattern_re = re.compile(re.escape(f"${{{var.variable_name}}}"), re.IGNORECASE)
-                            if var_pattern_re.search(original_text):
-                                # Perform case-insensitive variable substitution
-                                original_text = var_pattern_re.sub(var.replacement_value, original_text)
-                                modified = True
-
-                                logger.info(
-                                    f"Substituted variable (case-insensitive) in element {element.id}: {var.variable_name} -> '{var.replacement_value}'"
-                                )
-
-                    if modified:
-                        # Validate font for new content
-                        font_warning = self._validate_text_font(element, original_text)
-                        if font_warning:
-                            font_warnings.append(font_warning)
-
-                        # Update element
-                        element.text = original_text
-                        element.raw_text = original_text
-                        modified_count += 1
-                    else:
-                        skipped_count += 1
+        font_issues: Counter[str] = Counter()
+
+        # Process the text of every page and of the shared layers
+        for _page_number, element, editable in self._text_elements(document):
+            # Check if this element contains variables
+            original_text = element.text
+            modified = False
+
+            # Handle case-insensitive variable substitution
+            for var in variables:
+                if var.case_sensitive:
+                    var_pattern_str = f"${{{var.variable_name}}}"
+                    if var_pattern_str in original_text:
+                        # Perform variable substitution
+                        original_text = original_text.replace(var_pattern_str, var.replacement_value)
+                        modified = True
+
+                        logger.info(
+                            f"Substituted variable in element {element.id}: {var_pattern_str} -> '{var.replacement_value}'"
+                        )
+                else:
+                    # Case-insensitive matching
+                    import re
+
+                    var_pattern_re = re.compile(re.escape(f"${{{var.variable_name}}}"), re.IGNORECASE)
+                    if var_pattern_re.search(original_text):
+                        # Perform case-insensitive variable substitution
+                        original_text = var_pattern_re.sub(var.replacement_value, original_text)
+                        modified = True
+
+                        logger.info(
+                            f"Substituted variable (case-insensitive) in element {element.id}: {var.variable_name} -> '{var.replacement_value}'"
+                        )
+
+            if modified:
+                # Validate font for new content
+                font_warning = self._validate_text_font(element, original_text)
+                if font_warning:
+                    font_issues[font_warning] += 1
+
+                # Update element
+                element = editable()
+                element.text = original_text
+                element.raw_text = original_text
+                modified_count += 1
+            else:
+                skipped_count += 1
 
         result.modified_elements = modified_count
         result.skipped_elements = skipped_count
-        result.font_warnings = font_warnings
+        result.font_warnings = self._aggregate_font_warnings(font_issues)
         result.details = {
             "variables_applied": len(variables),
             "template_mode": template_mode,
+            "font_validation": self._font_validation_summary(font_issues),
         }
 
         logger.info(f"Variable substitution completed: {modified_count} modified, {skipped_count} skipped")
@@ -261,59 +244,58 @@ def validate_document_fonts(
             "elements_with_issues": list[dict[str, Any]](),
         }
 
-        # Collect all fonts used in the document
-        for unit in document.document_structure:
-            if not isinstance(unit, PageUnit):
+        # Collect all fonts used in the document, shared layers included
+        for page_number, element, _ in self._text_elements(document):
+            font_details = element.font_details
+            if isinstance(font_details, dict):
+                font_name = font_details.get("name")
+            else:
+                font_name = font_details.name
+
+            if font_name:
+                validation_result["fonts_used"].add(font_name)
+            else:
+                # Handle case where font_name is not found
                 continue
 
-            for layer in unit.layers:
-                for element in layer.content:
-                    if isinstance(element, TextElement):
-                        font_details = element.font_details
-                        if isinstance(font_details, dict):
-                            font_name = font_details.get("name")
-                        else:
-                            font_name = font_details.name
-
-                        if font_name:
-                            validation_result["fonts_used"].add(font_name)
-                        else:
-                            # Handle case where font_name is not found
-                            continue
-
-                        # Check font availability
-                        if not self.font_validator.is_font_available(font_name):
-                            validation_result["fonts_missing"].add(font_name)
-                            validation_result["elements_with_issues"].append(
-                                {
-                                    "element_id": element.id,
-                                    "page_number": unit.page_number,
-                                    "font_name": font_name,
-                                    "issue": "font_missing",
-                                    "text_sample": (
-                                        element.text[:50] + "..." if len(element.text) > 50 else element.text
-                                    ),
-                                }
-                            )
-
-                        # Check licensing if requested (simplified for now)
-                        elif check_licensing and font_name not in [
-                            "Arial",
-                            "Times",
-                            "Helvetica",
-                        ]:
-                            validation_result["fonts_unlicensed"].add(font_name)
-                            validation_result["elements_with_issues"].append(
-                                {
-                                    "element_id": element.id,
-                                    "page_number": unit.page_number,
-                                    "font_name": font_name,
-                                    "issue": "font_unlicensed",
-                                    "text_sample": (
-                                        element.text[:50] + "..." if len(element.text) > 50 else element.text
-                                    ),
-                                }
-                            )
+            # Check font availability (memoised per font by the validator)
+            if not self.font_validator.check_text_coverage(font_name).available:
+                validation_result["fonts_missing"].add(font_name)
+                validation_result["elements_with_issues"].append(
+                    {
+                        "element_id": element.id,
+                        "page_number": page_number,
+                        "font_name": font_name,
+                        "issue": "font_missing",
+                        "text_sample": (element.text[:50] + "..." if len(element.text) > 50 else element.text),
+                    }
+                )
+
+            # Check licensing if requested (simplified for now)
+            elif check_licensing and font_name not in [
+                "Arial",
+                "Times",
+                "Helvetica",
+            ]:
+                validation_result["fonts_unlicensed"].add(font_name)
+                validation_result["elements_with_issues"].append(
+                    {
+                        "element_id": element.id,
+                        "page_number": page_number,
+                        "font_name": font_name,
+                        "issue": "font_unlicensed",
+                        "text_sample": (element.text[:50] + "..." if len(element.text) > 50 else element.text),
+                    }
+                )
+
+        # Aggregate issues per font so callers don't have to walk the element list
+        issue_counts = Counter(
+            (issue["font_name"], issue["issue"]) for issue in validation_result["elements_with_issues"]
+        )
+        validation_result["issue_summary"] = [
+            {"font_name": font_name, "issue": issue, "elements": count}
+            for (font_name, issue), count in sorted(issue_counts.items())
+        ]
 
         # Convert sets to lists for JSON serialization
         validation_result["fonts_used"] = list(validation_result["fonts_used"])
@@ -326,16 +308,48 @@ def validate_document_fonts(
 
         return validation_result
 
+    @staticmethod
+    def _text_elements(
+        document: UniversalDocument, page_numbers: list[int] | None = None
+    ) -> Iterator[tuple[int | None, TextElement, Callable[[], TextElement]]]:
+        """
+        Text elements of the selected pages, then of the shared layers those pages reference.
+
+        Yields:
+            (page number, or None for shared content; element; callable returning the element
+            to change, which for shared content also used by unselected pages is in a copy)
+        """
+        for unit in document.document_structure:
+            if not isinstance(unit, PageUnit):
+                continue
+            # Skip if page filtering is applied and this page doesn't match
+            if page_numbers is not None and unit.page_number not in page_numbers:
+                continue
+            for layer in unit.layers:
+                for element in layer.content:
+                    if isinstance(element, TextElement):
+                        yield unit.page_number, element, lambda element=element: element
+
+        editor = SharedLayerEditor(document, page_numbers)
+        for layer in editor.layers():
+            for element in layer.content:
+                if isinstance(element, TextElement):
+                    yield None, element, lambda layer=layer, element=element: editor.editable(layer, element)
+
     def _validate_text_font(self, element: TextElement, new_text: str) -> str | None:
         """
         Validate that the element's font can render the new text.
 
+        The check is memoised by the font validator, so repeated font/character set
+        combinations across a batch cost a dictionary lookup.
+
         Args:
             element: The text element
             new_text: The new text content
 
         Returns:
-            Warning message if validation fails, None otherwise
+            Warning message if validation fails, None otherwise. Messages do not
+            include the element text so identical issues can be aggregated.
         """
         # Handle case where font_details might be a dictionary
         font_details = element.font_details
@@ -345,16 +359,35 @@ def _validate_text_font(self, element: TextElement, new_text: str) -> str | None
             font_name = font_details.name
 
         if not font_name:
-            return f"No font name found for text: '{new_text[:30]}...'"
+            return "No font name found for text"
+
+        check = self.font_validator.check_text_coverage(font_name, new_text)
+
+        if not check.available:
+            return f"Font '{font_name}' not available"
 
-        # Check if font is available
-        if not self.font_validator.is_font_available(font_name):
-            return f"Font '{font_name}' not available for text: '{new_text[:30]}...'"
+        if not check.covers_text:
+            missing = "".join(check.missing_characters)
+            return (
+                f"Font '{font_name}' missing glyphs: {missing!r}" if missing else f"Font '{font_name}' missing glyphs"
+            )
 
-        # Check glyph coverage (simplified for now)
-        # TODO: Implement proper glyph coverage checking
         return None
 
+    @staticmethod
+    def _aggregate_font_warnings(font_issues: Counter[str]) -> list[str]:
+        """Turn per-element font issues into one warning per distinct issue"""
+        return [f"{warning} ({count} element(s))" for warning, count in font_issues.most_common()]
+
+    def _font_validation_summary(self, font_issues: Counter[str]) -> dict[str, Any]:
+        """Summarise font validation for the result details"""
+        cache = getattr(self.font_validator, "validation_cache", None)
+        return {
+            "elements_with_issues": sum(font_issues.values()),
+            "distinct_issues": len(font_issues),
+            "cache": cache.get_statistics() if cache is not None else None,
+        }
+
     def get_substitution_statistics(self, document: UniversalDocument) -> dict[str, Any]:
         """
         Get statistics about variable substitutions in the document.
@@ -370,33 +403,25 @@ def get_substitution_statistics(self, document: UniversalDocument) -> dict[str,
         variable_patterns_found: set[str] = set()
         substitution_opportunities: list[dict[str, Any]] = []
 
-        # Find variable patterns in the document
-        for unit in document.document_structure:
-            if not isinstance(unit, PageUnit):
-                continue
-
-            for layer in unit.layers:
-                for element in layer.content:
-                    if isinstance(element, TextElement):
-                        total_text_elements += 1
-
-                        # Look for variable patterns like ${VARIABLE_NAME}
-                        variable_patterns = re.findall(r"\$\{([^}]+)\}", element.text)
-
-                        if variable_patterns:
-                            elements_with_variables += 1
-                            variable_patterns_found.update(variable_patterns)
-
-                            substitution_opportunities.append(
-                                {
-                                    "element_id": element.id,
-                                    "page_number": unit.page_number,
-                                    "variables": variable_patterns,
-                                    "text_sample": (
-                                        element.text[:100] + "..." if len(element.text) > 100 else element.text
-                                    ),
-                                }
-                            )
+        # Find variable patterns in the document, shared layers included
+        for page_number, element, _ in self._text_elements(document):
+            total_text_elements += 1
+
+            # Look for variable patterns like ${VARIABLE_NAME}
+            variable_patterns = re.findall(r"\$\{([^}]+)\}", element.text)
+
+            if variable_patterns:
+                elements_with_variables += 1
+                variable_patterns_found.update(variable_patterns)
+
+                substitution_opportunities.append(
+                    {
+                        "element_id": element.id,
+                        "page_number": page_number,
+                        "variables": variable_patterns,
+                        "text_sample": (element.text[:100] + "..." if len(element.text) > 100 else element.text),
+                    }
+                )
 
         # Build result dict
         return {
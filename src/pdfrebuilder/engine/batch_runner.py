@@ -0,0 +1,395 @@
+"""
+Directory-scale batch modification for the Multi-Format Document Engine.
+
+This module runs a BatchModifier operation over many layout documents with a
+pool of worker processes. Workers are started once with a warm font catalog,
+progress is recorded in a resumable manifest, and per-file
+BatchModificationResults are aggregated into a single JSON report.
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from pdfrebuilder.engine.batch_modifier import BatchModificationResult, BatchModifier, VariableSubstitution
+from pdfrebuilder.font.font_validator import FontValidator
+from pdfrebuilder.models.universal_idm import UniversalDocument
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 2
+SUPPORTED_OPERATIONS = ("replace", "substitute", "validate")
+
+
+@dataclass
+class BatchOperation:
+    """A batch modification applied identically to every input document"""
+
+    kind: str
+    replacements: list[tuple[str, str]] = field(default_factory=list)
+    variables: list[VariableSubstitution] = field(default_factory=list)
+    element_ids: list[str] | None = None
+    page_numbers: list[int] | None = None
+    validate_fonts: bool = True
+    template_mode: bool = True
+    check_licensing: bool = True
+
+    def __post_init__(self):
+        if self.kind not in SUPPORTED_OPERATIONS:
+            raise ValueError(f"Unsupported batch operation '{self.kind}'. Supported: {', '.join(SUPPORTED_OPERATIONS)}")
+
+    def signature(self) -> str:
+        """Stable digest of the operation, used to decide whether a manifest can be resumed"""
+        payload = json.dumps(asdict(self), sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BatchManifest:
+    """
+    Resumable record of a directory batch run.
+
+    The manifest is a JSON-lines file: a header line naming the operation, then
+    one line per completed file, appended as each file finishes. Loading folds
+    the lines (the latest line for a file wins), so a crashed run can be
+    restarted and will skip files that already completed with the same
+    operation and unchanged input. Entries are keyed by absolute input path.
+    """
+
+    def __init__(self, path: str | Path, operation_signature: str):
+        self.path = Path(path)
+        self.operation_signature = operation_signature
+        self.entries: dict[str, dict[str, Any]] = {}
+        # Whether the file on disk already starts with this operation's header
+        self._has_header = False
+
+    @classmethod
+    def load(cls, path: str | Path, operation_signature: str) -> "BatchManifest":
+        """Load an existing manifest, discarding it if it belongs to a different operation"""
+        manifest = cls(path, operation_signature)
+        if not manifest.path.exists():
+            return manifest
+
+        lines = 0
+        try:
+            with open(manifest.path, encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                if (
+                    header.get("version") != MANIFEST_VERSION
+                    or header.get("operation_signature") != operation_signature
+                ):
+                    logger.info(f"Batch manifest {manifest.path} was written for a different operation, starting over")
+                    return manifest
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash; its file is simply redone
+                        logger.warning(f"Skipping a truncated line in batch manifest {manifest.path}")
+                        continue
+                    manifest.entries[entry.pop("file")] = entry
+        except (OSError, json.JSONDecodeError, AttributeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable batch manifest {manifest.path}: {e}")
+            manifest.entries = {}
+            return manifest
+
+        manifest._has_header = True
+        if lines > len(manifest.entries):
+            # Files redone by earlier resumes left superseded lines behind
+            manifest.compact()
+        return manifest
+
+    @staticmethod
+    def input_fingerprint(input_path: str) -> dict[str, Any]:
+        stat = os.stat(input_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def get(self, input_path: str) -> dict[str, Any] | None:
+        return self.entries.get(os.path.abspath(input_path))
+
+    def is_complete(self, input_path: str) -> bool:
+        """Whether the file finished in a previous run and has not changed since"""
+        entry = self.get(input_path)
+        if not entry or entry.get("status") != "done":
+            return False
+        try:
+            return entry.get("input") == self.input_fingerprint(input_path)
+        except OSError:
+            return False
+
+    def record(self, input_path: str, output_path: str, result: dict[str, Any]) -> None:
+        """Record a finished file by appending one line to the manifest"""
+        try:
+            fingerprint = self.input_fingerprint(input_path)
+        except OSError:
+            fingerprint = None
+        key = os.path.abspath(input_path)
+        entry = {
+            "status": "failed" if _is_error(result) else "done",
+            "output": output_path,
+            "input": fingerprint,
+            "completed_at": datetime.now().isoformat(),
+            "result": result,
+        }
+        self.entries[key] = entry
+        if not self._has_header:
+            self.compact()
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"file": key, **entry}, ensure_ascii=False) + "\n")
+
+    def _header(self) -> str:
+        return json.dumps({"version": MANIFEST_VERSION, "operation_signature": self.operation_signature}) + "\n"
+
+    def compact(self) -> None:
+        """Rewrite the manifest atomically with one line per file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self._header())
+            for key, entry in self.entries.items():
+                f.write(json.dumps({"file": key, **entry}, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self._has_header = True
+
+
+@dataclass
+class BatchRunReport:
+    """Aggregated outcome of a directory batch run"""
+
+    operation: str
+    total_files: int = 0
+    processed: int = 0
+    resumed: int = 0
+    failed: int = 0
+    results: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "summary": {
+                "total_files": self.total_files,
+                "processed": self.processed,
+                "resumed": self.resumed,
+                "failed": self.failed,
+                "modified_elements": sum(r.get("modified_elements", 0) for r in self.results.values()),
+                "skipped_elements": sum(r.get("skipped_elements", 0) for r in self.results.values()),
+            },
+            "files": self.results,
+        }
+
+
+def expand_batch_inputs(patterns: Iterable[str]) -> list[str]:
+    """
+    Expand directories and glob patterns into a sorted list of layout JSON files.
+
+    Args:
+        patterns: Directories (searched recursively for *.json), glob patterns or plain files
+
+    Returns:
+        Sorted, de-duplicated list of file paths
+    """
+    files: set[str] = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            files.update(glob.glob(os.path.join(pattern, "**", "*.json"), recursive=True))
+        elif glob.has_magic(pattern):
+            files.update(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(pattern):
+            files.add(pattern)
+        else:
+            logger.warning(f"No input matches '{pattern}'")
+    return sorted(os.path.normpath(p) for p in files)
+
+
+def _error_result(error: Exception) -> dict[str, Any]:
+    """Result recorded when a file could not be processed at all"""
+    return asdict(BatchModificationResult(success=False, validation_errors=[str(error)], details={"error": str(error)}))
+
+
+def _is_error(result: dict[str, Any]) -> bool:
+    """Processing errors are retried on resume; unsuccessful validations are not"""
+    return "error" in result.get("details", {})
+
+
+def _output_path_for(input_path: str, output_dir: str, common_root: str, operation: BatchOperation) -> str:
+    relative = os.path.relpath(input_path, common_root)
+    if operation.kind == "validate":
+        relative = os.path.splitext(relative)[0] + ".validation.json"
+    return os.path.join(output_dir, relative)
+
+
+def _init_worker(fonts_dir: str | None, available_fonts: dict[str, str]) -> None:
+    """Seed the per-process FontValidator with the catalog scanned by the parent"""
+    FontValidator(fonts_dir, available_fonts=available_fonts)
+
+
+def process_batch_file(input_path: str, output_path: str, operation: BatchOperation) -> dict[str, Any]:
+    """
+    Apply a batch operation to a single layout document.
+
+    Runs inside worker processes; errors are captured in the returned result rather than raised.
+
+    Returns:
+        BatchModificationResult serialised as a dictionary
+    """
+    try:
+        with open(input_path, encoding="utf-8") as f:
+            document = UniversalDocument.from_dict(json.load(f))
+
+        modifier = BatchModifier()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+        if operation.kind == "validate":
+            validation = modifier.validate_document_fonts(document, check_licensing=operation.check_licensing)
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(validation, f, indent=2, ensure_ascii=False)
+            result = BatchModificationResult(
+                success=validation["overall_status"] == "passed",
+                validation_errors=[
+                    f"Font '{issue['font_name']}': {issue['issue']} ({issue['elements']} element(s))"
+                    for issue in validation["issue_summary"]
+                ],
+                details={"fonts_used": validation["fonts_used"]},
+            )
+            return asdict(result)
+
+        if operation.kind == "replace":
+            result = modifier.batch_text_replacement(
+                document=document,
+                replacements=operation.replacements,
+                element_ids=operation.element_ids,
+                page_numbers=operation.page_numbers,
+                validate_fonts=operation.validate_fonts,
+            )
+        else:
+            result = modifier.variable_substitution(
+                document=document,
+                variables=operation.variables,
+                template_mode=operation.template_mode,
+            )
+
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(document.to_dict(), f, indent=2, ensure_ascii=False)
+        return asdict(result)
+
+    except Exception as e:
+        logger.error(f"Batch operation failed for {input_path}: {e}")
+        return _error_result(e)
+
+
+def run_batch(
+    inputs: Iterable[str],
+    output_dir: str,
+    operation: BatchOperation,
+    workers: int | None = None,
+    manifest_path: str | None = None,
+    results_path: str | None = None,
+    fonts_dir: str | None = None,
+) -> BatchRunReport:
+    """
+    Run a batch operation over many documents with a pool of warm worker processes.
+
+    Args:
+        inputs: Directories, glob patterns or files to process
+        output_dir: Directory receiving modified documents (or validation reports),
+            mirroring the layout of the inputs
+        operation: The operation to apply to each document
+        workers: Number of worker processes; 1 runs in-process, None uses the CPU count
+        manifest_path: Resumable manifest location (default: <output_dir>/batch_manifest.jsonl)
+        results_path: Aggregated JSON report location (default: <output_dir>/batch_results.json)
+        fonts_dir: Font directory for validation, scanned once and shared with the workers
+
+    Returns:
+        BatchRunReport with per-file BatchModificationResults
+    """
+    # Never pick up our own outputs, manifest or report when the output dir sits inside an input dir
+    output_root = os.path.abspath(output_dir)
+    input_files = [
+        p for p in expand_batch_inputs(inputs) if os.path.commonpath([os.path.abspath(p), output_root]) != output_root
+    ]
+    report = BatchRunReport(operation=operation.kind, total_files=len(input_files))
+
+    manifest = BatchManifest.load(
+        manifest_path or os.path.join(output_dir, "batch_manifest.jsonl"),
+        operation.signature(),
+    )
+
+    common_root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in input_files]) if input_files else ""
+    pending: list[tuple[str, str]] = []
+    for input_path in input_files:
+        output_path = _output_path_for(os.path.abspath(input_path), output_dir, common_root, operation)
+        if manifest.is_complete(input_path):
+            report.resumed += 1
+            report.results[input_path] = manifest.get(input_path)["result"]
+        else:
+            pending.append((input_path, output_path))
+
+    if report.resumed:
+        logger.info(f"Resuming batch: {report.resumed} file(s) already completed, {len(pending)} remaining")
+
+    def _finish(input_path: str, output_path: str, result: dict[str, Any]) -> None:
+        manifest.record(input_path, output_path, result)
+        report.results[input_path] = result
+        report.processed += 1
+        if _is_error(result):
+            report.failed += 1
+        logger.info(f"Batch progress: {report.processed + report.resumed}/{report.total_files} ({input_path})")
+
+    # Scan fonts once in the parent; workers receive the catalog instead of rescanning
+    validator = FontValidator(fonts_dir)
+    worker_count = workers if workers is not None else (os.cpu_count() or 1)
+
+    if worker_count <= 1 or len(pending) <= 1:
+        for input_path, output_path in pending:
+            _finish(input_path, output_path, process_batch_file(input_path, output_path, operation))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=worker_count,
+            initializer=_init_worker,
+            initargs=(validator.fonts_dir, validator.available_fonts),
+        ) as executor:
+            # Bound in-flight work so huge directories don't queue every task up front
+            queue = iter(pending)
+            in_flight: dict[Future, tuple[str, str]] = {}
+
+            def _submit_next() -> None:
+                for input_path, output_path in queue:
+                    in_flight[executor.submit(process_batch_file, input_path, output_path, operation)] = (
+                        input_path,
+                        output_path,
+                    )
+                    return
+
+            for _ in range(worker_count * 2):
+                _submit_next()
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    input_path, output_path = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = _error_result(e)
+                    _finish(input_path, output_path, result)
+                    _submit_next()
+
+    results_file = Path(results_path or os.path.join(output_dir, "batch_results.json"))
+    results_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_file, "w", encoding="utf-8") as f:
+        json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+
+    logger.info(
+        f"Batch {operation.kind} completed: {report.processed} processed, "
+        f"{report.resumed} resumed, {report.failed} failed"
+    )
+    return report
@@ -72,6 +72,21 @@ def load_from_env(self, prefix: str = "PDF_ENGINE_") -> dict[str, Any]:
         default_engine = os.getenv(f"{prefix}DEFAULT", "reportlab")
         config["default_engine"] = default_engine
 
+        # Load automatic engine selection settings
+        auto_config: dict[str, Any] = {}
+        _val = os.getenv(f"{prefix}AUTO_PROFILES")
+        if _val is not None:
+            auto_config["profiles_path"] = _val
+        _val = os.getenv(f"{prefix}AUTO_FALLBACK")
+        if _val is not None:
+            auto_config["fallback_engine"] = _val
+        _val = os.getenv(f"{prefix}AUTO_LEARN")
+        if _val is not None:
+            auto_config["learn"] = _val.lower() == "true"
+
+        if auto_config:
+            config["auto"] = auto_config
+
         # Load ReportLab settings
         reportlab_config: dict[str, Any] = {}
         _val = os.getenv(f"{prefix}REPORTLAB_COMPRESSION")
@@ -83,6 +98,12 @@ def load_from_env(self, prefix: str = "PDF_ENGINE_") -> dict[str, Any]:
         _val = os.getenv(f"{prefix}REPORTLAB_EMBED_FONTS")
         if _val is not None:
             reportlab_config["embed_fonts"] = _val.lower() == "true"
+        _val = os.getenv(f"{prefix}REPORTLAB_OUTPUT_DPI")
+        if _val is not None:
+            reportlab_config["output_dpi"] = int(_val)
+        _val = os.getenv(f"{prefix}REPORTLAB_DOWNSAMPLE_IMAGES")
+        if _val is not None:
+            reportlab_config["downsample_images"] = _val.lower() == "true"
 
         if reportlab_config:
             config["reportlab"] = reportlab_config
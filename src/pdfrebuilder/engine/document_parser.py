@@ -3,14 +3,19 @@
 This module provides a unified interface for parsing different document formats.
 """
 
+import io
 import logging
 import os
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, BinaryIO
 
 from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
 from pdfrebuilder.models.universal_idm import UniversalDocument
-from pdfrebuilder.tools.generic import detect_file_format
+from pdfrebuilder.tools.generic import detect_file_format, detect_stream_format
+
+if TYPE_CHECKING:
+    from pdfrebuilder.engine.asset_store import ContentAddressedAssetStore
+    from pdfrebuilder.engine.extraction_cache import ExtractionCache
 
 logger = logging.getLogger(__name__)
 
@@ -24,22 +29,64 @@ def __init__(self, message: str, details: dict[str, Any] | None = None):
 
 
 class AssetManifest:
-    """Tracks extracted assets from a document"""
+    """Tracks extracted assets from a document
+
+    Images added with a content hash are deduplicated: each distinct hash is
+    listed once and carries a reference count of the elements that use it.
+    """
 
     def __init__(self):
         self.images = []
         self.fonts = []
         self.other_assets = []
+        self._images_by_hash: dict[str, dict[str, Any]] = {}
 
     def add_image(
         self,
         path: str,
         original_name: str | None = None,
         metadata: dict[str, Any] | None = None,
+        content_hash: str | None = None,
     ):
-        """Add an image to the manifest"""
+        """Add an image to the manifest, or take another reference to known content"""
+        if content_hash is not None:
+            entry = self._images_by_hash.get(content_hash)
+            if entry is not None:
+                entry["refcount"] += 1
+                return
+            entry = {
+                "path": path,
+                "original_name": original_name,
+                "metadata": metadata or {},
+                "content_hash": content_hash,
+                "refcount": 1,
+            }
+            self._images_by_hash[content_hash] = entry
+            self.images.append(entry)
+            return
         self.images.append({"path": path, "original_name": original_name, "metadata": metadata or {}})
 
+    def get_refcount(self, content_hash: str) -> int:
+        """Number of references held on an image by content hash"""
+        entry = self._images_by_hash.get(content_hash)
+        return entry["refcount"] if entry else 0
+
+    def release_image(self, content_hash: str) -> int:
+        """Drop one reference to an image; the entry is removed when none remain
+
+        Returns:
+            The remaining reference count
+        """
+        entry = self._images_by_hash.get(content_hash)
+        if entry is None:
+            return 0
+        entry["refcount"] -= 1
+        if entry["refcount"] <= 0:
+            del self._images_by_hash[content_hash]
+            self.images.remove(entry)
+            return 0
+        return entry["refcount"]
+
     def add_font(self, path: str, font_name: str, metadata: dict[str, Any] | None = None):
         """Add a font to the manifest"""
         self.fonts.append({"path": path, "font_name": font_name, "metadata": metadata or {}})
@@ -84,10 +131,15 @@ def can_parse(self, file_path: str) -> bool:
         file_format = detect_file_format(file_path)
         return file_format == "pdf"
 
-    def parse(self, file_path: str, extraction_flags: dict[str, bool] | None = None) -> UniversalDocument:
-        """Parse PDF document into Universal IDM"""
+    def parse(
+        self,
+        file_path: str,
+        extraction_flags: dict[str, bool] | None = None,
+        cache: "ExtractionCache | None" = None,
+    ) -> UniversalDocument:
+        """Parse PDF document into Universal IDM, reusing unchanged pages from cache when given"""
         logger.info(f"Parsing PDF document: {file_path}")
-        return extract_pdf_content(file_path, extraction_flags)
+        return extract_pdf_content(file_path, extraction_flags, cache=cache)
 
     def extract_assets(self, file_path: str, output_dir: str) -> AssetManifest:
         """Extract and save images, fonts, and other assets from PDF"""
@@ -281,6 +333,7 @@ def parse_document(
     file_path: str,
     extraction_flags: dict[str, bool] | None = None,
     engine: str = "auto",
+    cache: "ExtractionCache | None" = None,
 ) -> UniversalDocument:
     """
     Parse a document using the specified or appropriate parser based on file format
@@ -289,6 +342,7 @@ def parse_document(
         file_path: Path to the document file
         extraction_flags: Optional flags to control extraction behavior
         engine: Engine to use ('auto', 'fitz', 'psd-tools', 'wand')
+        cache: Extraction cache for this call only; used for PDFs, ignored for other formats
 
     Returns:
         UniversalDocument: Parsed document structure
@@ -311,9 +365,62 @@ def parse_document(
             else:
                 raise DocumentParsingError(f"No parser available for engine '{engine}' and file format '{file_format}'")
 
+        if cache is not None and isinstance(parser, PDFParser):
+            return parser.parse(file_path, extraction_flags, cache=cache)
         return parser.parse(file_path, extraction_flags)
 
     except Exception as e:
         if isinstance(e, DocumentParsingError):
             raise
         raise DocumentParsingError(f"Failed to parse document: {e!s}", {"original_error": str(e)})
+
+
+def parse_document_stream(
+    source: bytes | BinaryIO,
+    extraction_flags: dict[str, bool] | None = None,
+    engine: str = "auto",
+    asset_store: "ContentAddressedAssetStore | None" = None,
+) -> UniversalDocument:
+    """
+    Parse a document held in memory, without a path on disk
+
+    Args:
+        source: Document content as bytes or a readable binary stream
+        extraction_flags: Optional flags to control extraction behavior
+        engine: Engine to use ('auto', 'fitz', 'psd-tools')
+        asset_store: Store for extracted images, e.g. an InMemoryAssetStore; defaults to
+            the on-disk store for ``settings.image_dir``
+
+    Returns:
+        UniversalDocument: Parsed document structure
+
+    Raises:
+        DocumentParsingError: If the format or engine is unsupported, or parsing fails
+    """
+    data = bytes(source) if isinstance(source, (bytes, bytearray, memoryview)) else source.read()
+    file_format = detect_stream_format(data[:8])
+    engine_formats = {"fitz": "pdf", "psd-tools": "psd"}
+
+    if engine == "auto":
+        if file_format == "unknown":
+            raise DocumentParsingError("Unsupported stream format. Supported formats from memory: PDF and PSD")
+    elif engine not in engine_formats:
+        raise DocumentParsingError(
+            f"Engine '{engine}' cannot parse from memory. Available engines: {[*engine_formats, 'auto']}"
+        )
+    elif engine_formats[engine] != file_format:
+        raise DocumentParsingError(f"Engine '{engine}' cannot parse stream format '{file_format}'")
+
+    try:
+        logger.info(f"Parsing {file_format.upper()} document from a {len(data)}-byte stream")
+        if file_format == "pdf":
+            return extract_pdf_content(data, extraction_flags, asset_store=asset_store)
+
+        from pdfrebuilder.engine.extract_psd_content import check_psd_tools_availability, extract_psd_content
+
+        if not check_psd_tools_availability():
+            raise NotImplementedError("psd-tools is not installed. Please install it with 'pip install psd-tools'")
+        return extract_psd_content(io.BytesIO(data), extraction_flags, asset_store=asset_store)
+
+    except Exception as e:
+        raise DocumentParsingError(f"Failed to parse document: {e!s}", {"original_error": str(e)})
@@ -23,9 +23,31 @@
     "properties": {
         "default_engine": {
             "type": "string",
-            "enum": ["reportlab", "pymupdf", "fitz"],
+            "enum": ["reportlab", "pymupdf", "fitz", "auto"],
             "default": "reportlab",
-            "description": "Default PDF rendering engine to use",
+            "description": "Default PDF rendering engine to use ('auto' picks the fastest profiled engine per document)",
+        },
+        "auto": {
+            "type": "object",
+            "properties": {
+                "profiles_path": {
+                    "type": "string",
+                    "default": "",
+                    "description": "Engine throughput profiles file (empty: engine_profiles.json in the cache directory)",
+                },
+                "fallback_engine": {
+                    "type": "string",
+                    "enum": ["reportlab", "pymupdf", "fitz"],
+                    "default": "reportlab",
+                    "description": "Engine used when no capable engine has been profiled",
+                },
+                "learn": {
+                    "type": "boolean",
+                    "default": True,
+                    "description": "Whether renders through 'auto' refine the profiles",
+                },
+            },
+            "additionalProperties": False,
         },
         "reportlab": {
             "type": "object",
@@ -72,6 +94,18 @@
                     "default": 1.0,
                     "description": "Coordinate precision multiplier",
                 },
+                "output_dpi": {
+                    "type": "integer",
+                    "minimum": 36,
+                    "maximum": 2400,
+                    "default": 300,
+                    "description": "Resolution images are downsampled to when downsample_images is enabled",
+                },
+                "downsample_images": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "Whether to downsample images above output_dpi at their largest placement",
+                },
             },
             "additionalProperties": False,
         },
@@ -179,6 +213,11 @@
 # Default configuration values
 DEFAULT_ENGINE_CONFIG = {
     "default_engine": "reportlab",
+    "auto": {
+        "profiles_path": "",
+        "fallback_engine": "reportlab",
+        "learn": True,
+    },
     "reportlab": {
         "compression": 1,
         "page_mode": "portrait",
@@ -187,6 +226,8 @@
         "image_compression": "jpeg",
         "color_space": "rgb",
         "precision": 1.0,
+        "output_dpi": 300,
+        "downsample_images": False,
     },
     "pymupdf": {
         "overlay_mode": False,
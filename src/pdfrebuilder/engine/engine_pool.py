@@ -0,0 +1,142 @@
+"""
+Pooling of PDF rendering engine instances.
+
+Engines keep per-render state (the current document, registered fonts,
+metrics), so one instance must never render two documents at once. An
+``EnginePool`` holds initialised instances for one engine configuration and
+lends each to a single caller at a time: ``checkout`` hands out an idle
+instance or creates a new one, ``checkin`` returns it for reuse. Use
+``lease`` as a context manager so the instance is returned even when
+rendering fails.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from pdfrebuilder.engine.pdf_rendering_engine import EngineError, PDFRenderingEngine
+
+logger = logging.getLogger(__name__)
+
+
+class EnginePoolTimeout(EngineError):
+    """Raised when no engine instance becomes available within the checkout timeout"""
+
+
+class EnginePool:
+    """
+    Thread-safe pool of initialised engine instances.
+
+    Args:
+        factory: Callable creating a new, initialised engine instance
+        max_size: Maximum number of instances; checkout waits when all are in use. None means unbounded
+        name: Name used in log messages and statistics
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], PDFRenderingEngine],
+        max_size: int | None = None,
+        name: str = "engine",
+    ):
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.factory = factory
+        self.max_size = max_size
+        self.name = name
+        self._condition = threading.Condition()
+        self._idle: list[PDFRenderingEngine] = []
+        self._leased: set[int] = set()
+        self._size = 0
+        self.created = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def checkout(self, timeout: float | None = None) -> PDFRenderingEngine:
+        """
+        Take an engine instance for exclusive use.
+
+        Args:
+            timeout: Seconds to wait when the pool is at max_size; None waits indefinitely
+
+        Returns:
+            An initialised engine; hand it back with ``checkin``
+
+        Raises:
+            EnginePoolTimeout: If no instance became available in time
+        """
+        with self._condition:
+            if not self._idle and self.max_size is not None and self._size >= self.max_size:
+                self.waits += 1
+                started = time.perf_counter()
+                available = self._condition.wait_for(lambda: self._idle or self._size < self.max_size, timeout)
+                self.wait_seconds += time.perf_counter() - started
+                if not available:
+                    raise EnginePoolTimeout(f"No {self.name} engine available after {timeout}s (max {self.max_size})")
+
+            self.checkouts += 1
+            if self._idle:
+                engine = self._idle.pop()
+                self._leased.add(id(engine))
+                return engine
+            # Reserve the slot before creating, so concurrent checkouts respect max_size
+            self._size += 1
+
+        try:
+            engine = self.factory()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self.created += 1
+            self._leased.add(id(engine))
+        logger.debug(f"Created {self.name} engine instance {self.created} for the pool")
+        return engine
+
+    def checkin(self, engine: PDFRenderingEngine, discard: bool = False) -> None:
+        """
+        Return an engine taken with ``checkout``.
+
+        Args:
+            engine: The instance to return
+            discard: Drop the instance instead of reusing it, e.g. after a failure left it in an unknown state
+        """
+        with self._condition:
+            if id(engine) not in self._leased:
+                raise ValueError(f"Engine {engine!r} was not checked out from this pool")
+            self._leased.discard(id(engine))
+            if discard:
+                self._size -= 1
+            else:
+                self._idle.append(engine)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: float | None = None) -> Iterator[PDFRenderingEngine]:
+        """Check out an engine for the duration of a ``with`` block"""
+        engine = self.checkout(timeout)
+        try:
+            yield engine
+        finally:
+            self.checkin(engine)
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                "name": self.name,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._leased),
+                "max_size": self.max_size,
+                "created": self.created,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+            }
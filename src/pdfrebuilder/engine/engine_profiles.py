@@ -0,0 +1,447 @@
+"""
+Benchmark-driven automatic selection of the PDF output engine.
+
+The ``auto`` output engine routes each document to the engine predicted to
+render it fastest. Predictions come from per-engine throughput profiles
+persisted in a JSON file (``engine_profiles.json`` under the cache
+directory by default). Profiles are keyed by a coarse description of the
+document: page-count bucket, dominant content (text, vector, image or
+mixed) and whether a template PDF is overlaid. Each profile records seconds
+per unit of work (pages plus elements), so one profile can predict the
+rendering time of differently sized documents in the same bucket.
+
+Profiles are built by ``pdfrebuilder engines benchmark`` from a local
+corpus and refined by every ``auto`` render. Engines that lack a feature
+the document needs are never chosen. Without a usable profile, ``auto``
+uses the fallback engine.
+
+Several processes may share one profiles file. Saving merges the runs this
+process recorded since its last save into the file as it is on disk, under
+a file lock where the platform has one, so concurrent workers add up rather
+than overwrite each other. ``auto`` renders only schedule a save, which a
+background timer (or interpreter exit) performs, keeping file writes off
+the render path.
+"""
+
+import atexit
+import io
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+AUTO_ENGINE = "auto"
+
+# Bump when the profile file layout or the profile keys change
+PROFILE_FORMAT_VERSION = 1
+
+# Share of elements above which one kind of content dominates a document
+DOMINANT_SHARE = 0.6
+
+# Seconds an auto render waits before its scheduled save, so bursts of renders share one write
+PROFILE_SAVE_DELAY = 5.0
+
+# Document content that needs an engine feature (see PDFRenderingEngine.supported_features)
+_REQUIRED_FEATURES = {
+    "text": "text",
+    "vector": "drawings",
+    "image": "images",
+    "template": "overlay_mode",
+}
+
+
+@dataclass(frozen=True)
+class DocumentFeatures:
+    """Content of a document that affects which engine renders it fastest"""
+
+    page_count: int
+    text_elements: int = 0
+    vector_elements: int = 0
+    image_elements: int = 0
+    template_overlay: bool = False
+
+    @classmethod
+    def from_layout(cls, layout: dict[str, Any], template: str | None = None) -> "DocumentFeatures":
+        """Features of a layout dictionary (``UniversalDocument.to_dict()``)"""
+        counts = {"text": 0, "vector": 0, "image": 0}
+        pages = [unit for unit in layout.get("document_structure", []) if unit.get("type", "page") == "page"]
+        layers = list(layout.get("shared_layers", []))
+        for unit in pages:
+            layers.extend(unit.get("layers", []))
+        _count_elements(layers, counts)
+        return cls(
+            page_count=len(pages),
+            text_elements=counts["text"],
+            vector_elements=counts["vector"],
+            image_elements=counts["image"],
+            template_overlay=bool(template),
+        )
+
+    @property
+    def element_count(self) -> int:
+        return self.text_elements + self.vector_elements + self.image_elements
+
+    @property
+    def work_units(self) -> int:
+        """Size of the rendering job that profile throughputs are measured against"""
+        return max(1, self.page_count + self.element_count)
+
+    @property
+    def dominant_content(self) -> str:
+        total = self.element_count
+        if not total:
+            return "empty"
+        shares = {"text": self.text_elements, "vector": self.vector_elements, "image": self.image_elements}
+        kind, count = max(shares.items(), key=lambda item: item[1])
+        return kind if count / total >= DOMINANT_SHARE else "mixed"
+
+    @property
+    def profile_key(self) -> str:
+        """Profile bucket, e.g. ``pages:2-10/text`` or ``pages:1/mixed/template``"""
+        key = f"pages:{_page_bucket(self.page_count)}/{self.dominant_content}"
+        return f"{key}/template" if self.template_overlay else key
+
+    def required_features(self) -> set[str]:
+        """Engine features needed to render the document faithfully"""
+        present = {
+            "text": self.text_elements > 0,
+            "vector": self.vector_elements > 0,
+            "image": self.image_elements > 0,
+            "template": self.template_overlay,
+        }
+        return {_REQUIRED_FEATURES[kind] for kind, needed in present.items() if needed}
+
+
+def _count_elements(layers: Iterable[dict[str, Any]], counts: dict[str, int]) -> None:
+    for layer in layers:
+        for element in layer.get("content", []):
+            element_type = element.get("type")
+            if element_type == "text":
+                counts["text"] += 1
+            elif element_type == "image":
+                counts["image"] += 1
+            elif element_type in ("drawing", "shape"):
+                counts["vector"] += 1
+        _count_elements(layer.get("children", []), counts)
+
+
+def _page_bucket(page_count: int) -> str:
+    if page_count <= 1:
+        return "1"
+    if page_count <= 10:
+        return "2-10"
+    if page_count <= 100:
+        return "11-100"
+    return "100+"
+
+
+@dataclass(frozen=True)
+class EngineChoice:
+    """Engine picked for a document and why"""
+
+    engine: str
+    predicted_seconds: float | None
+    reason: str
+
+
+ProfileData = dict[str, dict[str, dict[str, float]]]
+
+
+def _add_profiles(target: ProfileData, runs: ProfileData) -> ProfileData:
+    """Add the runs, seconds and work units of runs to target in place; returns target"""
+    for engine, profiles in runs.items():
+        for key, profile in profiles.items():
+            totals = target.setdefault(engine, {}).setdefault(key, {"runs": 0, "seconds": 0.0, "work_units": 0})
+            for field_name in ("runs", "seconds", "work_units"):
+                totals[field_name] += profile[field_name]
+    return target
+
+
+class _ProfilesFileLock:
+    """Exclusive lock on a profiles file across processes; a no-op where fcntl is unavailable"""
+
+    def __init__(self, path: Path):
+        self.lock_path = path.with_name(f"{path.name}.lock")
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.lock_path, "a")
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+class EngineProfiles:
+    """
+    Persisted per-engine throughput profiles.
+
+    Args:
+        path: JSON file the profiles are loaded from and saved to
+        save_delay: Seconds ``save_later`` waits before saving
+    """
+
+    def __init__(self, path: str | Path, save_delay: float = PROFILE_SAVE_DELAY):
+        self.path = Path(path)
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._engines: ProfileData = {}
+        # Runs recorded since the last save, merged into the file by the next one
+        self._unsaved: ProfileData = {}
+        self._save_timer: threading.Timer | None = None
+        self.load()
+
+    def _read(self) -> ProfileData:
+        """Profiles in the file; a missing or unreadable file gives none"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") == PROFILE_FORMAT_VERSION:
+                return data.get("engines", {})
+            logger.info(f"Ignoring engine profiles in an old format: {self.path}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Discarding unreadable engine profiles {self.path}: {e}")
+        return {}
+
+    def load(self) -> None:
+        """(Re)load the profiles from disk, keeping runs recorded since the last save"""
+        engines = self._read()
+        with self._lock:
+            self._engines = _add_profiles(engines, self._unsaved)
+
+    def save(self) -> None:
+        """Merge the runs recorded since the last save into the file and reload what other processes added"""
+        with self._lock:
+            unsaved, self._unsaved = self._unsaved, {}
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with _ProfilesFileLock(self.path):
+                engines = _add_profiles(self._read(), unsaved)
+                tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"format": PROFILE_FORMAT_VERSION, "engines": engines}, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save engine profiles {self.path}: {e}")
+            with self._lock:
+                self._unsaved = _add_profiles(unsaved, self._unsaved)
+            return
+        with self._lock:
+            self._engines = _add_profiles(engines, self._unsaved)
+
+    def save_later(self) -> None:
+        """Save after ``save_delay`` seconds on a background timer, unless a save is already scheduled"""
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    @property
+    def has_unsaved_runs(self) -> bool:
+        with self._lock:
+            return bool(self._unsaved)
+
+    def record(self, engine: str, features: DocumentFeatures, seconds: float) -> None:
+        """Add one measured render of a document to the engine's profile"""
+        run = {engine: {features.profile_key: {"runs": 1, "seconds": seconds, "work_units": features.work_units}}}
+        with self._lock:
+            _add_profiles(self._engines, run)
+            _add_profiles(self._unsaved, run)
+
+    def predict(self, engine: str, features: DocumentFeatures) -> float | None:
+        """
+        Predicted rendering time in seconds, or None without data for the engine.
+
+        Uses the profile for the document's bucket, or the engine's overall
+        throughput when that bucket has not been measured.
+        """
+        with self._lock:
+            profiles = self._engines.get(engine)
+            if not profiles:
+                return None
+            profile = profiles.get(features.profile_key)
+            if profile and profile["work_units"]:
+                return profile["seconds"] / profile["work_units"] * features.work_units
+            seconds = sum(p["seconds"] for p in profiles.values())
+            work_units = sum(p["work_units"] for p in profiles.values())
+        return seconds / work_units * features.work_units if work_units else None
+
+    def get_profiles(self) -> dict[str, dict[str, dict[str, float]]]:
+        with self._lock:
+            return {engine: {key: dict(p) for key, p in profiles.items()} for engine, profiles in self._engines.items()}
+
+
+def choose_engine(
+    features: DocumentFeatures,
+    engine_features: dict[str, dict[str, bool]],
+    profiles: EngineProfiles | None,
+    fallback: str,
+) -> EngineChoice:
+    """
+    Pick the engine predicted to render a document fastest.
+
+    Args:
+        features: Features of the document
+        engine_features: Candidate engine names mapped to their ``supported_features``
+        profiles: Throughput profiles; None selects the fallback among capable engines
+        fallback: Engine to use when no capable engine has been profiled
+
+    Returns:
+        The chosen engine with its predicted rendering time
+    """
+    required = features.required_features()
+    capable = [name for name, supported in engine_features.items() if all(supported.get(f) for f in required)]
+    if not capable:
+        return EngineChoice(fallback, None, f"no engine supports all of {sorted(required)}")
+
+    predictions = {}
+    if profiles is not None:
+        for name in capable:
+            predicted = profiles.predict(name, features)
+            if predicted is not None:
+                predictions[name] = predicted
+    if predictions:
+        engine = min(predictions, key=lambda name: predictions[name])
+        return EngineChoice(engine, predictions[engine], f"fastest for {features.profile_key}")
+
+    engine = fallback if fallback in capable else capable[0]
+    return EngineChoice(engine, None, f"no profile for {features.profile_key}")
+
+
+def default_profiles_path() -> Path:
+    """``engine_profiles.json`` under ConfigManager.cache_dir"""
+    from pdfrebuilder.config.manager import ConfigManager
+
+    return ConfigManager().cache_dir / "engine_profiles.json"
+
+
+_PROFILES: dict[str, EngineProfiles] = {}
+_PROFILES_LOCK = threading.Lock()
+
+
+def _save_unsaved_profiles() -> None:
+    """Save runs whose scheduled save has not happened yet when the interpreter exits"""
+    with _PROFILES_LOCK:
+        profiles = list(_PROFILES.values())
+    for entry in profiles:
+        if entry.has_unsaved_runs:
+            entry.save()
+
+
+atexit.register(_save_unsaved_profiles)
+
+
+def get_engine_profiles(path: str | Path | None = None) -> EngineProfiles:
+    """Process-wide profiles for a file, by default the one under the cache directory"""
+    if not path:
+        path = default_profiles_path()
+    key = os.path.abspath(path)
+    with _PROFILES_LOCK:
+        profiles = _PROFILES.get(key)
+        if profiles is None:
+            profiles = EngineProfiles(path)
+            _PROFILES[key] = profiles
+        return profiles
+
+
+def load_corpus_layout(path: str, asset_store: Any) -> dict[str, Any]:
+    """Layout dictionary for a corpus file: a layout JSON file, or a PDF extracted with asset_store"""
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+
+    return extract_pdf_content(path, asset_store=asset_store).to_dict()
+
+
+def benchmark_engines(
+    corpus: Iterable[str],
+    profiles: EngineProfiles,
+    engines: list[str] | None = None,
+    repeat: int = 3,
+    engine_config: dict[str, Any] | None = None,
+    progress: Callable[[str, str, float], None] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Render every corpus document with every capable engine and record the timings.
+
+    Each document is rendered ``repeat`` times per engine and the fastest
+    time is recorded, so one-off stalls do not skew the profile. The
+    profiles are saved once the corpus is done.
+
+    Args:
+        corpus: Layout JSON files and PDFs to benchmark
+        profiles: Profiles to record the timings in
+        engines: Engine names to benchmark; all registered engines by default
+        repeat: Renders per document and engine
+        engine_config: Engine configuration, as for ``get_engine``
+        progress: Called with (document, engine, seconds) after each measurement
+
+    Returns:
+        One result dictionary per document and engine
+    """
+    from pdfrebuilder.engine.asset_store import InMemoryAssetStore
+    from pdfrebuilder.engine.engine_selector import get_pdf_engine_selector
+
+    selector = get_pdf_engine_selector()
+    candidates = selector.get_engine_candidates(engines)
+    # Extracted images stay in memory for the whole run
+    asset_store = InMemoryAssetStore()
+    results = []
+    for path in corpus:
+        try:
+            layout = load_corpus_layout(path, asset_store)
+        except Exception as e:
+            logger.warning(f"Skipping benchmark document {path}: {e}")
+            continue
+        features = DocumentFeatures.from_layout(layout)
+        required = features.required_features()
+
+        for name, supported in candidates.items():
+            if not all(supported.get(f) for f in required):
+                continue
+            engine = selector.create_engine(name, engine_config)
+            timings = []
+            try:
+                for _ in range(max(1, repeat)):
+                    started = time.perf_counter()
+                    engine.render(layout, io.BytesIO())
+                    timings.append(time.perf_counter() - started)
+            except Exception as e:
+                logger.warning(f"Engine {name} failed to render {path}: {e}")
+                results.append({"document": path, "engine": name, "error": str(e)})
+                continue
+            seconds = min(timings)
+            profiles.record(name, features, seconds)
+            results.append(
+                {"document": path, "engine": name, "profile": features.profile_key, "seconds": round(seconds, 6)}
+            )
+            if progress:
+                progress(path, name, seconds)
+
+    profiles.save()
+    return results
@@ -1,8 +1,17 @@
 import logging
+import threading
 from typing import Any
 
 from pdfrebuilder.engine.document_parser import DocumentParser
 from pdfrebuilder.engine.document_renderer import DocumentRenderer
+from pdfrebuilder.engine.engine_pool import EnginePool
+from pdfrebuilder.engine.engine_profiles import (
+    AUTO_ENGINE,
+    DocumentFeatures,
+    EngineChoice,
+    choose_engine,
+    get_engine_profiles,
+)
 from pdfrebuilder.engine.pdf_rendering_engine import (
     EngineInitializationError,
     EngineNotFoundError,
@@ -49,9 +58,21 @@ def get_engine(self, name: str, config: dict[str, Any] | None = None):
 
 
 class PDFEngineSelector:
+    """
+    Registry of PDF rendering engines.
+
+    Engine instances carry per-render state, so they are never shared between
+    threads: ``get_engine`` caches one instance per engine configuration for
+    each thread, and ``get_engine_pool`` gives callers that render several
+    documents concurrently (thread pools, asyncio tasks) an ``EnginePool`` to
+    check instances in and out of.
+    """
+
     def __init__(self):
         self.engines = {}
-        self._engine_cache = {}
+        self._lock = threading.Lock()
+        self._thread_engines = threading.local()
+        self._engine_pools: dict[str, EnginePool] = {}
         self.register_default_engines()
 
     def register_engine(self, name, engine_class):
@@ -69,32 +90,52 @@ def register_default_engines(self):
         except ImportError as e:
             logger.warning(f"Could not register some default PDF engines: {e}")
 
-    def get_engine(self, name: str, config: dict[str, Any] | None = None):
+    def _resolve(self, name: str, config: dict[str, Any] | None) -> tuple[str, str]:
         name = name.lower()
         if name not in self.engines:
             available = ", ".join(self.engines.keys())
             raise EngineNotFoundError(f"Unknown PDF engine: {name}. Available engines: {available}")
+        return name, f"{name}_{hash(str(sorted((config or {}).items())))}"
 
-        cache_key = f"{name}_{hash(str(sorted((config or {}).items())))}"
-        if cache_key in self._engine_cache:
-            return self._engine_cache[cache_key]
-
+    def create_engine(self, name: str, config: dict[str, Any] | None = None) -> PDFRenderingEngine:
+        """Create a new, uncached engine instance initialised from the engine's section of config"""
+        name, _ = self._resolve(name, config)
         try:
-            engine_class = self.engines[name]
-            engine = engine_class()
-
-            if config:
-                engine_config = config.get(name, {})
-                engine.initialize(engine_config)
-            else:
-                engine.initialize({})
-
-            self._engine_cache[cache_key] = engine
+            engine = self.engines[name]()
+            engine.initialize(config.get(name, {}) if config else {})
             return engine
-
         except Exception as e:
             raise EngineInitializationError(f"Failed to initialize PDF engine {name}: {e!s}")
 
+    def get_engine(self, name: str, config: dict[str, Any] | None = None):
+        """Engine instance for the calling thread, reused by later calls from the same thread"""
+        name, cache_key = self._resolve(name, config)
+        cache = getattr(self._thread_engines, "cache", None)
+        if cache is None:
+            cache = self._thread_engines.cache = {}
+        if cache_key not in cache:
+            cache[cache_key] = self.create_engine(name, config)
+        return cache[cache_key]
+
+    def get_engine_pool(
+        self, name: str, config: dict[str, Any] | None = None, max_size: int | None = None
+    ) -> EnginePool:
+        """
+        Shared pool of instances for an engine configuration.
+
+        Args:
+            name: Engine name
+            config: Engine configuration, as for ``get_engine``
+            max_size: Upper bound on instances, applied when the pool is first created
+        """
+        name, cache_key = self._resolve(name, config)
+        with self._lock:
+            pool = self._engine_pools.get(cache_key)
+            if pool is None:
+                pool = EnginePool(lambda: self.create_engine(name, config), max_size=max_size, name=name)
+                self._engine_pools[cache_key] = pool
+            return pool
+
     def list_available_engines(self) -> dict[str, dict[str, Any]]:
         """List all available engines with their capabilities."""
         engines_info = {}
@@ -116,11 +157,58 @@ def list_available_engines(self) -> dict[str, dict[str, Any]]:
 
         return engines_info
 
+    def get_engine_candidates(self, names: list[str] | None = None) -> dict[str, dict[str, bool]]:
+        """
+        Engines ``auto`` may choose between, mapped to their supported features.
+
+        Aliases of an already listed engine class (``fitz``) are left out.
+
+        Args:
+            names: Restrict the candidates to these engine names
+        """
+        candidates: dict[str, dict[str, bool]] = {}
+        seen: set[type] = set()
+        for name, engine_class in self.engines.items():
+            if (names is not None and name not in names) or engine_class in seen:
+                continue
+            seen.add(engine_class)
+            candidates[name] = dict(getattr(engine_class, "supported_features", {}))
+        return candidates
+
+    def choose_engine(
+        self, layout: dict[str, Any], config: dict[str, Any] | None = None, template: str | None = None
+    ) -> EngineChoice:
+        """
+        Engine the ``auto`` output engine would render a layout with.
+
+        Args:
+            layout: Layout dictionary to render
+            config: Engine configuration; its ``auto`` section names the profiles file and fallback engine
+            template: Template PDF that will be overlaid, if any
+        """
+        auto_config = (config or {}).get(AUTO_ENGINE, {})
+        choice = choose_engine(
+            DocumentFeatures.from_layout(layout, template),
+            self.get_engine_candidates(),
+            get_engine_profiles(auto_config.get("profiles_path")),
+            self._auto_fallback(config),
+        )
+        logger.info(f"Auto engine selection: {choice.engine} ({choice.reason})")
+        return choice
+
+    def _auto_fallback(self, config: dict[str, Any] | None) -> str:
+        config = config or {}
+        default_engine = config.get("default_engine", "reportlab").lower()
+        if default_engine != AUTO_ENGINE:
+            return default_engine
+        return config.get(AUTO_ENGINE, {}).get("fallback_engine", "reportlab").lower()
+
     def get_default_engine(self, config: dict[str, Any] | None = None) -> PDFRenderingEngine:
         if config is None:
             config = {}
 
-        default_engine = config.get("default_engine", "reportlab").lower()
+        # Without a document to profile, "auto" means its fallback engine
+        default_engine = self._auto_fallback(config)
 
         try:
             return self.get_engine(default_engine, config)
@@ -168,12 +256,15 @@ def register_default_engines(self):
 _pdf_engine_selector = None
 _input_engine_selector = None
 _output_engine_selector = None
+_pdf_engine_selector_lock = threading.Lock()
 
 
 def get_pdf_engine_selector():
     global _pdf_engine_selector
     if _pdf_engine_selector is None:
-        _pdf_engine_selector = PDFEngineSelector()
+        with _pdf_engine_selector_lock:
+            if _pdf_engine_selector is None:
+                _pdf_engine_selector = PDFEngineSelector()
     return _pdf_engine_selector
 
 
@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import os
 import traceback
@@ -6,6 +5,12 @@
 
 import pymupdf as fitz
 
+from pdfrebuilder.engine.asset_store import get_asset_store
+from pdfrebuilder.engine.asset_writer import create_asset_writer, remove_failed_images
+from pdfrebuilder.engine.extraction_cache import PageFingerprinter, get_extraction_cache
+from pdfrebuilder.engine.master_pages import detect_master_content
+from pdfrebuilder.engine.path_encoding import encode_drawing_items
+from pdfrebuilder.engine.text_coalescing import coalesce_line_spans, group_glyph_offsets, span_text
 from pdfrebuilder.models.universal_idm import (
     BlendMode,
     BoundingBox,
@@ -31,22 +36,19 @@
 # This file should only contain utility functions if needed, or can be removed if redundant.
 
 
-def _process_image_block(block, image_dir, element_id):
-    """Processes an image block, saves the image, and returns an ImageElement."""
+def _process_image_block(block, image_dir, element_id, asset_store=None, writer=None):
+    """Processes an image block, stores the image by content hash, and returns an ImageElement."""
     try:
-        img_bytes = block["image"]
-        # Replace MD5 with SHA-256 for more secure hashing
-        img_hash = hashlib.sha256(img_bytes).hexdigest()
-        path = os.path.join(image_dir, f"img_{img_hash[:8]}.{block['ext']}")
-        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-        with open(path, "wb") as f:
-            f.write(img_bytes)
+        store = asset_store or get_asset_store(image_dir)
+        stored = store.put_bytes(
+            block["image"], block["ext"], original_name=element_id, metadata={"element_id": element_id}, writer=writer
+        )
 
         bbox = BoundingBox.from_list(list(block["bbox"]))
         return ImageElement(
             id=element_id,
             bbox=bbox,
-            image_file=path,
+            image_file=stored.path,
             original_format=block.get("ext", "unknown"),
         )
     except Exception as e:
@@ -55,19 +57,122 @@ def _process_image_block(block, image_dir, element_id):
         return None
 
 
-def _process_text_block(block, space_density_threshold, element_id_counter):
-    """Processes a text block and returns a list of TextElement objects."""
+def _store_xref_image(doc, xref, asset_store, xref_assets, writer=None):
+    """Extracts an image XObject once per document and stores its original encoded stream.
+
+    Returns a (StoredAsset, ext, has_mask) tuple, or None if the xref could not be extracted.
+    Later occurrences of the same xref only add a reference to the stored asset.
+    With a background writer the file is written while extraction continues.
+    """
+    if xref in xref_assets:
+        entry = xref_assets[xref]
+        if entry is not None:
+            asset_store.add_reference(entry[0])
+        return entry
+
+    entry = None
+    try:
+        info = doc.extract_image(xref)
+        if info and info.get("image"):
+            stored = asset_store.put_bytes(
+                info["image"], info["ext"], original_name=f"xref {xref}", metadata={"xref": xref}, writer=writer
+            )
+            entry = (stored, info["ext"], bool(info.get("smask")))
+    except Exception as e:
+        logger.error(f"❌ Error extracting image xref {xref}: {e}")
+    xref_assets[xref] = entry
+    return entry
+
+
+def _process_image_occurrence(image_info, entry, element_id):
+    """Builds an ImageElement for one placement of a shared image XObject."""
+    stored, ext, has_mask = entry
+    return ImageElement(
+        id=element_id,
+        bbox=BoundingBox.from_list(list(image_info["bbox"])),
+        image_file=stored.path,
+        original_format=ext,
+        has_transparency=has_mask or bool(image_info.get("has-mask")),
+        transformation_matrix=list(image_info["transform"]) if image_info.get("transform") else None,
+    )
+
+
+def _iter_page_blocks(page, include_text, include_images, text_layout="dict"):
+    """Yields ("text", block) and ("image", image_info) items for a page in content-stream order.
+
+    Text is read from the text dict (or ``rawdict`` when per-glyph positions are
+    needed) without image payloads; images come from
+    ``page.get_image_info`` so their bytes can be pulled once per xref. Image
+    info numbers are block numbers in the full dict, so the text blocks fill
+    the remaining positions.
+    """
+    text_flags = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+    text_blocks = page.get_text(text_layout, flags=text_flags).get("blocks", []) if include_text else []
+    image_infos = page.get_image_info(xrefs=True) if include_images else []
+
+    images_by_number = {info["number"]: info for info in image_infos}
+    text_iter = iter(text_blocks)
+    position = 0
+    remaining_images = len(images_by_number)
+    while True:
+        if position in images_by_number:
+            yield "image", images_by_number[position]
+            remaining_images -= 1
+        else:
+            block = next(text_iter, None)
+            if block is None:
+                if remaining_images <= 0:
+                    return
+            else:
+                yield "text", block
+        position += 1
+
+
+def _inline_image_blocks(page):
+    """Image blocks with payloads keyed by block number, for inline images that have no xref."""
+    return {
+        block["number"]: block
+        for block in page.get_text("dict", flags=fitz.TEXT_PRESERVE_IMAGES).get("blocks", [])
+        if block.get("type") == 1
+    }
+
+
+def _process_text_block(block, space_density_threshold, element_id_counter, coalesce=False, span_stats=None):
+    """Processes a text block and returns a list of TextElement objects.
+
+    With ``coalesce`` set, adjacent same-style spans of a horizontal line become
+    one element carrying per-glyph offsets (the block must come from ``rawdict``).
+    ``span_stats`` accumulates the number of source spans and emitted elements.
+    """
     text_elements = []
     try:
         for line in block.get("lines", []):
             line_wmode = line.get("wmode")
             line_dir = line.get("dir")
+            spans = line.get("spans", [])
+
+            if coalesce and not line_wmode and tuple(line_dir or (1, 0)) == (1, 0):
+                groups = coalesce_line_spans(spans)
+            else:
+                groups = [[span] for span in spans]
 
-            for span in line.get("spans", []):
-                raw_text = span.get("text", "")
+            for group in groups:
+                span = group[0]
+                raw_text = "".join(span_text(s) for s in group)
                 if not raw_text.strip():
                     continue
 
+                glyph_offsets = None
+                bbox_values = list(span["bbox"])
+                if len(group) > 1:
+                    bbox_values = [
+                        min(s["bbox"][0] for s in group),
+                        min(s["bbox"][1] for s in group),
+                        max(s["bbox"][2] for s in group),
+                        max(s["bbox"][3] for s in group),
+                    ]
+                    glyph_offsets = group_glyph_offsets(group, bbox_values[0])
+
                 clean_text, needs_spacing = normalize_text_spacing(raw_text, space_density_threshold)
 
                 font_flags = span.get("flags", 0)
@@ -97,7 +202,7 @@ def _process_text_block(block, space_density_threshold, element_id_counter):
                     original_flags=font_flags,
                 )
 
-                bbox = BoundingBox.from_list(list(span["bbox"]))
+                bbox = BoundingBox.from_list(bbox_values)
                 element_id = f"text_{element_id_counter[0]}"
                 element_id_counter[0] += 1
 
@@ -112,8 +217,12 @@ def _process_text_block(block, space_density_threshold, element_id_counter):
                     align=0,
                     adjust_spacing=needs_spacing,
                     background_color=None,  # This will be filled in later
+                    glyph_offsets=glyph_offsets,
                 )
                 text_elements.append(text_element)
+                if span_stats is not None:
+                    span_stats["spans"] += sum(1 for s in group if span_text(s).strip())
+                    span_stats["elements"] += 1
     except (KeyError, IndexError) as e:
         logger.warning(f"⚠️ Warning: Skipping malformed text block/span. Error: {e}")
 
@@ -121,71 +230,9 @@ def _process_text_block(block, space_density_threshold, element_id_counter):
 
 
 def _process_drawing(drawing, drawing_idx):
-    """Processes a drawing and returns a DrawingElement."""
-    # DEBUG: Log the full drawing dict and rect
+    """Processes a drawing and returns a DrawingElement with a compact path."""
     logger.debug(f"[DRAWING EXTRACTION] drawing_idx={drawing_idx} drawing dict: {drawing}")
-    logger.debug(f"[DRAWING EXTRACTION] drawing_idx={drawing_idx} drawing.get('rect'): {drawing.get('rect')}")
-    # Convert drawing commands
-    drawing_commands = []
-    for item in drawing.get("items", []):
-        cmd = item[0]
-        pts = list(item[1:])
-
-        if cmd == "m":
-            drawing_commands.append(DrawingCommand(cmd="M", pts=pts))
-        elif cmd == "l":
-            drawing_commands.append(DrawingCommand(cmd="L", pts=pts))
-        elif cmd == "c":
-            drawing_commands.append(DrawingCommand(cmd="C", pts=pts))
-        elif cmd == "h":
-            drawing_commands.append(DrawingCommand(cmd="H"))
-        elif cmd == "re":
-            # Handle both [Rect, ...] and [x0, y0, x1, y1]
-            if (
-                len(pts) == 1
-                and hasattr(pts[0], "x0")
-                and hasattr(pts[0], "y0")
-                and hasattr(pts[0], "x1")
-                and hasattr(pts[0], "y1")
-            ):
-                rect = pts[0]
-                drawing_commands.append(
-                    DrawingCommand(
-                        cmd="rect",
-                        bbox=BoundingBox(rect.x0, rect.y0, rect.x1, rect.y1),
-                    )
-                )
-            elif len(pts) == 4 and all(isinstance(p, int | float) for p in pts):
-                rect = fitz.Rect(*pts)
-                drawing_commands.append(
-                    DrawingCommand(
-                        cmd="rect",
-                        bbox=BoundingBox(rect.x0, rect.y0, rect.x1, rect.y1),
-                    )
-                )
-            else:
-                logger.warning(f"Skipping malformed rectangle drawing due to invalid coordinates: {pts}")
-
-    # If no drawing_commands were found, but a valid bbox exists, add a default rect command
-    rect = drawing.get("rect")
-    # Accept fitz.Rect as well as list/tuple
-    if rect:
-        if hasattr(rect, "x0") and hasattr(rect, "y0") and hasattr(rect, "x1") and hasattr(rect, "y1"):
-            rect_list = [rect.x0, rect.y0, rect.x1, rect.y1]
-        elif isinstance(rect, list | tuple) and len(rect) == 4 and all(isinstance(x, int | float) for x in rect):
-            rect_list = list(rect)
-        else:
-            logger.error(
-                f"[DRAWING EXTRACTION] drawing_idx={drawing_idx} rect is not a valid list/tuple or fitz.Rect: {rect} (type: {type(rect)})"
-            )
-            rect_list = None
-        if rect_list:
-            drawing_commands.append(
-                DrawingCommand(
-                    cmd="rect",
-                    bbox=BoundingBox.from_list(rect_list),
-                )
-            )
+    path = encode_drawing_items(drawing.get("items", []), close_path=bool(drawing.get("closePath")))
 
     # Create stroke and fill colors
     stroke_color = Color.from_rgb_tuple(drawing.get("color")) if drawing.get("color") else None
@@ -208,18 +255,46 @@ def _process_drawing(drawing, drawing_idx):
         z_index=drawing_idx,
         color=stroke_color,
         fill=fill_color,
-        width=drawing.get("width", 1.0),
-        drawing_commands=drawing_commands,
+        width=drawing.get("width") or 1.0,  # fill-only paths report no width
+        path=path,
     )
 
 
-def extract_pdf_content(pdf_path, extraction_flags=None):
+def describe_source(source):
+    """Printable name for a document source given as a path, bytes or a binary stream"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<{len(source)}-byte stream>"
+    if hasattr(source, "read"):
+        return f"<stream {getattr(source, 'name', type(source).__name__)}>"
+    return str(source)
+
+
+def open_pdf(source) -> fitz.Document:
+    """Open a PDF from a filesystem path, a bytes-like object or a readable binary stream"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    if hasattr(source, "read"):
+        return fitz.open(stream=source.read(), filetype="pdf")
+    return fitz.open(source)
+
+
+def extract_pdf_content(pdf_path, extraction_flags=None, cache=None, asset_store=None):
     """
     Extracts all content from a PDF, organizing it by page and a default 'base' layer for reconstruction.
 
     This version uses the Universal IDM classes to create a structured document representation
     with full support for layer hierarchies and complex element types.
 
+    Pages whose content is unchanged since a previous run are reused from the
+    extraction cache when one is passed or ``settings.processing.extraction_cache`` is set.
+
+    Args:
+        pdf_path: Path to the PDF, or its content as bytes or a readable binary stream
+        extraction_flags: Optional flags to control extraction behavior
+        cache: Optional extraction cache
+        asset_store: Store for extracted images; defaults to the on-disk store for ``settings.image_dir``.
+            Pass an InMemoryAssetStore to extract without touching the filesystem.
+
     Returns:
         UniversalDocument: A complete document object with all extracted content
     """
@@ -232,9 +307,9 @@ def extract_pdf_content(pdf_path, extraction_flags=None):
         }
 
     try:
-        doc: fitz.Document = fitz.open(pdf_path)
+        doc: fitz.Document = open_pdf(pdf_path)
     except RuntimeError as e:
-        raise ValueError(f"Could not open or parse PDF file at '{pdf_path}': {e}")
+        raise ValueError(f"Could not open or parse PDF file at '{describe_source(pdf_path)}': {e}")
 
     # Get engine info
     # engine_info = get_engine_info("fitz") # This line is removed as per the edit hint.
@@ -262,124 +337,213 @@ def extract_pdf_content(pdf_path, extraction_flags=None):
         document_structure=[],
     )
 
-    image_dir = settings.image_dir or "images"
+    if asset_store is None:
+        asset_store = get_asset_store(settings.image_dir or "images")
+    image_dir = asset_store.root_dir
+    store_stats_before = asset_store.get_statistics()
+    xref_assets = {}
+    writer = create_asset_writer() if asset_store.persistent else None
+    # With background writes, pages are cached only once their assets are known to be on disk
+    pending_cache_puts = []
     space_density_threshold = settings.processing.space_density_threshold
+    coalesce_spans = settings.processing.span_coalescing
+    span_stats = {"spans": 0, "elements": 0}
+
+    # Cached pages reference stored paths, which only stay valid for persistent stores
+    if cache is None and settings.processing.extraction_cache and asset_store.persistent:
+        cache = get_extraction_cache()
+    fingerprinter = PageFingerprinter(doc) if cache is not None else None
+    cache_options = {
+        "space_density_threshold": space_density_threshold,
+        "image_dir": os.path.abspath(image_dir),
+        "span_coalescing": coalesce_spans,
+    }
+    cache_hits = cache_misses = 0
+
+    # The writer is closed even when extraction fails, so its threads never outlive the call
+    failures = []
+    # References to stored images are released once this document is done
+    with asset_store.document_scope():
+        try:
+            for page_num in range(doc.page_count):
+                logger.info(f"Extraction progress: Processing page {page_num + 1}/{doc.page_count}")
+                page: fitz.Page = doc[page_num]
+
+                cache_key = None
+                if cache is not None:
+                    cache_key = cache.make_key(fingerprinter.page_digest(page), extraction_flags, cache_options)
+                    cached_page = cache.get(cache_key, page_num)
+                    if cached_page is not None:
+                        cache_hits += 1
+                        universal_doc.document_structure.append(cached_page)
+                        continue
+                    cache_misses += 1
+
+                # Create a new page unit
+                page_unit = PageUnit(
+                    page_number=page_num,
+                    size=(page.rect.width, page.rect.height),
+                    background_color=None,  # Will be set later if detected
+                    layers=[],
+                )
 
-    for page_num in range(doc.page_count):
-        logger.info(f"Extraction progress: Processing page {page_num + 1}/{doc.page_count}")
-        page: fitz.Page = doc[page_num]
-
-        # Create a new page unit
-        page_unit = PageUnit(
-            page_number=page_num,
-            size=(page.rect.width, page.rect.height),
-            background_color=None,  # Will be set later if detected
-            layers=[],
-        )
+                raw_drawings = page.get_drawings() if extraction_flags.get("include_drawings", True) else []
+
+                logger.debug(f"[EXTRACTION] page {page_num}: raw_drawings = {raw_drawings}")
+
+                # Track background colors and filled rectangles
+                page_bg_color_candidates: Counter[tuple[float, float, float]] = Counter()
+                filled_rects = [d for d in raw_drawings if d.get("type") == "f" and d.get("fill")]
+
+                # Create the base layer for this page
+                base_layer = Layer(
+                    layer_id=f"page_{page_num}_base_layer",
+                    layer_name="Page Content",
+                    layer_type=LayerType.BASE,
+                    bbox=BoundingBox(0, 0, page.rect.width, page.rect.height),
+                    visibility=True,
+                    opacity=1.0,
+                    blend_mode=BlendMode.NORMAL,
+                    children=[],
+                    content=[],
+                )
 
-        # Get raw content from the page
-        raw_blocks = (
-            page.get_text("dict").get("blocks", [])
-            if (extraction_flags.get("include_text", True) or extraction_flags.get("include_images", True))
-            else []
+                # --- Z-Order Strategy for PDF Base Layer ---
+                # Process drawings first
+                for drawing_idx, drawing in enumerate(raw_drawings):
+                    if drawing.get("used_for_background", False):
+                        continue  # Skip if already used for text background
+
+                    drawing_element = _process_drawing(drawing, drawing_idx)
+                    base_layer.content.append(drawing_element)
+
+                # Process text and image blocks
+                element_id_counter = [0]  # Use a list to allow modification in nested functions
+                temp_text_elements = []
+
+                inline_blocks = None
+                for kind, block in _iter_page_blocks(
+                    page,
+                    extraction_flags.get("include_text", True),
+                    extraction_flags.get("include_images", True),
+                    text_layout="rawdict" if coalesce_spans else "dict",
+                ):
+                    if kind == "text":
+                        # Process text blocks but hold them for background detection
+                        processed_texts = _process_text_block(
+                            block, space_density_threshold, element_id_counter, coalesce_spans, span_stats
+                        )
+                        temp_text_elements.extend(processed_texts)
+                        continue
+
+                    # Process and add image occurrences
+                    image_id = f"image_{element_id_counter[0]}"
+                    element_id_counter[0] += 1
+                    if block.get("xref"):
+                        entry = _store_xref_image(doc, block["xref"], asset_store, xref_assets, writer)
+                        image_element = _process_image_occurrence(block, entry, image_id) if entry else None
+                    else:
+                        # Inline images have no xref; fall back to the text dict payload for this page only
+                        if inline_blocks is None:
+                            inline_blocks = _inline_image_blocks(page)
+                        inline_block = inline_blocks.get(block["number"])
+                        image_element = (
+                            _process_image_block(inline_block, image_dir, image_id, asset_store, writer)
+                            if inline_block
+                            else None
+                        )
+                    if image_element:
+                        base_layer.content.append(image_element)
+
+                # Apply background detection to text elements
+                raw_background_drawings: list[DrawingElement] = []
+                for text_elem in temp_text_elements:
+                    text_rect = fitz.Rect(text_elem.bbox.to_list())
+                    for rect_draw in filled_rects:
+                        if not rect_draw.get("used_for_background"):
+                            bg_rect = fitz.Rect(rect_draw["rect"])
+                            intersection_area = (text_rect & bg_rect).get_area()
+                            if text_rect.contains(bg_rect) or intersection_area > (text_rect.get_area() * 0.8):
+                                # Set background color for text
+                                if rect_draw.get("fill"):
+                                    text_elem.background_color = Color.from_rgb_tuple(rect_draw["fill"])
+
+                                rect_draw["used_for_background"] = True
+                                page_bg_color_candidates[tuple(rect_draw["fill"])] += 1
+
+                                # If raw background drawings are to be included
+                                if extraction_flags.get("include_raw_background_drawings", False):
+                                    bg_drawing_id = f"bg_drawing_{len(raw_background_drawings)}"
+                                    bg_rect_list = [bg_rect.x0, bg_rect.y0, bg_rect.x1, bg_rect.y1]
+                                    bg_drawing_cmd = DrawingCommand(
+                                        cmd="rect", bbox=BoundingBox.from_list(bg_rect_list)
+                                    )
+                                    bg_drawing = DrawingElement(
+                                        id=bg_drawing_id,
+                                        bbox=BoundingBox.from_list(bg_rect_list),
+                                        color=None,
+                                        fill=(
+                                            Color.from_rgb_tuple(rect_draw["fill"]) if rect_draw.get("fill") else None
+                                        ),
+                                        drawing_commands=[bg_drawing_cmd],
+                                    )
+                                    raw_background_drawings.append(bg_drawing)
+                                break
+
+                # Add text elements to the base layer
+                base_layer.content.extend(temp_text_elements)
+
+                # Add raw background drawings if requested
+                if extraction_flags.get("include_raw_background_drawings", False) and raw_background_drawings:
+                    base_layer.content.extend(raw_background_drawings)
+
+                # Set page background color if detected
+                if page_bg_color_candidates:
+                    most_common_color = page_bg_color_candidates.most_common(1)[0][0]
+                    page_unit.background_color = Color.from_rgb_tuple(most_common_color)
+
+                # Add the base layer to the page
+                page_unit.layers.append(base_layer)
+
+                # Add the page to the document
+                universal_doc.document_structure.append(page_unit)
+                if cache_key is not None:
+                    if writer is None:
+                        cache.put(cache_key, page_unit)
+                    else:
+                        pending_cache_puts.append((cache_key, page_unit))
+        finally:
+            if writer is not None:
+                failures = writer.close()
+
+    if writer is not None:
+        remove_failed_images(universal_doc, failures)
+        writer_stats = writer.get_statistics()
+        logger.info(
+            f"Background asset writer: {writer_stats['written']} written, {len(failures)} failed, "
+            f"{writer_stats['blocked_seconds']:.2f}s blocked on a full queue"
         )
-        raw_drawings = page.get_drawings() if extraction_flags.get("include_drawings", True) else []
-
-        logger.debug(f"[EXTRACTION] page {page_num}: raw_drawings = {raw_drawings}")
-
-        # Track background colors and filled rectangles
-        page_bg_color_candidates: Counter[tuple[float, float, float]] = Counter()
-        filled_rects = [d for d in raw_drawings if d.get("type") == "f" and d.get("fill")]
-
-        # Create the base layer for this page
-        base_layer = Layer(
-            layer_id=f"page_{page_num}_base_layer",
-            layer_name="Page Content",
-            layer_type=LayerType.BASE,
-            bbox=BoundingBox(0, 0, page.rect.width, page.rect.height),
-            visibility=True,
-            opacity=1.0,
-            blend_mode=BlendMode.NORMAL,
-            children=[],
-            content=[],
+        if not failures:
+            for cache_key, page_unit in pending_cache_puts:
+                cache.put(cache_key, page_unit)
+
+    if settings.processing.master_page_detection:
+        detect_master_content(universal_doc, min_page_ratio=settings.processing.master_page_min_ratio)
+
+    store_stats = asset_store.get_statistics()
+    logger.info(
+        f"Image assets: {len(xref_assets)} unique xrefs, "
+        f"{store_stats['writes'] - store_stats_before['writes']} written, "
+        f"{store_stats['dedup_hits'] - store_stats_before['dedup_hits']} deduplicated"
+    )
+    if coalesce_spans and span_stats["spans"]:
+        reduction = 1 - span_stats["elements"] / span_stats["spans"]
+        logger.info(
+            f"Span coalescing: {span_stats['spans']} text spans -> {span_stats['elements']} elements "
+            f"({reduction:.1%} reduction)"
         )
-
-        # --- Z-Order Strategy for PDF Base Layer ---
-        # Process drawings first
-        for drawing_idx, drawing in enumerate(raw_drawings):
-            if drawing.get("used_for_background", False):
-                continue  # Skip if already used for text background
-
-            drawing_element = _process_drawing(drawing, drawing_idx)
-            base_layer.content.append(drawing_element)
-
-        # Process text and image blocks
-        element_id_counter = [0]  # Use a list to allow modification in nested functions
-        temp_text_elements = []
-
-        for block in raw_blocks:
-            if block.get("type") == 0 and extraction_flags.get("include_text", True):
-                # Process text blocks but hold them for background detection
-                processed_texts = _process_text_block(block, space_density_threshold, element_id_counter)
-                temp_text_elements.extend(processed_texts)
-
-            elif block.get("type") == 1 and extraction_flags.get("include_images", True):
-                # Process and add image blocks
-                image_id = f"image_{element_id_counter[0]}"
-                element_id_counter[0] += 1
-                image_element = _process_image_block(block, image_dir, image_id)
-                if image_element:
-                    base_layer.content.append(image_element)
-
-        # Apply background detection to text elements
-        raw_background_drawings: list[DrawingElement] = []
-        for text_elem in temp_text_elements:
-            text_rect = fitz.Rect(text_elem.bbox.to_list())
-            for rect_draw in filled_rects:
-                if not rect_draw.get("used_for_background"):
-                    bg_rect = fitz.Rect(rect_draw["rect"])
-                    intersection_area = (text_rect & bg_rect).get_area()
-                    if text_rect.contains(bg_rect) or intersection_area > (text_rect.get_area() * 0.8):
-                        # Set background color for text
-                        if rect_draw.get("fill"):
-                            text_elem.background_color = Color.from_rgb_tuple(rect_draw["fill"])
-
-                        rect_draw["used_for_background"] = True
-                        page_bg_color_candidates[tuple(rect_draw["fill"])] += 1
-
-                        # If raw background drawings are to be included
-                        if extraction_flags.get("include_raw_background_drawings", False):
-                            bg_drawing_id = f"bg_drawing_{len(raw_background_drawings)}"
-                            bg_rect_list = [bg_rect.x0, bg_rect.y0, bg_rect.x1, bg_rect.y1]
-                            bg_drawing_cmd = DrawingCommand(cmd="rect", bbox=BoundingBox.from_list(bg_rect_list))
-                            bg_drawing = DrawingElement(
-                                id=bg_drawing_id,
-                                bbox=BoundingBox.from_list(bg_rect_list),
-                                color=None,
-                                fill=(Color.from_rgb_tuple(rect_draw["fill"]) if rect_draw.get("fill") else None),
-                                drawing_commands=[bg_drawing_cmd],
-                            )
-                            raw_background_drawings.append(bg_drawing)
-                        break
-
-        # Add text elements to the base layer
-        base_layer.content.extend(temp_text_elements)
-
-        # Add raw background drawings if requested
-        if extraction_flags.get("include_raw_background_drawings", False) and raw_background_drawings:
-            base_layer.content.extend(raw_background_drawings)
-
-        # Set page background color if detected
-        if page_bg_color_candidates:
-            most_common_color = page_bg_color_candidates.most_common(1)[0][0]
-            page_unit.background_color = Color.from_rgb_tuple(most_common_color)
-
-        # Add the base layer to the page
-        page_unit.layers.append(base_layer)
-
-        # Add the page to the document
-        universal_doc.document_structure.append(page_unit)
-
+    if cache is not None:
+        logger.info(f"Extraction cache: {cache_hits} hits, {cache_misses} misses ({cache.cache_dir})")
     logger.info(f"✅ Extraction complete: {doc.page_count} pages processed with Universal IDM structure.")
     doc.close()
 
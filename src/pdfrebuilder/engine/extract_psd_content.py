@@ -5,10 +5,9 @@
 and convert it to the Universal IDM format.
 """
 
-import hashlib
 import logging
 import os
-from typing import Any
+from typing import Any, BinaryIO
 
 # Import psd-tools conditionally to handle cases where it's not installed
 try:
@@ -18,6 +17,8 @@
 except ImportError:
     HAS_PSD_TOOLS = False
 
+from pdfrebuilder.engine.asset_store import ContentAddressedAssetStore, get_asset_store
+from pdfrebuilder.engine.asset_writer import BackgroundAssetWriter, create_asset_writer, remove_failed_images
 from pdfrebuilder.models.universal_idm import (
     BlendMode,
     BoundingBox,
@@ -123,18 +124,20 @@ def _extract_text_element(psd_layer: Any, element_id: str) -> TextElement:
     )
 
 
-def _extract_image_element(psd_layer: Any, element_id: str, image_dir: str) -> ImageElement:
+def _extract_image_element(
+    psd_layer: Any,
+    element_id: str,
+    asset_store: ContentAddressedAssetStore,
+    writer: BackgroundAssetWriter | None = None,
+) -> ImageElement:
     """Extract image element from a PSD pixel layer"""
     # Get image data
     image = psd_layer.composite()
 
-    # Save image to file
-    img_bytes = image.tobytes()
-    # Replace MD5 with SHA-256 for more secure hashing
-    img_hash = hashlib.sha256(img_bytes).hexdigest()
-    path = os.path.join(image_dir, f"img_{img_hash[:8]}.png")
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    image.save(path)
+    # Encode once and store by content hash; identical layers share one file
+    stored = asset_store.put_image(
+        image, "png", original_name=element_id, metadata={"element_id": element_id}, writer=writer
+    )
 
     # Get bounding box
     bbox = BoundingBox(psd_layer.left, psd_layer.top, psd_layer.right, psd_layer.bottom)
@@ -144,7 +147,7 @@ def _extract_image_element(psd_layer: Any, element_id: str, image_dir: str) -> I
     return ImageElement(
         id=element_id,
         bbox=bbox,
-        image_file=path,
+        image_file=stored.path,
         original_format="png",
         has_transparency=image.mode == "RGBA",
         z_index=layer_index,
@@ -222,7 +225,13 @@ def _extract_shape_element(psd_layer: Any, element_id: str) -> DrawingElement:
     )
 
 
-def _process_layer(psd_layer: Any, parent_id: str, element_counter: dict[str, int], image_dir: str) -> Layer:
+def _process_layer(
+    psd_layer: Any,
+    parent_id: str,
+    element_counter: dict[str, int],
+    asset_store: ContentAddressedAssetStore,
+    writer: BackgroundAssetWriter | None = None,
+) -> Layer:
     """Process a PSD layer and convert it to a Universal IDM layer"""
     # Generate layer ID
     layer_index = getattr(psd_layer, "index", getattr(psd_layer, "_index", 0))
@@ -251,7 +260,7 @@ def _process_layer(psd_layer: Any, parent_id: str, element_counter: dict[str, in
     # Process children for group layers
     if layer_type == LayerType.GROUP:
         for child_layer in psd_layer:
-            child = _process_layer(child_layer, layer_id, element_counter, image_dir)
+            child = _process_layer(child_layer, layer_id, element_counter, asset_store, writer)
             layer.children.append(child)
     else:
         # Process content based on layer type
@@ -273,19 +282,24 @@ def _process_layer(psd_layer: Any, parent_id: str, element_counter: dict[str, in
             # Extract image element
             element_id = f"image_{element_counter['image']}"
             element_counter["image"] += 1
-            image_element = _extract_image_element(psd_layer, element_id, image_dir)
+            image_element = _extract_image_element(psd_layer, element_id, asset_store, writer)
             layer.content.append(image_element)
 
     return layer
 
 
-def extract_psd_content(psd_path: str, extraction_flags: dict[str, bool] | None = None) -> UniversalDocument:
+def extract_psd_content(
+    psd_path: str | BinaryIO,
+    extraction_flags: dict[str, bool] | None = None,
+    asset_store: ContentAddressedAssetStore | None = None,
+) -> UniversalDocument:
     """
     Extract content from a PSD file and convert it to the Universal IDM format
 
     Args:
-        psd_path: Path to the PSD file
+        psd_path: Path to the PSD file, or a readable binary stream
         extraction_flags: Optional flags to control extraction behavior
+        asset_store: Store for layer images; defaults to the on-disk store for ``settings.image_dir``
 
     Returns:
         UniversalDocument: Extracted document content
@@ -338,7 +352,7 @@ def extract_psd_content(psd_path: str, extraction_flags: dict[str, bool] | None
         # Create canvas unit
         canvas = CanvasUnit(
             size=(psd.width, psd.height),
-            canvas_name=os.path.basename(psd_path),
+            canvas_name=os.path.basename(psd_path) if isinstance(psd_path, str) else "canvas",
             background_color=None,  # Will be set if background layer is found
             layers=[],
         )
@@ -350,20 +364,30 @@ def extract_psd_content(psd_path: str, extraction_flags: dict[str, bool] | None
             "drawing": 0,
         }
 
-        # Process layers
-        for psd_layer in psd:
+        if asset_store is None:
             from pdfrebuilder.settings import settings
 
-            layer = _process_layer(
-                psd_layer,
-                "canvas",
-                element_counter,
-                settings.image_dir or "images",
-            )
-            canvas.layers.append(layer)
+            asset_store = get_asset_store(settings.image_dir or "images")
+
+        # Process layers; pixel layer images are written in the background when enabled
+        writer = create_asset_writer() if asset_store.persistent else None
+        with asset_store.document_scope():
+            try:
+                for psd_layer in psd:
+                    layer = _process_layer(
+                        psd_layer,
+                        "canvas",
+                        element_counter,
+                        asset_store,
+                        writer,
+                    )
+                    canvas.layers.append(layer)
+            finally:
+                failures = writer.close() if writer is not None else []
 
         # Add canvas to document
         document.document_structure.append(canvas)
+        remove_failed_images(document, failures)
 
         logger.info(f"✅ Extraction complete: PSD with {len(canvas.layers)} top-level layers processed")
         return document
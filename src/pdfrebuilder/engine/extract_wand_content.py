@@ -33,6 +33,8 @@
 import os
 from typing import Any
 
+from pdfrebuilder.engine.asset_store import ContentAddressedAssetStore, StoredAsset, get_asset_store
+from pdfrebuilder.engine.asset_writer import BackgroundAssetWriter, create_asset_writer, remove_failed_images
 from pdfrebuilder.models.universal_idm import (
     BlendMode,
     BoundingBox,
@@ -153,7 +155,11 @@ def check_tesseract_availability() -> tuple[bool, dict[str, Any]]:
         }
 
 
-def extract_wand_content(file_path: str, extraction_flags: dict[str, bool] | None = None) -> UniversalDocument:
+def extract_wand_content(
+    file_path: str,
+    extraction_flags: dict[str, bool] | None = None,
+    asset_store: ContentAddressedAssetStore | None = None,
+) -> UniversalDocument:
     """
     Extract content from a PSD or layered image file using Python-Wand.
 
@@ -164,6 +170,7 @@ def extract_wand_content(file_path: str, extraction_flags: dict[str, bool] | Non
             - include_images: Extract image layers (default: True)
             - include_drawings_non_background: Extract vector graphics (default: True)
             - include_raw_background_drawings: Extract background elements (default: False)
+        asset_store: Store for extracted images; defaults to the on-disk store for ``settings.image_dir``
 
     Returns:
         UniversalDocument: Extracted document structure following Universal IDM schema
@@ -201,6 +208,13 @@ def extract_wand_content(file_path: str, extraction_flags: dict[str, bool] | Non
     logger.info(f"Starting Wand extraction for: {file_path}")
     logger.debug(f"Extraction flags: {extraction_flags}")
 
+    if asset_store is None:
+        from pdfrebuilder.settings import settings
+
+        asset_store = get_asset_store(settings.image_dir or "images")
+    # Extracted images are written in the background when enabled
+    writer = create_asset_writer() if asset_store.persistent else None
+
     try:
         from wand.image import Image
 
@@ -215,14 +229,20 @@ def extract_wand_content(file_path: str, extraction_flags: dict[str, bool] | Non
 
             # Create document structure based on format
             document_structure: list[PageUnit | CanvasUnit]
-            if file_format.lower() == "tiff" and _is_multi_page_tiff(img):
-                # Handle multi-page TIFF as separate pages
-                _tiff_canvases: list[CanvasUnit] = _extract_multi_page_tiff(img, extraction_flags)
-                document_structure = list(_tiff_canvases)
-            else:
-                # Handle as single canvas (PSD, single images, etc.)
-                canvas = _create_canvas_structure(img, extraction_flags, file_format)
-                document_structure = [canvas]
+            with asset_store.document_scope():
+                try:
+                    if file_format.lower() == "tiff" and _is_multi_page_tiff(img):
+                        # Handle multi-page TIFF as separate pages
+                        _tiff_canvases: list[CanvasUnit] = _extract_multi_page_tiff(
+                            img, extraction_flags, asset_store, writer
+                        )
+                        document_structure = list(_tiff_canvases)
+                    else:
+                        # Handle as single canvas (PSD, single images, etc.)
+                        canvas = _create_canvas_structure(img, extraction_flags, file_format, asset_store, writer)
+                        document_structure = [canvas]
+                finally:
+                    failures = writer.close() if writer is not None else []
 
             # Create Universal Document
             document = UniversalDocument(
@@ -232,6 +252,7 @@ def extract_wand_content(file_path: str, extraction_flags: dict[str, bool] | Non
                 metadata=metadata,
                 document_structure=document_structure,
             )
+            remove_failed_images(document, failures)
 
             logger.info(f"Successfully extracted content from {file_path}")
             return document
@@ -498,7 +519,12 @@ def _is_multi_page_tiff(img) -> bool:
         return False
 
 
-def _extract_multi_page_tiff(img, extraction_flags: dict[str, bool]) -> list[CanvasUnit]:
+def _extract_multi_page_tiff(
+    img,
+    extraction_flags: dict[str, bool],
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
+) -> list[CanvasUnit]:
     """Extract multi-page TIFF as separate canvas units."""
     pages = []
 
@@ -532,7 +558,9 @@ def _extract_multi_page_tiff(img, extraction_flags: dict[str, bool]) -> list[Can
 
                     # Extract the page as an image if requested
                     if extraction_flags.get("include_images", True):
-                        image_element = _extract_tiff_page_as_image(img, page_index, bbox_obj.to_list())
+                        image_element = _extract_tiff_page_as_image(
+                            img, page_index, bbox_obj.to_list(), asset_store, writer
+                        )
                         if image_element:
                             page_layer.content.append(image_element)
 
@@ -560,25 +588,21 @@ def _extract_multi_page_tiff(img, extraction_flags: dict[str, bool]) -> list[Can
         return []
 
 
-def _extract_tiff_page_as_image(img, page_index: int, bbox: list[float]) -> ImageElement | None:
+def _extract_tiff_page_as_image(
+    img,
+    page_index: int,
+    bbox: list[float],
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
+) -> ImageElement | None:
     """Extract a TIFF page as an image element."""
     try:
-        from pdfrebuilder.settings import settings
-
         # Get configuration
         config = get_wand_config()
         image_format = config.get("image_format", "png")
 
-        # Create output directory for images
-        image_dir = settings.image_dir
-        os.makedirs(image_dir, exist_ok=True)
-
-        # Generate filename for this page
-        import hashlib
-
+        # Hash used in the element id for this page
         page_hash = hashlib.md5(f"tiff_page_{page_index}".encode(), usedforsecurity=False).hexdigest()[:8]
-        image_filename = f"tiff_page_{page_index:03d}_{page_hash}.{image_format}"
-        image_path = os.path.join(image_dir, image_filename)
 
         # Extract the current page as an image
         with img.clone() as page_img:
@@ -592,8 +616,8 @@ def _extract_tiff_page_as_image(img, page_index: int, bbox: list[float]) -> Imag
             _apply_color_profile_management(page_img, config)
             _optimize_image_for_output(page_img, config)
 
-            # Save the page image
-            page_img.save(filename=image_path)
+            # Store the page image
+            image_path = _store_wand_image(page_img, image_format, asset_store, writer, f"tiff_page_{page_index}").path
 
             # Get image properties
             width, height = page_img.size
@@ -620,21 +644,27 @@ def _extract_tiff_page_as_image(img, page_index: int, bbox: list[float]) -> Imag
         return None
 
 
-def _create_canvas_structure(img, extraction_flags: dict[str, bool], file_format: str = "unknown") -> CanvasUnit:
+def _create_canvas_structure(
+    img,
+    extraction_flags: dict[str, bool],
+    file_format: str = "unknown",
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
+) -> CanvasUnit:
     """Create canvas structure from Wand image object."""
     width, height = img.size
 
     # Handle different formats differently
     if file_format.lower() in ["jpeg", "png", "gif", "bmp"]:
         # For single-layer image formats, create a simple structure
-        layers = _create_single_image_structure(img, width, height, extraction_flags, file_format)
+        layers = _create_single_image_structure(img, width, height, extraction_flags, file_format, asset_store, writer)
     else:
         # For layered formats (PSD, etc.), extract layers
-        layers = _extract_layers_from_image(img, width, height, extraction_flags)
+        layers = _extract_layers_from_image(img, width, height, extraction_flags, asset_store, writer)
 
         # If no layers were extracted, create a base layer with the flattened image
         if not layers:
-            base_layer = _create_base_layer_from_image(img, width, height, extraction_flags)
+            base_layer = _create_base_layer_from_image(img, width, height, extraction_flags, asset_store, writer)
             layers = [base_layer]
 
     # Create canvas object
@@ -650,7 +680,13 @@ def _create_canvas_structure(img, extraction_flags: dict[str, bool], file_format
 
 
 def _create_single_image_structure(
-    img, width: int, height: int, extraction_flags: dict[str, bool], file_format: str
+    img,
+    width: int,
+    height: int,
+    extraction_flags: dict[str, bool],
+    file_format: str,
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
 ) -> list[Layer]:
     """Create a simple layer structure for single-layer image formats (JPEG, PNG, GIF, BMP)."""
     try:
@@ -670,7 +706,7 @@ def _create_single_image_structure(
 
         # Extract the image content if requested
         if extraction_flags.get("include_images", True):
-            image_element = _extract_single_image_content(img, file_format, bbox_obj.to_list())
+            image_element = _extract_single_image_content(img, file_format, bbox_obj.to_list(), asset_store, writer)
             if image_element:
                 base_layer.content.append(image_element)
 
@@ -682,25 +718,21 @@ def _create_single_image_structure(
         return []
 
 
-def _extract_single_image_content(img, file_format: str, bbox: list[float]) -> ImageElement | None:
+def _extract_single_image_content(
+    img,
+    file_format: str,
+    bbox: list[float],
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
+) -> ImageElement | None:
     """Extract content from a single-layer image format."""
     try:
-        from pdfrebuilder.settings import settings
-
         # Get configuration
         config = get_wand_config()
         output_format = config.get("image_format", "png")
 
-        # Create output directory for images
-        image_dir = settings.image_dir
-        os.makedirs(image_dir, exist_ok=True)
-
-        # Generate filename for the image
-        import hashlib
-
+        # Hash used in the element id for the image
         img_hash = hashlib.md5(f"{file_format}_image".encode(), usedforsecurity=False).hexdigest()[:8]
-        image_filename = f"{file_format.lower()}_image_{img_hash}.{output_format}"
-        image_path = os.path.join(image_dir, image_filename)
 
         # Extract the image
         with img.clone() as extracted_img:
@@ -714,8 +746,10 @@ def _extract_single_image_content(img, file_format: str, bbox: list[float]) -> I
             _apply_color_profile_management(extracted_img, config)
             _optimize_image_for_output(extracted_img, config)
 
-            # Save the image
-            extracted_img.save(filename=image_path)
+            # Store the image
+            image_path = _store_wand_image(
+                extracted_img, output_format, asset_store, writer, f"{file_format.lower()}_image"
+            ).path
 
             # Get image properties
             width, height = extracted_img.size
@@ -742,7 +776,14 @@ def _extract_single_image_content(img, file_format: str, bbox: list[float]) -> I
         return None
 
 
-def _extract_layers_from_image(img, width: int, height: int, extraction_flags: dict[str, bool]) -> list[Layer]:
+def _extract_layers_from_image(
+    img,
+    width: int,
+    height: int,
+    extraction_flags: dict[str, bool],
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
+) -> list[Layer]:
     """Extract individual layers from a Wand image object."""
     layers = []
 
@@ -773,6 +814,8 @@ def _extract_layers_from_image(img, width: int, height: int, extraction_flags: d
                         height,
                         extraction_flags,
                         current_layer_info,
+                        asset_store,
+                        writer,
                     )
                     if layer:
                         layers.append(layer)
@@ -1218,11 +1261,11 @@ def _extract_layer_as_image(
     layer_id: str,
     layer_bbox: list[float],
     layer_info: dict[str, Any] | None = None,
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
 ) -> ImageElement | None:
     """Extract a layer as an image element."""
     try:
-        from pdfrebuilder.settings import settings
-
         if layer_info is None:
             layer_info = {}
 
@@ -1230,13 +1273,8 @@ def _extract_layer_as_image(
         config = get_wand_config()
         image_format = config.get("image_format", "png")
 
-        # Create output directory for images
-        image_dir = settings.image_dir
-        os.makedirs(image_dir, exist_ok=True)
-
-        # Generate consistent filename for this layer
+        # Consistent name for this layer, used in the element id
         image_filename = _generate_consistent_image_filename(layer_id, layer_index, image_format, "layer")
-        image_path = os.path.join(image_dir, image_filename)
 
         # Try to extract the current layer as an image
         try:
@@ -1252,8 +1290,8 @@ def _extract_layer_as_image(
                 _apply_color_profile_management(layer_img, config)
                 _optimize_image_for_output(layer_img, config)
 
-                # Save the layer image
-                layer_img.save(filename=image_path)
+                # Store the layer image
+                image_path = _store_wand_image(layer_img, image_format, asset_store, writer, layer_id).path
 
                 # Get image properties
                 width, height = layer_img.size
@@ -1296,12 +1334,12 @@ def _extract_layer_as_image(
                         # Crop to layer bounds
                         fallback_img.crop(int(x1), int(y1), int(x2), int(y2))
 
-                    # Set format and save
+                    # Set format and store
                     fallback_img.format = image_format
                     if image_format.lower() in ["jpg", "jpeg"]:
                         fallback_img.compression_quality = 90
 
-                    fallback_img.save(filename=image_path)
+                    image_path = _store_wand_image(fallback_img, image_format, asset_store, writer, layer_id).path
 
                     # Get properties
                     width, height = fallback_img.size
@@ -1377,6 +1415,8 @@ def _create_layer_from_wand_layer(
     height: int,
     extraction_flags: dict[str, bool],
     layer_info: dict[str, Any] | None = None,
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
 ) -> Layer | None:
     """Create a LayerObject from a Wand image layer."""
     try:
@@ -1516,7 +1556,9 @@ def _create_layer_from_wand_layer(
         # Extract content from this layer if requested
         if extraction_flags.get("include_images", True):
             # Extract the layer as a raster image
-            image_element = _extract_layer_as_image(img, layer_index, layer_id, layer_bbox, layer_info)
+            image_element = _extract_layer_as_image(
+                img, layer_index, layer_id, layer_bbox, layer_info, asset_store, writer
+            )
             if image_element:
                 layer.content.append(image_element)
 
@@ -1528,7 +1570,14 @@ def _create_layer_from_wand_layer(
         return None
 
 
-def _create_base_layer_from_image(img, width: int, height: int, extraction_flags: dict[str, bool]) -> Layer:
+def _create_base_layer_from_image(
+    img,
+    width: int,
+    height: int,
+    extraction_flags: dict[str, bool],
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
+) -> Layer:
     """Create a base layer from the flattened image."""
     # Create base layer for the canvas
     bbox_obj = BoundingBox(0, 0, float(width), float(height))
@@ -1547,7 +1596,7 @@ def _create_base_layer_from_image(img, width: int, height: int, extraction_flags
     # Extract content from the flattened image if requested
     if extraction_flags.get("include_images", True):
         # Extract the entire image as a single element
-        image_element = _extract_base_image(img, width, height)
+        image_element = _extract_base_image(img, width, height, asset_store, writer)
         if image_element:
             base_layer.content.append(image_element)
 
@@ -1613,23 +1662,19 @@ def validate_wand_config(config: dict[str, Any]) -> tuple[bool, list[str]]:
     return len(errors) == 0, errors
 
 
-def _extract_base_image(img, width: int, height: int) -> ImageElement | None:
+def _extract_base_image(
+    img,
+    width: int,
+    height: int,
+    asset_store: ContentAddressedAssetStore | None = None,
+    writer: BackgroundAssetWriter | None = None,
+) -> ImageElement | None:
     """Extract the base/flattened image as an image element."""
     try:
-        from pdfrebuilder.settings import settings
-
         # Get configuration
         config = get_wand_config()
         image_format = config.get("image_format", "png")
 
-        # Create output directory for images
-        image_dir = settings.image_dir
-        os.makedirs(image_dir, exist_ok=True)
-
-        # Generate consistent filename for the base image
-        image_filename = _generate_consistent_image_filename("base_canvas", 0, image_format, "base")
-        image_path = os.path.join(image_dir, image_filename)
-
         # Extract the flattened image
         with img.clone() as base_img:
             # Flatten all layers into a single image
@@ -1648,8 +1693,9 @@ def _extract_base_image(img, width: int, height: int) -> ImageElement | None:
             _apply_color_profile_management(base_img, config)
             _optimize_image_for_output(base_img, config)
 
-            # Save the base image
-            base_img.save(filename=image_path)
+            # Store the base image
+            stored = _store_wand_image(base_img, image_format, asset_store, writer, "base_canvas")
+            image_path = stored.path
 
             # Get image properties
             has_transparency = base_img.alpha_channel
@@ -1663,6 +1709,8 @@ def _extract_base_image(img, width: int, height: int) -> ImageElement | None:
                 "color_space": color_space,
                 "has_transparency": has_transparency,
                 "dpi": config.get("density", 300),
+                # Unknown here when the image was already stored or is encoded in the background
+                "file_size_bytes": stored.size or None,
             }
 
             # Record comprehensive metadata for base image
@@ -1851,6 +1899,45 @@ def _optimize_image_for_output(img, config: dict[str, Any]) -> None:
         logger.debug(f"Error optimizing image for output: {e}")
 
 
+def _store_wand_image(
+    wand_img,
+    image_format: str,
+    asset_store: ContentAddressedAssetStore | None,
+    writer: BackgroundAssetWriter | None,
+    original_name: str,
+) -> StoredAsset:
+    """
+    Put a Wand image in the asset store, encoding and writing it in the background when a writer is given.
+
+    The key comes from ImageMagick's pixel signature, so the image is only
+    encoded when its content is not stored yet. A background encode works on
+    a clone, since callers close or change their image right after storing it.
+    """
+    if asset_store is None:
+        from pdfrebuilder.settings import settings
+
+        asset_store = get_asset_store(settings.image_dir or "images")
+    key = [
+        wand_img.signature,
+        list(wand_img.size),
+        image_format.upper(),
+        str(wand_img.colorspace),
+        wand_img.alpha_channel,
+    ]
+    content_hash = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+    ext = image_format.lower()
+    source = wand_img.clone() if writer is not None and not asset_store.contains(content_hash, ext) else wand_img
+
+    def encode() -> bytes:
+        try:
+            return source.make_blob(image_format)
+        finally:
+            if source is not wand_img:
+                source.close()
+
+    return asset_store.put_encoded(content_hash, ext, encode, original_name=original_name, writer=writer)
+
+
 def _generate_consistent_image_filename(
     layer_id: str, layer_index: int, image_format: str, prefix: str = "layer"
 ) -> str:
@@ -1910,9 +1997,10 @@ def _record_image_metadata(
         import os
         from datetime import datetime
 
-        # Get file information
-        file_stat = os.stat(image_path)
-        file_size = file_stat.st_size
+        # Get file information; the file may still be queued on a background writer
+        file_size = img_properties.get("file_size_bytes")
+        if file_size is None and os.path.exists(image_path):
+            file_size = os.stat(image_path).st_size
 
         # Create comprehensive metadata record
         metadata = {
@@ -0,0 +1,204 @@
+"""
+Incremental extraction cache for the Multi-Format Document Engine.
+
+Each extracted PageUnit is stored under a key derived from the page's
+content streams, the resources it draws from, the extraction flags and the
+engine version. Re-extracting a lightly edited document then only processes
+the pages whose content actually changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any
+
+import pymupdf as fitz
+
+from pdfrebuilder import __version__
+from pdfrebuilder.models.universal_idm import ImageElement, Layer, PageUnit
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached PageUnit layout or the key derivation changes
+CACHE_FORMAT_VERSION = 2
+
+_XREF_REFERENCE = re.compile(r"(\d+) 0 R")
+# Back-references that would otherwise pull the whole page tree into a digest
+_PARENT_REFERENCE = re.compile(r"/(?:Parent|P) \d+ 0 R")
+
+
+class PageFingerprinter:
+    """
+    Computes content digests for the pages of one open document.
+
+    Digests of shared resources (fonts, images, form XObjects) are memoised so
+    each object is hashed once per document.
+    """
+
+    def __init__(self, doc: fitz.Document):
+        self.doc = doc
+        self._xref_digests: dict[int, str] = {}
+
+    def _xref_digest(self, xref: int) -> str:
+        cached = self._xref_digests.get(xref)
+        if cached is not None:
+            return cached
+        # Placeholder guards against reference cycles
+        self._xref_digests[xref] = ""
+
+        h = hashlib.sha256()
+        source = _PARENT_REFERENCE.sub("", self.doc.xref_object(xref, compressed=True))
+        h.update(source.encode("utf-8", "surrogateescape"))
+        if self.doc.xref_is_stream(xref):
+            h.update(self.doc.xref_stream_raw(xref) or b"")
+        for ref in _XREF_REFERENCE.findall(source):
+            h.update(self._xref_digest(int(ref)).encode("ascii"))
+
+        digest = h.hexdigest()
+        self._xref_digests[xref] = digest
+        return digest
+
+    def _resources_digest(self, page_xref: int) -> str:
+        """Digest of the page resources, following inheritance from the page tree"""
+        xref = page_xref
+        while xref:
+            kind, value = self.doc.xref_get_key(xref, "Resources")
+            if kind == "xref":
+                return self._xref_digest(int(value.split()[0]))
+            if kind == "dict":
+                h = hashlib.sha256(value.encode("utf-8", "surrogateescape"))
+                for ref in _XREF_REFERENCE.findall(value):
+                    h.update(self._xref_digest(int(ref)).encode("ascii"))
+                return h.hexdigest()
+            parent_kind, parent = self.doc.xref_get_key(xref, "Parent")
+            xref = int(parent.split()[0]) if parent_kind == "xref" else 0
+        return ""
+
+    def page_digest(self, page: fitz.Page) -> str:
+        """Digest of everything the extractor reads from a page"""
+        h = hashlib.sha256()
+        h.update(page.read_contents())
+        h.update(self._resources_digest(page.xref).encode("ascii"))
+        h.update(repr((tuple(page.mediabox), tuple(page.cropbox), page.rotation)).encode("ascii"))
+        return h.hexdigest()
+
+
+class ExtractionCache:
+    """
+    On-disk cache of extracted PageUnits.
+
+    Args:
+        cache_dir: Directory holding the cache entries
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(page_digest: str, extraction_flags: dict[str, Any], options: dict[str, Any] | None = None) -> str:
+        """Cache key for a page digest under the given extraction flags and options"""
+        payload = {
+            "format": CACHE_FORMAT_VERSION,
+            "engine": f"fitz-{fitz.VersionBind}",
+            "pdfrebuilder": __version__,
+            "page": page_digest,
+            "flags": extraction_flags,
+            "options": options or {},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str, page_number: int) -> PageUnit | None:
+        """
+        Load a cached page and renumber it for its position in the current document.
+
+        Entries whose image files have since been removed count as misses.
+        """
+        path = self._entry_path(key)
+        page_unit = None
+        try:
+            with open(path, encoding="utf-8") as f:
+                page_unit = PageUnit.from_dict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {path}: {e}")
+
+        if page_unit is not None and not _images_present(page_unit.layers):
+            page_unit = None
+
+        with self._lock:
+            if page_unit is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        cached_number = page_unit.page_number
+        page_unit.page_number = page_number
+        for layer in page_unit.layers:
+            if layer.layer_id == f"page_{cached_number}_base_layer":
+                layer.layer_id = f"page_{page_number}_base_layer"
+        return page_unit
+
+    def put(self, key: str, page_unit: PageUnit) -> None:
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(page_unit.to_dict(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write extraction cache entry {path}: {e}")
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cache_dir": str(self.cache_dir),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _images_present(layers: list[Layer]) -> bool:
+    for layer in layers:
+        for element in layer.content:
+            if isinstance(element, ImageElement) and not os.path.exists(element.image_file):
+                return False
+        if not _images_present(layer.children):
+            return False
+    return True
+
+
+_CACHES: dict[str, ExtractionCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_extraction_cache(cache_dir: str | Path | None = None) -> ExtractionCache:
+    """
+    Get the process-wide extraction cache for a directory.
+
+    Defaults to the ``extraction`` directory under ConfigManager.cache_dir.
+    """
+    if cache_dir is None:
+        from pdfrebuilder.config.manager import ConfigManager
+
+        cache_dir = ConfigManager().cache_dir / "extraction"
+    key = os.path.abspath(cache_dir)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = ExtractionCache(cache_dir)
+            _CACHES[key] = cache
+        return cache
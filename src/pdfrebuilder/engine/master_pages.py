@@ -0,0 +1,328 @@
+"""
+Master-page detection and shared-layer rendering for the Multi-Format Document Engine.
+
+Headers, footers, logos and background frames usually repeat on most pages of
+a document. ``detect_master_content`` fingerprints elements across pages and
+hoists content that repeats on enough pages into document-level shared layers
+(``UniversalDocument.shared_layers``), which pages reference through
+``PageUnit.shared_layer_refs``.
+
+Renderers draw a shared layer once and place it on every referencing page:
+the PyMuPDF engines through ``SharedLayerPlacer`` (a one-page PDF shown with
+``show_pdf_page``), ReportLab through a native form. Shared layers are drawn
+beneath the page's own layers, so detection only hoists an element when no
+content left on the page is drawn below it and overlaps it, and orders the
+shared layers so overlapping hoisted elements keep their stacking order.
+
+Code that edits page text walks the shared layers too; ``SharedLayerEditor``
+gives page-filtered edits a copy of a shared layer when pages outside the
+filter also use it.
+"""
+
+import hashlib
+import json
+import logging
+import math
+from collections import defaultdict
+from collections.abc import Callable, Collection
+from typing import Any
+
+import pymupdf as fitz
+
+from pdfrebuilder.models.universal_idm import (
+    BlendMode,
+    BoundingBox,
+    Element,
+    Layer,
+    LayerType,
+    PageUnit,
+    UniversalDocument,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _element_fingerprint(element: Element, page_size: tuple[float, float]) -> str:
+    data = element.to_dict()
+    data.pop("id", None)
+    data.pop("element_id", None)
+    return hashlib.sha256(json.dumps([data, list(page_size)], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _overlaps(a: Element, b: Element) -> bool:
+    """Whether two elements' bounding boxes intersect; an element without a bbox overlaps everything"""
+    if a.bbox is None or b.bbox is None:
+        return True
+    return a.bbox.x1 < b.bbox.x2 and b.bbox.x1 < a.bbox.x2 and a.bbox.y1 < b.bbox.y2 and b.bbox.y1 < a.bbox.y2
+
+
+def _stacking_order(
+    nodes: list[Any], edges: set[tuple[Any, Any]], sort_key: Callable[[Any], Any]
+) -> tuple[list[Any], list[Any]]:
+    """
+    Order nodes so every (before, after) edge is respected, preferring sort_key order.
+
+    Returns:
+        The ordered nodes, and the nodes left over because they sit on a cycle
+    """
+    incoming: dict[Any, int] = dict.fromkeys(nodes, 0)
+    outgoing: dict[Any, list[Any]] = defaultdict(list)
+    for before, after in edges:
+        if before in incoming and after in incoming and before != after:
+            outgoing[before].append(after)
+            incoming[after] += 1
+    ready = sorted((node for node in nodes if not incoming[node]), key=sort_key)
+    ordered = []
+    while ready:
+        node = ready.pop(0)
+        ordered.append(node)
+        for after in outgoing[node]:
+            incoming[after] -= 1
+            if not incoming[after]:
+                ready.append(after)
+        ready.sort(key=sort_key)
+    placed = set(ordered)
+    return ordered, [node for node in nodes if node not in placed]
+
+
+def detect_master_content(
+    document: UniversalDocument, min_page_ratio: float = 0.5, min_pages: int = 3
+) -> dict[str, int]:
+    """
+    Hoist elements repeated across pages into document-level shared layers.
+
+    Elements are grouped by the exact set of pages they appear on, so content
+    shared by every page and content shared by every page but the cover end up
+    in separate shared layers. Shared layers are drawn under the page's own
+    content, so a repeated element stays on its pages when something left on a
+    page is drawn before it and overlaps it, and shared layers are ordered so
+    overlapping hoisted elements keep their original stacking. The document is
+    modified in place.
+
+    Args:
+        document: Extracted document
+        min_page_ratio: Fraction of pages an element must appear on
+        min_pages: Minimum number of pages an element must appear on
+
+    Returns:
+        Statistics with the number of shared layers, hoisted elements and removed occurrences
+    """
+    stats = {"shared_layers": 0, "hoisted_elements": 0, "removed_occurrences": 0}
+    pages = [unit for unit in document.document_structure if isinstance(unit, PageUnit)]
+    threshold = max(min_pages, math.ceil(min_page_ratio * len(pages)))
+    if len(pages) < threshold:
+        return stats
+
+    # fingerprint (with per-page ordinal for repeated identical elements) -> {page index: (layer, element)}
+    occurrences: dict[tuple[str, int], dict[int, tuple[Layer, Element]]] = defaultdict(dict)
+    first_seen: dict[tuple[str, int], tuple[int, int, int]] = {}
+    # Per page, every drawn element in drawing order with its key (None for content that cannot be hoisted)
+    draw_order: list[list[tuple[tuple[str, int] | None, Element]]] = []
+    for page_idx, page in enumerate(pages):
+        seen_on_page: dict[str, int] = defaultdict(int)
+        drawn: list[tuple[tuple[str, int] | None, Element]] = []
+        for layer_idx, layer in enumerate(page.layers):
+            if not layer.visibility:
+                continue
+            if layer.opacity != 1.0:
+                drawn.extend((None, element) for element in layer.content)
+                continue
+            for element_idx, element in enumerate(layer.content):
+                fingerprint = _element_fingerprint(element, page.size)
+                key = (fingerprint, seen_on_page[fingerprint])
+                seen_on_page[fingerprint] += 1
+                occurrences[key][page_idx] = (layer, element)
+                first_seen.setdefault(key, (page_idx, layer_idx, element_idx))
+                drawn.append((key, element))
+        draw_order.append(drawn)
+
+    candidates = {key for key, on_pages in occurrences.items() if len(on_pages) >= threshold}
+    while True:
+        # An element drawn before an overlapping candidate must be drawn before it in the shared layers too
+        unsafe: set[tuple[str, int]] = set()
+        edges: set[tuple[tuple[str, int], tuple[str, int]]] = set()
+        for drawn in draw_order:
+            for position, (key, element) in enumerate(drawn):
+                if key not in candidates:
+                    continue
+                for below_key, below in drawn[:position]:
+                    if _overlaps(below, element):
+                        if below_key in candidates:
+                            edges.add((below_key, key))
+                        else:
+                            unsafe.add(key)
+                            break
+        if unsafe:
+            candidates -= unsafe
+            continue
+
+        groups: dict[frozenset[int], list[tuple[str, int]]] = defaultdict(list)
+        for key in candidates:
+            groups[frozenset(occurrences[key])].append(key)
+        group_of = {key: page_set for page_set, keys in groups.items() for key in keys}
+        group_rank = {page_set: min(first_seen[key] for key in keys) for page_set, keys in groups.items()}
+        ordered_page_sets, cyclic_groups = _stacking_order(
+            list(groups),
+            {(group_of[before], group_of[after]) for before, after in edges},
+            group_rank.__getitem__,
+        )
+        ordered_groups = []
+        cyclic_keys = [key for page_set in cyclic_groups for key in groups[page_set]]
+        for page_set in ordered_page_sets:
+            keys, cyclic = _stacking_order(groups[page_set], edges, first_seen.__getitem__)
+            ordered_groups.append((page_set, keys))
+            cyclic_keys.extend(cyclic)
+        if not cyclic_keys:
+            break
+        # Pages stack these elements in conflicting orders, so no shared-layer order fits them all
+        candidates -= set(cyclic_keys)
+    if not ordered_groups:
+        return stats
+
+    for group_idx, (page_set, keys) in enumerate(ordered_groups):
+        first_page = pages[min(page_set)]
+        layer_id = f"master_{len(document.shared_layers)}"
+
+        shared_content = []
+        for element_idx, key in enumerate(keys):
+            _, template = occurrences[key][min(page_set)]
+            shared_element = type(template).from_dict(template.to_dict())
+            shared_element.id = f"{layer_id}_{element_idx}"
+            if hasattr(shared_element, "element_id"):
+                shared_element.element_id = shared_element.id
+            shared_content.append(shared_element)
+
+        document.shared_layers.append(
+            Layer(
+                layer_id=layer_id,
+                layer_name=f"Master Content {group_idx + 1}",
+                layer_type=LayerType.MASTER,
+                bbox=BoundingBox(0, 0, first_page.size[0], first_page.size[1]),
+                blend_mode=BlendMode.NORMAL,
+                content=shared_content,
+            )
+        )
+
+        hoisted = {id(occurrences[key][page_idx][1]) for key in keys for page_idx in page_set}
+        for page_idx in sorted(page_set):
+            page = pages[page_idx]
+            for layer in page.layers:
+                before = len(layer.content)
+                layer.content = [element for element in layer.content if id(element) not in hoisted]
+                stats["removed_occurrences"] += before - len(layer.content)
+            page.shared_layer_refs.append(layer_id)
+
+        stats["shared_layers"] += 1
+        stats["hoisted_elements"] += len(keys)
+
+    logger.info(
+        f"Master-page detection: {stats['hoisted_elements']} elements hoisted into "
+        f"{stats['shared_layers']} shared layer(s), {stats['removed_occurrences']} page occurrences removed"
+    )
+    return stats
+
+
+class SharedLayerEditor:
+    """
+    Lets page-filtered edits reach the shared layers of the selected pages without leaking to other pages.
+
+    ``layers`` lists the shared layers the selected pages reference. Before
+    changing one of their elements, ask ``editable`` for the element to change:
+    when the layer is also referenced by pages outside the selection, the
+    selected pages first get their own copy of the layer, and the copy's element
+    is returned.
+
+    Args:
+        document: Document whose shared layers are edited
+        page_numbers: Page numbers to edit, or None for every page
+    """
+
+    def __init__(self, document: UniversalDocument, page_numbers: Collection[int] | None = None):
+        self._document = document
+        self._selected: dict[str, list[PageUnit]] = {}
+        self._split: set[str] = set()
+        self._copies: dict[str, Layer] = {}
+        pages = [unit for unit in document.document_structure if isinstance(unit, PageUnit)]
+        for layer in document.shared_layers:
+            referencing = [page for page in pages if layer.layer_id in page.shared_layer_refs]
+            selected = [page for page in referencing if page_numbers is None or page.page_number in page_numbers]
+            if selected:
+                self._selected[layer.layer_id] = selected
+                if len(selected) < len(referencing):
+                    self._split.add(layer.layer_id)
+
+    def layers(self) -> list[Layer]:
+        """Shared layers referenced by the selected pages"""
+        return [layer for layer in self._document.shared_layers if layer.layer_id in self._selected]
+
+    def editable(self, layer: Layer, element: Element) -> Element:
+        """The element to change for the selected pages, copying the layer for them first if needed"""
+        if layer.layer_id not in self._split:
+            return element
+        copy = self._copies.get(layer.layer_id)
+        if copy is None:
+            copy = Layer.from_dict(layer.to_dict())
+            taken = {shared.layer_id for shared in self._document.shared_layers}
+            index = len(self._document.shared_layers)
+            while f"master_{index}" in taken:
+                index += 1
+            copy.layer_id = f"master_{index}"
+            self._document.shared_layers.append(copy)
+            for page in self._selected[layer.layer_id]:
+                page.shared_layer_refs = [
+                    copy.layer_id if ref == layer.layer_id else ref for ref in page.shared_layer_refs
+                ]
+            self._copies[layer.layer_id] = copy
+        position = next(index for index, candidate in enumerate(layer.content) if candidate is element)
+        return copy.content[position]
+
+
+class SharedLayerPlacer:
+    """
+    Draws each shared layer once into a one-page PDF and places it on pages with ``show_pdf_page``.
+
+    PyMuPDF copies the source page into the output once and references it from
+    every page it is shown on.
+
+    Args:
+        shared_layers: Shared layer dictionaries from the layout config
+        draw_element: Callable drawing one element dictionary on a PyMuPDF page
+    """
+
+    def __init__(self, shared_layers: list[dict[str, Any]], draw_element: Callable[[fitz.Page, dict[str, Any]], Any]):
+        self._layers = {layer.get("layer_id"): layer for layer in shared_layers or []}
+        self._draw_element = draw_element
+        self._sources: dict[str, fitz.Document] = {}
+
+    def _source_for(self, layer_id: str, rect: fitz.Rect) -> fitz.Document | None:
+        source = self._sources.get(layer_id)
+        if source is not None:
+            return source
+        layer = self._layers.get(layer_id)
+        if layer is None:
+            logger.warning(f"Page references unknown shared layer '{layer_id}'")
+            return None
+
+        bbox = layer.get("bbox") or [0, 0, rect.width, rect.height]
+        width, height = (bbox[2] - bbox[0]) or rect.width, (bbox[3] - bbox[1]) or rect.height
+        source = fitz.open()
+        source_page = source.new_page(width=width, height=height)
+        if layer.get("visibility", True):
+            for element in layer.get("content", []):
+                self._draw_element(source_page, element)
+        self._sources[layer_id] = source
+        return source
+
+    def place(self, page: fitz.Page, layer_refs: list[str]) -> None:
+        """Show the referenced shared layers on a page, in reference order"""
+        for layer_id in layer_refs or []:
+            source = self._source_for(layer_id, page.rect)
+            if source is not None:
+                # The 'show_pdf_page' method is valid in PyMuPDF, but the library's type
+                # stubs are incomplete, causing mypy/pyright to raise a false positive.
+                page.show_pdf_page(page.rect, source, 0)  # type: ignore[attr-defined]
+
+    def close(self) -> None:
+        for source in self._sources.values():
+            source.close()
+        self._sources.clear()
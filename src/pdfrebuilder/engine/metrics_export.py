@@ -0,0 +1,486 @@
+"""
+Metrics registry and exporters for monitoring pdfrebuilder processes.
+
+Performance data is spread across in-process sources: the
+``PerformanceCollector`` rendering history, the font registration tracker
+and error reporter, the ReportLab font and image caches, the PyMuPDF font
+map and the subprocess ``SecurityMetrics``. ``MetricsRegistry`` folds them
+into counters, gauges and histograms when it is collected. Each collection
+only processes entries recorded since the previous one, and running totals
+kept by a source are folded in as increments, so counters keep increasing
+when a source is cleared.
+
+The registry can be exported in three ways:
+
+- OpenMetrics text, served at ``GET /metrics`` by ``pdfrebuilder serve``
+- Prometheus text files for the node exporter textfile collector, written
+  by ``--metrics-textfile`` after a CLI command
+- JSON lines, one sample per line, appended by ``--metrics-jsonl`` for
+  offline analysis
+
+No client library is required; the exposition formats are written here.
+"""
+
+import json
+import logging
+import math
+import os
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+PAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+LabelValues = tuple[str, ...]
+
+
+@dataclass
+class MetricFamily:
+    """A metric and its samples, as (sample name, labels, value) tuples"""
+
+    name: str
+    type: str
+    help: str
+    samples: list[tuple[str, dict[str, str], float]] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "help": self.help,
+            "samples": [[sample, labels, value] for sample, labels, value in self.samples],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "MetricFamily":
+        return cls(
+            data["name"],
+            data["type"],
+            data["help"],
+            [(sample, dict(labels), float(value)) for sample, labels, value in data["samples"]],
+        )
+
+    def with_labels(self, **labels: str) -> "MetricFamily":
+        """Copy with extra labels on every sample"""
+        return MetricFamily(self.name, self.type, self.help, [(s, {**labels, **sl}, v) for s, sl, v in self.samples])
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> dict[str, str]:
+        return dict(zip(self.labelnames, key, strict=True))
+
+
+class Counter(_Metric):
+    """Monotonically increasing total; samples are exposed with a ``_total`` suffix"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def family(self) -> MetricFamily:
+        samples = [(f"{self.name}_total", self._labels(key), value) for key, value in sorted(self._values.items())]
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def family(self) -> MetricFamily:
+        samples = [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = ()):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets or DURATION_BUCKETS))
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def family(self) -> MetricFamily:
+        samples = []
+        for key, counts in sorted(self._counts.items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, float(cumulative)))
+            samples.append((f"{self.name}_count", labels, float(cumulative)))
+            samples.append((f"{self.name}_sum", labels, self._sums[key]))
+        return MetricFamily(self.name, self.type, self.help, samples)
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms updated from registered collectors.
+
+    A collector is a callable taking the registry; it is run on every
+    ``collect`` and updates the registry's metrics from its source.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[MetricsRegistry], None]] = []
+        self._lock = threading.RLock()
+
+    def _get_or_create(self, metric_class: type, name: str, help: str, labelnames: Iterable[str], **kwargs: Any):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, help, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DURATION_BUCKETS
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None]) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> list[MetricFamily]:
+        """Run the collectors and return every metric with samples"""
+        with self._lock:
+            for collector in self._collectors:
+                try:
+                    collector(self)
+                except Exception as e:
+                    logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+            families = [metric.family() for metric in self._metrics.values()]
+        return [family for family in families if family.samples]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return f"{int(value)}.0"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def render_text(families: Iterable[MetricFamily], openmetrics: bool = True) -> str:
+    """
+    Text exposition of metric families.
+
+    Args:
+        families: Families from ``MetricsRegistry.collect``
+        openmetrics: OpenMetrics 1.0 (for scrapers) rather than the Prometheus 0.0.4 text format
+            the node exporter textfile collector reads
+    """
+    lines = []
+    for family in families:
+        # The Prometheus text format names counter families after their _total samples
+        name = family.name if openmetrics or family.type != "counter" else f"{family.name}_total"
+        lines.append(f"# HELP {name} {_escape(family.help)}")
+        lines.append(f"# TYPE {name} {family.type}")
+        for sample, labels, value in family.samples:
+            lines.append(f"{sample}{_format_labels(labels)} {_format_value(value)}")
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(families: Iterable[MetricFamily], path: str) -> None:
+    """Atomically write a node exporter textfile (``*.prom``)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_text(families, openmetrics=False))
+    os.replace(tmp_path, path)
+
+
+def json_lines(families: Iterable[MetricFamily], timestamp: float | None = None) -> str:
+    """One JSON object per sample, for offline analysis"""
+    timestamp = time.time() if timestamp is None else timestamp
+    lines = []
+    for family in families:
+        for sample, labels, value in family.samples:
+            record = {
+                "timestamp": timestamp,
+                "metric": sample,
+                "type": family.type,
+                "labels": labels,
+                "value": value if math.isfinite(value) else _format_value(value),
+            }
+            lines.append(json.dumps(record, sort_keys=True))
+    return "".join(f"{line}\n" for line in lines)
+
+
+def append_json_lines(families: Iterable[MetricFamily], path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json_lines(families))
+
+
+def snapshot(registry: MetricsRegistry | None = None) -> list[dict[str, Any]]:
+    """JSON-serialisable collection of a registry, the process-wide one by default"""
+    registry = registry or get_metrics_registry()
+    return [family.to_dict() for family in registry.collect()]
+
+
+def merge_families(families: Iterable[MetricFamily]) -> list[MetricFamily]:
+    """Combine families with the same name, e.g. from several worker processes, keeping first-seen order"""
+    merged: dict[str, MetricFamily] = {}
+    for family in families:
+        existing = merged.get(family.name)
+        if existing is None:
+            merged[family.name] = MetricFamily(family.name, family.type, family.help, list(family.samples))
+        else:
+            existing.samples.extend(family.samples)
+    return list(merged.values())
+
+
+class _PerformanceSource:
+    """Folds new PerformanceCollector measurements into rendering metrics"""
+
+    def __init__(self):
+        self._seen = 0
+
+    def __call__(self, registry: MetricsRegistry) -> None:
+        from pdfrebuilder.engine.performance_metrics import get_performance_collector
+
+        new, self._seen = get_performance_collector().get_metrics_since(self._seen)
+
+        renders = registry.counter("pdfrebuilder_renders", "Documents rendered", ("engine", "status"))
+        pages = registry.counter("pdfrebuilder_pages_rendered", "Pages rendered", ("engine",))
+        elements = registry.counter("pdfrebuilder_elements_rendered", "Elements rendered", ("engine",))
+        seconds = registry.counter("pdfrebuilder_render_seconds", "Time spent rendering", ("engine",))
+        duration = registry.histogram(
+            "pdfrebuilder_render_duration_seconds", "Rendering time per document", ("engine",)
+        )
+        page_duration = registry.histogram(
+            "pdfrebuilder_page_render_duration_seconds", "Rendering time per page", ("engine",), PAGE_BUCKETS
+        )
+        peak_memory = registry.gauge(
+            "pdfrebuilder_render_peak_memory_bytes", "Peak RSS during the latest rendering", ("engine",)
+        )
+        for metrics in new:
+            engine = metrics.engine_name
+            renders.inc(engine=engine, status="success" if metrics.success else "error")
+            duration.observe(metrics.duration, engine=engine)
+            peak_memory.set(metrics.memory_peak, engine=engine)
+            if not metrics.success:
+                continue
+            pages.inc(metrics.page_count, engine=engine)
+            elements.inc(metrics.element_count, engine=engine)
+            seconds.inc(metrics.duration, engine=engine)
+            for timing in metrics.page_timings():
+                page_duration.observe(timing["duration_ms"] / 1000, engine=engine)
+
+        pages_per_second = registry.gauge(
+            "pdfrebuilder_pages_per_second", "Pages rendered per second of rendering time", ("engine",)
+        )
+        elements_per_second = registry.gauge(
+            "pdfrebuilder_elements_per_second", "Elements rendered per second of rendering time", ("engine",)
+        )
+        for (engine,) in list(seconds._values):
+            total = seconds.get(engine=engine)
+            if total > 0:
+                pages_per_second.set(pages.get(engine=engine) / total, engine=engine)
+                elements_per_second.set(elements.get(engine=engine) / total, engine=engine)
+
+
+class _TotalsFolder:
+    """Turns running totals kept by a source into counter increments, folding only what is new"""
+
+    def __init__(self):
+        self._last: dict[tuple[str, tuple[tuple[str, str], ...]], float] = {}
+
+    def fold(self, counter: Counter, total: float, **labels: Any) -> None:
+        key = (counter.name, tuple(sorted((name, str(value)) for name, value in labels.items())))
+        last = self._last.get(key, 0.0)
+        self._last[key] = total
+        # A smaller total means the source was reset; everything it now reports is new
+        counter.inc(total - last if total >= last else total, **labels)
+
+
+class _FontSource:
+    """Folds font cache lookups, registration outcomes and errors into counters"""
+
+    def __init__(self):
+        self._totals = _TotalsFolder()
+
+    def __call__(self, registry: MetricsRegistry) -> None:
+        fold = self._totals.fold
+        cache_hits = registry.counter("pdfrebuilder_cache_hits", "Lookups answered from a cache", ("cache",))
+        cache_misses = registry.counter("pdfrebuilder_cache_misses", "Lookups that missed a cache", ("cache",))
+
+        # Only sources already loaded by the process; collecting must not import the engines
+        if "pdfrebuilder.engine.reportlab_fonts" in sys.modules:
+            from pdfrebuilder.engine.reportlab_fonts import get_reportlab_font_registry
+
+            stats = get_reportlab_font_registry().get_statistics()
+            fold(cache_hits, stats["hits"], cache="reportlab_fonts")
+            fold(cache_misses, stats["misses"], cache="reportlab_fonts")
+            fallbacks = registry.counter(
+                "pdfrebuilder_reportlab_font_fallbacks", "Fonts drawn with a standard font instead"
+            )
+            fold(fallbacks, stats["fallbacks"])
+        if "pdfrebuilder.engine.reportlab_images" in sys.modules:
+            from pdfrebuilder.engine.reportlab_images import get_image_reader_cache
+
+            stats = get_image_reader_cache().get_statistics()
+            fold(cache_hits, stats["hits"], cache="reportlab_images")
+            fold(cache_misses, stats["misses"], cache="reportlab_images")
+        if "pdfrebuilder.engine.pymupdf_engine" in sys.modules:
+            from pdfrebuilder.engine.pymupdf_engine import _fitz_font_resolution
+
+            info = _fitz_font_resolution.cache_info()
+            fold(cache_hits, info.hits, cache="pymupdf_fonts")
+            fold(cache_misses, info.misses, cache="pymupdf_fonts")
+
+        if "pdfrebuilder.font.utils" in sys.modules:
+            from pdfrebuilder.font.utils import get_font_error_reporter, get_font_registration_tracker
+
+            stats = get_font_registration_tracker().get_registration_statistics()
+            registrations = registry.counter(
+                "pdfrebuilder_font_registrations", "Font registration attempts by outcome", ("result",)
+            )
+            fold(registrations, stats["successful_registrations"], result="success")
+            fold(registrations, stats["failed_registrations"], result="failed")
+            fold(registrations, stats["fallback_registrations"], result="fallback")
+            registry.gauge("pdfrebuilder_font_fallback_ratio", "Share of font registrations that used a fallback").set(
+                stats["fallback_rate"]
+            )
+            font_errors = registry.counter("pdfrebuilder_font_errors", "Font errors reported, by kind", ("kind",))
+            for kind, count in get_font_error_reporter().generate_error_summary()["error_counts"].items():
+                fold(font_errors, count, kind=kind)
+
+
+class _SubprocessSource:
+    """Folds new subprocess executions recorded by the security monitor into metrics"""
+
+    def __init__(self):
+        self._seen = 0
+        self._totals = _TotalsFolder()
+        self._started = None
+
+    def __call__(self, registry: MetricsRegistry) -> None:
+        if "pdfrebuilder.security.subprocess_utils" not in sys.modules:
+            return
+        from pdfrebuilder.security import subprocess_utils
+
+        monitor = subprocess_utils._global_security_monitor
+        if monitor is None:
+            return
+        metrics = monitor.metrics.metrics
+        total = metrics["total_commands"]
+        if metrics["start_time"] != self._started or total < self._seen:
+            # Metrics were reset: everything they now hold is new
+            self._started, self._seen, self._totals = metrics["start_time"], 0, _TotalsFolder()
+        new_count, self._seen = total - self._seen, total
+        times = list(metrics["execution_times"])
+        durations = registry.histogram("pdfrebuilder_subprocess_duration_seconds", "Subprocess execution time")
+        for execution_time in times[len(times) - min(new_count, len(times)) :] if new_count else []:
+            durations.observe(execution_time)
+
+        commands = registry.counter(
+            "pdfrebuilder_subprocess_commands", "Subprocess commands by outcome (success, failed, blocked)", ("result",)
+        )
+        for outcome, count in list(metrics["command_outcomes"].items()):
+            self._totals.fold(commands, count, result=outcome)
+        violations = registry.counter(
+            "pdfrebuilder_security_violations", "Security violations recorded, by type", ("type",)
+        )
+        for violation_type, count in list(metrics["security_violations"].items()):
+            self._totals.fold(violations, count, type=violation_type)
+
+
+def create_default_registry() -> MetricsRegistry:
+    """Registry with collectors for rendering, font and subprocess metrics"""
+    registry = MetricsRegistry()
+    registry.add_collector(_PerformanceSource())
+    registry.add_collector(_FontSource())
+    registry.add_collector(_SubprocessSource())
+    return registry
+
+
+_metrics_registry: MetricsRegistry | None = None
+_metrics_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """The process-wide registry with the default collectors"""
+    global _metrics_registry
+    if _metrics_registry is None:
+        with _metrics_registry_lock:
+            if _metrics_registry is None:
+                _metrics_registry = create_default_registry()
+    return _metrics_registry
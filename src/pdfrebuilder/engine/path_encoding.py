@@ -0,0 +1,239 @@
+"""
+Compact path encoding for vector drawings.
+
+``encode_drawing_items`` turns the items of a ``page.get_drawings()`` path into
+a ``PathData`` (opcode string plus flat coordinate array) without creating a
+``DrawingCommand`` per segment; ``commands_to_path`` converts the older
+``drawing_commands`` lists (``M``/``L``/``C``/``H``/``rect``/``ellipse``) to the
+same form. Renderers consume ``PathData`` one opcode at a time:
+``pdf_path_operators`` writes PDF path operators for the PyMuPDF Shape API,
+``build_reportlab_path`` feeds a ReportLab path object.
+"""
+
+import logging
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from pdfrebuilder.models.universal_idm import DrawingCommand, PathData
+
+logger = logging.getLogger(__name__)
+
+# Decimal places kept for extracted coordinates
+COORD_PRECISION = 3
+
+# Control point distance for approximating a quarter ellipse with a cubic Bezier
+_KAPPA = 0.5522847498
+
+_PDF_OPERATORS = {
+    "M": "{:.9g} {:.9g} m\n",
+    "L": "{:.9g} {:.9g} l\n",
+    "C": "{:.9g} {:.9g} {:.9g} {:.9g} {:.9g} {:.9g} c\n",
+}
+
+
+def encode_drawing_items(items: Sequence[tuple], close_path: bool = False) -> PathData:
+    """
+    Encode the items of one ``page.get_drawings()`` path.
+
+    Lines and curves that do not start at the current point begin a new
+    subpath; rectangles and quads are closed subpaths of their own.
+
+    Args:
+        items: Drawing items (``("l", p1, p2)``, ``("c", p1, p2, p3, p4)``, ``("re", rect, ...)``, ``("qu", quad)``)
+        close_path: Whether the drawing closes its last subpath
+
+    Returns:
+        PathData for the drawing
+    """
+    ops: list[str] = []
+    coords: list[float] = []
+    current = None
+    for item in items:
+        kind = item[0]
+        if kind == "l" or kind == "c":
+            start = item[1]
+            if current is None or start.x != current.x or start.y != current.y:
+                ops.append("M")
+                coords += (start.x, start.y)
+            if kind == "l":
+                ops.append("L")
+                current = item[2]
+                coords += (current.x, current.y)
+            else:
+                ops.append("C")
+                current = item[4]
+                coords += (item[2].x, item[2].y, item[3].x, item[3].y, current.x, current.y)
+        elif kind == "re":
+            rect = item[1]
+            ops.append("R")
+            coords += (rect.x0, rect.y0, rect.x1, rect.y1)
+            current = None
+        elif kind == "qu":
+            quad = item[1]
+            ops += "MLLLZ"
+            coords += (quad.ul.x, quad.ul.y, quad.ur.x, quad.ur.y, quad.lr.x, quad.lr.y, quad.ll.x, quad.ll.y)
+            current = None
+    if close_path and ops and ops[-1] not in "RZ":
+        ops.append("Z")
+    return PathData(ops="".join(ops), coords=[round(value, COORD_PRECISION) for value in coords])
+
+
+def pdf_path_operators(path: PathData, matrix: Sequence[float]) -> str:
+    """
+    PDF path construction operators for a path, with coordinates mapped through ``matrix``.
+
+    Args:
+        path: Path to emit
+        matrix: Affine matrix (a, b, c, d, e, f), e.g. ``Shape.ipctm`` to map page to PDF space
+
+    Returns:
+        Content stream fragment (``m``, ``l``, ``c``, ``re`` and ``h`` operators)
+    """
+    a, b, c, d, e, f = matrix
+    xs, ys = path.coords[0::2], path.coords[1::2]
+    # Every coordinate pair is a point, including rectangle corners, so map them all at once
+    flat: list[float] = []
+    for x, y in zip(xs, ys, strict=True):
+        flat += (a * x + c * y + e, b * x + d * y + f)
+
+    parts = []
+    index = 0
+    for op in path.ops:
+        if op == "Z":
+            parts.append("h\n")
+            continue
+        arity = PathData.OP_ARITY[op]
+        values = flat[index : index + arity]
+        index += arity
+        if op == "R":
+            x0, y0, x1, y1 = values
+            parts.append(f"{x0:.9g} {y0:.9g} {x1 - x0:.9g} {y1 - y0:.9g} re\n")
+        else:
+            parts.append(_PDF_OPERATORS[op].format(*values))
+    return "".join(parts)
+
+
+def _flat_points(pts: Any) -> list[float]:
+    """Flatten command points given as numbers, [x, y] pairs or point objects"""
+    flat: list[float] = []
+    for value in pts or ():
+        if isinstance(value, int | float):
+            flat.append(float(value))
+        elif hasattr(value, "x") and hasattr(value, "y"):
+            flat += (float(value.x), float(value.y))
+        else:
+            flat += (float(value[0]), float(value[1]))
+    return flat
+
+
+def _bbox_values(command: DrawingCommand) -> list[float] | None:
+    bbox = command.bbox
+    if bbox is not None:
+        return [bbox.x1, bbox.y1, bbox.x2, bbox.y2]
+    flat = _flat_points(command.pts)
+    return flat if len(flat) == 4 else None
+
+
+def commands_to_path(commands: Iterable[DrawingCommand]) -> PathData:
+    """
+    Convert a ``drawing_commands`` list into one ``PathData``.
+
+    Understands ``M``/``L``/``C``/``H`` (with points given as flat numbers,
+    ``[x, y]`` pairs or point objects; ``L`` and ``C`` may include their start
+    point, as the original extractor wrote them), ``rect``, ``ellipse``,
+    ``line`` and ``curve``. Unknown or malformed commands are skipped.
+    """
+    ops: list[str] = []
+    coords: list[float] = []
+    current: tuple[float, float] | None = None
+    start: tuple[float, float] | None = None
+
+    def move_to(x: float, y: float) -> None:
+        nonlocal current, start
+        if current != (x, y):
+            ops.append("M")
+            coords.extend((x, y))
+        current = start = (x, y)
+
+    skipped: set[str] = set()
+    for command in commands:
+        cmd = command.cmd
+        pts = _flat_points(command.pts) if cmd not in ("rect", "ellipse", "H") else []
+
+        if cmd == "M" and len(pts) >= 2:
+            move_to(pts[0], pts[1])
+        elif cmd in ("L", "line") and len(pts) >= 2 and len(pts) % 2 == 0:
+            points = list(zip(pts[0::2], pts[1::2], strict=True))
+            if cmd == "line" or len(points) > 1 or current is None:
+                move_to(*points[0])
+                points = points[1:]
+            for point in points:
+                ops.append("L")
+                coords.extend(point)
+                current = point
+        elif cmd in ("C", "curve") and len(pts) in (6, 8):
+            if len(pts) == 8:
+                move_to(pts[0], pts[1])
+                pts = pts[2:]
+            elif current is None:
+                skipped.add(cmd)
+                continue
+            ops.append("C")
+            coords.extend(pts)
+            current = (pts[4], pts[5])
+        elif cmd == "H":
+            if current is not None:
+                ops.append("Z")
+                current = start
+        elif cmd == "rect" and (values := _bbox_values(command)):
+            ops.append("R")
+            coords.extend(values)
+            current = None
+        elif cmd == "ellipse" and (values := _bbox_values(command)):
+            x0, y0, x1, y1 = values
+            cx, cy, rx, ry = (x0 + x1) / 2, (y0 + y1) / 2, (x1 - x0) / 2, (y1 - y0) / 2
+            kx, ky = rx * _KAPPA, ry * _KAPPA
+            ops.append("MCCCCZ")
+            coords.extend(
+                (
+                    cx + rx, cy,
+                    cx + rx, cy + ky, cx + kx, cy + ry, cx, cy + ry,
+                    cx - kx, cy + ry, cx - rx, cy + ky, cx - rx, cy,
+                    cx - rx, cy - ky, cx - kx, cy - ry, cx, cy - ry,
+                    cx + kx, cy - ry, cx + rx, cy - ky, cx + rx, cy,
+                )
+            )  # fmt: skip
+            current = None
+        else:
+            skipped.add(cmd)
+
+    if skipped:
+        logger.debug(f"Skipped unsupported or malformed drawing commands: {sorted(skipped)}")
+    return PathData(ops="".join(ops), coords=coords)
+
+
+def build_reportlab_path(target: Any, path: PathData, page_height: float) -> Any:
+    """
+    Append a path to a ReportLab path object (``canvas.beginPath()``), flipping y to ReportLab space.
+
+    Returns:
+        The target path object
+    """
+    # Flip every y coordinate in one pass; rectangle corners are points too
+    coords = path.coords[:]
+    coords[1::2] = [page_height - y for y in coords[1::2]]
+    index = 0
+    for op in path.ops:
+        if op == "M":
+            target.moveTo(coords[index], coords[index + 1])
+        elif op == "L":
+            target.lineTo(coords[index], coords[index + 1])
+        elif op == "C":
+            target.curveTo(*coords[index : index + 6])
+        elif op == "R":
+            x0, y0, x1, y1 = coords[index : index + 4]
+            target.rect(x0, y1, x1 - x0, y0 - y1)
+        elif op == "Z":
+            target.close()
+        index += PathData.OP_ARITY[op]
+    return target
@@ -1,3 +1,7 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from pdfrebuilder.engine.engine_profiles import EngineChoice
 from pdfrebuilder.engine.engine_selector import get_pdf_engine_selector
 from pdfrebuilder.engine.pdf_rendering_engine import PDFRenderingEngine
 
@@ -12,3 +16,19 @@ def get_default_pdf_engine(config: dict | None = None) -> PDFRenderingEngine:
     """Get the default PDF engine."""
     selector = get_pdf_engine_selector()
     return selector.get_default_engine(config)
+
+
+def choose_pdf_engine(layout: dict, config: dict | None = None, template: str | None = None) -> EngineChoice:
+    """Pick the engine the ``auto`` output engine would render a layout with."""
+    selector = get_pdf_engine_selector()
+    return selector.choose_engine(layout, config, template)
+
+
+@contextmanager
+def lease_pdf_engine(
+    engine_name: str, config: dict | None = None, timeout: float | None = None
+) -> Iterator[PDFRenderingEngine]:
+    """Check a PDF engine out of the shared pool for the duration of a ``with`` block."""
+    selector = get_pdf_engine_selector()
+    with selector.get_engine_pool(engine_name, config).lease(timeout) as engine:
+        yield engine
@@ -3,12 +3,24 @@
 
 This module provides utilities for collecting and reporting performance metrics
 for different PDF rendering engines.
+
+While a rendering is measured, a ``ResourceSampler`` thread records the
+process RSS and CPU usage at a fixed interval, so the peak memory of a
+render is its real peak rather than the larger of the start and end values.
+Engines mark the stages of a render (font plan, each page, save) with
+``measure_stage``; stages nest and are reported with their durations and RSS
+change. Optionally, ``tracemalloc`` snapshots record the source lines that
+allocated the most memory.
 """
 
 import logging
+import threading
 import time
+import tracemalloc
+from collections import deque
+from collections.abc import Iterator
 from contextlib import contextmanager
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 from typing import Any
 
@@ -16,6 +28,147 @@
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SAMPLE_INTERVAL = 0.05
+DEFAULT_MAX_SAMPLES = 1000
+DEFAULT_MAX_HISTORY = 200
+DEFAULT_TOP_ALLOCATIONS = 10
+
+
+@dataclass
+class StageSpan:
+    """A timed stage of a rendering; times are seconds from the start of the measurement"""
+
+    name: str
+    start: float
+    duration: float = 0.0
+    memory_delta: float = 0.0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    children: list["StageSpan"] = field(default_factory=list)
+
+    def iter_spans(self) -> Iterator["StageSpan"]:
+        """This span and all nested spans, depth first"""
+        yield self
+        for child in self.children:
+            yield from child.iter_spans()
+
+
+class ResourceSampler:
+    """
+    Background thread sampling the RSS and CPU usage of a process.
+
+    Once ``max_samples`` samples are held, every other sample is dropped and
+    only every second sample is kept from then on, so long renders keep a
+    bounded timeline at a coarser resolution. The peak RSS always reflects
+    every sample taken.
+
+    Args:
+        process: Process to sample
+        interval: Seconds between samples
+        max_samples: Upper bound on the kept timeline
+    """
+
+    def __init__(self, process: psutil.Process, interval: float, max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.process = process
+        self.interval = interval
+        self.max_samples = max(2, max_samples)
+        self.samples: list[dict[str, float]] = []
+        self.peak_rss = 0.0
+        self.peak_cpu_percent = 0.0
+        self._stride = 1
+        self._taken = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started = 0.0
+        self._last_time = 0.0
+        self._last_cpu = 0.0
+
+    def start(self) -> None:
+        self._started = self._last_time = time.perf_counter()
+        self._last_cpu = self._cpu_seconds()
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="pdfrebuilder-resource-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread and take a final sample"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.sample()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def _cpu_seconds(self) -> float:
+        cpu_times = self.process.cpu_times()
+        return cpu_times.user + cpu_times.system
+
+    def sample(self) -> None:
+        try:
+            rss = float(self.process.memory_info().rss)
+            cpu_seconds = self._cpu_seconds()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return
+        now = time.perf_counter()
+        elapsed = now - self._last_time
+        cpu_percent = (cpu_seconds - self._last_cpu) / elapsed * 100 if elapsed > 0 else 0.0
+        self._last_time, self._last_cpu = now, cpu_seconds
+
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_cpu_percent = max(self.peak_cpu_percent, cpu_percent)
+        self._taken += 1
+        if self._taken % self._stride:
+            return
+        self.samples.append({"t": round(now - self._started, 6), "rss": rss, "cpu_percent": round(cpu_percent, 2)})
+        if len(self.samples) >= self.max_samples:
+            self.samples = self.samples[::2]
+            self._stride *= 2
+
+
+# tracemalloc is process-global; measurements that need it share one session
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _top_allocations(limit: int) -> tuple[list[dict[str, Any]], float]:
+    """Source lines holding the most traced memory, and the traced peak in bytes"""
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    )
+    top = [
+        {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "size": stat.size, "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+    return top, float(tracemalloc.get_traced_memory()[1])
+
+
+class _Measurement:
+    """State of one measure_rendering call, kept per thread for stage spans"""
+
+    def __init__(self, metrics: "RenderingMetrics", process: psutil.Process, started: float):
+        self.metrics = metrics
+        self.process = process
+        self.started = started
+        self.stack: list[StageSpan] = []
+
 
 @dataclass
 class RenderingMetrics:
@@ -38,11 +191,25 @@ class RenderingMetrics:
     success: bool
     error_message: str | None = None
     warnings: list[str] | None = None
+    cpu_percent_peak: float = 0.0
+    memory_samples: list[dict[str, float]] = field(default_factory=list)
+    stages: list[StageSpan] = field(default_factory=list)
+    top_allocations: list[dict[str, Any]] = field(default_factory=list)
+    traced_memory_peak: float = 0.0
 
     def __post_init__(self):
         if self.warnings is None:
             self.warnings = []
 
+    def page_timings(self) -> list[dict[str, Any]]:
+        """Duration of every ``page`` stage, in rendering order"""
+        return [
+            {**span.attributes, "duration_ms": round(span.duration * 1000, 3)}
+            for stage in self.stages
+            for span in stage.iter_spans()
+            if span.name == "page"
+        ]
+
     def to_dict(self) -> dict[str, Any]:
         """Convert metrics to dictionary."""
         return asdict(self)
@@ -53,6 +220,7 @@ def to_summary(self) -> dict[str, Any]:
             "engine": self.engine_name,
             "duration_ms": round(self.duration * 1000, 2),
             "memory_mb": round(self.memory_used / (1024 * 1024), 2),
+            "peak_memory_mb": round(self.memory_peak / (1024 * 1024), 2),
             "cpu_time_ms": round((self.cpu_time_user + self.cpu_time_system) * 1000, 2),
             "pages": self.page_count,
             "elements": self.element_count,
@@ -62,12 +230,36 @@ def to_summary(self) -> dict[str, Any]:
 
 
 class PerformanceCollector:
-    """Collector for performance metrics."""
+    """
+    Collector for performance metrics.
+
+    Args:
+        sample_interval: Seconds between RSS/CPU samples during a rendering; 0 disables the sampler
+        trace_allocations: Record the top allocating source lines with tracemalloc (slows rendering down)
+        top_allocations: Number of allocation sites to record
+        max_samples: Upper bound on the RSS/CPU timeline kept per rendering
+        max_history: Renderings kept in ``metrics_history``; older ones are dropped first
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+        trace_allocations: bool = False,
+        top_allocations: int = DEFAULT_TOP_ALLOCATIONS,
+        max_samples: int = DEFAULT_MAX_SAMPLES,
+        max_history: int = DEFAULT_MAX_HISTORY,
+    ):
         """Initialize the performance collector."""
-        self.metrics_history: list[RenderingMetrics] = []
+        self.sample_interval = sample_interval
+        self.trace_allocations = trace_allocations
+        self.top_allocations = top_allocations
+        self.max_samples = max_samples
+        self.metrics_history: deque[RenderingMetrics] = deque(maxlen=max_history)
+        # Renderings recorded since the collector was created; keeps counting when history is trimmed or cleared
+        self.recorded = 0
         self._current_metrics: RenderingMetrics | None = None
+        self._local = threading.local()
+        self._history_lock = threading.Lock()
 
     @contextmanager
     def measure_rendering(self, engine_name: str, engine_version: str = "unknown"):
@@ -83,9 +275,9 @@ def measure_rendering(self, engine_name: str, engine_version: str = "unknown"):
         """
         # Initialize metrics
         start_time = time.time()
+        started = time.perf_counter()
         process = psutil.Process()
-        memory_info = process.memory_info()
-        memory_start = memory_info.rss
+        memory_start = process.memory_info().rss
 
         # Create metrics object
         metrics = RenderingMetrics(
@@ -107,16 +299,20 @@ def measure_rendering(self, engine_name: str, engine_version: str = "unknown"):
         )
 
         self._current_metrics = metrics
+        previous = getattr(self._local, "measurement", None)
+        self._local.measurement = _Measurement(metrics, process, started)
 
         # Context for collecting additional metrics
         context: dict[str, Any] = {"page_count": 0, "element_count": 0, "warnings": []}
 
+        sampler = ResourceSampler(process, self.sample_interval, self.max_samples) if self.sample_interval > 0 else None
+        trace_allocations = self.trace_allocations
         try:
-            # Monitor memory usage during rendering
-            memory_peak = memory_start
-
-            # Basic CPU time monitoring
             cpu_start_time = process.cpu_times()
+            if sampler is not None:
+                sampler.start()
+            if trace_allocations:
+                _start_tracemalloc()
 
             yield context
 
@@ -131,38 +327,79 @@ def measure_rendering(self, engine_name: str, engine_version: str = "unknown"):
 
         finally:
             # Collect final metrics
-            end_time = time.time()
-            memory_info = process.memory_info()
-            memory_end = memory_info.rss
+            duration = time.perf_counter() - started
+            if sampler is not None:
+                sampler.stop()
+            if trace_allocations:
+                try:
+                    metrics.top_allocations, metrics.traced_memory_peak = _top_allocations(self.top_allocations)
+                finally:
+                    _stop_tracemalloc()
+            memory_end = process.memory_info().rss
 
             # Update metrics
-            metrics.end_time = end_time
-            metrics.duration = end_time - start_time
+            metrics.end_time = start_time + duration
+            metrics.duration = duration
             metrics.memory_end = memory_end
             metrics.memory_used = memory_end - memory_start
-            metrics.memory_peak = max(memory_peak, memory_end)
+            metrics.memory_peak = max(memory_start, memory_end, sampler.peak_rss if sampler else 0)
             metrics.page_count = int(context["page_count"])
             metrics.element_count = int(context["element_count"])
             metrics.warnings = list(context["warnings"])
+            if sampler is not None:
+                metrics.memory_samples = sampler.samples
+                metrics.cpu_percent_peak = sampler.peak_cpu_percent
 
-            # Get CPU usage (approximate)
+            # CPU usage is the CPU time used over the wall time of the rendering
             try:
-                metrics.cpu_percent = process.cpu_percent()
-                # Calculate CPU time used
                 cpu_end_time = process.cpu_times()
                 metrics.cpu_time_user = cpu_end_time.user - cpu_start_time.user
                 metrics.cpu_time_system = cpu_end_time.system - cpu_start_time.system
+                if duration > 0:
+                    metrics.cpu_percent = (metrics.cpu_time_user + metrics.cpu_time_system) / duration * 100
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 metrics.cpu_percent = 0
                 metrics.cpu_time_user = 0
                 metrics.cpu_time_system = 0
 
             # Store metrics
-            self.metrics_history.append(metrics)
+            with self._history_lock:
+                self.metrics_history.append(metrics)
+                self.recorded += 1
+            self._local.measurement = previous
             self._current_metrics = None
 
             logger.info(f"Rendering completed: {metrics.to_summary()}")
 
+    @contextmanager
+    def stage(self, name: str, **attributes: Any) -> Iterator[StageSpan | None]:
+        """
+        Time a stage of the rendering measured on the calling thread.
+
+        Stages opened inside another stage are recorded as its children.
+        Outside of ``measure_rendering`` this does nothing and yields None.
+
+        Args:
+            name: Stage name, e.g. ``font_plan``, ``page`` or ``save``
+            **attributes: Details stored with the span, e.g. ``page=3``
+        """
+        measurement: _Measurement | None = getattr(self._local, "measurement", None)
+        if measurement is None:
+            yield None
+            return
+
+        span = StageSpan(name, start=time.perf_counter() - measurement.started, attributes=attributes)
+        parent = measurement.stack[-1].children if measurement.stack else measurement.metrics.stages
+        parent.append(span)
+        measurement.stack.append(span)
+        rss_start = measurement.process.memory_info().rss
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - measurement.started - span.start
+            span.memory_delta = measurement.process.memory_info().rss - rss_start
+            measurement.stack.pop()
+
     def get_current_metrics(self) -> RenderingMetrics | None:
         """Get the currently active metrics object."""
         return self._current_metrics
@@ -172,8 +409,24 @@ def get_latest_metrics(self) -> RenderingMetrics | None:
         return self.metrics_history[-1] if self.metrics_history else None
 
     def get_metrics_history(self) -> list[RenderingMetrics]:
-        """Get all collected metrics."""
-        return self.metrics_history.copy()
+        """Get the collected metrics still in the history."""
+        with self._history_lock:
+            return list(self.metrics_history)
+
+    def get_metrics_since(self, position: int) -> tuple[list[RenderingMetrics], int]:
+        """
+        Get the metrics recorded after ``position``.
+
+        Args:
+            position: Value of ``recorded`` returned by a previous call, or 0
+
+        Returns:
+            The new metrics still in the history and the position to pass next time
+        """
+        with self._history_lock:
+            first_kept = self.recorded - len(self.metrics_history)
+            skip = max(position - first_kept, 0)
+            return list(self.metrics_history)[skip:], self.recorded
 
     def get_engine_stats(self, engine_name: str) -> dict[str, Any]:
         """
@@ -185,7 +438,7 @@ def get_engine_stats(self, engine_name: str) -> dict[str, Any]:
         Returns:
             Statistics dictionary
         """
-        engine_metrics = [m for m in self.metrics_history if m.engine_name == engine_name]
+        engine_metrics = [m for m in self.get_metrics_history() if m.engine_name == engine_name]
 
         if not engine_metrics:
             return {"engine": engine_name, "runs": 0}
@@ -204,6 +457,7 @@ def get_engine_stats(self, engine_name: str) -> dict[str, Any]:
         if successful_runs:
             durations = [m.duration for m in successful_runs]
             memory_usage = [m.memory_used for m in successful_runs]
+            memory_peaks = [m.memory_peak for m in successful_runs]
 
             stats.update(
                 {
@@ -213,6 +467,8 @@ def get_engine_stats(self, engine_name: str) -> dict[str, Any]:
                     "avg_memory_mb": round(sum(memory_usage) / len(memory_usage) / (1024 * 1024), 2),
                     "min_memory_mb": round(min(memory_usage) / (1024 * 1024), 2),
                     "max_memory_mb": round(max(memory_usage) / (1024 * 1024), 2),
+                    "avg_peak_memory_mb": round(sum(memory_peaks) / len(memory_peaks) / (1024 * 1024), 2),
+                    "max_peak_memory_mb": round(max(memory_peaks) / (1024 * 1024), 2),
                     "total_pages": sum(m.page_count for m in successful_runs),
                     "total_elements": sum(m.element_count for m in successful_runs),
                 }
@@ -256,31 +512,37 @@ def generate_report(self, output_path: str | None = None) -> dict[str, Any]:
         Returns:
             Report dictionary
         """
+        history = self.get_metrics_history()
         report = {
             "timestamp": datetime.now().isoformat(),
-            "total_runs": len(self.metrics_history),
+            "total_runs": len(history),
             "engines": {},
             "summary": {},
+            "runs": [],
         }
 
         # Get stats for each engine
-        engines = {m.engine_name for m in self.metrics_history}
+        engines = {m.engine_name for m in history}
         for engine in engines:
             engine_stats = self.get_engine_stats(engine)
             report["engines"][engine] = engine_stats
 
         # Overall summary
-        if self.metrics_history:
-            successful_runs = [m for m in self.metrics_history if m.success]
+        if history:
+            successful_runs = [m for m in history if m.success]
             report["summary"] = {
-                "total_runs": len(self.metrics_history),
+                "total_runs": len(history),
                 "successful_runs": len(successful_runs),
-                "overall_success_rate": len(successful_runs) / len(self.metrics_history),
+                "overall_success_rate": len(successful_runs) / len(history),
                 "total_pages_processed": sum(m.page_count for m in successful_runs),
                 "total_elements_processed": sum(m.element_count for m in successful_runs),
                 "total_processing_time_ms": round(sum(m.duration for m in successful_runs) * 1000, 2),
+                "peak_memory_mb": round(max(m.memory_peak for m in history) / (1024 * 1024), 2),
             }
 
+        # Per-run detail: memory/CPU timeline, stage spans, page timings and allocation sites
+        report["runs"] = [{**m.to_dict(), "page_timings": m.page_timings()} for m in history]
+
         # Save report if path provided
         if output_path:
             try:
@@ -296,7 +558,8 @@ def generate_report(self, output_path: str | None = None) -> dict[str, Any]:
 
     def clear_history(self) -> None:
         """Clear all collected metrics."""
-        self.metrics_history.clear()
+        with self._history_lock:
+            self.metrics_history.clear()
         logger.info("Performance metrics history cleared")
 
 
@@ -305,10 +568,24 @@ def clear_history(self) -> None:
 
 
 def get_performance_collector() -> PerformanceCollector:
-    """Get the global performance collector instance."""
+    """
+    Get the global performance collector instance.
+
+    Sampling is configured by ``settings.processing.metrics_sample_interval``,
+    ``metrics_trace_allocations`` and ``metrics_top_allocations``; ``metrics_history_size``
+    bounds the renderings kept.
+    """
     global _performance_collector
     if _performance_collector is None:
-        _performance_collector = PerformanceCollector()
+        from pdfrebuilder.settings import settings
+
+        processing = settings.processing
+        _performance_collector = PerformanceCollector(
+            sample_interval=processing.metrics_sample_interval,
+            trace_allocations=processing.metrics_trace_allocations,
+            top_allocations=processing.metrics_top_allocations,
+            max_history=processing.metrics_history_size,
+        )
     return _performance_collector
 
 
@@ -327,6 +604,17 @@ def measure_engine_performance(engine_name: str, engine_version: str = "unknown"
     return collector.measure_rendering(engine_name, engine_version)
 
 
+def measure_stage(name: str, **attributes: Any):
+    """
+    Context manager timing a stage of the rendering measured on the calling thread.
+
+    Args:
+        name: Stage name, e.g. ``font_plan``, ``page`` or ``save``
+        **attributes: Details stored with the span, e.g. ``page=3``
+    """
+    return get_performance_collector().stage(name, **attributes)
+
+
 def get_engine_performance_stats(engine_name: str) -> dict[str, Any]:
     """
     Get performance statistics for an engine.
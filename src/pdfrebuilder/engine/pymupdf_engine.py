@@ -8,13 +8,20 @@
 import logging
 import os
 import sys
-from typing import Any, ClassVar
+import time
+from functools import lru_cache
+from typing import Any, BinaryIO, ClassVar
 
 import pymupdf as fitz
 from pymupdf import Document
 
+from pdfrebuilder.engine.asset_store import read_memory_asset
+from pdfrebuilder.engine.master_pages import SharedLayerPlacer
+from pdfrebuilder.engine.path_encoding import pdf_path_operators
 from pdfrebuilder.engine.pdf_rendering_engine import PDFRenderingEngine, RenderingError
-from pdfrebuilder.models.universal_idm import Color, UniversalDocument
+from pdfrebuilder.engine.render_profiler import RenderProfiler
+from pdfrebuilder.engine.text_coalescing import glyph_runs, offsets_for_text
+from pdfrebuilder.models.universal_idm import Color, PathData, UniversalDocument
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +47,7 @@ def __init__(self):
         """Initialize the PyMuPDF engine."""
         super().__init__()
         self._current_doc: Document | None = None
-        self._font_cache = {}
+        self._profiler: RenderProfiler | None = None
 
     def initialize(self, config: dict[str, Any]) -> None:
         """Initialize the engine with configuration."""
@@ -150,7 +157,7 @@ def render_element(self, page: Any, element: dict[str, Any], resources: dict[str
                 "error": str(e),
             }
 
-    def finalize_document(self, document: Document, output_path: str) -> None:
+    def finalize_document(self, document: Document, output_path: str | BinaryIO) -> None:
         """Finalize and save the document."""
         try:
             # Apply optimization settings
@@ -190,16 +197,32 @@ def _render_text_element(
             color = self._convert_color(font_details.get("color", [0, 0, 0]))
 
             # Map font name to PyMuPDF font
-            fitz_font = self._get_fitz_font(font_name)
-
-            # Render text
-            page.insert_text(
-                rect.tl,  # Top-left point
-                text_content,
-                fontname=fitz_font,
-                fontsize=font_size,
-                color=color,
-            )
+            profiler = self._profiler
+            if profiler is None:
+                fitz_font = self._get_fitz_font(font_name)
+            else:
+                started = time.perf_counter()
+                fitz_font, fallback = _fitz_font_resolution(font_name)
+                profiler.record_font(font_name, fitz_font, time.perf_counter() - started, fallback)
+
+            # Render text, one call per correctly advancing run for coalesced spans
+            glyph_offsets = offsets_for_text(text_content, element.get("raw_text", ""), element.get("glyph_offsets"))
+            if glyph_offsets:
+                runs = glyph_runs(
+                    text_content,
+                    glyph_offsets,
+                    lambda run: fitz.get_text_length(run, fontname=fitz_font, fontsize=font_size),
+                )
+            else:
+                runs = [(0.0, text_content)]
+            for offset, run_text in runs:
+                page.insert_text(
+                    (rect.x0 + offset, rect.y0),  # Top-left point
+                    run_text,
+                    fontname=fitz_font,
+                    fontsize=font_size,
+                    color=color,
+                )
 
         except Exception as e:
             result["status"] = "error"
@@ -219,15 +242,19 @@ def _render_image_element(
             image_file = element.get("image_file", "")
             bbox = element.get("bbox", [0, 0, 100, 100])
 
-            if not image_file or not os.path.exists(image_file):
+            image_data = read_memory_asset(image_file) if image_file else None
+            if image_data is None and (not image_file or not os.path.exists(image_file)):
                 result["warnings"].append(f"Image file not found: {image_file}")
                 return
 
             # Convert bbox to fitz.Rect
             rect = fitz.Rect(bbox[0], bbox[1], bbox[2], bbox[3])
 
-            # Insert image
-            page.insert_image(rect, filename=image_file)
+            # Insert image, from an in-memory asset store when the extraction used one
+            if image_data is not None:
+                page.insert_image(rect, stream=image_data)
+            else:
+                page.insert_image(rect, filename=image_file)
 
         except Exception as e:
             result["status"] = "error"
@@ -250,6 +277,14 @@ def _render_drawing_element(
             fill_color = self._convert_color(element.get("fill"))
             width = element.get("width", 1.0)
 
+            if element.get("path"):
+                # Compact path: write the path operators once and paint them with one finish
+                shape = page.new_shape()
+                shape.draw_cont += pdf_path_operators(PathData.from_dict(element["path"]), shape.ipctm)
+                shape.updateRect(fitz.Rect(bbox))
+                shape.finish(color=stroke_color, fill=fill_color, width=width or 1.0, closePath=False)
+                shape.commit()
+
             # Process drawing commands
             path = []
             for cmd in drawing_commands:
@@ -322,70 +357,7 @@ def _convert_color(self, color: Color | dict | list | int | None) -> tuple[float
 
     def _get_fitz_font(self, font_name: str) -> str:
         """Map font name to PyMuPDF font identifier."""
-        # Cache font mappings
-        if font_name in self._font_cache:
-            return self._font_cache[font_name]
-
-        # Common font mappings
-        font_mappings = {
-            "Arial": "helv",
-            "Arial-Bold": "hebo",
-            "Arial-Italic": "heit",
-            "Arial-BoldItalic": "hebi",
-            "Helvetica": "helv",
-            "Helvetica-Bold": "hebo",
-            "Helvetica-Oblique": "heit",
-            "Helvetica-BoldOblique": "hebi",
-            "Times-Roman": "tiro",
-            "Times-Bold": "tibo",
-            "Times-Italic": "tiit",
-            "Times-BoldItalic": "tibi",
-            "Courier": "cour",
-            "Courier-Bold": "cobo",
-            "Courier-Oblique": "coit",
-            "Courier-BoldOblique": "cobi",
-        }
-
-        # Try exact match first
-        if font_name in font_mappings:
-            fitz_font = font_mappings[font_name]
-        else:
-            # Try to find a close match
-            font_lower = font_name.lower()
-            if "arial" in font_lower or "helvetica" in font_lower:
-                if "bold" in font_lower and "italic" in font_lower:
-                    fitz_font = "hebi"
-                elif "bold" in font_lower:
-                    fitz_font = "hebo"
-                elif "italic" in font_lower or "oblique" in font_lower:
-                    fitz_font = "heit"
-                else:
-                    fitz_font = "helv"
-            elif "times" in font_lower:
-                if "bold" in font_lower and "italic" in font_lower:
-                    fitz_font = "tibi"
-                elif "bold" in font_lower:
-                    fitz_font = "tibo"
-                elif "italic" in font_lower:
-                    fitz_font = "tiit"
-                else:
-                    fitz_font = "tiro"
-            elif "courier" in font_lower:
-                if "bold" in font_lower and ("italic" in font_lower or "oblique" in font_lower):
-                    fitz_font = "cobi"
-                elif "bold" in font_lower:
-                    fitz_font = "cobo"
-                elif "italic" in font_lower or "oblique" in font_lower:
-                    fitz_font = "coit"
-                else:
-                    fitz_font = "cour"
-            else:
-                # Default to Helvetica
-                fitz_font = "helv"
-
-        # Cache the result
-        self._font_cache[font_name] = fitz_font
-        return fitz_font
+        return _fitz_font_for(font_name)
 
     def get_version_info(self) -> dict[str, Any]:
         """Get comprehensive version information for PyMuPDF engine."""
@@ -428,15 +400,27 @@ def extract(self, input_pdf_path: str) -> UniversalDocument:
 
         return extract_pdf_content(input_pdf_path)
 
+    def render(
+        self,
+        document: UniversalDocument | dict[str, Any],
+        output_path: str | BinaryIO,
+        original_pdf_for_template: str | None = None,
+    ) -> None:
+        """Render a UniversalDocument or its layout dictionary to a PDF file or writable binary stream."""
+        config = document.to_dict() if isinstance(document, UniversalDocument) else document
+        self.generate(config, output_path, original_pdf_for_template)
+
     def generate(
         self,
         config: dict[str, Any],
-        output_pdf_path: str,
+        output_pdf_path: str | BinaryIO,
         original_pdf_for_template: str | None = None,
     ) -> None:
         """Generate PDF from universal JSON config using PyMuPDF."""
-        from pdfrebuilder.engine.performance_metrics import measure_engine_performance
+        from pdfrebuilder.engine.performance_metrics import measure_engine_performance, measure_stage
+        from pdfrebuilder.engine.render_profiler import get_active_profiler
 
+        self._profiler = profiler = get_active_profiler()
         with measure_engine_performance(self.engine_name, self.engine_version) as metrics:
             try:
                 # Import fitz here for conditional usage
@@ -451,6 +435,10 @@ def generate(
 
                 page_count = 0
                 element_count = 0
+                shared_layers = SharedLayerPlacer(
+                    config.get("shared_layers", []),
+                    lambda target, element: self.render_element(target, element, {}),
+                )
 
                 for doc_unit in document_structure:
                     if doc_unit.get("type") != "page":
@@ -458,49 +446,73 @@ def generate(
 
                     page_count += 1
 
-                    # Get page properties
-                    page_size = doc_unit.get("size", [612, 792])  # Default letter size
-                    background_color = doc_unit.get("page_background_color")
-
-                    # Add page
-                    page = self.add_page(document, tuple(page_size), background_color)
-
-                    # Handle template overlay
-                    if original_pdf_for_template and os.path.exists(original_pdf_for_template):
-                        try:
-                            template_doc = fitz.open(original_pdf_for_template)
-                            page_idx = doc_unit.get("page_number", 0)
-                            if page_idx < template_doc.page_count:
-                                page.show_pdf_page(page.rect, template_doc, page_idx)
-                            template_doc.close()
-                        except Exception as e:
-                            logger.warning(f"Could not apply template: {e}")
-                            metrics["warnings"].append(f"Template error: {e}")
-
-                    # Process layers
-                    layers = doc_unit.get("layers", [])
-                    for layer in layers:
-                        if not layer.get("visibility", True):
-                            continue
-
-                        # Process layer content
-                        content = layer.get("content", [])
-                        element_count += len(content)
-                        for element in content:
-                            result = self.render_element(page, element, {})
-                            if result.get("warnings"):
-                                metrics["warnings"].extend(result["warnings"])
+                    with measure_stage("page", page=doc_unit.get("page_number", page_count - 1)):
+                        if profiler is not None:
+                            profiler.start_page(doc_unit.get("page_number", page_count - 1))
+
+                        # Get page properties
+                        page_size = doc_unit.get("size", [612, 792])  # Default letter size
+                        background_color = doc_unit.get("page_background_color")
+
+                        # Add page
+                        page = self.add_page(document, tuple(page_size), background_color)
+
+                        # Handle template overlay
+                        if original_pdf_for_template and os.path.exists(original_pdf_for_template):
+                            try:
+                                template_doc = fitz.open(original_pdf_for_template)
+                                page_idx = doc_unit.get("page_number", 0)
+                                if page_idx < template_doc.page_count:
+                                    page.show_pdf_page(page.rect, template_doc, page_idx)
+                                template_doc.close()
+                            except Exception as e:
+                                logger.warning(f"Could not apply template: {e}")
+                                metrics["warnings"].append(f"Template error: {e}")
+
+                        # Shared (master-page) layers are drawn once and placed beneath the page content
+                        shared_layers.place(page, doc_unit.get("shared_layer_refs", []))
+
+                        # Process layers
+                        layers = doc_unit.get("layers", [])
+                        for layer in layers:
+                            if not layer.get("visibility", True):
+                                continue
+
+                            # Process layer content
+                            content = layer.get("content", [])
+                            element_count += len(content)
+                            for element in content:
+                                if profiler is None:
+                                    result = self.render_element(page, element, {})
+                                else:
+                                    started = time.perf_counter()
+                                    result = self.render_element(page, element, {})
+                                    profiler.record_element(
+                                        element.get("id", "unknown"),
+                                        element.get("type", "unknown"),
+                                        (element.get("font_details") or {}).get("name"),
+                                        time.perf_counter() - started,
+                                    )
+                                if result.get("warnings"):
+                                    metrics["warnings"].extend(result["warnings"])
+
+                        if profiler is not None:
+                            profiler.end_page()
 
                 # Update metrics
                 metrics["page_count"] = page_count
                 metrics["element_count"] = element_count
 
                 # Finalize document
-                self.finalize_document(document, output_pdf_path)
+                with measure_stage("save"):
+                    self.finalize_document(document, output_pdf_path)
+                shared_layers.close()
 
             except Exception as e:
                 logger.error(f"Error generating PDF with PyMuPDF: {e}")
                 raise RenderingError(f"PDF generation failed: {e!s}")
+            finally:
+                self._profiler = None
 
     def validate_config(self, config: dict[str, Any]) -> dict[str, Any]:
         """Validate PyMuPDF-specific configuration."""
@@ -520,3 +532,79 @@ def validate_config(self, config: dict[str, Any]) -> dict[str, Any]:
                 result["errors"].append("annotation_mode must be 'preserve', 'ignore', or 'remove'")
 
         return result
+
+
+def _fitz_font_for(font_name: str) -> str:
+    """Map a font name to a PyMuPDF base-14 font identifier."""
+    return _fitz_font_resolution(font_name)[0]
+
+
+@lru_cache(maxsize=1024)
+def _fitz_font_resolution(font_name: str) -> tuple[str, bool]:
+    """
+    Map a font name to a PyMuPDF base-14 font identifier, and report whether
+    the name matched no known family and fell back to Helvetica.
+
+    The mapping depends only on the name, so the cache is shared by every
+    engine instance and thread.
+    """
+    fallback = False
+    # Common font mappings
+    font_mappings = {
+        "Arial": "helv",
+        "Arial-Bold": "hebo",
+        "Arial-Italic": "heit",
+        "Arial-BoldItalic": "hebi",
+        "Helvetica": "helv",
+        "Helvetica-Bold": "hebo",
+        "Helvetica-Oblique": "heit",
+        "Helvetica-BoldOblique": "hebi",
+        "Times-Roman": "tiro",
+        "Times-Bold": "tibo",
+        "Times-Italic": "tiit",
+        "Times-BoldItalic": "tibi",
+        "Courier": "cour",
+        "Courier-Bold": "cobo",
+        "Courier-Oblique": "coit",
+        "Courier-BoldOblique": "cobi",
+    }
+
+    # Try exact match first
+    if font_name in font_mappings:
+        fitz_font = font_mappings[font_name]
+    else:
+        # Try to find a close match
+        font_lower = font_name.lower()
+        if "arial" in font_lower or "helvetica" in font_lower:
+            if "bold" in font_lower and "italic" in font_lower:
+                fitz_font = "hebi"
+            elif "bold" in font_lower:
+                fitz_font = "hebo"
+            elif "italic" in font_lower or "oblique" in font_lower:
+                fitz_font = "heit"
+            else:
+                fitz_font = "helv"
+        elif "times" in font_lower:
+            if "bold" in font_lower and "italic" in font_lower:
+                fitz_font = "tibi"
+            elif "bold" in font_lower:
+                fitz_font = "tibo"
+            elif "italic" in font_lower:
+                fitz_font = "tiit"
+            else:
+                fitz_font = "tiro"
+        elif "courier" in font_lower:
+            if "bold" in font_lower and ("italic" in font_lower or "oblique" in font_lower):
+                fitz_font = "cobi"
+            elif "bold" in font_lower:
+                fitz_font = "cobo"
+            elif "italic" in font_lower or "oblique" in font_lower:
+                fitz_font = "coit"
+            else:
+                fitz_font = "cour"
+        else:
+            # Default to Helvetica
+            fitz_font = "helv"
+            fallback = font_lower != "helv"
+
+    return fitz_font, fallback
@@ -0,0 +1,184 @@
+"""
+Per-element render profiling and hot-spot reports.
+
+Stage spans from ``PerformanceCollector`` show how long each page took;
+``RenderProfiler`` shows why. While a profiler is active (see
+``profile_rendering``), the output engines record the wall time of every
+element they draw, and font resolution records the time spent finding each
+font and whether it fell back to another one. ``RenderProfiler.report()``
+ranks the data into a hot-spot report:
+
+- the slowest elements
+- time per element type
+- time per font, and the fonts whose resolution needed a fallback scan
+- time per page, and the pages over the page budget
+
+Engines look the profiler up once per document and skip all profiling work
+when none is active. When one is active, each element costs two
+``perf_counter`` calls and one tuple append.
+"""
+
+import json
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+DEFAULT_TOP = 20
+
+_active_profiler: ContextVar["RenderProfiler | None"] = ContextVar("pdfrebuilder_render_profiler", default=None)
+
+
+def get_active_profiler() -> "RenderProfiler | None":
+    """The profiler engines should record into, or None when profiling is off"""
+    return _active_profiler.get()
+
+
+@contextmanager
+def profile_rendering(profiler: "RenderProfiler | None" = None) -> Iterator["RenderProfiler"]:
+    """
+    Profile the renders run in this block (on the calling thread).
+
+    Args:
+        profiler: Profiler to record into; a new one by default
+    """
+    profiler = profiler or RenderProfiler()
+    token = _active_profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active_profiler.reset(token)
+
+
+class RenderProfiler:
+    """
+    Collects element, font and page timings for one or more renders.
+
+    Args:
+        page_budget_ms: Pages taking longer than this are listed as over budget
+        top: Number of entries in the ranked lists of the report
+    """
+
+    def __init__(self, page_budget_ms: float | None = None, top: int = DEFAULT_TOP):
+        self.page_budget_ms = page_budget_ms
+        self.top = top
+        # (page, element id, element type, font, seconds)
+        self._elements: list[tuple[Any, str, str, str | None, float]] = []
+        # (font, resolved font, seconds, fell back)
+        self._fonts: list[tuple[str, str, float, bool]] = []
+        # (page, seconds)
+        self._pages: list[tuple[Any, float]] = []
+        self._page: Any = None
+        self._page_started = 0.0
+
+    def start_page(self, page: Any) -> None:
+        self._page = page
+        self._page_started = time.perf_counter()
+
+    def end_page(self) -> None:
+        self._pages.append((self._page, time.perf_counter() - self._page_started))
+        self._page = None
+
+    def record_element(self, element_id: Any, element_type: Any, font: str | None, seconds: float) -> None:
+        self._elements.append((self._page, str(element_id), str(element_type), font, seconds))
+
+    def record_font(self, font: str, resolved: str, seconds: float, fallback: bool) -> None:
+        """Record one font resolution and whether it fell back to a different font"""
+        self._fonts.append((font, resolved, seconds, fallback))
+
+    def report(self) -> dict[str, Any]:
+        """Ranked hot-spot report; all times in milliseconds"""
+        elements = self._elements
+        slowest = sorted(elements, key=lambda e: e[4], reverse=True)[: self.top]
+
+        types: dict[str, list[float]] = {}
+        page_elements: dict[Any, int] = {}
+        font_render: dict[str, list[float]] = {}
+        for page, _, element_type, font, seconds in elements:
+            types.setdefault(element_type, []).append(seconds)
+            page_elements[page] = page_elements.get(page, 0) + 1
+            if font is not None:
+                font_render.setdefault(font, []).append(seconds)
+
+        resolutions: dict[str, dict[str, Any]] = {}
+        for font, resolved, seconds, fallback in self._fonts:
+            entry = resolutions.setdefault(
+                font, {"resolved": resolved, "resolutions": 0, "seconds": 0.0, "fallback": False}
+            )
+            entry["resolutions"] += 1
+            entry["seconds"] += seconds
+            entry["fallback"] = entry["fallback"] or fallback
+
+        fonts = []
+        for font in set(font_render) | set(resolutions):
+            timings = font_render.get(font, [])
+            resolution = resolutions.get(font, {})
+            fonts.append(
+                {
+                    "font": font,
+                    "resolved": resolution.get("resolved", font),
+                    "elements": len(timings),
+                    "render_ms": _ms(sum(timings)),
+                    "resolution_ms": _ms(resolution.get("seconds", 0.0)),
+                    "fallback": resolution.get("fallback", False),
+                }
+            )
+        fonts.sort(key=lambda f: f["render_ms"] + f["resolution_ms"], reverse=True)
+
+        pages = [
+            {"page": page, "ms": _ms(seconds), "elements": page_elements.get(page, 0)} for page, seconds in self._pages
+        ]
+        over_budget = []
+        if self.page_budget_ms is not None:
+            over_budget = sorted(
+                (page for page in pages if page["ms"] > self.page_budget_ms), key=lambda p: p["ms"], reverse=True
+            )
+
+        return {
+            "summary": {
+                "elements": len(elements),
+                "pages": len(pages),
+                "element_ms": _ms(sum(e[4] for e in elements)),
+                "page_ms": _ms(sum(seconds for _, seconds in self._pages)),
+                "font_resolution_ms": _ms(sum(f[2] for f in self._fonts)),
+                "page_budget_ms": self.page_budget_ms,
+            },
+            "slowest_elements": [
+                {"page": page, "element_id": element_id, "type": element_type, "font": font, "ms": _ms(seconds)}
+                for page, element_id, element_type, font, seconds in slowest
+            ],
+            "element_types": sorted(
+                (
+                    {
+                        "type": element_type,
+                        "count": len(timings),
+                        "total_ms": _ms(sum(timings)),
+                        "mean_ms": _ms(sum(timings) / len(timings)),
+                        "max_ms": _ms(max(timings)),
+                    }
+                    for element_type, timings in types.items()
+                ),
+                key=lambda t: t["total_ms"],
+                reverse=True,
+            ),
+            "fonts": fonts[: self.top],
+            "fallback_fonts": [
+                font for font in sorted(fonts, key=lambda f: f["resolution_ms"], reverse=True) if font["fallback"]
+            ][: self.top],
+            "pages": pages,
+            "pages_over_budget": over_budget,
+        }
+
+    def write_report(self, path: str) -> dict[str, Any]:
+        """Write the hot-spot report as JSON and return it"""
+        report = self.report()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        return report
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
@@ -5,20 +5,32 @@
 proper font embedding, and licensing verification capabilities.
 """
 
+import io
 import logging
 import os
 import sys
-from typing import Any, ClassVar, cast
+import time
+from typing import Any, BinaryIO, ClassVar, cast
 
 from reportlab.lib.colors import Color as RLColor
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.utils import ImageReader
 from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
 
+from pdfrebuilder.engine.path_encoding import build_reportlab_path, commands_to_path
 from pdfrebuilder.engine.pdf_rendering_engine import PDFRenderingEngine, RenderingError
+from pdfrebuilder.engine.render_profiler import RenderProfiler, get_active_profiler
+from pdfrebuilder.engine.reportlab_fonts import get_reportlab_font_registry
+from pdfrebuilder.engine.reportlab_images import (
+    DocumentImages,
+    get_image_reader_cache,
+    image_elements,
+    read_image_bytes,
+)
+from pdfrebuilder.engine.text_coalescing import glyph_runs, offsets_for_text
 from pdfrebuilder.font.font_validator import FontValidator
 from pdfrebuilder.models.universal_idm import (
     Color,
@@ -26,6 +38,7 @@
     ImageElement,
     Layer,
     PageUnit,
+    PathData,
     TextElement,
     UniversalDocument,
 )
@@ -61,6 +74,10 @@ def __init__(self, font_validator: FontValidator | None = None):
         self.image_compression: str = "jpeg"
         self.color_space: str = "rgb"
         self.precision: float = 1.0
+        self.output_dpi: int = 300
+        self.downsample_images: bool = False
+        self._document_images: DocumentImages | None = None
+        self._profiler: RenderProfiler | None = None
 
     def initialize(self, config: dict[str, Any]) -> None:
         """Initialize the engine with configuration."""
@@ -75,6 +92,8 @@ def initialize(self, config: dict[str, Any]) -> None:
         self.image_compression = config.get("image_compression", "jpeg")
         self.color_space = config.get("color_space", "rgb")
         self.precision = config.get("precision", 1.0)
+        self.output_dpi = config.get("output_dpi", 300)
+        self.downsample_images = config.get("downsample_images", False)
 
         # Log initialization using the new logging system
         self.log_initialization()
@@ -197,15 +216,9 @@ def _render_text_element_new(
         try:
             # Extract text properties
             text_content = element.get("text", "")
-            font_details = element.get("font_details", {})
             bbox = element.get("bbox", [0, 0, 100, 20])
 
-            # Register font if needed
-            font_name = font_details.get("name", "Helvetica")
-            if font_name not in self._registered_fonts:
-                self._register_font(font_name)
-
-            # Create paragraph style
+            # Create paragraph style (registers the font if needed)
             style = self._create_text_style_new(element)
 
             # Create paragraph
@@ -285,7 +298,7 @@ def _create_text_style_new(self, element: dict[str, Any]) -> ParagraphStyle:
         # Create style
         style = ParagraphStyle(
             name=f"style_{element_id}",
-            fontName=font_details.get("name", "Helvetica"),
+            fontName=self._register_font(font_details.get("name", "Helvetica")),
             fontSize=font_details.get("size", 12),
             textColor=color,
             alignment=1,  # Center alignment
@@ -326,10 +339,20 @@ def extract(self, input_pdf_path: str) -> dict[str, Any]:
             "ReportLab engine does not support PDF extraction. Use PyMuPDF engine for extraction."
         )
 
-    def render(self, document: UniversalDocument, output_path: str) -> None:
-        """Render a UniversalDocument to a PDF file using ReportLab."""
-        from pdfrebuilder.engine.performance_metrics import measure_engine_performance
-
+    def render(
+        self,
+        document: UniversalDocument | dict[str, Any],
+        output_path: str | BinaryIO,
+        original_pdf_for_template: str | None = None,
+    ) -> None:
+        """Render a UniversalDocument or its layout dictionary to a PDF file or writable binary stream using ReportLab."""
+        if isinstance(document, dict):
+            document = UniversalDocument.from_dict(document)
+        if original_pdf_for_template:
+            self.warn_unsupported_feature("template_overlay", "the original PDF is not drawn beneath the output")
+        from pdfrebuilder.engine.performance_metrics import measure_engine_performance, measure_stage
+
+        self._profiler = profiler = get_active_profiler()
         with measure_engine_performance(self.engine_name, self.engine_version) as metrics:
             try:
                 # Get page size from the first page or use default
@@ -339,18 +362,33 @@ def render(self, document: UniversalDocument, output_path: str) -> None:
 
                 # Create canvas
                 c = canvas.Canvas(output_path, pagesize=page_size)
+                with measure_stage("image_plan"):
+                    self._document_images = DocumentImages(
+                        c, output_dpi=self.output_dpi if self.downsample_images else None
+                    )
+                    self._document_images.plan(document)
+                with measure_stage("font_plan"):
+                    self._plan_fonts(document)
 
                 # Count pages and elements for metrics
                 page_count = 0
                 element_count = 0
 
+                # Names of shared layers already defined as forms on this canvas
+                shared_forms: set[str] = set()
+
                 # Process each page
                 for i, page_unit in enumerate(document.document_structure):
                     if isinstance(page_unit, PageUnit):
                         page_count += 1
                         for layer in page_unit.layers:
                             element_count += len(layer.content)
-                        self._render_page_on_canvas(c, page_unit, document)
+                        with measure_stage("page", page=page_unit.page_number):
+                            if profiler is not None:
+                                profiler.start_page(page_unit.page_number)
+                            self._render_page_on_canvas(c, page_unit, document, shared_forms)
+                            if profiler is not None:
+                                profiler.end_page()
                         if i < len(document.document_structure) - 1:
                             c.showPage()
                     else:
@@ -358,7 +396,9 @@ def render(self, document: UniversalDocument, output_path: str) -> None:
                         metrics["warnings"].append(f"Skipped non-page unit: {type(page_unit)}")
 
                 # Save the canvas
-                c.save()
+                with measure_stage("save"):
+                    c.save()
+                logger.debug(f"ReportLab image cache: {get_image_reader_cache().get_statistics()}")
 
                 # Update metrics
                 metrics["page_count"] = page_count
@@ -369,6 +409,9 @@ def render(self, document: UniversalDocument, output_path: str) -> None:
             except Exception as e:
                 logger.error(f"Error generating PDF with ReportLab: {e}")
                 raise
+            finally:
+                self._document_images = None
+                self._profiler = None
 
     def _create_document(self, document: UniversalDocument, output_path: str) -> SimpleDocTemplate:
         """Create a ReportLab document with proper configuration."""
@@ -392,13 +435,46 @@ def _create_document(self, document: UniversalDocument, output_path: str) -> Sim
 
         return doc
 
-    def _render_page_on_canvas(self, c: canvas.Canvas, page_unit: PageUnit, document: UniversalDocument) -> None:
+    def _render_page_on_canvas(
+        self,
+        c: canvas.Canvas,
+        page_unit: PageUnit,
+        document: UniversalDocument,
+        shared_forms: set[str] | None = None,
+    ) -> None:
         """Render a single page on a ReportLab canvas."""
         # Get page size
         page_size: tuple[float, float] = (600.0, 400.0)  # Default
         if page_unit.size:
             page_size = page_unit.size
 
+        # Shared (master-page) layers become forms: defined once, drawn beneath the page content.
+        # Forms must be defined before anything is drawn on the current page.
+        if shared_forms is None:
+            shared_forms = set()
+        if self._document_images is not None:
+            page_layers = [*page_unit.layers]
+            page_layers.extend(
+                layer
+                for layer_id in page_unit.shared_layer_refs
+                if (layer := document.get_shared_layer(layer_id)) is not None
+                and f"shared_{layer_id}" not in shared_forms
+            )
+            self._document_images.define(image_elements(page_layers))
+        for layer_id in page_unit.shared_layer_refs:
+            shared_layer = document.get_shared_layer(layer_id)
+            if shared_layer is None:
+                logger.warning(f"Page {page_unit.page_number} references unknown shared layer '{layer_id}'")
+                continue
+            form_name = f"shared_{layer_id}"
+            if form_name not in shared_forms:
+                c.beginForm(form_name)
+                if shared_layer.visibility:
+                    self._render_layer_content(c, shared_layer, page_size)
+                c.endForm()
+                shared_forms.add(form_name)
+            c.doForm(form_name)
+
         # Process layers in z-order (bottom to top)
         layers = sorted(
             page_unit.layers,
@@ -409,42 +485,49 @@ def _render_page_on_canvas(self, c: canvas.Canvas, page_unit: PageUnit, document
             if not layer.visibility:
                 continue
 
-            # Process layer content
-            for element in layer.content:
-                if isinstance(element, TextElement):
-                    self._render_text_element_canvas(c, element, layer, page_size)
-                elif isinstance(element, DrawingElement):
-                    self._render_drawing_element_canvas(c, element, layer, page_size)
-                elif isinstance(element, ImageElement):
-                    self._render_image_element_canvas(c, element, layer, page_size)
-                else:
-                    logger.warning(f"Unsupported element type: {type(element)}")
+            self._render_layer_content(c, layer, page_size)
+
+    def _render_layer_content(self, c: canvas.Canvas, layer: Layer, page_size: tuple[float, float]) -> None:
+        """Render the elements of a layer on a ReportLab canvas."""
+        profiler = self._profiler
+        for element in layer.content:
+            if profiler is None:
+                self._render_canvas_element(c, element, layer, page_size)
+                continue
+            started = time.perf_counter()
+            self._render_canvas_element(c, element, layer, page_size)
+            font = element.font_details.name if isinstance(element, TextElement) and element.font_details else None
+            element_type = element.type.value if element.type else type(element).__name__
+            profiler.record_element(element.id, element_type, font, time.perf_counter() - started)
+
+    def _render_canvas_element(self, c: canvas.Canvas, element: Any, layer: Layer, page_size: tuple) -> None:
+        if isinstance(element, TextElement):
+            self._render_text_element_canvas(c, element, layer, page_size)
+        elif isinstance(element, DrawingElement):
+            self._render_drawing_element_canvas(c, element, layer, page_size)
+        elif isinstance(element, ImageElement):
+            self._render_image_element_canvas(c, element, layer, page_size)
+        else:
+            logger.warning(f"Unsupported element type: {type(element)}")
 
     def _render_image_element_canvas(
         self, c: canvas.Canvas, element: ImageElement, layer: Layer, page_size: tuple
     ) -> None:
-        """Render an image element placeholder using ReportLab canvas."""
+        """Render an image element using ReportLab canvas."""
         try:
-            # Get bounding box
-            bbox = element.bbox
-            x1, y1, x2, y2 = bbox.x1, bbox.y1, bbox.x2, bbox.y2
-
-            # Convert to ReportLab coordinates
-            y1_rl = page_size[1] - y2
-            y2_rl = page_size[1] - y1
-
-            # Draw a placeholder rectangle
-            c.setStrokeColorRGB(0.5, 0.5, 0.5)  # Gray color
-            c.rect(x1, y1_rl, x2 - x1, y2 - y1, fill=0)
-
-            # Draw a cross inside the rectangle
-            c.line(x1, y1_rl, x2, y2_rl)
-            c.line(x1, y2_rl, x2, y1_rl)
-
-            # Draw the image path
-            c.setFillColorRGB(0.5, 0.5, 0.5)
-            c.setFont("Helvetica", 8)
-            c.drawCentredString(x1 + (x2 - x1) / 2, y1_rl + (y2_rl - y1_rl) / 2, element.image_file)
+            images = self._document_images
+            if images is None:
+                # Drawn outside render(): a form cannot be defined mid-page, so embed the image directly
+                data = read_image_bytes(element.image_file)
+                if data is None:
+                    logger.warning(f"Image file not found: {element.image_file}")
+                    return
+                bbox = element.bbox
+                c.drawImage(
+                    ImageReader(io.BytesIO(data)), bbox.x1, page_size[1] - bbox.y2, bbox.x2 - bbox.x1, bbox.y2 - bbox.y1
+                )
+            elif not images.place(element, page_size[1]):
+                logger.warning(f"Skipping image element {element.id}: {element.image_file} could not be loaded")
 
         except Exception as e:
             logger.error(f"Error rendering image element {element.id}: {e}")
@@ -463,31 +546,17 @@ def _render_drawing_element_canvas(
                 c.setFillColor(fill_color)
             c.setLineWidth(element.width)
 
-            # Process drawing commands
-            for command in element.drawing_commands:
-                if command.cmd == "rect" and command.bbox:
-                    x, y, x1, y1 = command.bbox.to_list()
-                    # Convert to ReportLab coordinates
-                    y_rl = page_size[1] - y1
-                    y1_rl = page_size[1] - y
-                    c.rect(x, y1_rl, x1 - x, y_rl - y1_rl, fill=1 if element.fill else 0)
-                elif command.cmd == "line":
-                    x1, y1, x2, y2 = command.pts
-                    # Convert to ReportLab coordinates
-                    y1_rl = page_size[1] - y1
-                    y2_rl = page_size[1] - y2
-                    c.line(x1, y1_rl, x2, y2_rl)
-                elif command.cmd == "curve":
-                    x1, y1, x2, y2, x3, y3, x4, y4 = command.pts
-                    # Convert to ReportLab coordinates
-                    y1_rl = page_size[1] - y1
-                    y2_rl = page_size[1] - y2
-                    y3_rl = page_size[1] - y3
-                    y4_rl = page_size[1] - y4
-                    p = c.beginPath()
-                    p.moveTo(x1, y1_rl)
-                    p.curveTo(x2, y2_rl, x3, y3_rl, x4, y4_rl)
-                    c.drawPath(p)
+            # One ReportLab path for the whole drawing, painted with a single operation
+            path = element.path
+            if element.drawing_commands:
+                legacy = commands_to_path(element.drawing_commands)
+                path = PathData(path.ops + legacy.ops, path.coords + legacy.coords) if path else legacy
+            if path is not None and path.ops:
+                c.drawPath(
+                    build_reportlab_path(c.beginPath(), path, page_size[1]),
+                    stroke=1 if element.color else 0,
+                    fill=1 if element.fill else 0,
+                )
 
         except Exception as e:
             logger.error(f"Error rendering drawing element {element.id}: {e}")
@@ -507,8 +576,7 @@ def _render_text_element_canvas(
                     f"No valid font name found for element {getattr(element, 'id', 'unknown')}, using fallback font 'Arial'"
                 )
 
-            if font_name not in self._registered_fonts:
-                self._register_font(font_name)
+            font_name = self._register_font(font_name)
 
             # Get text content
             text_content = element.text
@@ -525,12 +593,21 @@ def _render_text_element_canvas(
             y = page_size[1] - bbox.y1  # Convert to ReportLab coordinates
 
             # Set font and color
-            c.setFont(font_name, element.font_details.size)
+            font_size = element.font_details.size
+            c.setFont(font_name, font_size)
             color = self._convert_color(element.font_details.color)
             c.setFillColor(color)
 
-            # Draw text
-            c.drawString(x, y, text_content)
+            # Draw text, one string per correctly advancing run for coalesced spans
+            glyph_offsets = offsets_for_text(text_content, element.raw_text, element.glyph_offsets)
+            if glyph_offsets:
+                runs = glyph_runs(
+                    text_content, glyph_offsets, lambda run: pdfmetrics.stringWidth(run, font_name, font_size)
+                )
+                for offset, run_text in runs:
+                    c.drawString(x + offset, y, run_text)
+            else:
+                c.drawString(x, y, text_content)
 
         except Exception as e:
             logger.error(f"Error rendering text element {element.id}: {e}")
@@ -573,8 +650,7 @@ def _render_text_element(self, story: list[Any], element: TextElement, layer: La
                     f"No valid font name found for element {getattr(element, 'id', 'unknown')}, using fallback font 'Arial'"
                 )
 
-            if font_name not in self._registered_fonts:
-                self._register_font(font_name)
+            font_name = self._register_font(font_name)
 
             # Create paragraph style
             style = self._create_text_style(element)
@@ -610,7 +686,7 @@ def _create_text_style(self, element: TextElement) -> ParagraphStyle:
         # Create style
         style = ParagraphStyle(
             name=f"style_{element.id}",
-            fontName=font_details.name,
+            fontName=self._register_font(font_details.name),
             fontSize=font_details.size,
             textColor=color,
             alignment=1,  # Center alignment
@@ -624,54 +700,41 @@ def _convert_color(self, color: Color) -> RLColor:
         """Convert our Color object to ReportLab Color."""
         return RLColor(color.r, color.g, color.b, alpha=color.a)
 
-    def _register_font(self, font_name: str) -> None:
-        """Register a font with ReportLab."""
-        if font_name in self._registered_fonts:
-            return
-
-        try:
-            # Check if font is available
-            if self.font_validator:
-                is_available = self.font_validator.is_font_available(font_name)
-                if not is_available:
-                    logger.warning(f"Font '{font_name}' not available, using fallback")
-                    font_name = "Helvetica"  # Fallback font
-
-            # Try to register the font
-            # For now, we'll use the font name as-is
-            # In a full implementation, you'd need to provide the actual font file path
-            self._registered_fonts[font_name] = font_name
-
-            # Register with ReportLab if we have the font file
-            font_path = self._get_font_path(font_name)
-            if font_path and os.path.exists(font_path):
-                try:
-                    pdfmetrics.registerFont(TTFont(font_name, font_path))
-                    logger.info(f"Registered font: {font_name}")
-                except Exception as e:
-                    logger.warning(f"Could not register font {font_name}: {e}")
-            else:
-                logger.info(f"Font file not found for: {font_name}")
-
-        except Exception as e:
-            logger.error(f"Error registering font {font_name}: {e}")
+    def _register_font(self, font_name: str) -> str:
+        """
+        Resolve a layout font name to the ReportLab font to draw it with.
+
+        Font files are parsed and registered once per process by the shared
+        registry; with ``embed_fonts`` off, the closest standard font is used.
+        """
+        profiler = self._profiler
+        started = time.perf_counter() if profiler is not None else 0.0
+        resolved = self._registered_fonts.get(font_name)
+        if resolved is None:
+            resolved = get_reportlab_font_registry().resolve(font_name, embed=self.embed_fonts)
+            self._registered_fonts[font_name] = resolved
+        if profiler is not None:
+            # Recorded on cache hits too, so every profiled render lists the fonts it used
+            fallback = get_reportlab_font_registry().is_fallback(font_name, self.embed_fonts)
+            profiler.record_font(font_name, resolved, time.perf_counter() - started, fallback)
+        return resolved
+
+    def _plan_fonts(self, document: UniversalDocument) -> None:
+        """Resolve every font of the document before the first page, so font loading is not timed as page work"""
+        layers: list[Layer] = list(document.shared_layers)
+        for unit in document.document_structure:
+            if isinstance(unit, PageUnit):
+                layers.extend(unit.layers)
+        while layers:
+            layer = layers.pop()
+            layers.extend(layer.children)
+            for element in layer.content:
+                if isinstance(element, TextElement) and element.font_details:
+                    self._register_font(element.font_details.name)
 
     def _get_font_path(self, font_name: str) -> str | None:
-        """Get the file path for a font."""
-        # This is a simplified implementation
-        # In practice, you'd need a proper font management system
-        font_dir = "downloaded_fonts"
-        possible_paths = [
-            os.path.join(font_dir, f"{font_name}.ttf"),
-            os.path.join(font_dir, f"{font_name}.otf"),
-            os.path.join(font_dir, f"{font_name}.woff"),
-        ]
-
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-
-        return None
+        """Get the file path for a font from the project font catalog."""
+        return get_reportlab_font_registry().find_font_file(font_name)
 
     def validate_font_licensing(self, font_name: str) -> dict[str, Any]:
         """Validate font licensing for embedding."""
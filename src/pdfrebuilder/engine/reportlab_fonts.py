@@ -0,0 +1,219 @@
+"""
+Process-wide TrueType font registry for the ReportLab engine.
+
+Parsing a TTF with ``reportlab.pdfbase.ttfonts.TTFont`` is the slow part of
+using a font, and ReportLab's own font registry is global anyway, so fonts
+are resolved and registered once per process and shared by every engine
+instance and document. Font files are looked up in the project font catalog
+(``settings.font_management``: manual, downloaded and font directories),
+first by file name and then by family name.
+
+ReportLab always embeds TrueType fonts as subsets containing only the glyphs
+used. With embedding disabled, fonts resolve to the closest of the standard
+14 PDF fonts, which are never embedded.
+"""
+
+import logging
+import os
+import threading
+from typing import Any
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+logger = logging.getLogger(__name__)
+
+FONT_EXTENSIONS = (".ttf", ".otf")
+
+# Standard fonts ReportLab knows without a font file
+STANDARD_FONTS = frozenset(pdfmetrics.standardFonts)
+
+# Short PyMuPDF base-14 names that appear in layouts extracted with PyMuPDF
+_FITZ_STANDARD_NAMES = {
+    "helv": "Helvetica",
+    "hebo": "Helvetica-Bold",
+    "heit": "Helvetica-Oblique",
+    "hebi": "Helvetica-BoldOblique",
+    "tiro": "Times-Roman",
+    "tibo": "Times-Bold",
+    "tiit": "Times-Italic",
+    "tibi": "Times-BoldItalic",
+    "cour": "Courier",
+    "cobo": "Courier-Bold",
+    "coit": "Courier-Oblique",
+    "cobi": "Courier-BoldOblique",
+    "symb": "Symbol",
+    "zadb": "ZapfDingbats",
+}
+
+
+def standard_font_for(font_name: str) -> str:
+    """Closest standard PDF font for a font name, by family and style keywords"""
+    if font_name in STANDARD_FONTS:
+        return font_name
+    if font_name in _FITZ_STANDARD_NAMES:
+        return _FITZ_STANDARD_NAMES[font_name]
+
+    name = font_name.lower()
+    bold = "bold" in name or "black" in name or "heavy" in name
+    italic = "italic" in name or "oblique" in name
+    if "times" in name or ("serif" in name and "sans" not in name):
+        return {(False, False): "Times-Roman", (True, False): "Times-Bold", (False, True): "Times-Italic"}.get(
+            (bold, italic), "Times-BoldItalic"
+        )
+    if "courier" in name or "mono" in name:
+        return {(False, False): "Courier", (True, False): "Courier-Bold", (False, True): "Courier-Oblique"}.get(
+            (bold, italic), "Courier-BoldOblique"
+        )
+    return {(False, False): "Helvetica", (True, False): "Helvetica-Bold", (False, True): "Helvetica-Oblique"}.get(
+        (bold, italic), "Helvetica-BoldOblique"
+    )
+
+
+def catalog_font_dirs() -> list[str]:
+    """Font directories of the project font catalog, in lookup order"""
+    from pdfrebuilder.settings import settings
+
+    font_management = settings.font_management
+    dirs = [font_management.manual_fonts_dir, font_management.downloaded_fonts_dir, font_management.font_directory]
+    return list(dict.fromkeys(d for d in dirs if d))
+
+
+class ReportLabFontRegistry:
+    """
+    Resolves font names to ReportLab font names, registering each TrueType file once.
+
+    Args:
+        font_dirs: Directories to look up font files in; the project font catalog when None
+    """
+
+    def __init__(self, font_dirs: list[str] | None = None):
+        self._font_dirs = font_dirs
+        self._lock = threading.Lock()
+        self._resolved: dict[tuple[str, bool], str] = {}
+        # Resolutions that fell back to a standard font because no usable file was found
+        self._fallback_keys: set[tuple[str, bool]] = set()
+        self._registered_paths: dict[str, str] = {}
+        self._family_catalog: dict[str, str] | None = None
+        self.hits = 0
+        self.misses = 0
+        self.registered = 0
+        self.fallbacks = 0
+        self.failures = 0
+
+    @property
+    def font_dirs(self) -> list[str]:
+        return self._font_dirs if self._font_dirs is not None else catalog_font_dirs()
+
+    def resolve(self, font_name: str, embed: bool = True) -> str:
+        """
+        ReportLab font name to draw ``font_name`` with.
+
+        Args:
+            font_name: Font name from the layout
+            embed: Whether a TrueType font file may be embedded (as a subset); otherwise a standard font is used
+
+        Returns:
+            A font name registered with ReportLab
+        """
+        key = (font_name, embed)
+        resolved = self._resolved.get(key)
+        if resolved is not None:
+            self.hits += 1
+            return resolved
+
+        with self._lock:
+            resolved = self._resolved.get(key)
+            if resolved is None:
+                self.misses += 1
+                fallbacks = self.fallbacks
+                resolved = self._resolve_locked(font_name, embed)
+                if self.fallbacks > fallbacks:
+                    self._fallback_keys.add(key)
+                self._resolved[key] = resolved
+            else:
+                self.hits += 1
+        return resolved
+
+    def is_fallback(self, font_name: str, embed: bool = True) -> bool:
+        """Whether ``resolve`` fell back to a standard font for ``font_name``"""
+        return (font_name, embed) in self._fallback_keys
+
+    def _resolve_locked(self, font_name: str, embed: bool) -> str:
+        if font_name in STANDARD_FONTS or font_name in _FITZ_STANDARD_NAMES or not embed:
+            return standard_font_for(font_name)
+
+        font_path = self.find_font_file(font_name)
+        if font_path is not None:
+            registered = self._register_file(font_name, font_path)
+            if registered is not None:
+                return registered
+
+        self.fallbacks += 1
+        fallback = standard_font_for(font_name)
+        logger.info(f"Font '{font_name}' not available to ReportLab, using '{fallback}'")
+        return fallback
+
+    def _register_file(self, font_name: str, font_path: str) -> str | None:
+        key = os.path.realpath(font_path)
+        if key in self._registered_paths:
+            return self._registered_paths[key]
+        try:
+            pdfmetrics.registerFont(TTFont(font_name, font_path))
+        except Exception as e:
+            # e.g. OpenType fonts with PostScript (CFF) outlines, which ReportLab cannot embed
+            self.failures += 1
+            logger.warning(f"Could not register font {font_name} from {font_path}: {e}")
+            return None
+        self.registered += 1
+        self._registered_paths[key] = font_name
+        logger.info(f"Registered font: {font_name} ({font_path})")
+        return font_name
+
+    def find_font_file(self, font_name: str) -> str | None:
+        """Font file for a name: ``<name>.ttf``/``.otf`` in a catalog directory, else a family-name match"""
+        font_dirs = self.font_dirs
+        for font_dir in font_dirs:
+            for ext in FONT_EXTENSIONS:
+                font_path = os.path.join(font_dir, f"{font_name}{ext}")
+                if os.path.exists(font_path):
+                    return font_path
+
+        if self._family_catalog is None:
+            from pdfrebuilder.font.utils import scan_available_fonts
+
+            # Scanned once per process; parses every font file in the catalog
+            self._family_catalog = scan_available_fonts([d for d in font_dirs if os.path.isdir(d)])
+        return self._family_catalog.get(font_name)
+
+    def clear(self) -> None:
+        """Forget resolutions and the scanned catalog, e.g. after fonts were downloaded"""
+        with self._lock:
+            self._resolved.clear()
+            self._fallback_keys.clear()
+            self._family_catalog = None
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "resolved": len(self._resolved),
+                "hits": self.hits,
+                "misses": self.misses,
+                "registered": self.registered,
+                "fallbacks": self.fallbacks,
+                "failures": self.failures,
+            }
+
+
+_font_registry: ReportLabFontRegistry | None = None
+_font_registry_lock = threading.Lock()
+
+
+def get_reportlab_font_registry() -> ReportLabFontRegistry:
+    """The process-wide font registry shared by all ReportLab engine instances"""
+    global _font_registry
+    if _font_registry is None:
+        with _font_registry_lock:
+            if _font_registry is None:
+                _font_registry = ReportLabFontRegistry()
+    return _font_registry
@@ -0,0 +1,232 @@
+"""
+Image handling for the ReportLab engine.
+
+Decoding an image and preparing its pixel data is the expensive part of
+drawing it with ReportLab, so decoded images are kept in a process-wide
+``ImageReaderCache`` keyed by content hash (and target size, when images are
+downsampled). Within one output document, ``DocumentImages`` wraps every
+distinct image in a form XObject the first time it is needed and places it
+by reference afterwards: the image XObject is written once however many
+pages use it, and ReportLab does not re-hash the pixel data per placement.
+"""
+
+import hashlib
+import io
+import logging
+import math
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from PIL import Image
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from pdfrebuilder.engine.asset_store import read_memory_asset
+from pdfrebuilder.models.universal_idm import ImageElement, Layer, UniversalDocument
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_ENTRIES = 64
+
+
+def read_image_bytes(image_file: str) -> bytes | None:
+    """Encoded image bytes from an in-memory asset store or the filesystem, or None when missing"""
+    data = read_memory_asset(image_file)
+    if data is not None:
+        return data
+    if not os.path.exists(image_file):
+        return None
+    with open(image_file, "rb") as f:
+        return f.read()
+
+
+@dataclass
+class CachedImage:
+    """A decoded image ready to be drawn by ReportLab"""
+
+    reader: ImageReader
+    content_hash: str
+    width: int
+    height: int
+    has_alpha: bool
+    # ImageReader decodes lazily and is not safe to draw from two threads at once
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class ImageReaderCache:
+    """
+    Process-wide LRU cache of decoded images keyed by content hash.
+
+    Args:
+        max_entries: Number of decoded images kept in memory
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, tuple[int, int] | None], CachedImage] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.downsampled = 0
+
+    def get(self, data: bytes, max_size: tuple[int, int] | None = None) -> CachedImage:
+        """
+        Decoded image for the given encoded bytes.
+
+        Args:
+            data: Encoded image bytes
+            max_size: Maximum (width, height) in pixels; larger images are downsampled to fit
+        """
+        content_hash = hashlib.sha256(data).hexdigest()
+        key = (content_hash, max_size)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        cached = self._decode(data, content_hash, max_size)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = cached
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cached
+
+    def _decode(self, data: bytes, content_hash: str, max_size: tuple[int, int] | None) -> CachedImage:
+        image = Image.open(io.BytesIO(data))
+        width, height = image.size
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+
+        if max_size and (width > max_size[0] or height > max_size[1]):
+            image = image.convert("RGBA" if has_alpha else "RGB")
+            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            logger.debug(f"Downsampled image {content_hash[:12]} from {width}x{height} to {image.width}x{image.height}")
+            reader = ImageReader(image)
+            with self._lock:
+                self.downsampled += 1
+        else:
+            # Keep the encoded bytes so ReportLab can embed JPEGs without re-encoding
+            reader = ImageReader(io.BytesIO(data))
+        image_width, image_height = reader.getSize()
+        return CachedImage(reader, content_hash, image_width, image_height, has_alpha)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "downsampled": self.downsampled,
+            }
+
+
+_image_reader_cache: ImageReaderCache | None = None
+_image_reader_cache_lock = threading.Lock()
+
+
+def get_image_reader_cache() -> ImageReaderCache:
+    """The process-wide image cache shared by all ReportLab engine instances"""
+    global _image_reader_cache
+    if _image_reader_cache is None:
+        with _image_reader_cache_lock:
+            if _image_reader_cache is None:
+                _image_reader_cache = ImageReaderCache()
+    return _image_reader_cache
+
+
+def image_elements(layers: Iterable[Layer]) -> Iterable[ImageElement]:
+    """Image elements of the given layers and their children"""
+    for layer in layers:
+        for element in layer.content:
+            if isinstance(element, ImageElement):
+                yield element
+        yield from image_elements(layer.children)
+
+
+class DocumentImages:
+    """
+    Image XObjects of one ReportLab document.
+
+    Args:
+        c: The canvas being drawn
+        output_dpi: Resolution to downsample images to for their largest placement; None keeps full resolution
+        cache: Decoded image cache, the process-wide one by default
+    """
+
+    def __init__(self, c: canvas.Canvas, output_dpi: float | None = None, cache: ImageReaderCache | None = None):
+        self.canvas = c
+        self.output_dpi = output_dpi
+        self.cache = cache or get_image_reader_cache()
+        self._forms: dict[str, str | None] = {}
+        self._max_sizes: dict[str, tuple[int, int]] = {}
+
+    def plan(self, document: UniversalDocument) -> None:
+        """Record the largest placement of every image, which bounds its downsampled size"""
+        if not self.output_dpi:
+            return
+        layers: list[Layer] = list(document.shared_layers)
+        for unit in document.document_structure:
+            layers.extend(unit.layers)
+        scale = self.output_dpi / 72.0
+        for element in image_elements(layers):
+            width = math.ceil(abs(element.bbox.x2 - element.bbox.x1) * scale)
+            height = math.ceil(abs(element.bbox.y2 - element.bbox.y1) * scale)
+            current = self._max_sizes.get(element.image_file, (0, 0))
+            self._max_sizes[element.image_file] = (max(current[0], width, 1), max(current[1], height, 1))
+
+    def define(self, elements: Iterable[ImageElement]) -> None:
+        """
+        Define forms for images not yet in the document.
+
+        ReportLab discards the current page's content when a form is begun, so
+        call this before anything is drawn on the page.
+        """
+        for element in elements:
+            image_file = element.image_file
+            if image_file in self._forms:
+                continue
+            self._forms[image_file] = self._define_form(image_file)
+
+    def _define_form(self, image_file: str) -> str | None:
+        data = read_image_bytes(image_file)
+        if data is None:
+            logger.warning(f"Image file not found: {image_file}")
+            return None
+        try:
+            cached = self.cache.get(data, self._max_sizes.get(image_file))
+        except Exception as e:
+            logger.error(f"Could not decode image {image_file}: {e}")
+            return None
+
+        form_name = f"image_{cached.content_hash[:16]}"
+        if form_name in self._forms.values():
+            return form_name  # Same content under another file name
+        c = self.canvas
+        c.beginForm(form_name, 0, 0, 1, 1)
+        with cached.lock:
+            c.drawImage(cached.reader, 0, 0, 1, 1, mask="auto" if cached.has_alpha else None)
+        c.endForm()
+        return form_name
+
+    def place(self, element: ImageElement, page_height: float) -> bool:
+        """Draw an image element at its bounding box; False when the image is unavailable"""
+        form_name = self._forms.get(element.image_file)
+        if form_name is None:
+            return False
+        bbox = element.bbox
+        c = self.canvas
+        c.saveState()
+        c.transform(bbox.x2 - bbox.x1, 0, 0, bbox.y2 - bbox.y1, bbox.x1, page_height - bbox.y2)
+        c.doForm(form_name)
+        c.restoreState()
+        return True
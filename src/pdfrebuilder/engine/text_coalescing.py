@@ -0,0 +1,135 @@
+"""
+Span coalescing for PDF text extraction.
+
+Kerning- and colour-split PDFs break one visual line into many PyMuPDF spans.
+``coalesce_line_spans`` groups adjacent spans on the same baseline that share
+font, size, colour and flags so the extractor can emit one TextElement per
+group. The position of every glyph is kept in ``TextElement.glyph_offsets``;
+``glyph_runs`` turns those offsets back into the few positioned runs a
+renderer needs to reproduce the original placement.
+"""
+
+import logging
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+# Maximum drift (in points) between a glyph's recorded and natural position before a new run starts
+GLYPH_POSITION_TOLERANCE = 0.5
+
+
+def span_text(span: dict) -> str:
+    """Text of a span from either the ``dict`` (``text``) or ``rawdict`` (``chars``) layout"""
+    if "text" in span:
+        return span["text"]
+    return "".join(char.get("c", "") for char in span.get("chars", []))
+
+
+def _style_key(span: dict) -> tuple:
+    return (span.get("font"), round(span.get("size", 0), 2), span.get("color"), span.get("flags", 0))
+
+
+def _same_baseline(a: dict, b: dict) -> bool:
+    a_origin, b_origin = a.get("origin"), b.get("origin")
+    if not a_origin or not b_origin:
+        return False
+    return abs(a_origin[1] - b_origin[1]) <= GLYPH_POSITION_TOLERANCE
+
+
+def coalesce_line_spans(spans: list[dict]) -> list[list[dict]]:
+    """
+    Group adjacent spans of one line that share a resolved style and baseline.
+
+    Whitespace-only spans join the group they follow, whatever their style, and
+    trailing whitespace is dropped from each group. Groups never start with a
+    whitespace-only span; such spans are returned as single-span groups. Spans
+    without per-character data (``dict`` layout) are never merged.
+    """
+    groups: list[list[dict]] = []
+    for span in spans:
+        if groups and "chars" in span and "chars" in groups[-1][0] and span_text(groups[-1][0]).strip():
+            leader = groups[-1][0]
+            if not span_text(span).strip() or (_style_key(span) == _style_key(leader) and _same_baseline(span, leader)):
+                groups[-1].append(span)
+                continue
+        groups.append([span])
+
+    for group in groups:
+        while len(group) > 1 and not span_text(group[-1]).strip():
+            group.pop()
+    return groups
+
+
+def group_glyph_offsets(group: list[dict], x0: float) -> list[float]:
+    """Baseline x offsets from ``x0`` of every character in a ``rawdict`` span group"""
+    return [round(char["origin"][0] - x0, 2) for span in group for char in span["chars"]]
+
+
+def offsets_for_text(text: str, raw_text: str, glyph_offsets: list[float] | None) -> list[float] | None:
+    """
+    Glyph offsets that apply to ``text``, the string a renderer is about to draw.
+
+    Offsets describe ``raw_text``; they still apply after the extractor's
+    space normalisation removed spaces, and are dropped for any other edit.
+    """
+    if not glyph_offsets or len(glyph_offsets) != len(raw_text):
+        return None
+    if text == raw_text:
+        return list(glyph_offsets)
+    if text == raw_text.replace(" ", ""):
+        return [offset for char, offset in zip(raw_text, glyph_offsets, strict=True) if char != " "]
+    return None
+
+
+def _word_runs(text: str, offsets: list[float]) -> list[tuple[float, str]]:
+    runs: list[tuple[float, str]] = []
+    start = None
+    for index, char in enumerate(text + " "):
+        if char == " ":
+            if start is not None:
+                runs.append((offsets[start], text[start:index]))
+                start = None
+        elif start is None:
+            start = index
+    return runs
+
+
+def glyph_runs(
+    text: str,
+    offsets: list[float],
+    measure: Callable[[str], float] | None = None,
+    tolerance: float = GLYPH_POSITION_TOLERANCE,
+) -> list[tuple[float, str]]:
+    """
+    Split text into runs that can each be drawn at a single start offset.
+
+    With a ``measure`` callable (width of a string in the rendering font), a
+    run continues while the natural advance keeps every glyph within
+    ``tolerance`` of its recorded offset. Without one, or if measuring fails
+    (e.g. a font PyMuPDF cannot measure by name), the text is split into words.
+
+    Returns:
+        List of (offset, run_text) pairs
+    """
+    if measure is None:
+        return _word_runs(text, offsets)
+
+    widths: dict[str, float] = {}
+    runs: list[tuple[float, str]] = []
+    start = 0
+    position = offsets[0] if offsets else 0.0
+    try:
+        for index, char in enumerate(text):
+            if index > start and abs(position - offsets[index]) > tolerance:
+                runs.append((offsets[start], text[start:index]))
+                start = index
+                position = offsets[index]
+            if char not in widths:
+                widths[char] = measure(char)
+            position += widths[char]
+    except Exception as e:
+        logger.debug(f"Glyph measurement failed ({e}); positioning text by word")
+        return _word_runs(text, offsets)
+    if start < len(text):
+        runs.append((offsets[start], text[start:]))
+    return runs
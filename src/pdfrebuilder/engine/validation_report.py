@@ -1442,11 +1442,14 @@ def generate_html_report(self, output_path: str) -> None:
         # Generate metadata HTML
         metadata_html = ""
         font_validation_html = ""
+        render_profile_html = ""
 
         for key, value in self.metadata.items():
             if key == "font_validation" and isinstance(value, dict):
                 # Generate special font validation section
                 font_validation_html = self._generate_font_validation_html(value)
+            elif key == "render_profile" and isinstance(value, dict):
+                render_profile_html = self._generate_render_profile_html(value)
             elif isinstance(value, dict):
                 metadata_html += (
                     f"<tr><td>{html_escape(key)}</td><td>{html_escape(json.dumps(value, indent=2))}</td></tr>"
@@ -1584,6 +1587,10 @@ def generate_html_report(self, output_path: str) -> None:
         if font_validation_html:
             html_content = html_content.replace("</body>", f"{font_validation_html}</body>")
 
+        # Add render profile hot spots if available
+        if render_profile_html:
+            html_content = html_content.replace("</body>", f"{render_profile_html}</body>")
+
         # Save HTML report
         os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
         with open(output_path, "w", encoding="utf-8") as f:
@@ -1707,6 +1714,84 @@ def _generate_font_validation_html(self, font_validation: dict) -> str:
 
         return html
 
+    def _generate_render_profile_html(self, profile: dict) -> str:
+        """Generate HTML section for the render profiler hot-spot report"""
+        summary = profile.get("summary", {})
+        over_budget = profile.get("pages_over_budget", [])
+        budget = summary.get("page_budget_ms")
+        budget_class = "failed" if over_budget else "passed"
+        budget_text = f" (budget {budget} ms)" if budget is not None else ""
+
+        html = f"""
+        <div>
+            <h2>Render Profile</h2>
+            <div class="summary">
+                <div class="metrics">
+                    <div class="metric-card">
+                        <h3>Pages</h3>
+                        <p>{summary.get("pages", 0)} in {summary.get("page_ms", 0.0):.1f} ms</p>
+                    </div>
+                    <div class="metric-card">
+                        <h3>Elements</h3>
+                        <p>{summary.get("elements", 0)} in {summary.get("element_ms", 0.0):.1f} ms</p>
+                    </div>
+                    <div class="metric-card">
+                        <h3>Font Resolution</h3>
+                        <p>{summary.get("font_resolution_ms", 0.0):.1f} ms</p>
+                    </div>
+                    <div class="metric-card">
+                        <h3>Pages Over Budget</h3>
+                        <p><span class="{budget_class}">{len(over_budget)}</span>{budget_text}</p>
+                    </div>
+                </div>
+        """
+
+        def table(title: str, headers: list[str], rows: list[list[Any]]) -> str:
+            if not rows:
+                return ""
+            header_html = "".join(f"<th>{html_escape(header)}</th>" for header in headers)
+            rows_html = "".join(
+                "<tr>" + "".join(f"<td>{html_escape(str(cell))}</td>" for cell in row) + "</tr>" for row in rows
+            )
+            return f"<h3>{html_escape(title)}</h3><table><tr>{header_html}</tr>{rows_html}</table>"
+
+        html += table(
+            "Slowest Elements",
+            ["Page", "Element ID", "Type", "Font", "Time (ms)"],
+            [
+                [e.get("page"), e.get("element_id"), e.get("type"), e.get("font") or "", e.get("ms")]
+                for e in profile.get("slowest_elements", [])
+            ],
+        )
+        html += table(
+            "Element Types",
+            ["Type", "Count", "Total (ms)", "Mean (ms)", "Max (ms)"],
+            [
+                [t.get("type"), t.get("count"), t.get("total_ms"), t.get("mean_ms"), t.get("max_ms")]
+                for t in profile.get("element_types", [])
+            ],
+        )
+        html += table(
+            "Fonts Causing Fallback Scans",
+            ["Font", "Resolved To", "Elements", "Resolution (ms)", "Render (ms)"],
+            [
+                [f.get("font"), f.get("resolved"), f.get("elements"), f.get("resolution_ms"), f.get("render_ms")]
+                for f in profile.get("fallback_fonts", [])
+            ],
+        )
+        html += table(
+            "Pages Over Budget",
+            ["Page", "Elements", "Time (ms)"],
+            [[p.get("page"), p.get("elements"), p.get("ms")] for p in over_budget],
+        )
+
+        html += """
+            </div>
+        </div>
+        """
+
+        return html
+
     def generate_junit_report(self, output_path: str) -> None:
         """
         Generate JUnit XML report for CI/CD integration with secure XML parsing
@@ -2126,6 +2211,7 @@ def generate_validation_report(
     output_dir: str,
     report_formats: list | None = None,
     font_validation_result: dict[str, Any] | None = None,
+    render_profile: dict[str, Any] | None = None,
 ) -> dict:
     """
     Generate comprehensive validation reports in multiple formats.
@@ -2137,6 +2223,7 @@ def generate_validation_report(
         output_dir: Directory to save reports
         report_formats: List of report formats to generate (json, html, ci)
         font_validation_result: Optional font validation result to include in reports
+        render_profile: Optional render profiler hot-spot report to include in reports
 
     Returns:
         Dictionary mapping report formats to their file paths
@@ -2165,6 +2252,10 @@ def generate_validation_report(
     if font_validation_result:
         metadata["font_validation"] = font_validation_result
 
+    # Add render profile hot spots if the render was profiled
+    if render_profile:
+        metadata["render_profile"] = render_profile
+
     report = ValidationReport(
         document_name=base_name,
         results=[validation_result],
@@ -0,0 +1,597 @@
+"""
+Long-running worker service for the Multi-Format Document Engine.
+
+``pdfrebuilder serve`` keeps a pool of worker processes that import the
+engines once, hold a warm font catalog, engine instances and the font
+fallback system, and then run extract, generate and compare jobs for as long
+as the service lives.
+
+Jobs are JSON objects sent either over a local Unix socket (one JSON object
+per line, one response line per request) or over HTTP (``POST /jobs``)::
+
+    {"id": "job-1", "type": "extract", "input": "in.pdf", "config": "layout.json"}
+    {"id": "job-2", "type": "generate", "config": "layout.json", "output": "out.pdf", "engine": "reportlab"}
+    {"id": "job-3", "type": "compare", "original": "in.pdf", "generated": "out.pdf", "diff": "diff.png"}
+
+Every response carries the job ``id`` and a ``status`` of ``ok``, ``error``,
+``timeout`` or ``busy``. The pool admits at most ``workers + queue_size`` jobs
+at once and answers ``busy`` beyond that, so clients can back off. A job that
+exceeds its timeout has its worker terminated and replaced with a fresh one.
+If the replacement fails to start, the pool runs one worker short and the
+next job to need that worker retries the start, answering ``error`` if it
+fails again.
+
+Each worker returns a snapshot of its metrics registry with every job. The
+pool combines the latest snapshots with its own job metrics and serves them
+in OpenMetrics format at ``GET /metrics`` (``{"type": "metrics"}`` over the
+Unix socket), with a ``worker`` label holding the worker's pid.
+"""
+
+import base64
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing.connection import Connection
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ("extract", "generate", "compare")
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 8
+DEFAULT_JOB_TIMEOUT = 300.0
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "pdfrebuilder.sock")
+# Worker start-up includes importing the engines and scanning fonts
+WORKER_START_TIMEOUT = 120.0
+
+HTTP_STATUS = {"ok": 200, "error": 500, "invalid": 400, "busy": 503, "timeout": 504}
+
+
+class ServiceError(Exception):
+    """Raised when the service cannot be reached or answers with a malformed response"""
+
+
+# Per-process state built once by _warm_up and reused by every job the worker runs
+_WARM_STATE: dict[str, Any] = {}
+
+
+def _warm_up(fonts_dir: str | None, available_fonts: dict[str, str] | None) -> dict[str, Any]:
+    """Import the engines, instantiate them and initialise fonts; returns warm-up statistics"""
+    started = time.perf_counter()
+
+    from pdfrebuilder.engine.config_loader import load_engine_config
+    from pdfrebuilder.engine.engine_selector import get_pdf_engine_selector
+    from pdfrebuilder.font.font_validator import FontValidator
+    from pdfrebuilder.font.utils import initialize_font_fallback_system
+
+    engine_config = load_engine_config()
+    selector = get_pdf_engine_selector()
+    engines = []
+    for name in sorted(selector.engines):
+        try:
+            # Instances are cached by the selector, so later jobs reuse them
+            selector.get_engine(name, engine_config)
+            engines.append(name)
+        except Exception as e:
+            logger.warning(f"Worker could not warm engine '{name}': {e}")
+
+    validator = FontValidator(fonts_dir, available_fonts=available_fonts)
+    fallback = initialize_font_fallback_system()
+
+    _WARM_STATE.update({"engine_config": engine_config})
+    return {
+        "pid": os.getpid(),
+        "engines": engines,
+        "fonts": len(validator.available_fonts),
+        "fallback_fonts": len(fallback.get("valid_fonts", [])),
+        "warm_up_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _run_extract(job: dict[str, Any]) -> dict[str, Any]:
+    from pdfrebuilder.engine.document_parser import parse_document
+    from pdfrebuilder.tools import serialize_pdf_content_to_config
+
+    document = parse_document(job["input"], job.get("flags"), engine=job.get("engine", "auto"))
+    if job.get("config"):
+        serialize_pdf_content_to_config(document, job["config"])
+        return {"config": job["config"], "units": len(document.document_structure)}
+    return {"layout": document.to_dict(), "units": len(document.document_structure)}
+
+
+def _run_generate(job: dict[str, Any]) -> dict[str, Any]:
+    from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+
+    if "layout" in job:
+        layout = job["layout"]
+    else:
+        with open(job["config"], encoding="utf-8") as f:
+            layout = json.load(f)
+
+    pdf = recreate_pdf_from_layout(
+        layout,
+        job.get("output"),
+        engine_name=job.get("engine"),
+        engine_config=_WARM_STATE.get("engine_config"),
+        original_pdf_for_template=job.get("template"),
+    )
+    if pdf is not None:
+        return {"pdf_base64": base64.b64encode(pdf).decode("ascii")}
+    return {"output": job["output"]}
+
+
+def _run_compare(job: dict[str, Any]) -> dict[str, Any]:
+    from pdfrebuilder.core.compare_pdfs_visual import compare_pdfs_visual
+
+    diff = job.get("diff") or os.path.splitext(job["generated"])[0] + "_diff.png"
+    code = compare_pdfs_visual(job["original"], job["generated"], diff, job.get("threshold"))
+    return {"code": code, "diff": diff}
+
+
+_JOB_RUNNERS = {"extract": _run_extract, "generate": _run_generate, "compare": _run_compare}
+
+
+def execute_job(job: dict[str, Any]) -> dict[str, Any]:
+    """Run one job in the current process and build its response, with the job's font diagnostics"""
+    from pdfrebuilder.font.utils import font_diagnostics_scope
+
+    started = time.perf_counter()
+    with font_diagnostics_scope() as diagnostics:
+        try:
+            result = _JOB_RUNNERS[job["type"]](job)
+            response = {"status": "ok", "result": result}
+        except Exception as e:
+            logger.error(f"Job {job.get('id')} ({job.get('type')}) failed: {e}")
+            response = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+    response["elapsed"] = round(time.perf_counter() - started, 3)
+    response["font_diagnostics"] = diagnostics.summary()
+    return response
+
+
+def _worker_main(conn: Connection, fonts_dir: str | None, available_fonts: dict[str, str] | None) -> None:
+    """Worker process loop: warm up once, then run jobs until the pipe closes"""
+    try:
+        conn.send({"ready": True, "warm": _warm_up(fonts_dir, available_fonts)})
+    except Exception as e:
+        conn.send({"ready": False, "error": str(e)})
+        return
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        response = execute_job(job)
+        try:
+            from pdfrebuilder.engine.metrics_export import snapshot
+
+            response["metrics"] = snapshot()
+        except Exception as e:
+            logger.warning(f"Worker could not collect metrics: {e}")
+        conn.send(response)
+
+
+@dataclass
+class _Worker:
+    process: Any
+    conn: Connection
+    warm: dict[str, Any]
+    jobs: int = 0
+
+
+class WorkerPool:
+    """
+    Pool of pre-warmed worker processes with admission control and per-job timeouts.
+
+    Args:
+        workers: Number of worker processes
+        queue_size: Jobs allowed to wait for a free worker; further jobs are answered ``busy``
+        job_timeout: Default seconds a job may run before its worker is replaced
+        fonts_dir: Font directory scanned once here and handed to every worker
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        job_timeout: float = DEFAULT_JOB_TIMEOUT,
+        fonts_dir: str | None = None,
+    ):
+        from pdfrebuilder.font.font_validator import FontValidator
+
+        self.size = workers
+        self.queue_size = queue_size
+        self.job_timeout = job_timeout
+        self.fonts_dir = fonts_dir
+        # Scan fonts once; workers receive the catalog instead of rescanning
+        self._available_fonts = dict(FontValidator(fonts_dir).available_fonts)
+        # Spawned workers do not inherit the service's threads or locks
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        # Idle workers; None stands for a worker that could not be restarted yet
+        self._idle: queue.Queue[_Worker | None] = queue.Queue()
+        self._missing = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {"completed": 0, "failed": 0, "timed_out": 0, "rejected": 0, "restarted": 0}
+        self._init_metrics()
+
+        for _ in range(workers):
+            self._idle.put(self._start_worker())
+
+    def _start_worker(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.fonts_dir, self._available_fonts),
+            name="pdfrebuilder-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        try:
+            if not parent_conn.poll(WORKER_START_TIMEOUT):
+                process.terminate()
+                process.join()
+                raise ServiceError("Worker did not finish warming up")
+            hello = parent_conn.recv()
+        except (EOFError, OSError) as e:
+            process.join()
+            parent_conn.close()
+            raise ServiceError(f"Worker exited while warming up: {e}") from e
+        except ServiceError:
+            parent_conn.close()
+            raise
+        if not hello.get("ready"):
+            process.join()
+            parent_conn.close()
+            raise ServiceError(f"Worker failed to start: {hello.get('error')}")
+        logger.info(
+            f"Worker {hello['warm']['pid']} ready in {hello['warm']['warm_up_seconds']}s "
+            f"(engines: {', '.join(hello['warm']['engines'])}; {hello['warm']['fonts']} fonts)"
+        )
+        return _Worker(process=process, conn=parent_conn, warm=hello["warm"])
+
+    def _init_metrics(self) -> None:
+        from pdfrebuilder.engine.metrics_export import MetricsRegistry
+
+        self.metrics = MetricsRegistry()
+        self._jobs_metric = self.metrics.counter("pdfrebuilder_service_jobs", "Jobs handled", ("type", "status"))
+        self._job_duration = self.metrics.histogram(
+            "pdfrebuilder_service_job_duration_seconds", "Time from admission to response", ("type",)
+        )
+        self._restarts_metric = self.metrics.counter("pdfrebuilder_service_worker_restarts", "Workers replaced")
+        # Latest metrics snapshot of each live worker, by pid
+        self._worker_metrics: dict[int, list[dict[str, Any]]] = {}
+
+    def _replace(self, worker: _Worker) -> _Worker | None:
+        """Stop a worker and start its replacement; None when the replacement failed to start"""
+        worker.process.terminate()
+        worker.process.join(5)
+        worker.conn.close()
+        with self._lock:
+            self.stats["restarted"] += 1
+            self._restarts_metric.inc()
+            self._worker_metrics.pop(worker.warm["pid"], None)
+        try:
+            return self._start_worker()
+        except ServiceError as e:
+            logger.error(f"Could not replace worker {worker.warm['pid']}: {e}; retrying with the next job")
+            return None
+
+    def _acquire_worker(self) -> _Worker:
+        """
+        Wait for an idle worker.
+
+        A slot whose worker could not be restarted is kept in the idle queue as
+        None, so the next job to take it retries the start instead of waiting
+        for a worker that does not exist.
+
+        Raises:
+            ServiceError: If a missing worker still fails to start
+        """
+        worker = self._idle.get()
+        if worker is not None:
+            return worker
+        with self._lock:
+            self._missing -= 1
+        try:
+            return self._start_worker()
+        except ServiceError:
+            self._release_worker(None)
+            raise
+
+    def _release_worker(self, worker: _Worker | None) -> None:
+        """Return a worker, or the slot of one that could not be started, to the idle queue"""
+        if worker is None:
+            with self._lock:
+                self._missing += 1
+        self._idle.put(worker)
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def _record_job(self, job: dict[str, Any], status: str, started: float) -> None:
+        with self._lock:
+            self._jobs_metric.inc(type=job.get("type"), status=status)
+            self._job_duration.observe(time.perf_counter() - started, type=job.get("type"))
+
+    def run(self, job: dict[str, Any]) -> dict[str, Any]:
+        """
+        Run a job on a warm worker.
+
+        Returns:
+            Response dictionary with the job id, a status and either a result or an error
+        """
+        job_id = job.get("id")
+        if job.get("type") not in JOB_TYPES:
+            return {"id": job_id, "status": "invalid", "error": f"Unknown job type {job.get('type')!r}"}
+        if self._closed:
+            return {"id": job_id, "status": "error", "error": "Service is shutting down"}
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            with self._lock:
+                self._jobs_metric.inc(type=job["type"], status="busy")
+            return {"id": job_id, "status": "busy", "error": "All workers busy and the job queue is full"}
+
+        started = time.perf_counter()
+        try:
+            try:
+                worker = self._acquire_worker()
+            except ServiceError as e:
+                self._count("failed")
+                self._record_job(job, "error", started)
+                return {"id": job_id, "status": "error", "error": str(e)}
+            timeout = float(job.get("timeout") or self.job_timeout)
+            # The worker to hand back: a replacement after a failure, or None when that failed to start
+            returned: _Worker | None = worker
+            try:
+                worker.conn.send(job)
+                if not worker.conn.poll(timeout):
+                    logger.warning(f"Job {job_id} exceeded {timeout}s; restarting worker {worker.warm['pid']}")
+                    self._count("timed_out")
+                    returned = self._replace(worker)
+                    self._record_job(job, "timeout", started)
+                    return {"id": job_id, "status": "timeout", "error": f"Job exceeded {timeout}s"}
+                response = worker.conn.recv()
+                worker.jobs += 1
+            except (EOFError, OSError) as e:
+                logger.error(f"Worker {worker.warm['pid']} died while running job {job_id}: {e}")
+                self._count("failed")
+                returned = self._replace(worker)
+                self._record_job(job, "error", started)
+                return {"id": job_id, "status": "error", "error": f"Worker died: {e}"}
+            finally:
+                self._release_worker(returned)
+
+            metrics = response.pop("metrics", None)
+            if metrics is not None:
+                with self._lock:
+                    self._worker_metrics[worker.warm["pid"]] = metrics
+            self._count("completed" if response["status"] == "ok" else "failed")
+            self._record_job(job, response["status"], started)
+            return {"id": job_id, **response, "worker": worker.warm["pid"]}
+        finally:
+            self._slots.release()
+
+    def get_statistics(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.size,
+                "queue_size": self.queue_size,
+                "idle_workers": max(self._idle.qsize() - self._missing, 0),
+                "missing_workers": self._missing,
+                "job_timeout": self.job_timeout,
+                **self.stats,
+            }
+
+    def collect_metrics(self) -> list[Any]:
+        """Pool job metrics and the latest metrics of every worker, labelled with its pid"""
+        from pdfrebuilder.engine.metrics_export import MetricFamily, merge_families
+
+        families = self.metrics.collect()
+        with self._lock:
+            worker_metrics = dict(self._worker_metrics)
+        for pid, snapshot in sorted(worker_metrics.items()):
+            families.extend(MetricFamily.from_dict(data).with_labels(worker=str(pid)) for data in snapshot)
+        return merge_families(families)
+
+    def close(self) -> None:
+        """Stop all workers"""
+        self._closed = True
+        for _ in range(self.size):
+            try:
+                worker = self._idle.get(timeout=self.job_timeout)
+            except queue.Empty:
+                break
+            if worker is None:
+                continue
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+
+
+def _handle_request(pool: WorkerPool, payload: bytes) -> dict[str, Any]:
+    try:
+        job = json.loads(payload)
+    except json.JSONDecodeError as e:
+        return {"status": "invalid", "error": f"Malformed JSON: {e}"}
+    if not isinstance(job, dict):
+        return {"status": "invalid", "error": "A job must be a JSON object"}
+    if job.get("type") == "stats":
+        return {"id": job.get("id"), "status": "ok", "result": pool.get_statistics()}
+    if job.get("type") == "metrics":
+        families = [family.to_dict() for family in pool.collect_metrics()]
+        return {"id": job.get("id"), "status": "ok", "result": families}
+    return pool.run(job)
+
+
+class _UnixJobHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = _handle_request(self.server.pool, line)  # type: ignore[attr-defined]
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _UnixJobServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, pool: WorkerPool):
+        self.pool = pool
+        super().__init__(path, _UnixJobHandler)
+
+
+class _HTTPJobHandler(BaseHTTPRequestHandler):
+    def _reply(self, response: dict[str, Any]) -> None:
+        body = json.dumps(response).encode("utf-8")
+        self.send_response(HTTP_STATUS.get(response.get("status", "error"), 500))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/metrics":
+            from pdfrebuilder.engine.metrics_export import OPENMETRICS_CONTENT_TYPE, render_text
+
+            body = render_text(self.server.pool.collect_metrics()).encode("utf-8")  # type: ignore[attr-defined]
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == "/stats":
+            self._reply({"status": "ok", "result": self.server.pool.get_statistics()})  # type: ignore[attr-defined]
+        else:
+            self._reply({"status": "invalid", "error": f"Unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        if self.path != "/jobs":
+            self._reply({"status": "invalid", "error": f"Unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        self._reply(_handle_request(self.server.pool, self.rfile.read(length)))  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"HTTP {self.address_string()}: {format % args}")
+
+
+class _HTTPJobServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], pool: WorkerPool):
+        self.pool = pool
+        super().__init__(address, _HTTPJobHandler)
+
+
+def create_server(pool: WorkerPool, socket_path: str | None = None, http_address: str | None = None):
+    """
+    Create the job server for a pool, listening on a Unix socket or an HTTP host:port.
+
+    Returns:
+        A socketserver instance; call ``serve_forever()`` to accept jobs
+    """
+    if bool(socket_path) == bool(http_address):
+        raise ValueError("Specify exactly one of a Unix socket path or an HTTP host:port")
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        return _UnixJobServer(socket_path, pool)
+    host, _, port = http_address.rpartition(":")  # type: ignore[union-attr]
+    return _HTTPJobServer((host or "127.0.0.1", int(port)), pool)
+
+
+def serve(
+    socket_path: str | None = None,
+    http_address: str | None = None,
+    workers: int = DEFAULT_WORKERS,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    job_timeout: float = DEFAULT_JOB_TIMEOUT,
+    fonts_dir: str | None = None,
+) -> None:
+    """Start a worker pool and serve jobs until interrupted"""
+    pool = WorkerPool(workers=workers, queue_size=queue_size, job_timeout=job_timeout, fonts_dir=fonts_dir)
+    server = create_server(pool, socket_path, http_address)
+    logger.info(f"Serving jobs on {socket_path or 'http://' + str(http_address)} with {workers} worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down worker service")
+    finally:
+        server.server_close()
+        pool.close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class ServiceClient:
+    """
+    Client for a running worker service.
+
+    Args:
+        address: ``unix:/path/to/socket``, a plain socket path, or ``http://host:port``
+        timeout: Seconds to wait for a response
+    """
+
+    def __init__(self, address: str, timeout: float | None = None):
+        self.address = address
+        self.timeout = timeout
+
+    def submit(self, job: dict[str, Any]) -> dict[str, Any]:
+        """Send a job and wait for its response"""
+        payload = json.dumps(job).encode("utf-8")
+        try:
+            if self.address.startswith(("http://", "https://")):
+                return self._submit_http(payload)
+            return self._submit_unix(payload)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ServiceError(f"Could not reach worker service at {self.address}: {e}") from e
+
+    def _submit_unix(self, payload: bytes) -> dict[str, Any]:
+        path = self.address.removeprefix("unix:")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(path)
+            with sock.makefile("rwb") as stream:
+                stream.write(payload + b"\n")
+                stream.flush()
+                line = stream.readline()
+        if not line:
+            raise ServiceError(f"Worker service at {self.address} closed the connection")
+        return json.loads(line)
+
+    def _submit_http(self, payload: bytes) -> dict[str, Any]:
+        import urllib.error
+        import urllib.request
+
+        request = urllib.request.Request(
+            self.address.rstrip("/") + "/jobs",
+            data=payload,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            # Non-2xx responses still carry the JSON job response
+            return json.loads(e.read())
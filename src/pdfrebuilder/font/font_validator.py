@@ -8,10 +8,12 @@
 # Add missing imports
 import logging
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import Any
 
-from pdfrebuilder.font.utils import font_covers_text, scan_available_fonts
+from pdfrebuilder.font.utils import font_codepoints, scan_available_fonts
 from pdfrebuilder.settings import STANDARD_PDF_FONTS
 
 logger = logging.getLogger(__name__)
@@ -72,24 +74,105 @@ def add_validation_message(self, message: str, level: str = "info") -> None:
         if level in ["error", "critical"]:
             self.validation_passed = False
 
+    def summarize_coverage_issues(self) -> dict[str, dict[str, Any]]:
+        """Aggregate coverage issues per font instead of per element"""
+        summary: dict[str, dict[str, Any]] = {}
+        for issue in self.font_coverage_issues:
+            entry = summary.setdefault(
+                issue["font_name"],
+                {"elements": 0, "missing_characters": set(), "element_ids": []},
+            )
+            entry["elements"] += 1
+            entry["missing_characters"].update(issue["missing_characters"])
+            if issue.get("element_id"):
+                entry["element_ids"].append(issue["element_id"])
+        for entry in summary.values():
+            entry["missing_characters"] = sorted(entry["missing_characters"])
+        return summary
+
+
+@dataclass(frozen=True)
+class FontCheckResult:
+    """Outcome of an availability and glyph coverage check for one font/character set"""
+
+    font_name: str
+    available: bool
+    font_path: str | None = None
+    covers_text: bool = True
+    missing_characters: tuple[str, ...] = ()
+
+
+def charset_signature(text: str) -> str:
+    """Normalise text to the sorted set of non-whitespace characters it uses"""
+    return "".join(sorted({char for char in text if char.strip()}))
+
+
+class FontValidationCache:
+    """Bounded LRU cache of font checks keyed by (font name, charset signature, catalog generation)"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str, int], FontCheckResult] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str, int]) -> FontCheckResult | None:
+        with self._lock:
+            check = self._entries.get(key)
+            if check is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return check
+
+    def put(self, key: tuple[str, str, int], check: FontCheckResult) -> None:
+        with self._lock:
+            self._entries[key] = check
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_statistics(self) -> dict[str, Any]:
+        """Get hit/miss counters for reporting"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
 
 class FontValidator:
     """Font validation system for document processing"""
 
     _instance = None
+    # Parsed cmaps kept per (font path, catalog generation)
+    max_cached_cmaps = 256
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, fonts_dir: str | None = None):
+    def __init__(self, fonts_dir: str | None = None, available_fonts: dict[str, str] | None = None):
         """Initialize the font validator
 
         Args:
             fonts_dir: Directory containing font files. If None, uses settings.
+            available_fonts: Pre-scanned font catalog ({name: path}) to use instead of
+                scanning fonts_dir, e.g. when handed over from a parent process.
         """
-        if hasattr(self, "_initialized") and self._initialized and not fonts_dir:
+        if hasattr(self, "_initialized") and self._initialized and not fonts_dir and available_fonts is None:
             return
 
         from pdfrebuilder.settings import settings
@@ -97,11 +180,22 @@ def __init__(self, fonts_dir: str | None = None):
         self.fonts_dir = fonts_dir or settings.font_management.downloaded_fonts_dir or "downloaded_fonts"
         self.available_fonts: dict[str, str] = {}
         self.substitution_tracker: list[FontSubstitution] = []
-        self._refresh_available_fonts()
+        if not hasattr(self, "validation_cache"):
+            self.validation_cache = FontValidationCache()
+            self.catalog_generation = 0
+            self._cmaps: OrderedDict[tuple[str, int], frozenset[int] | None] = OrderedDict()
+            self._cmaps_lock = threading.Lock()
+        if available_fonts is not None:
+            self.catalog_generation += 1
+            self.available_fonts = dict(available_fonts)
+        else:
+            self._refresh_available_fonts()
         self._initialized = True
 
     def _refresh_available_fonts(self) -> None:
         """Refresh the cache of available fonts"""
+        # Cached checks are keyed by generation, so bumping it invalidates them
+        self.catalog_generation += 1
         try:
             if os.path.exists(str(self.fonts_dir)):
                 self.available_fonts = scan_available_fonts(self.fonts_dir)
@@ -163,6 +257,10 @@ def _extract_fonts_from_config(self, layout_config: dict[str, Any]) -> set[str]:
                     for layer in layers:
                         self._extract_fonts_from_layer(layer, fonts_used)
 
+            # Master-page content hoisted out of the pages
+            for layer in layout_config.get("shared_layers", []):
+                self._extract_fonts_from_layer(layer, fonts_used)
+
         except Exception as e:
             logger.error(f"[FontValidator] Error extracting fonts from config: {e}")
 
@@ -217,6 +315,46 @@ def is_font_available(self, font_name: str) -> bool:
         """Public method to check if a font is available"""
         return self._is_font_available(font_name)
 
+    def check_text_coverage(self, font_name: str, text: str = "") -> FontCheckResult:
+        """Check availability and glyph coverage of a font for the given text, memoised
+
+        Args:
+            font_name: Name of the font to check
+            text: Text the font has to render; empty to check availability only
+
+        Returns:
+            FontCheckResult shared by every caller asking about the same font and character set
+        """
+        signature = charset_signature(text)
+        key = (font_name, signature, self.catalog_generation)
+        check = self.validation_cache.get(key)
+        if check is None:
+            check = self._compute_font_check(font_name, text)
+            self.validation_cache.put(key, check)
+        return check
+
+    def _compute_font_check(self, font_name: str, text: str) -> FontCheckResult:
+        """Run the uncached availability and coverage checks"""
+        if not self._is_font_available(font_name):
+            return FontCheckResult(font_name=font_name, available=False, covers_text=False)
+
+        font_path = self._get_font_path(font_name)
+        if not font_path or not text.strip():
+            return FontCheckResult(font_name=font_name, available=True, font_path=font_path)
+
+        missing = self._find_missing_characters(font_path, text)
+        if not missing and self._font_codepoints(font_path) is not None:
+            return FontCheckResult(font_name=font_name, available=True, font_path=font_path)
+
+        # An unreadable font covers nothing, even though no character can be named
+        return FontCheckResult(
+            font_name=font_name,
+            available=True,
+            font_path=font_path,
+            covers_text=False,
+            missing_characters=tuple(dict.fromkeys(missing)),
+        )
+
     def _check_font_coverage(self, layout_config: dict[str, Any], result: FontValidationResult) -> None:
         """Check font glyph coverage for text elements"""
         try:
@@ -229,10 +367,23 @@ def _check_font_coverage(self, layout_config: dict[str, Any], result: FontValida
                     for layer in layers:
                         self._check_layer_font_coverage(layer, result, page_number)
 
+            # Master-page content hoisted out of the pages
+            for layer in layout_config.get("shared_layers", []):
+                self._check_layer_font_coverage(layer, result, None)
+
+            for font_name, summary in result.summarize_coverage_issues().items():
+                result.add_validation_message(
+                    f"Font '{font_name}' missing glyphs {''.join(summary['missing_characters'])!r} "
+                    f"for text in {summary['elements']} element(s)",
+                    "warning",
+                )
+
         except Exception as e:
             logger.error(f"[FontValidator] Error checking font coverage: {e}")
 
-    def _check_layer_font_coverage(self, layer: dict[str, Any], result: FontValidationResult, page_number: int) -> None:
+    def _check_layer_font_coverage(
+        self, layer: dict[str, Any], result: FontValidationResult, page_number: int | None
+    ) -> None:
         """Check font coverage for elements in a layer"""
         try:
             content = layer.get("content", [])
@@ -249,7 +400,7 @@ def _check_layer_font_coverage(self, layer: dict[str, Any], result: FontValidati
             logger.error(f"[FontValidator] Error checking layer font coverage: {e}")
 
     def _check_element_font_coverage(
-        self, element: dict[str, Any], result: FontValidationResult, page_number: int
+        self, element: dict[str, Any], result: FontValidationResult, page_number: int | None
     ) -> None:
         """Check font coverage for a specific text element"""
         try:
@@ -261,20 +412,10 @@ def _check_element_font_coverage(
             if not font_name or not text_content or font_name == "Unnamed-T3":
                 return
 
-            # Get font path
-            font_path = self._get_font_path(font_name)
-            if not font_path:
-                return
-
-            # Check coverage
-            if not font_covers_text(font_path, text_content):
-                # Find missing characters
-                missing_chars = self._find_missing_characters(font_path, text_content)
-                result.add_coverage_issue(font_name, text_content, missing_chars, element_id)
-                result.add_validation_message(
-                    f"Font '{font_name}' missing glyphs for text in element '{element_id}' on page {page_number + 1}",
-                    "warning",
-                )
+            # Messages are emitted per font by _check_font_coverage once all elements are checked
+            check = self.check_text_coverage(font_name, text_content)
+            if check.font_path and not check.covers_text:
+                result.add_coverage_issue(font_name, text_content, list(check.missing_characters), element_id)
 
         except Exception as e:
             logger.error(f"[FontValidator] Error checking element font coverage: {e}")
@@ -295,29 +436,33 @@ def _get_font_path(self, font_name: str) -> str | None:
 
         return None
 
-    def _find_missing_characters(self, font_path: str, text: str) -> list[str]:
-        """Find characters that are not covered by the font"""
-        try:
-            # fontTools is not fully typed, so we have to ignore this import.
-            # fontTools is not fully typed, so we have to ignore this import.
-            from fontTools.ttLib import TTFont  # type: ignore[import-untyped]
-
-            font = TTFont(font_path)
-            cmap = set()
-            # The `tables` attribute of `font["cmap"]` is not recognized by mypy due to incomplete stubs.
-            for table in font["cmap"].tables:  # type: ignore[attr-defined]
-                cmap.update(table.cmap.keys())
+    def _font_codepoints(self, font_path: str) -> frozenset[int] | None:
+        """Code points mapped by a font, parsed once per catalog generation; None if the font is unreadable"""
+        key = (font_path, self.catalog_generation)
+        with self._cmaps_lock:
+            if key in self._cmaps:
+                self._cmaps.move_to_end(key)
+                return self._cmaps[key]
 
-            missing_chars = []
-            for char in text:
-                if char.strip() and ord(char) not in cmap:
-                    missing_chars.append(char)
+        try:
+            codepoints: frozenset[int] | None = font_codepoints(font_path)
+        except Exception as e:
+            logger.error(f"[FontValidator] Error reading cmap of {font_path}: {e}")
+            codepoints = None
 
-            return missing_chars
+        with self._cmaps_lock:
+            self._cmaps[key] = codepoints
+            while len(self._cmaps) > self.max_cached_cmaps:
+                self._cmaps.popitem(last=False)
+        return codepoints
 
-        except Exception as e:
-            logger.error(f"[FontValidator] Error finding missing characters: {e}")
+    def _find_missing_characters(self, font_path: str, text: str) -> list[str]:
+        """Find characters that are not covered by the font"""
+        codepoints = self._font_codepoints(font_path)
+        if codepoints is None:
             return []
+        missing = {ord(char) for char in charset_signature(text)} - codepoints
+        return [chr(codepoint) for codepoint in sorted(missing)]
 
     def _generate_validation_summary(self, result: FontValidationResult) -> None:
         """Generate a summary of the font validation results"""
@@ -15,6 +15,9 @@
 import logging
 import os
 import sys
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -26,11 +29,13 @@
 
 from pdfrebuilder.font.googlefonts import download_google_font
 from pdfrebuilder.settings import STANDARD_PDF_FONTS, settings
+from pdfrebuilder.utils.event_log import DEFAULT_HISTORY_SIZE, EventLog, EventScope, compact_context
 
 # Global caches
 _FONT_REGISTRATION_CACHE: dict[int, set[str]] = {}
 _FONT_DOWNLOAD_ATTEMPTED: set[str] = set()
-_FONT_SUBSTITUTION_TRACKING: list[dict] = []
+# Most recent substitutions across all fallback managers
+_FONT_SUBSTITUTION_TRACKING: deque[dict] = deque(maxlen=DEFAULT_HISTORY_SIZE)
 
 # Font validator instance (set by external code)
 _font_validator = None
@@ -202,16 +207,21 @@ def get_search_summary(self) -> str:
 
 
 class FontErrorReporter:
-    """Comprehensive font error reporting and aggregation system"""
+    """
+    Comprehensive font error reporting and aggregation system
 
-    def __init__(self):
+    Keeps the most recent errors of each kind and running counts per kind and
+    font, so long-running processes neither accumulate every error nor scan
+    them to build a summary.
+    """
+
+    ERROR_KINDS: ClassVar[tuple[str, ...]] = ("registration", "validation", "fallback", "discovery")
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE):
         """Initialize the font error reporter"""
         self.logger = logging.getLogger(f"{__name__}.FontErrorReporter")
-        self._registration_errors: list[dict[str, Any]] = []
-        self._validation_errors: list[dict[str, Any]] = []
-        self._fallback_errors: list[dict[str, Any]] = []
-        self._discovery_errors: list[dict[str, Any]] = []
-        self._error_counts: dict[str, int] = {}
+        self._errors = {kind: EventLog(history_size) for kind in self.ERROR_KINDS}
+        self._need_font_file_errors = 0
 
     def report_registration_error(
         self, font_name: str, error: Exception, context: dict[str, Any], verbose: bool = True
@@ -230,12 +240,13 @@ def report_registration_error(
             "font_name": font_name,
             "error_type": type(error).__name__,
             "error_message": str(error),
-            "context": context.copy(),
+            "context": compact_context(context),
             "is_need_font_file_error": "need font file or buffer" in str(error).lower(),
         }
 
-        self._registration_errors.append(error_record)
-        self._increment_error_count("registration")
+        self._errors["registration"].record(error_record, font=font_name)
+        if error_record["is_need_font_file_error"]:
+            self._need_font_file_errors += 1
 
         if verbose:
             # Log with appropriate level based on error type
@@ -266,12 +277,11 @@ def report_validation_error(
             "timestamp": datetime.now(),
             "font_path": font_path,
             "validation_errors": validation_errors.copy(),
-            "context": context.copy(),
+            "context": compact_context(context),
             "error_count": len(validation_errors),
         }
 
-        self._validation_errors.append(error_record)
-        self._increment_error_count("validation")
+        self._errors["validation"].record(error_record)
 
         if verbose:
             self.logger.warning(
@@ -301,12 +311,11 @@ def report_fallback_error(
             "original_font": original_font,
             "attempted_fallbacks": attempted_fallbacks.copy(),
             "final_error": str(final_error) if final_error else None,
-            "context": context.copy(),
+            "context": compact_context(context),
             "fallback_count": len(attempted_fallbacks),
         }
 
-        self._fallback_errors.append(error_record)
-        self._increment_error_count("fallback")
+        self._errors["fallback"].record(error_record, font=original_font)
 
         if verbose:
             self.logger.critical(
@@ -331,74 +340,57 @@ def report_discovery_error(
             "timestamp": datetime.now(),
             "font_name": font_name,
             "search_paths": search_paths.copy(),
-            "context": context.copy(),
+            "context": compact_context(context),
             "paths_searched": len(search_paths),
         }
 
-        self._discovery_errors.append(error_record)
-        self._increment_error_count("discovery")
+        self._errors["discovery"].record(error_record, font=font_name)
 
         if verbose:
             self.logger.warning(
                 f"Font discovery failed: font='{font_name}', search_paths={search_paths}, context={context}"
             )
 
-    def _increment_error_count(self, error_type: str) -> None:
-        """Increment error count for the given type"""
-        self._error_counts[error_type] = self._error_counts.get(error_type, 0) + 1
+    @property
+    def error_counts(self) -> dict[str, int]:
+        """Number of errors of each kind reported so far"""
+        return {kind: log.total for kind, log in self._errors.items() if log.total}
 
     def generate_error_summary(self) -> dict[str, Any]:
         """
         Generate comprehensive summary of all font errors encountered
 
+        Counts cover every error since the last clear; ``error_details`` holds
+        the most recent errors of each kind.
+
         Returns:
             Dictionary containing error summary and statistics
         """
+        error_counts = self.error_counts
         summary = {
             "timestamp": datetime.now(),
-            "total_errors": sum(self._error_counts.values()),
-            "error_counts": self._error_counts.copy(),
-            "registration_errors": len(self._registration_errors),
-            "validation_errors": len(self._validation_errors),
-            "fallback_errors": len(self._fallback_errors),
-            "discovery_errors": len(self._discovery_errors),
-            "need_font_file_errors": sum(
-                1 for error in self._registration_errors if error.get("is_need_font_file_error", False)
-            ),
+            "total_errors": sum(error_counts.values()),
+            "error_counts": error_counts,
+            "registration_errors": self._errors["registration"].total,
+            "validation_errors": self._errors["validation"].total,
+            "fallback_errors": self._errors["fallback"].total,
+            "discovery_errors": self._errors["discovery"].total,
+            "need_font_file_errors": self._need_font_file_errors,
             "most_problematic_fonts": self._get_most_problematic_fonts(),
-            "error_details": {
-                "registration": self._registration_errors.copy(),
-                "validation": self._validation_errors.copy(),
-                "fallback": self._fallback_errors.copy(),
-                "discovery": self._discovery_errors.copy(),
-            },
+            "error_details": {kind: log.recent() for kind, log in self._errors.items()},
         }
 
         return summary
 
     def _get_most_problematic_fonts(self) -> list[dict[str, Any]]:
-        """Get fonts that appear most frequently in errors"""
-        font_error_counts: dict[str, int] = {}
+        """Get fonts that appear most frequently in registration, fallback and discovery errors"""
+        font_error_counts: Counter[str] = Counter()
+        for log in self._errors.values():
+            font_error_counts.update(log.counts("font"))
 
-        # Count registration errors by font
-        for error in self._registration_errors:
-            font_name = error["font_name"]
-            font_error_counts[font_name] = font_error_counts.get(font_name, 0) + 1
-
-        # Count fallback errors by original font
-        for error in self._fallback_errors:
-            font_name = error["original_font"]
-            font_error_counts[font_name] = font_error_counts.get(font_name, 0) + 1
-
-        # Count discovery errors by font
-        for error in self._discovery_errors:
-            font_name = error["font_name"]
-            font_error_counts[font_name] = font_error_counts.get(font_name, 0) + 1
-
-        # Sort by error count and return top 10
-        sorted_fonts = sorted(font_error_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-
-        return [{"font_name": font_name, "error_count": count} for font_name, count in sorted_fonts]
+        return [
+            {"font_name": font_name, "error_count": count} for font_name, count in font_error_counts.most_common(10)
+        ]
 
     def get_actionable_guidance(self) -> list[str]:
         """
@@ -410,9 +402,7 @@ def get_actionable_guidance(self) -> list[str]:
         guidance = []
 
         # Check for "need font file or buffer" errors
-        need_file_errors = [error for error in self._registration_errors if error.get("is_need_font_file_error", False)]
-
-        if need_file_errors:
+        if self._need_font_file_errors:
             guidance.append(
                 "CRITICAL: 'need font file or buffer' errors detected. "
                 "This indicates font registration is being attempted without proper font file data. "
@@ -420,14 +410,14 @@ def get_actionable_guidance(self) -> list[str]:
             )
 
         # Check for validation errors
-        if self._validation_errors:
+        if self._errors["validation"]:
             guidance.append(
                 "Font validation errors detected. Check font file integrity, "
                 "ensure files exist and are readable, and verify font formats are supported."
             )
 
         # Check for fallback failures
-        if self._fallback_errors:
+        if self._errors["fallback"]:
             guidance.append(
                 "Font fallback system failures detected. This is critical as it means "
                 "no working fonts could be found. Ensure standard PDF fonts are available "
@@ -435,14 +425,14 @@ def get_actionable_guidance(self) -> list[str]:
             )
 
         # Check for discovery errors
-        if self._discovery_errors:
+        if self._errors["discovery"]:
             guidance.append(
                 "Font discovery errors detected. Check font directory paths, "
                 "ensure font files are properly named, and verify directory permissions."
             )
 
         # General guidance
-        if self._error_counts:
+        if any(self._errors.values()):
             guidance.append(
                 "Consider running font system diagnostics to identify and resolve underlying font management issues."
             )
@@ -451,11 +441,9 @@ def get_actionable_guidance(self) -> list[str]:
 
     def clear_errors(self) -> None:
         """Clear all recorded errors"""
-        self._registration_errors.clear()
-        self._validation_errors.clear()
-        self._fallback_errors.clear()
-        self._discovery_errors.clear()
-        self._error_counts.clear()
+        for log in self._errors.values():
+            log.clear()
+        self._need_font_file_errors = 0
 
         self.logger.info("Font error reporter cleared all recorded errors")
 
@@ -520,7 +508,7 @@ class FallbackFontManager:
     def __init__(self):
         """Initialize the fallback font manager"""
         self.logger = logging.getLogger(f"{__name__}.FallbackFontManager")
-        self._substitution_tracking: list[FontSubstitution] = []
+        self._substitution_tracking = EventLog()
         self._validated_fallbacks: dict[str, bool] = {}
         self._error_reporter = get_font_error_reporter()
         # Ensure fallback fonts list is consistent with configured default
@@ -982,7 +970,7 @@ def track_substitution(
             page_number=page_number,
         )
 
-        self._substitution_tracking.append(substitution)
+        self._substitution_tracking.record(substitution, original=original_font, fallback=fallback_font)
 
         # Also add to global tracking for backward compatibility
         _FONT_SUBSTITUTION_TRACKING.append(
@@ -991,8 +979,8 @@ def track_substitution(
                 "substituted_font": fallback_font,
                 "element_id": element_id,
                 "reason": reason,
-                "timestamp": datetime.now(),
-                "text_content": text_content,
+                "timestamp": substitution.timestamp,
+                "text_content": substitution.text_content,
                 "page_number": page_number,
             }
         )
@@ -1007,9 +995,10 @@ def get_substitution_summary(self) -> dict[str, Any]:
         Get summary of all font substitutions
 
         Returns:
-            Dictionary containing substitution statistics and details
+            Dictionary containing substitution statistics and the most recent substitutions
         """
-        if not self._substitution_tracking:
+        tracking = self._substitution_tracking
+        if not tracking:
             return {
                 "total_substitutions": 0,
                 "unique_original_fonts": 0,
@@ -1017,13 +1006,10 @@ def get_substitution_summary(self) -> dict[str, Any]:
                 "substitutions": [],
             }
 
-        original_fonts = {sub.original_font for sub in self._substitution_tracking}
-        fallback_fonts = {sub.substituted_font for sub in self._substitution_tracking}
-
         return {
-            "total_substitutions": len(self._substitution_tracking),
-            "unique_original_fonts": len(original_fonts),
-            "unique_fallback_fonts": len(fallback_fonts),
+            "total_substitutions": tracking.total,
+            "unique_original_fonts": tracking.distinct("original"),
+            "unique_fallback_fonts": tracking.distinct("fallback"),
             "most_common_original": self._get_most_common_font("original"),
             "most_common_fallback": self._get_most_common_font("fallback"),
             "substitutions": [
@@ -1035,25 +1021,18 @@ def get_substitution_summary(self) -> dict[str, Any]:
                     "timestamp": sub.timestamp.isoformat(),
                     "page_number": sub.page_number,
                 }
-                for sub in self._substitution_tracking
+                for sub in tracking.recent()
             ],
         }
 
     def _get_most_common_font(self, font_type: str) -> dict[str, Any] | None:
         """Get the most commonly substituted font"""
-        if not self._substitution_tracking:
-            return None
-
-        font_counts: dict[str, int] = {}
-        for sub in self._substitution_tracking:
-            font_name = sub.original_font if font_type == "original" else sub.substituted_font
-            font_counts[font_name] = font_counts.get(font_name, 0) + 1
-
-        if not font_counts:
+        most_common = self._substitution_tracking.most_common(font_type, 1)
+        if not most_common:
             return None
 
-        most_common = max(font_counts.items(), key=lambda x: x[1])
-        return {"font_name": most_common[0], "count": most_common[1]}
+        font_name, count = most_common[0]
+        return {"font_name": font_name, "count": count}
 
     def clear_substitution_tracking(self) -> None:
         """Clear all substitution tracking data"""
@@ -1843,14 +1822,19 @@ def _add_to_registration_cache(page_id: int, font_name: str) -> None:
 
 
 class FontRegistrationTracker:
-    """System to track all font registration attempts and results"""
+    """
+    System to track all font registration attempts and results
 
-    def __init__(self):
+    Keeps the most recent attempts and failures, plus running counts per font,
+    method and failure reason, so statistics do not depend on how many
+    registrations the process has seen.
+    """
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE):
         """Initialize the registration tracker"""
         self.logger = logging.getLogger(f"{__name__}.FontRegistrationTracker")
-        self._registration_attempts: list[dict[str, Any]] = []
-        self._successful_registrations: list[dict[str, Any]] = []
-        self._failed_registrations: list[dict[str, Any]] = []
+        self._registration_attempts = EventLog(history_size)
+        self._failed_registrations = EventLog(history_size)
         self._registration_statistics: dict[str, int] = {
             "total_attempts": 0,
             "successful_registrations": 0,
@@ -1885,14 +1869,21 @@ def track_registration_attempt(
             "font_path": registration_result.font_path,
             "element_context": registration_result.element_context,
             "is_critical_failure": registration_result.is_critical_failure(),
-            "context": context.copy() if context else {},
+            "context": compact_context(context),
         }
 
-        self._registration_attempts.append(attempt_record)
+        if not registration_result.success:
+            result = "failed"
+        elif registration_result.fallback_used:
+            result = "fallback"
+        else:
+            result = "success"
+        self._registration_attempts.record(
+            attempt_record, font=font_name, method=registration_result.registration_method, result=result
+        )
         self._registration_statistics["total_attempts"] += 1
 
         if registration_result.success:
-            self._successful_registrations.append(attempt_record)
             self._registration_statistics["successful_registrations"] += 1
 
             if registration_result.fallback_used:
@@ -1903,7 +1894,9 @@ def track_registration_attempt(
                 f"(method: {registration_result.registration_method}, fallback: {registration_result.fallback_used})"
             )
         else:
-            self._failed_registrations.append(attempt_record)
+            self._failed_registrations.record(
+                attempt_record, font=font_name, reason=registration_result.error_message or "Unknown error"
+            )
             self._registration_statistics["failed_registrations"] += 1
 
             if registration_result.is_critical_failure():
@@ -1942,33 +1935,21 @@ def get_registration_statistics(self) -> dict[str, Any]:
 
     def _get_most_requested_fonts(self) -> list[dict[str, Any]]:
         """Get the most frequently requested fonts"""
-        font_counts: dict[str, int] = {}
-        for attempt in self._registration_attempts:
-            font_name = attempt["font_name"]
-            font_counts[font_name] = font_counts.get(font_name, 0) + 1
-
-        sorted_fonts = sorted(font_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        return [{"font_name": font, "count": count} for font, count in sorted_fonts]
+        return [
+            {"font_name": font, "count": count} for font, count in self._registration_attempts.most_common("font", 10)
+        ]
 
     def _get_most_failed_fonts(self) -> list[dict[str, Any]]:
         """Get the fonts that fail most frequently"""
-        font_counts: dict[str, int] = {}
-        for attempt in self._failed_registrations:
-            font_name = attempt["font_name"]
-            font_counts[font_name] = font_counts.get(font_name, 0) + 1
-
-        sorted_fonts = sorted(font_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        return [{"font_name": font, "count": count} for font, count in sorted_fonts]
+        return [
+            {"font_name": font, "count": count} for font, count in self._failed_registrations.most_common("font", 10)
+        ]
 
     def _get_most_common_methods(self) -> list[dict[str, Any]]:
         """Get the most common registration methods"""
-        method_counts: dict[str, int] = {}
-        for attempt in self._registration_attempts:
-            method = attempt["registration_method"]
-            method_counts[method] = method_counts.get(method, 0) + 1
-
-        sorted_methods = sorted(method_counts.items(), key=lambda x: x[1], reverse=True)
-        return [{"method": method, "count": count} for method, count in sorted_methods]
+        return [
+            {"method": method, "count": count} for method, count in self._registration_attempts.most_common("method")
+        ]
 
     def get_failed_registrations_summary(self) -> dict[str, Any]:
         """
@@ -1977,7 +1958,8 @@ def get_failed_registrations_summary(self) -> dict[str, Any]:
         Returns:
             Dictionary containing failed registration analysis
         """
-        if not self._failed_registrations:
+        failures = self._failed_registrations
+        if not failures:
             return {
                 "total_failures": 0,
                 "critical_failures": 0,
@@ -1985,24 +1967,10 @@ def get_failed_registrations_summary(self) -> dict[str, Any]:
                 "failed_fonts": [],
             }
 
-        # Analyze failure reasons
-        failure_reasons: dict[str, int] = {}
-        critical_failures = 0
-
-        for failure in self._failed_registrations:
-            if failure["is_critical_failure"]:
-                critical_failures += 1
-
-            error_msg = failure["error_message"] or "Unknown error"
-            failure_reasons[error_msg] = failure_reasons.get(error_msg, 0) + 1
-
         return {
-            "total_failures": len(self._failed_registrations),
-            "critical_failures": critical_failures,
-            "failure_reasons": [
-                {"reason": reason, "count": count}
-                for reason, count in sorted(failure_reasons.items(), key=lambda x: x[1], reverse=True)
-            ],
+            "total_failures": failures.total,
+            "critical_failures": self._registration_statistics["critical_failures"],
+            "failure_reasons": [{"reason": reason, "count": count} for reason, count in failures.most_common("reason")],
             "failed_fonts": self._get_most_failed_fonts(),
             "recent_failures": [
                 {
@@ -2011,7 +1979,7 @@ def get_failed_registrations_summary(self) -> dict[str, Any]:
                     "timestamp": f["timestamp"].isoformat(),
                     "is_critical": f["is_critical_failure"],
                 }
-                for f in self._failed_registrations[-10:]  # Last 10 failures
+                for f in failures.recent(10)  # Last 10 failures
             ],
         }
 
@@ -2026,8 +1994,8 @@ def generate_registration_report(self) -> dict[str, Any]:
             "timestamp": datetime.now().isoformat(),
             "statistics": self.get_registration_statistics(),
             "failed_registrations": self.get_failed_registrations_summary(),
-            "total_attempts": len(self._registration_attempts),
-            "successful_attempts": len(self._successful_registrations),
+            "total_attempts": self._registration_attempts.total,
+            "successful_attempts": self._registration_statistics["successful_registrations"],
             "system_health": self._assess_system_health(),
         }
 
@@ -2078,7 +2046,6 @@ def _assess_system_health(self) -> dict[str, Any]:
     def clear_tracking_data(self) -> None:
         """Clear all tracking data"""
         self._registration_attempts.clear()
-        self._successful_registrations.clear()
         self._failed_registrations.clear()
         self._registration_statistics = {
             "total_attempts": 0,
@@ -2100,6 +2067,47 @@ def get_font_registration_tracker() -> FontRegistrationTracker:
     return _global_registration_tracker
 
 
+class FontDiagnosticsScope:
+    """
+    Font registrations, errors and substitutions recorded while a scope is open, e.g. during one worker job.
+
+    The global trackers keep their process-wide counts; the scope reports
+    only the difference.
+    """
+
+    def __init__(self):
+        tracker = get_font_registration_tracker()
+        self._attempts = EventScope(tracker._registration_attempts)
+        self._errors = {kind: EventScope(log) for kind, log in get_font_error_reporter()._errors.items()}
+        self._substitutions = EventScope(get_fallback_font_manager()._substitution_tracking)
+
+    def close(self) -> None:
+        self._attempts.close()
+        for scope in self._errors.values():
+            scope.close()
+        self._substitutions.close()
+
+    def summary(self) -> dict[str, Any]:
+        fonts = sorted(self._attempts.counts("font").items(), key=lambda x: x[1], reverse=True)[:5]
+        return {
+            "registrations": self._attempts.total,
+            "registration_results": self._attempts.counts("result"),
+            "most_requested_fonts": [{"font_name": font, "count": count} for font, count in fonts],
+            "errors": {kind: scope.total for kind, scope in self._errors.items() if scope.total},
+            "substitutions": self._substitutions.total,
+        }
+
+
+@contextmanager
+def font_diagnostics_scope() -> Iterator[FontDiagnosticsScope]:
+    """Scope font diagnostics to a block, e.g. one job; ``summary()`` stays valid after it exits"""
+    scope = FontDiagnosticsScope()
+    try:
+        yield scope
+    finally:
+        scope.close()
+
+
 def track_font_registration(
     font_name: str,
     registration_result: FontRegistrationResult,
@@ -2645,16 +2653,26 @@ def scan_available_fonts(font_dirs):
     return font_map
 
 
+def font_codepoints(font_path) -> frozenset[int]:
+    """
+    Returns the code points mapped by the cmap tables of the font at font_path.
+
+    Raises whatever fontTools raises for a missing or unreadable font.
+    """
+    font = TTFont(font_path)
+    cmap: set[int] = set()
+    cmap_table = font["cmap"]
+    for table in getattr(cmap_table, "tables", []):
+        cmap.update(getattr(table, "cmap", {}).keys())
+    return frozenset(cmap)
+
+
 def font_covers_text(font_path, text):
     """
     Returns True if the font at font_path covers all characters in text.
     """
     try:
-        font = TTFont(font_path)
-        cmap = set()
-        cmap_table = font["cmap"]
-        for table in getattr(cmap_table, "tables", []):
-            cmap.update(getattr(table, "cmap", {}).keys())
+        cmap = font_codepoints(font_path)
         return all(ord(char) in cmap for char in text if char.strip())
     except Exception as e:
         logger.warning(f"[font_utils] Could not check glyph coverage for {font_path}: {e}")
@@ -0,0 +1,400 @@
+"""
+Structural diff and patch for Universal IDM documents.
+
+``diff_documents`` matches units, layers and elements between two documents
+and returns a compact ``DocumentPatch`` listing the added, removed and modified
+items with their changed fields. Document-level shared layers (master-page
+content) are diffed the same way as page layers. ``apply_patch`` replays a patch on the base
+document.
+
+Matching works in hashed passes, so two large documents are compared in time
+linear in their size:
+
+* units by content (ignoring their position), then by page number or canvas name
+* layers by ``layer_id``, then by name and type
+* elements by ``id``, then by content, then by text or image file, then by bbox
+
+Items are addressed by their index in the base document, so a patch only
+applies to the document it was computed from.
+"""
+
+import copy
+import hashlib
+import json
+from collections import defaultdict, deque
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+from pdfrebuilder.models.universal_idm import UniversalDocument
+
+PATCH_FORMAT_VERSION = 1
+
+# Keys holding nested item lists; they are diffed structurally, not as fields
+_DOCUMENT_LISTS = ("document_structure", "shared_layers")
+_UNIT_LISTS = ("layers",)
+_LAYER_LISTS = ("children", "content")
+
+KeyFunction = Callable[[dict[str, Any]], Hashable | None]
+
+
+class PatchError(ValueError):
+    """Raised when a patch does not fit the document it is applied to"""
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _without(data: dict[str, Any], keys: tuple[str, ...]) -> dict[str, Any]:
+    return {k: v for k, v in data.items() if k not in keys}
+
+
+# --- Field diffs ---------------------------------------------------------
+
+
+def _diff_fields(old: dict[str, Any], new: dict[str, Any], skip: tuple[str, ...] = ()) -> list[dict[str, Any]]:
+    """Changed fields between two dictionaries as path/old/new records, descending into nested dicts"""
+    changes: list[dict[str, Any]] = []
+
+    def walk(a: dict[str, Any], b: dict[str, Any], path: list[str]) -> None:
+        for key in list(a) + [k for k in b if k not in a]:
+            if not path and key in skip:
+                continue
+            if key not in b:
+                changes.append({"path": [*path, key], "old": a[key], "deleted": True})
+            elif key not in a:
+                changes.append({"path": [*path, key], "old": None, "new": b[key]})
+            elif a[key] != b[key]:
+                if isinstance(a[key], dict) and isinstance(b[key], dict):
+                    walk(a[key], b[key], [*path, key])
+                else:
+                    changes.append({"path": [*path, key], "old": a[key], "new": b[key]})
+
+    walk(old, new, [])
+    return changes
+
+
+def _apply_fields(target: dict[str, Any], changes: list[dict[str, Any]]) -> None:
+    for change in changes:
+        *parents, key = change["path"]
+        node = target
+        for part in parents:
+            node = node.setdefault(part, {})
+        if change.get("deleted"):
+            node.pop(key, None)
+        else:
+            node[key] = copy.deepcopy(change["new"])
+
+
+# --- Matching ------------------------------------------------------------
+
+
+def _match(
+    old_items: list[dict[str, Any]], new_items: list[dict[str, Any]], key_functions: list[KeyFunction]
+) -> list[tuple[int, int]]:
+    """Pair old and new items through successive key functions; each pass only sees unmatched items"""
+    pairs: list[tuple[int, int]] = []
+    old_free = set(range(len(old_items)))
+    new_free = list(range(len(new_items)))
+
+    for key_function in key_functions:
+        if not old_free or not new_free:
+            break
+        buckets: dict[Hashable, deque[int]] = defaultdict(deque)
+        for i in sorted(old_free):
+            key = key_function(old_items[i])
+            if key is not None:
+                buckets[key].append(i)
+
+        still_free = []
+        for j in new_free:
+            key = key_function(new_items[j])
+            bucket = buckets.get(key) if key is not None else None
+            if bucket:
+                i = bucket.popleft()
+                old_free.discard(i)
+                pairs.append((i, j))
+            else:
+                still_free.append(j)
+        new_free = still_free
+
+    return pairs
+
+
+def _unique_key(field_name: str, items: list[dict[str, Any]]) -> KeyFunction:
+    """Key on a field only where its value is unique among the items"""
+    counts: dict[Any, int] = defaultdict(int)
+    for item in items:
+        counts[item.get(field_name)] += 1
+    return lambda item: item.get(field_name) if counts[item.get(field_name)] == 1 else None
+
+
+def _rounded_bbox(item: dict[str, Any]) -> tuple[Any, ...] | None:
+    bbox = item.get("bbox")
+    if not isinstance(bbox, list | tuple):
+        return None
+    return (item.get("type"), *(round(float(v), 1) for v in bbox))
+
+
+def _element_keys(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[KeyFunction]:
+    old_ids, new_ids = _unique_key("id", old), _unique_key("id", new)
+    return [
+        lambda e: ("id", e.get("id")) if (old_ids(e) is not None and new_ids(e) is not None) else None,
+        lambda e: _hash(_without(e, ("id",))),
+        lambda e: (e.get("type"), e.get("text")) if e.get("text") else None,
+        lambda e: (e.get("type"), e.get("image_file")) if e.get("image_file") else None,
+        _rounded_bbox,
+    ]
+
+
+def _layer_keys(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[KeyFunction]:
+    return [
+        lambda layer: layer.get("layer_id"),
+        lambda layer: (layer.get("layer_name"), layer.get("layer_type")),
+    ]
+
+
+def _position_independent(unit: dict[str, Any]) -> dict[str, Any]:
+    base_layer_id = f"page_{unit.get('page_number')}_base_layer"
+    layers = [
+        {**layer, "layer_id": None} if layer.get("layer_id") == base_layer_id else layer
+        for layer in unit.get("layers", [])
+    ]
+    return {**_without(unit, ("page_number",)), "layers": layers}
+
+
+def _unit_keys(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[KeyFunction]:
+    return [
+        lambda unit: _hash(_position_independent(unit)),
+        lambda unit: (unit.get("type"), unit.get("page_number"), unit.get("canvas_name")),
+    ]
+
+
+# --- List diff/apply -----------------------------------------------------
+
+
+def _diff_list(
+    old_items: list[dict[str, Any]],
+    new_items: list[dict[str, Any]],
+    key_factory: Callable[[list[dict[str, Any]], list[dict[str, Any]]], list[KeyFunction]],
+    diff_item: Callable[[dict[str, Any], dict[str, Any]], dict[str, Any] | None],
+) -> dict[str, Any] | None:
+    pairs = _match(old_items, new_items, key_factory(old_items, new_items))
+    matched_old = {i for i, _ in pairs}
+    matched_new = {j for _, j in pairs}
+
+    patch: dict[str, Any] = {}
+    removed = [i for i in range(len(old_items)) if i not in matched_old]
+    added = [{"index": j, "value": copy.deepcopy(new_items[j])} for j in range(len(new_items)) if j not in matched_new]
+    modified = []
+    for i, j in sorted(pairs):
+        item_patch = diff_item(old_items[i], new_items[j])
+        if item_patch:
+            modified.append({"index": i, "new_index": j, **item_patch})
+
+    order = [i for i, _ in sorted(pairs, key=lambda pair: pair[1])]
+    if order != sorted(order):
+        patch["order"] = order
+    if removed:
+        patch["removed"] = removed
+    if added:
+        patch["added"] = added
+    if modified:
+        patch["modified"] = modified
+    return patch or None
+
+
+def _apply_list(
+    old_items: list[dict[str, Any]],
+    patch: dict[str, Any] | None,
+    apply_item: Callable[[dict[str, Any], dict[str, Any]], None],
+) -> list[dict[str, Any]]:
+    if not patch:
+        return old_items
+
+    removed = set(patch.get("removed", []))
+    items = {i: item for i, item in enumerate(old_items) if i not in removed}
+    for item_patch in patch.get("modified", []):
+        index = item_patch["index"]
+        if index not in items:
+            raise PatchError(f"Patch modifies item {index}, which is not in the base document")
+        apply_item(items[index], item_patch)
+
+    order = patch.get("order") or sorted(items)
+    if set(order) != set(items):
+        raise PatchError("Patch order does not match the surviving items of the base document")
+    result = [items[i] for i in order]
+    for addition in sorted(patch.get("added", []), key=lambda a: a["index"]):
+        result.insert(addition["index"], copy.deepcopy(addition["value"]))
+    return result
+
+
+# --- Item diff/apply -----------------------------------------------------
+
+
+def _diff_element(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any] | None:
+    if old == new:
+        return None
+    return {"id": old.get("id"), "fields": _diff_fields(old, new)}
+
+
+def _apply_element(element: dict[str, Any], patch: dict[str, Any]) -> None:
+    _apply_fields(element, patch.get("fields", []))
+
+
+def _diff_layer(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any] | None:
+    if old == new:
+        return None
+    item: dict[str, Any] = {"layer_id": old.get("layer_id")}
+    fields = _diff_fields(old, new, skip=_LAYER_LISTS)
+    if fields:
+        item["fields"] = fields
+    children = _diff_list(old.get("children", []), new.get("children", []), _layer_keys, _diff_layer)
+    if children:
+        item["children"] = children
+    content = _diff_list(old.get("content", []), new.get("content", []), _element_keys, _diff_element)
+    if content:
+        item["content"] = content
+    return item
+
+
+def _apply_layer(layer: dict[str, Any], patch: dict[str, Any]) -> None:
+    _apply_fields(layer, patch.get("fields", []))
+    layer["children"] = _apply_list(layer.get("children", []), patch.get("children"), _apply_layer)
+    layer["content"] = _apply_list(layer.get("content", []), patch.get("content"), _apply_element)
+
+
+def _diff_unit(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any] | None:
+    if old == new:
+        return None
+    item: dict[str, Any] = {}
+    fields = _diff_fields(old, new, skip=_UNIT_LISTS)
+    if fields:
+        item["fields"] = fields
+    layers = _diff_list(old.get("layers", []), new.get("layers", []), _layer_keys, _diff_layer)
+    if layers:
+        item["layers"] = layers
+    return item or None
+
+
+def _apply_unit(unit: dict[str, Any], patch: dict[str, Any]) -> None:
+    _apply_fields(unit, patch.get("fields", []))
+    unit["layers"] = _apply_list(unit.get("layers", []), patch.get("layers"), _apply_layer)
+
+
+# --- Public API ----------------------------------------------------------
+
+
+@dataclass
+class DocumentPatch:
+    """Structural changes turning a base document into a target document"""
+
+    fields: list[dict[str, Any]] = field(default_factory=list)
+    units: dict[str, Any] | None = None
+    shared_layers: dict[str, Any] | None = None
+
+    def is_empty(self) -> bool:
+        return not self.fields and not self.units and not self.shared_layers
+
+    def changed_units(self) -> list[int]:
+        """Indices, in the target document, of units that were added or modified"""
+        if not self.units:
+            return []
+        indices = {a["index"] for a in self.units.get("added", [])}
+        indices.update(m["new_index"] for m in self.units.get("modified", []))
+        return sorted(indices)
+
+    def summary(self) -> dict[str, int]:
+        """Counts of added, removed and modified units, layers and elements"""
+        counts = dict.fromkeys(
+            (
+                "units_added",
+                "units_removed",
+                "units_modified",
+                "layers_added",
+                "layers_removed",
+                "layers_modified",
+                "elements_added",
+                "elements_removed",
+                "elements_modified",
+            ),
+            0,
+        )
+
+        def count(list_patch: dict[str, Any] | None, kind: str) -> None:
+            if not list_patch:
+                return
+            counts[f"{kind}_added"] += len(list_patch.get("added", []))
+            counts[f"{kind}_removed"] += len(list_patch.get("removed", []))
+            for item in list_patch.get("modified", []):
+                if kind == "elements" or item.get("fields"):
+                    counts[f"{kind}_modified"] += 1
+                if kind == "units":
+                    count(item.get("layers"), "layers")
+                elif kind == "layers":
+                    count(item.get("children"), "layers")
+                    count(item.get("content"), "elements")
+
+        count(self.units, "units")
+        count(self.shared_layers, "layers")
+        return counts
+
+    def to_dict(self) -> dict[str, Any]:
+        data = {"format": PATCH_FORMAT_VERSION, "fields": self.fields, "units": self.units}
+        if self.shared_layers:
+            data["shared_layers"] = self.shared_layers
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "DocumentPatch":
+        if data.get("format", PATCH_FORMAT_VERSION) != PATCH_FORMAT_VERSION:
+            raise PatchError(f"Unsupported patch format: {data.get('format')}")
+        return cls(fields=data.get("fields", []), units=data.get("units"), shared_layers=data.get("shared_layers"))
+
+
+def _as_dict(document: UniversalDocument | dict[str, Any]) -> dict[str, Any]:
+    return document.to_dict() if isinstance(document, UniversalDocument) else document
+
+
+def diff_documents(
+    base: UniversalDocument | dict[str, Any], target: UniversalDocument | dict[str, Any]
+) -> DocumentPatch:
+    """
+    Compute the structural changes between two documents.
+
+    Args:
+        base: Document the patch applies to
+        target: Document the patch produces
+
+    Returns:
+        DocumentPatch with the changes; empty when the documents are equal
+    """
+    old, new = _as_dict(base), _as_dict(target)
+    return DocumentPatch(
+        fields=_diff_fields(old, new, skip=_DOCUMENT_LISTS),
+        units=_diff_list(old.get("document_structure", []), new.get("document_structure", []), _unit_keys, _diff_unit),
+        shared_layers=_diff_list(old.get("shared_layers", []), new.get("shared_layers", []), _layer_keys, _diff_layer),
+    )
+
+
+def apply_patch(base: UniversalDocument | dict[str, Any], patch: DocumentPatch | dict[str, Any]) -> UniversalDocument:
+    """
+    Apply a patch to the document it was computed from.
+
+    The base document is not modified.
+
+    Raises:
+        PatchError: If the patch does not fit the base document
+    """
+    if isinstance(patch, dict):
+        patch = DocumentPatch.from_dict(patch)
+    data = copy.deepcopy(_as_dict(base))
+    _apply_fields(data, patch.fields)
+    data["document_structure"] = _apply_list(data.get("document_structure", []), patch.units, _apply_unit)
+    shared_layers = _apply_list(data.get("shared_layers", []), patch.shared_layers, _apply_layer)
+    if shared_layers:
+        data["shared_layers"] = shared_layers
+    else:
+        data.pop("shared_layers", None)
+    return UniversalDocument.from_dict(data)
@@ -6,7 +6,7 @@
 import logging
 from typing import Any
 
-from .universal_idm import UNIVERSAL_IDM_VERSION, UniversalDocument, validate_schema_version
+from .universal_idm import UNIVERSAL_IDM_VERSION, PathData, UniversalDocument, validate_schema_version
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +58,18 @@ def validate_document(self, data: dict[str, Any]) -> tuple[bool, list[str]]:
             metadata_errors = self._validate_metadata(data["metadata"])
             errors.extend(metadata_errors)
 
+        # Validate shared (master-page) layers and the page references to them
+        if "shared_layers" in data:
+            errors.extend(self._validate_layers(data["shared_layers"], "shared"))
+            shared_ids = {layer.get("layer_id") for layer in data["shared_layers"] if isinstance(layer, dict)}
+        else:
+            shared_ids = set()
+        for i, unit in enumerate(data.get("document_structure") or []):
+            if isinstance(unit, dict):
+                for ref in unit.get("shared_layer_refs", []):
+                    if ref not in shared_ids:
+                        errors.append(f"Document unit {i} references unknown shared layer: {ref}")
+
         return len(errors) == 0, errors
 
     def _validate_document_structure(self, structure: list[dict[str, Any]]) -> list[str]:
@@ -127,6 +139,7 @@ def _validate_layers(self, layers: list[dict[str, Any]], context: str) -> list[s
                     "group",
                     "adjustment",
                     "smart_object",
+                    "master",
                 ]
                 if layer["layer_type"] not in valid_layer_types:
                     errors.append(f"{context} layer {i} has invalid layer_type: {layer['layer_type']}")
@@ -246,6 +259,18 @@ def _validate_drawing_element(self, element: dict[str, Any], context: str) -> li
                         if cmd["cmd"] not in valid_commands:
                             errors.append(f"{context} drawing_command {i} has invalid cmd: {cmd['cmd']}")
 
+        # Compact path validation
+        if "path" in element:
+            path = element["path"]
+            if (
+                not isinstance(path, dict)
+                or not isinstance(path.get("ops"), str)
+                or not isinstance(path.get("coords"), list)
+            ):
+                errors.append(f"{context} path must be a dictionary with 'ops' string and 'coords' list")
+            elif not PathData.from_dict(path).is_valid():
+                errors.append(f"{context} path has unknown opcodes or a coordinate count that does not match its ops")
+
         return errors
 
     def _validate_bbox(self, bbox: Any, context: str) -> list[str]:
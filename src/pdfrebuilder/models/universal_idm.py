@@ -10,7 +10,7 @@
 from collections.abc import Sequence
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Optional, TypeVar, Union
+from typing import Any, ClassVar, Optional, TypeVar, Union
 
 # Schema version constant
 UNIVERSAL_IDM_VERSION = "1.0"
@@ -37,6 +37,7 @@ class LayerType(Enum):
     GROUP = "group"  # PSD group layer containing other layers
     ADJUSTMENT = "adjustment"  # PSD adjustment layer
     SMART_OBJECT = "smart_object"  # PSD smart object layer
+    MASTER = "master"  # Document-level content shared by several pages
 
 
 class ElementType(Enum):
@@ -243,6 +244,36 @@ class DrawingCommand:
     bbox: Optional["BoundingBox"] = None
 
 
+@dataclass
+class PathData:
+    """
+    Compact vector path: one opcode character per segment and a flat coordinate array.
+
+    Opcodes and the coordinates they consume:
+    ``M`` x y (move), ``L`` x y (line), ``C`` x1 y1 x2 y2 x y (cubic Bezier),
+    ``R`` x0 y0 x1 y1 (rectangle subpath), ``Z`` (close subpath).
+    """
+
+    ops: str = ""
+    coords: list[float] = field(default_factory=list)
+
+    OP_ARITY: ClassVar[dict[str, int]] = {"M": 2, "L": 2, "C": 6, "R": 4, "Z": 0}
+
+    def is_valid(self) -> bool:
+        """Whether every opcode is known and the coordinate count matches the opcodes"""
+        try:
+            return sum(self.OP_ARITY[op] for op in self.ops) == len(self.coords)
+        except KeyError:
+            return False
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"ops": self.ops, "coords": self.coords}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PathData":
+        return cls(ops=data.get("ops", ""), coords=list(data.get("coords", [])))
+
+
 # Base Element Classes
 
 
@@ -292,6 +323,7 @@ def __init__(
         adjust_spacing: bool = False,
         background_color: Color | None = None,
         element_id: str | None = None,
+        glyph_offsets: list[float] | None = None,
     ):
         # Handle backward compatibility for element_id parameter
         actual_id = element_id if element_id is not None else id
@@ -324,6 +356,8 @@ def __init__(
         self.background_color = background_color
         self.element_id = actual_id  # For backward compatibility
         self._font_details = font_details
+        # Baseline x offset of each raw_text character from the bbox left edge (bbox[0]), set on coalesced spans
+        self.glyph_offsets = glyph_offsets
 
     @property
     def font_details(self) -> FontDetails:
@@ -343,6 +377,8 @@ def to_dict(self) -> dict[str, Any]:
                 "font_details": self._font_details.to_dict(),
             }
         )
+        if self.glyph_offsets:
+            base_dict["glyph_offsets"] = list(self.glyph_offsets)
         return base_dict
 
     @classmethod
@@ -367,6 +403,7 @@ def from_dict(cls, data: dict[str, Any]) -> "TextElement":
                 Color.from_rgba_tuple(tuple(data["background_color"])) if data.get("background_color") else None
             ),
             font_details=data.get("font_details"),
+            glyph_offsets=data.get("glyph_offsets"),
         )
 
 
@@ -456,6 +493,7 @@ def __init__(
         drawing_commands: list[DrawingCommand | dict[str, Any]] | None = None,
         original_shape_type: str | None = None,
         element_id: str | None = None,
+        path: PathData | dict[str, Any] | None = None,
     ):
         # Handle backward compatibility for element_id parameter
         actual_id = element_id if element_id is not None else id
@@ -504,6 +542,8 @@ def __init__(
         self.drawing_commands = processed_commands
         self.original_shape_type = original_shape_type
         self.element_id = actual_id  # For backward compatibility
+        # Compact alternative to drawing_commands, produced by the PDF extractor
+        self.path = PathData.from_dict(path) if isinstance(path, dict) else path
 
         # Store the bbox list for backward compatibility
         self._bbox_list = self.bbox.to_list()
@@ -532,6 +572,8 @@ def to_dict(self) -> dict[str, Any]:
                 "original_shape_type": self.original_shape_type,
             }
         )
+        if self.path is not None:
+            base_dict["path"] = self.path.to_dict()
         return base_dict
 
     @classmethod
@@ -545,6 +587,7 @@ def from_dict(cls, data: dict[str, Any]) -> "DrawingElement":
             width=data.get("width", 1.0),
             drawing_commands=data.get("drawing_commands", []),
             original_shape_type=data.get("original_shape_type"),
+            path=data.get("path"),
         )
 
 
@@ -667,9 +710,12 @@ def __init__(
         background_color: Color | None = None,
         layers: Sequence[Layer] | None = None,
         page_number: int = 0,
+        shared_layer_refs: Sequence[str] | None = None,
     ):
         super().__init__(size, background_color, layers)
         self.page_number = page_number
+        # Ids of document-level shared layers drawn beneath this page's own layers
+        self.shared_layer_refs = list(shared_layer_refs) if shared_layer_refs else []
 
     @property
     def type(self) -> str:
@@ -684,6 +730,8 @@ def to_dict(self) -> dict[str, Any]:
                 "page_number": self.page_number,
             }
         )
+        if self.shared_layer_refs:
+            base_dict["shared_layer_refs"] = list(self.shared_layer_refs)
         return base_dict
 
     def add_layer(self, layer: Layer) -> None:
@@ -707,6 +755,7 @@ def from_dict(cls, data: dict[str, Any]) -> "PageUnit":
             ),
             layers=[Layer.from_dict(layer) for layer in data.get("layers", [])],
             page_number=data.get("page_number", 0),
+            shared_layer_refs=data.get("shared_layer_refs"),
         )
 
 
@@ -825,6 +874,7 @@ def __init__(
         engine_version: str = "unknown",
         metadata: DocumentMetadata | None = None,
         document_structure: Sequence[PageUnit | CanvasUnit] | None = None,
+        shared_layers: Sequence[Layer] | None = None,
     ):
         self.version = version
         self.engine = engine
@@ -833,16 +883,28 @@ def __init__(
         self.document_structure: list[PageUnit | CanvasUnit] = (
             list(document_structure) if document_structure is not None else []
         )
+        # Layers referenced by pages through PageUnit.shared_layer_refs (master-page content)
+        self.shared_layers: list[Layer] = list(shared_layers) if shared_layers is not None else []
 
     def to_dict(self) -> dict[str, Any]:
         """Convert the UniversalDocument to a dictionary representation for serialization."""
-        return {
+        data = {
             "version": self.version,
             "engine": self.engine,
             "engine_version": self.engine_version,
             "metadata": self.metadata.to_dict() if self.metadata else {},
             "document_structure": [unit.to_dict() for unit in self.document_structure],
         }
+        if self.shared_layers:
+            data["shared_layers"] = [layer.to_dict() for layer in self.shared_layers]
+        return data
+
+    def get_shared_layer(self, layer_id: str) -> Layer | None:
+        """Find a document-level shared layer by id"""
+        for layer in self.shared_layers:
+            if layer.layer_id == layer_id:
+                return layer
+        return None
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "UniversalDocument":
@@ -861,6 +923,7 @@ def from_dict(cls, data: dict[str, Any]) -> "UniversalDocument":
             engine_version=data.get("engine_version", "unknown"),
             metadata=DocumentMetadata.from_dict(data.get("metadata", {})),
             document_structure=doc_structure,
+            shared_layers=[Layer.from_dict(layer) for layer in data.get("shared_layers", [])],
         )
 
     def to_json(self, indent: int = 2) -> str:
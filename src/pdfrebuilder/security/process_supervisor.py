@@ -0,0 +1,258 @@
+"""
+Event-driven supervision of a running subprocess.
+
+``supervise_process`` waits for a process started with ``subprocess.Popen`` in
+a single loop that does three things:
+
+- drains stdout and stderr as data arrives, so a tool writing more than a
+  pipe buffer never blocks. Output is spooled to a temporary file once it
+  outgrows ``spool_threshold`` bytes, and anything past ``max_output_bytes``
+  is read and discarded.
+- wakes as soon as the process exits. On Linux it waits on a pidfd; on other
+  POSIX systems it waits on the pipes closing, then calls ``Popen.wait``. It
+  never sleep-polls.
+- calls a resource sampler every ``sample_interval`` seconds. The first
+  sample is taken only after one interval, so short commands are never
+  sampled.
+
+On POSIX the loop selects on the pipes. Windows selectors only accept
+sockets, so there one reader thread per pipe drains the output and the loop
+waits on the process with ``Popen.wait`` timeouts instead.
+
+A process that outlives its timeout is terminated, then killed, and
+``subprocess.TimeoutExpired`` is raised with the output drained so far.
+"""
+
+import contextlib
+import locale
+import os
+import selectors
+import subprocess  # nosec B404
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import IO, Any
+
+DEFAULT_SAMPLE_INTERVAL = 0.5
+DEFAULT_SPOOL_THRESHOLD = 1024 * 1024
+READ_CHUNK_SIZE = 64 * 1024
+TERMINATE_GRACE_SECONDS = 5.0
+# Whether pipes can be registered with a selector; Windows selectors only take sockets
+PIPES_SELECTABLE = os.name != "nt"
+
+
+class _OutputBuffer:
+    """Bytes read from one pipe, kept in memory up to a threshold and spooled to disk after that"""
+
+    def __init__(self, spool_threshold: int, max_bytes: int | None):
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.discarded = 0
+
+    def write(self, data: bytes) -> None:
+        if self.max_bytes is not None:
+            room = max(self.max_bytes - self.size, 0)
+            if len(data) > room:
+                self.discarded += len(data) - room
+                data = data[:room]
+        if data:
+            self._file.write(data)
+            self.size += len(data)
+
+    @property
+    def spooled(self) -> bool:
+        return bool(getattr(self._file, "_rolled", False))
+
+    def getvalue(self) -> bytes:
+        self._file.seek(0)
+        return self._file.read()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+@dataclass
+class SupervisionResult:
+    """Outcome of a supervised run"""
+
+    returncode: int
+    stdout: bytes | None
+    stderr: bytes | None
+    samples: list[dict[str, Any]] = field(default_factory=list)
+    stdout_discarded: int = 0
+    stderr_discarded: int = 0
+    spooled: bool = False
+    wall_time: float = 0.0
+
+
+def decode_output(data: bytes | None, encoding: str | None = None, errors: str | None = None) -> str | None:
+    """Decode captured output the way ``text=True`` pipes would, including newline translation"""
+    if data is None:
+        return None
+    decoded = data.decode(encoding or locale.getpreferredencoding(False), errors or "strict")
+    return decoded.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _open_pidfd(pid: int) -> int | None:
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is None:
+        return None
+    try:
+        return pidfd_open(pid)
+    except OSError:
+        # Older kernels or a process that has already been reaped
+        return None
+
+
+def _stop(process: subprocess.Popen) -> None:
+    """Terminate a process, killing it if it ignores the request"""
+    if process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=TERMINATE_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _drain(pipe: IO[bytes], buffer: _OutputBuffer) -> None:
+    """Copy a pipe into a buffer until it closes; runs on a reader thread"""
+    with contextlib.suppress(OSError, ValueError):
+        while data := pipe.read1(READ_CHUNK_SIZE):  # type: ignore[attr-defined]
+            buffer.write(data)
+
+
+def _seconds_until(*moments: float | None) -> float | None:
+    pending = [moment for moment in moments if moment is not None]
+    return max(min(pending) - time.monotonic(), 0.0) if pending else None
+
+
+def supervise_process(
+    process: subprocess.Popen,
+    timeout: float | None,
+    sampler: Callable[[], dict[str, Any]] | None = None,
+    sample_interval: float | None = DEFAULT_SAMPLE_INTERVAL,
+    spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+    max_output_bytes: int | None = None,
+) -> SupervisionResult:
+    """
+    Drain, time out and sample a process until it exits.
+
+    Args:
+        process: Process started with ``stdout``/``stderr`` set to ``subprocess.PIPE`` or left alone
+        timeout: Seconds before the process is stopped, or None to wait indefinitely
+        sampler: Called every ``sample_interval`` seconds while the process runs; exceptions it
+            raises stop the process and propagate
+        sample_interval: Seconds between samples; None disables sampling
+        spool_threshold: Bytes of output per stream kept in memory before spooling to disk
+        max_output_bytes: Bytes of output kept per stream; the rest is drained and discarded
+
+    Returns:
+        SupervisionResult with the raw output bytes
+
+    Raises:
+        subprocess.TimeoutExpired: If the process outlives the timeout
+    """
+    started = time.monotonic()
+    deadline = started + timeout if timeout is not None else None
+    next_sample = started + sample_interval if sampler and sample_interval else None
+
+    buffers: dict[str, _OutputBuffer] = {}
+    open_pipes: dict[int, tuple[str, IO[bytes]]] = {}
+    readers: list[threading.Thread] = []
+    selector = selectors.DefaultSelector() if PIPES_SELECTABLE else None
+    for name in ("stdout", "stderr"):
+        pipe = getattr(process, name)
+        if pipe is not None:
+            buffers[name] = _OutputBuffer(spool_threshold, max_output_bytes)
+            open_pipes[pipe.fileno()] = (name, pipe)
+            if selector is not None:
+                selector.register(pipe.fileno(), selectors.EVENT_READ)
+            else:
+                reader = threading.Thread(target=_drain, args=(pipe, buffers[name]), name=f"drain-{name}", daemon=True)
+                reader.start()
+                readers.append(reader)
+    pidfd = _open_pidfd(process.pid) if selector is not None else None
+    if pidfd is not None:
+        selector.register(pidfd, selectors.EVENT_READ)
+
+    samples: list[dict[str, Any]] = []
+    exited = process.poll() is not None
+    try:
+        while not (exited and not open_pipes):
+            wait = _seconds_until(deadline, next_sample)
+            if selector is None:
+                # Reader threads drain the pipes: wait for the exit, then for the pipes to close
+                if not exited:
+                    with contextlib.suppress(subprocess.TimeoutExpired):
+                        process.wait(timeout=wait)
+                else:
+                    for reader in readers:
+                        reader.join(_seconds_until(deadline))
+                    if not any(reader.is_alive() for reader in readers):
+                        for _, pipe in open_pipes.values():
+                            pipe.close()
+                        open_pipes.clear()
+            elif open_pipes or pidfd is not None:
+                for key, _ in selector.select(wait):
+                    if key.fd == pidfd:
+                        selector.unregister(pidfd)
+                        os.close(pidfd)
+                        pidfd = None
+                    elif data := os.read(key.fd, READ_CHUNK_SIZE):
+                        buffers[open_pipes[key.fd][0]].write(data)
+                    else:
+                        selector.unregister(key.fd)
+                        open_pipes.pop(key.fd)[1].close()
+            else:
+                # No pidfd and no pipes left: block on the exit itself
+                with contextlib.suppress(subprocess.TimeoutExpired):
+                    process.wait(timeout=wait)
+            exited = exited or process.poll() is not None
+            if exited and not open_pipes:
+                break
+
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                _stop(process)
+                for reader in readers:
+                    reader.join(TERMINATE_GRACE_SECONDS)
+                raise subprocess.TimeoutExpired(
+                    process.args,
+                    timeout,
+                    output=buffers["stdout"].getvalue() if "stdout" in buffers else None,
+                    stderr=buffers["stderr"].getvalue() if "stderr" in buffers else None,
+                )
+            if next_sample is not None and now >= next_sample and not exited:
+                try:
+                    samples.append(sampler())
+                except BaseException:
+                    _stop(process)
+                    raise
+                next_sample = now + sample_interval
+
+        stdout, stderr = buffers.get("stdout"), buffers.get("stderr")
+        return SupervisionResult(
+            returncode=process.wait(),
+            stdout=stdout.getvalue() if stdout else None,
+            stderr=stderr.getvalue() if stderr else None,
+            samples=samples,
+            stdout_discarded=stdout.discarded if stdout else 0,
+            stderr_discarded=stderr.discarded if stderr else 0,
+            spooled=any(buffer.spooled for buffer in buffers.values()),
+            wall_time=time.monotonic() - started,
+        )
+    finally:
+        if selector is not None:
+            selector.close()
+        if pidfd is not None:
+            os.close(pidfd)
+        for _, pipe in open_pipes.values():
+            with contextlib.suppress(OSError):
+                pipe.close()
+        for buffer in buffers.values():
+            buffer.close()
@@ -29,12 +29,21 @@
 import sys
 import tempfile
 import time
+from collections import deque
+from collections.abc import Callable
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any, ClassVar, TypedDict
 
 import psutil
 
+from pdfrebuilder.security.process_supervisor import (
+    DEFAULT_SAMPLE_INTERVAL,
+    DEFAULT_SPOOL_THRESHOLD,
+    decode_output,
+    supervise_process,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -170,36 +179,58 @@ def monitor_process(self, process: subprocess.Popen) -> dict[str, Any]:
 
         Returns:
             Dictionary containing resource usage statistics
+
+        Raises:
+            ResourceLimitError: If the process exceeds the memory limit
         """
-        try:
-            ps_process = psutil.Process(process.pid)
+        return self.sampler(process)()
 
-            # Get memory usage
-            memory_info = ps_process.memory_info()
-            memory_mb = memory_info.rss / (1024 * 1024)
+    def sampler(self, process: subprocess.Popen) -> Callable[[], dict[str, Any]]:
+        """
+        Create a sampling function for one process.
 
-            # Get CPU usage
-            cpu_percent = ps_process.cpu_percent()
+        The psutil handle is created on the first sample and reused afterwards,
+        so commands that finish before the first sample never pay for it and
+        CPU percentages are measured between consecutive samples.
+        """
+        handle: list[psutil.Process] = []
 
-            # Check limits
-            if memory_mb > self.max_memory_mb:
-                raise ResourceLimitError(f"Memory usage {memory_mb:.1f}MB exceeds limit {self.max_memory_mb}MB")
+        def sample() -> dict[str, Any]:
+            try:
+                if not handle:
+                    handle.append(psutil.Process(process.pid))
+                ps_process = handle[0]
 
-            if cpu_percent > self.max_cpu_percent:
-                logger.warning(f"CPU usage {cpu_percent:.1f}% exceeds recommended limit {self.max_cpu_percent}%")
+                # Get memory usage
+                memory_info = ps_process.memory_info()
+                memory_mb = memory_info.rss / (1024 * 1024)
 
-            return {
-                "memory_mb": memory_mb,
-                "cpu_percent": cpu_percent,
-                "num_threads": ps_process.num_threads(),
-                "status": ps_process.status(),
-            }
+                # Get CPU usage
+                cpu_percent = ps_process.cpu_percent()
 
-        except psutil.NoSuchProcess:
-            return {"status": "terminated"}
-        except Exception as e:
-            logger.warning(f"Failed to monitor process: {e}")
-            return {"error": str(e)}
+                # Check limits
+                if memory_mb > self.max_memory_mb:
+                    raise ResourceLimitError(f"Memory usage {memory_mb:.1f}MB exceeds limit {self.max_memory_mb}MB")
+
+                if cpu_percent > self.max_cpu_percent:
+                    logger.warning(f"CPU usage {cpu_percent:.1f}% exceeds recommended limit {self.max_cpu_percent}%")
+
+                return {
+                    "memory_mb": memory_mb,
+                    "cpu_percent": cpu_percent,
+                    "num_threads": ps_process.num_threads(),
+                    "status": ps_process.status(),
+                }
+
+            except ResourceLimitError:
+                raise
+            except psutil.NoSuchProcess:
+                return {"status": "terminated"}
+            except Exception as e:
+                logger.warning(f"Failed to monitor process: {e}")
+                return {"error": str(e)}
+
+        return sample
 
 
 class SubprocessSecurityValidator:
@@ -518,6 +549,9 @@ def __init__(
         max_cpu_percent: float = 80.0,
         audit_log_file: Path | None = None,
         enable_sandboxing: bool = True,
+        sample_interval: float | None = DEFAULT_SAMPLE_INTERVAL,
+        spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+        max_output_bytes: int | None = None,
     ):
         """
         Initialize enhanced secure subprocess runner.
@@ -529,9 +563,15 @@ def __init__(
             max_cpu_percent: Maximum CPU usage percentage
             audit_log_file: Optional file path for security audit logs
             enable_sandboxing: Whether to enable sandboxing features
+            sample_interval: Seconds between resource samples of monitored commands (None disables sampling)
+            spool_threshold: Bytes of captured output per stream kept in memory before spooling to disk
+            max_output_bytes: Bytes of captured output kept per stream; the rest is discarded
         """
         self.base_path = base_path or Path.cwd()
         self.timeout = timeout
+        self.sample_interval = sample_interval
+        self.spool_threshold = spool_threshold
+        self.max_output_bytes = max_output_bytes
         self.validator = SubprocessSecurityValidator()
 
         # Detect test environment and adjust limits accordingly
@@ -628,11 +668,10 @@ def run(
                 self._apply_sandboxing()
 
             # Start process with monitoring
-            if monitor_resources and not capture_output:
-                # For non-capturing processes, use Popen for monitoring
-                result = self._run_with_monitoring(cmd, cwd, timeout, text, env, **kwargs)
+            if monitor_resources and not {"input", "stdout", "stderr"} & kwargs.keys():
+                result = self._run_with_monitoring(cmd, cwd, timeout, capture_output, text, env, **kwargs)
             else:
-                # For capturing processes, use standard run with resource limits
+                # Commands feeding stdin or redirecting output run through subprocess.run
                 if self.enable_sandboxing:
                     self.resource_monitor.set_resource_limits()
 
@@ -659,8 +698,9 @@ def run(
             success = True
             execution_time = time.time() - start_time
 
-            # Monitor successful execution
-            self.security_monitor.monitor_command_execution(cmd, user, success, execution_time, cwd, env)
+            # Monitor completed execution; a non-zero exit without check=True still counts as failed
+            outcome = "success" if result.returncode == 0 else "failed"
+            self.security_monitor.monitor_command_execution(cmd, user, success, execution_time, cwd, env, outcome)
 
             logger.debug(f"Subprocess completed with return code: {result.returncode}")
             return result
@@ -699,7 +739,7 @@ def run(
                     "execution_time": execution_time,
                 },
             )
-            self.security_monitor.monitor_command_execution(cmd, user, success, execution_time, cwd, env)
+            self.security_monitor.monitor_command_execution(cmd, user, success, execution_time, cwd, env, "blocked")
 
             logger.error(f"Security violation in subprocess: {e}")
             raise
@@ -754,83 +794,87 @@ def _run_with_monitoring(
         cmd: list[str],
         cwd: Path | None,
         timeout: int,
+        capture_output: bool,
         text: bool,
         env: dict[str, str] | None,
         **kwargs,
     ) -> subprocess.CompletedProcess:
-        """Run subprocess with real-time resource monitoring."""
-        start_time = time.time()
+        """
+        Run subprocess under event-driven supervision.
+
+        Captured output is drained while the process runs, the exit is awaited
+        without polling, and resources are sampled every ``sample_interval``
+        seconds (see ``process_supervisor``).
+        """
+        check = kwargs.pop("check", False)
+        encoding = kwargs.pop("encoding", None)
+        errors = kwargs.pop("errors", None)
+        text = text or bool(kwargs.pop("universal_newlines", False)) or encoding is not None or errors is not None
 
         # Apply resource limits
         if self.enable_sandboxing:
             self.resource_monitor.set_resource_limits()
 
+        stream = subprocess.PIPE if capture_output else None
         process = subprocess.Popen(  # nosec B603
             cmd,
             cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=text,
+            stdout=stream,
+            stderr=stream,
             env=env,
             **kwargs,
         )
 
-        resource_stats = []
+        def decode(data: bytes | None) -> str | bytes | None:
+            return decode_output(data, encoding, errors) if text else data
+
         try:
-            while process.poll() is None:
-                # Monitor resource usage
-                stats = self.resource_monitor.monitor_process(process)
-                resource_stats.append(stats)
-
-                # Check timeout
-                if time.time() - start_time > timeout:
-                    process.terminate()
-                    try:
-                        process.wait(timeout=5)
-                    except subprocess.TimeoutExpired:
-                        process.kill()
-                        process.wait()
-                    raise subprocess.TimeoutExpired(cmd, timeout)
-
-                time.sleep(0.1)  # Monitor every 100ms
-
-            # Get final result
-            stdout, stderr = process.communicate()
-            result = subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
-
-            # Log comprehensive resource usage
-            execution_time = time.time() - start_time
-            max_memory = max((s.get("memory_mb", 0) for s in resource_stats), default=0)
-            avg_cpu = (
-                sum(s.get("cpu_percent", 0) for s in resource_stats) / len(resource_stats) if resource_stats else 0
+            supervision = supervise_process(
+                process,
+                timeout,
+                sampler=self.resource_monitor.sampler(process),
+                sample_interval=self.sample_interval,
+                spool_threshold=self.spool_threshold,
+                max_output_bytes=self.max_output_bytes,
             )
+        except subprocess.TimeoutExpired as e:
+            raise subprocess.TimeoutExpired(cmd, timeout, output=decode(e.output), stderr=decode(e.stderr)) from None
+        except BaseException:
+            # Ensure process is terminated
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            raise
 
-            resource_usage = {
-                "execution_time": execution_time,
-                "max_memory_mb": max_memory,
-                "avg_cpu_percent": avg_cpu,
-                "return_code": result.returncode,
-                "stdout_size": len(result.stdout) if result.stdout else 0,
-                "stderr_size": len(result.stderr) if result.stderr else 0,
-                "monitoring_samples": len(resource_stats),
-            }
-            self.audit_logger.log_resource_usage(cmd, resource_usage)
+        result = subprocess.CompletedProcess(
+            cmd, supervision.returncode, decode(supervision.stdout), decode(supervision.stderr)
+        )
 
-            # Monitor resource usage
-            self.security_monitor.monitor_resource_usage(cmd, resource_usage)
+        # Log comprehensive resource usage
+        resource_stats = supervision.samples
+        max_memory = max((s.get("memory_mb", 0) for s in resource_stats), default=0)
+        avg_cpu = sum(s.get("cpu_percent", 0) for s in resource_stats) / len(resource_stats) if resource_stats else 0
+
+        resource_usage = {
+            "execution_time": supervision.wall_time,
+            "max_memory_mb": max_memory,
+            "avg_cpu_percent": avg_cpu,
+            "return_code": result.returncode,
+            "stdout_size": len(supervision.stdout) if supervision.stdout else 0,
+            "stderr_size": len(supervision.stderr) if supervision.stderr else 0,
+            "stdout_discarded": supervision.stdout_discarded,
+            "stderr_discarded": supervision.stderr_discarded,
+            "output_spooled": supervision.spooled,
+            "monitoring_samples": len(resource_stats),
+        }
+        self.audit_logger.log_resource_usage(cmd, resource_usage)
 
-            return result
+        # Monitor resource usage
+        self.security_monitor.monitor_resource_usage(cmd, resource_usage)
 
-        except Exception:
-            # Ensure process is terminated
-            if process.poll() is None:
-                process.terminate()
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait()
-            raise
+        if check:
+            result.check_returncode()
+        return result
 
     def _apply_sandboxing(self) -> None:
         """Apply sandboxing measures where possible."""
@@ -1051,48 +1095,75 @@ def create_secure_temp_dir(prefix: str = "secure_temp_") -> Path:
 
 
 class SecurityMetrics:
-    """Collects and reports security metrics."""
+    """
+    Collects and reports security metrics.
+
+    Counts, sums and maxima cover every event since the last reset; the
+    per-event lists (execution times, memory usage, violations and pattern
+    matches) keep only the most recent ``history_size`` entries so a
+    long-running process does not accumulate them.
+    """
+
+    DEFAULT_HISTORY_SIZE = 1000
 
     class _MetricsDict(TypedDict):
         total_commands: int
         blocked_commands: int
+        command_outcomes: dict[str, int]
         security_violations: dict[str, int]
         resource_violations: int
-        suspicious_patterns: dict[str, list[dict[str, Any]]]
-        execution_times: list[float]
-        memory_usage: list[float]
+        suspicious_patterns: dict[str, deque[dict[str, Any]]]
+        execution_times: deque[float]
+        execution_time_total: float
+        memory_usage: deque[float]
+        memory_samples: int
+        memory_total_mb: float
+        memory_max_mb: float
         failed_authentications: int
         start_time: datetime
-        violations_list: list[dict[str, Any]]  # Added for test compatibility
+        violations_list: deque[dict[str, Any]]  # Added for test compatibility
 
-    def __init__(self):
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE):
         """Initialize security metrics collector."""
+        self.history_size = history_size
         self.metrics: SecurityMetrics._MetricsDict = {
             "total_commands": 0,
             "blocked_commands": 0,
+            "command_outcomes": {},
             "security_violations": {},
             "resource_violations": 0,
             "suspicious_patterns": {},
-            "execution_times": [],
-            "memory_usage": [],
+            "execution_times": deque(maxlen=history_size),
+            "execution_time_total": 0.0,
+            "memory_usage": deque(maxlen=history_size),
+            "memory_samples": 0,
+            "memory_total_mb": 0.0,
+            "memory_max_mb": 0.0,
             "failed_authentications": 0,
             "start_time": datetime.now(UTC),
-            "violations_list": [],
+            "violations_list": deque(maxlen=history_size),
         }
 
-    def record_command_execution(self, cmd: list[str], success: bool, execution_time: float) -> None:
-        """Record command execution metrics."""
+    def record_command_execution(
+        self, cmd: list[str], success: bool, execution_time: float, outcome: str | None = None
+    ) -> None:
+        """
+        Record command execution metrics.
+
+        ``outcome`` is ``success``, ``failed`` (ran but exited non-zero, timed out or hit a limit)
+        or ``blocked`` (rejected before it ran); it defaults to ``success`` or ``failed`` from ``success``.
+        """
         self.metrics["total_commands"] += 1
+        outcome = outcome or ("success" if success else "failed")
+        self.metrics["command_outcomes"][outcome] = self.metrics["command_outcomes"].get(outcome, 0) + 1
         self.metrics["execution_times"].append(execution_time)
+        self.metrics["execution_time_total"] += execution_time
 
         if not success:
             self.metrics["blocked_commands"] += 1
 
     def record_security_violation(self, violation_type: str, details: dict[str, Any]) -> None:
         """Record security violation metrics."""
-        if "violations_list" not in self.metrics:
-            self.metrics["violations_list"] = []
-
         # Store the full violation details for the test
         violation_record = {
             "type": violation_type,
@@ -1109,7 +1180,7 @@ def record_security_violation(self, violation_type: str, details: dict[str, Any]
     def record_suspicious_pattern(self, pattern: str, cmd: list[str]) -> None:
         """Record suspicious pattern detection."""
         if pattern not in self.metrics["suspicious_patterns"]:
-            self.metrics["suspicious_patterns"][pattern] = []
+            self.metrics["suspicious_patterns"][pattern] = deque(maxlen=self.history_size)
         self.metrics["suspicious_patterns"][pattern].append(
             {"command": cmd, "timestamp": datetime.now(UTC).isoformat()}
         )
@@ -1121,20 +1192,23 @@ def record_resource_violation(self, resource_type: str, usage: float, limit: flo
     def record_memory_usage(self, memory_mb: float) -> None:
         """Record memory usage."""
         self.metrics["memory_usage"].append(memory_mb)
+        self.metrics["memory_samples"] += 1
+        self.metrics["memory_total_mb"] += memory_mb
+        self.metrics["memory_max_mb"] = max(self.metrics["memory_max_mb"], memory_mb)
 
     def get_security_report(self) -> dict[str, Any]:
         """Generate comprehensive security report."""
         uptime = (datetime.now(UTC) - self.metrics["start_time"]).total_seconds()
 
         avg_execution_time = (
-            sum(self.metrics["execution_times"]) / len(self.metrics["execution_times"])
-            if self.metrics["execution_times"]
+            self.metrics["execution_time_total"] / self.metrics["total_commands"]
+            if self.metrics["total_commands"]
             else 0
         )
 
-        max_memory = max(self.metrics["memory_usage"]) if self.metrics["memory_usage"] else 0
+        max_memory = self.metrics["memory_max_mb"]
         avg_memory = (
-            sum(self.metrics["memory_usage"]) / len(self.metrics["memory_usage"]) if self.metrics["memory_usage"] else 0
+            self.metrics["memory_total_mb"] / self.metrics["memory_samples"] if self.metrics["memory_samples"] else 0
         )
 
         successful_commands = self.metrics["total_commands"] - self.metrics["blocked_commands"]
@@ -1146,15 +1220,18 @@ def get_security_report(self) -> dict[str, Any]:
             "successful_commands": successful_commands,
             "failed_commands": failed_commands,
             "blocked_commands": self.metrics["blocked_commands"],
+            "command_outcomes": dict(self.metrics["command_outcomes"]),
             "block_rate": (
                 self.metrics["blocked_commands"] / self.metrics["total_commands"]
                 if self.metrics["total_commands"] > 0
                 else 0
             ),
-            "security_violations": self.metrics.get("violations_list", []),
+            "security_violations": list(self.metrics["violations_list"]),
             "security_violation_counts": self.metrics["security_violations"],
             "resource_violations": self.metrics["resource_violations"],
-            "suspicious_patterns": self.metrics["suspicious_patterns"],
+            "suspicious_patterns": {
+                pattern: list(occurrences) for pattern, occurrences in self.metrics["suspicious_patterns"].items()
+            },
             "performance": {
                 "avg_execution_time": avg_execution_time,
                 "max_memory_mb": max_memory,
@@ -1165,7 +1242,7 @@ def get_security_report(self) -> dict[str, Any]:
 
     def reset_metrics(self) -> None:
         """Reset all metrics."""
-        self.__init__()
+        self.__init__(self.history_size)
 
 
 class SecurityAlerting:
@@ -1343,13 +1420,14 @@ def monitor_command_execution(
         execution_time: float,
         cwd: Path | None = None,
         env_vars: dict[str, str] | None = None,
+        outcome: str | None = None,
     ) -> None:
         """Monitor command execution and update metrics."""
         if not self.monitoring_active:
             return
 
         # Record metrics
-        self.metrics.record_command_execution(cmd, success, execution_time)
+        self.metrics.record_command_execution(cmd, success, execution_time, outcome)
 
         # Log audit event
         self.audit_logger.log_command_execution(cmd, user, cwd, env_vars)
@@ -1,9 +1,15 @@
 """General utilities and tools."""
 
-from .generic import detect_file_format, normalize_text_spacing, serialize_pdf_content_to_config
+from .generic import (
+    detect_file_format,
+    detect_stream_format,
+    normalize_text_spacing,
+    serialize_pdf_content_to_config,
+)
 
 __all__ = [
     "detect_file_format",
+    "detect_stream_format",
     "normalize_text_spacing",
     "serialize_pdf_content_to_config",
 ]
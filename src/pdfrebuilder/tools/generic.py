@@ -2,8 +2,6 @@
 import logging
 import os
 
-from pdfrebuilder.core.render import json_serializer
-
 # from pdfrebuilder.settings import CONFIG, STANDARD_PDF_FONTS
 
 
@@ -112,6 +110,9 @@ def serialize_pdf_content_to_config(content, config_path):
     else:
         content_dict = content
 
+    # Imported here: core.render pulls in PyMuPDF, which the rest of this module does not need
+    from pdfrebuilder.core.render import json_serializer
+
     with open(config_path, "w") as f:
         json.dump(content_dict, f, indent=2, default=json_serializer)
 
@@ -132,6 +133,27 @@ def normalize_text_spacing(text, space_density_threshold=0.3):
     return text, False
 
 
+def detect_stream_format(header: bytes) -> str:
+    """
+    Detect a document format from its leading bytes.
+
+    Args:
+        header: At least the first 8 bytes of the document
+
+    Returns:
+        String indicating the file format: 'pdf', 'psd', or 'unknown'
+    """
+    # Check for PDF signature (%PDF-)
+    if header.startswith(b"%PDF-"):
+        return "pdf"
+
+    # Check for PSD signature (8BPS)
+    if header.startswith(b"8BPS"):
+        return "psd"
+
+    return "unknown"
+
+
 def detect_file_format(file_path):
     """
     Detect the format of a file based on its magic bytes or extension.
@@ -147,13 +169,9 @@ def detect_file_format(file_path):
             # Read the first 8 bytes for magic number detection
             header = f.read(8)
 
-            # Check for PDF signature (%PDF-)
-            if header.startswith(b"%PDF-"):
-                return "pdf"
-
-            # Check for PSD signature (8BPS)
-            if header.startswith(b"8BPS"):
-                return "psd"
+            file_format = detect_stream_format(header)
+            if file_format != "unknown":
+                return file_format
 
             # If magic bytes don't match, try file extension
             _, ext = os.path.splitext(file_path.lower())
@@ -0,0 +1,149 @@
+"""
+Bounded event logs with incrementally maintained aggregates.
+
+Diagnostic trackers (font registrations, font errors and substitutions,
+subprocess security metrics) live for the whole process. In a long-running
+worker, keeping every event would grow without bound and make summaries
+slower over time. ``EventLog`` keeps only the most recent events in a ring
+buffer. It also keeps a total and per-dimension counts (for example per
+font, per method or per error type) that are updated when each event is
+recorded. Summaries then read those counts instead of scanning the history.
+
+``EventLog.scope()`` measures the events recorded while a block runs, such
+as a single job in a worker, without clearing the process-wide counts.
+"""
+
+import threading
+from collections import Counter, deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+DEFAULT_HISTORY_SIZE = 1000
+
+# Longest string kept from event context such as text snippets
+MAX_CONTEXT_TEXT = 100
+
+
+def compact_context(context: dict[str, Any] | None) -> dict[str, Any]:
+    """Shallow copy of an event context with long strings truncated and nested containers summarised"""
+    compact: dict[str, Any] = {}
+    for key, value in (context or {}).items():
+        if isinstance(value, str):
+            compact[key] = value[:MAX_CONTEXT_TEXT]
+        elif value is None or isinstance(value, (bool, int, float)):
+            compact[key] = value
+        elif isinstance(value, (list, tuple, set, dict)):
+            compact[key] = f"<{type(value).__name__} of {len(value)}>"
+        else:
+            compact[key] = str(value)[:MAX_CONTEXT_TEXT]
+    return compact
+
+
+class EventLog:
+    """
+    Ring buffer of recent events plus running totals.
+
+    Args:
+        history_size: Number of recent events kept
+    """
+
+    def __init__(self, history_size: int = DEFAULT_HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._recent: deque[Any] = deque(maxlen=history_size)
+        self._counts: dict[str, Counter[Any]] = {}
+        self.total = 0
+
+    @property
+    def history_size(self) -> int:
+        return self._recent.maxlen or 0
+
+    def record(self, event: Any, **keys: Any) -> None:
+        """
+        Record an event.
+
+        Args:
+            event: Event kept in the recent history
+            **keys: Dimension values the event is counted under, e.g. ``font="Arial", method="standard_pdf"``
+        """
+        with self._lock:
+            self._recent.append(event)
+            self.total += 1
+            for dimension, value in keys.items():
+                self._counts.setdefault(dimension, Counter())[value] += 1
+
+    def count(self, dimension: str, value: Any) -> int:
+        with self._lock:
+            return self._counts.get(dimension, Counter())[value]
+
+    def counts(self, dimension: str) -> dict[Any, int]:
+        with self._lock:
+            return dict(self._counts.get(dimension, Counter()))
+
+    def distinct(self, dimension: str) -> int:
+        with self._lock:
+            return len(self._counts.get(dimension, ()))
+
+    def most_common(self, dimension: str, limit: int | None = None) -> list[tuple[Any, int]]:
+        with self._lock:
+            return self._counts.get(dimension, Counter()).most_common(limit)
+
+    def recent(self, limit: int | None = None) -> list[Any]:
+        """Most recent events, oldest first"""
+        with self._lock:
+            events = list(self._recent)
+        return events if limit is None else events[-limit:] if limit > 0 else []
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._counts.clear()
+            self.total = 0
+
+    def _state(self) -> tuple[int, dict[str, Counter[Any]]]:
+        with self._lock:
+            return self.total, {dimension: Counter(counts) for dimension, counts in self._counts.items()}
+
+    @contextmanager
+    def scope(self) -> Iterator["EventScope"]:
+        """Measure the events recorded while the block runs"""
+        scope = EventScope(self)
+        try:
+            yield scope
+        finally:
+            scope.close()
+
+
+class EventScope:
+    """Events recorded in an ``EventLog`` since the scope opened; frozen once it closes"""
+
+    def __init__(self, log: EventLog):
+        self._log = log
+        self._start_total, self._start_counts = log._state()
+        self._end: tuple[int, dict[str, Counter[Any]]] | None = None
+
+    def close(self) -> None:
+        if self._end is None:
+            self._end = self._log._state()
+
+    def _current(self) -> tuple[int, dict[str, Counter[Any]]]:
+        return self._end if self._end is not None else self._log._state()
+
+    @property
+    def total(self) -> int:
+        # A clear() inside the scope restarts the log's totals
+        total = self._current()[0]
+        return total - self._start_total if total >= self._start_total else total
+
+    def counts(self, dimension: str) -> dict[Any, int]:
+        total, counts = self._current()
+        current = counts.get(dimension, Counter())
+        if total < self._start_total:
+            return dict(current)
+        return dict(current - self._start_counts.get(dimension, Counter()))
@@ -0,0 +1,66 @@
+"""
+Cold-start budget for the CLI.
+
+Runs ``pdfrebuilder --help`` and ``--version`` in a fresh interpreter under
+``python -X importtime`` and checks that no heavy dependency is imported and
+that the total import time stays within budget. Set
+PDFREBUILDER_STARTUP_BUDGET_MS to adjust the budget on slow machines.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+STARTUP_BUDGET_MS = float(os.environ.get("PDFREBUILDER_STARTUP_BUDGET_MS", "1000"))
+
+# Libraries that only the commands themselves need
+HEAVY_MODULES = {
+    "fitz",
+    "pymupdf",
+    "reportlab",
+    "PIL",
+    "numpy",
+    "fontTools",
+    "psd_tools",
+    "wand",
+    "pydantic",
+    "pydantic_settings",
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def _import_profile(*cli_args: str) -> tuple[set[str], float]:
+    """Top-level package names imported by the CLI invocation, and the total import time in ms"""
+    script = (
+        f"import sys; sys.argv = ['pdfrebuilder', *{list(cli_args)!r}]; from pdfrebuilder.cli.main import app; app()"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=60,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    packages, total_us = set(), 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        packages.add(match.group(3).split(".")[0])
+        if match.group(2) == " ":  # Top-level import: its cumulative time covers its children
+            total_us += int(match.group(1))
+    return packages, total_us / 1000
+
+
+@pytest.mark.parametrize("cli_args", [("--help",), ("--version",), ("generate", "--help")])
+def test_cli_startup_skips_heavy_imports(cli_args):
+    packages, total_ms = _import_profile(*cli_args)
+
+    assert not packages & HEAVY_MODULES, f"heavy modules imported at startup: {sorted(packages & HEAVY_MODULES)}"
+    assert total_ms < STARTUP_BUDGET_MS, f"imports took {total_ms:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms)"
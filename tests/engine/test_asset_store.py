@@ -0,0 +1,101 @@
+"""
+Tests for the content-addressed image store used during extraction.
+"""
+
+import os
+
+import pymupdf as fitz
+import pytest
+
+from pdfrebuilder.engine.asset_store import ContentAddressedAssetStore
+from pdfrebuilder.engine.document_parser import AssetManifest
+from pdfrebuilder.engine.extract_pdf_content_fitz import _process_image_block
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ContentAddressedAssetStore(str(tmp_path / "images"))
+
+
+def _png_bytes(color) -> bytes:
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 4, 4), False)
+    pix.set_rect(pix.irect, color)
+    return pix.tobytes("png")
+
+
+def test_identical_content_written_once(store):
+    data = _png_bytes((255, 0, 0))
+
+    first = store.put_bytes(data, "png")
+    second = store.put_bytes(data, "png")
+
+    assert first.path == second.path
+    assert first.written and not second.written
+    assert os.path.basename(first.path) == f"img_{first.content_hash}.png"
+    assert first.path.startswith(os.path.join(store.root_dir, first.content_hash[:2], first.content_hash[2:4]))
+    stats = store.get_statistics()
+    assert stats["writes"] == 1
+    assert stats["dedup_hits"] == 1
+    assert store.manifest.get_refcount(first.content_hash) == 2
+
+
+def test_existing_file_is_not_rewritten(store):
+    data = _png_bytes((0, 255, 0))
+    stored = store.put_bytes(data, "png")
+
+    other = ContentAddressedAssetStore(store.root_dir)
+    assert other.contains(stored.content_hash, "png")
+    assert not other.put_bytes(data, "png").written
+
+
+def test_manifest_refcounting():
+    manifest = AssetManifest()
+    manifest.add_image("a.png", content_hash="abc")
+    manifest.add_image("a.png", content_hash="abc")
+    manifest.add_image("b.png")
+
+    assert len(manifest.images) == 2
+    assert manifest.release_image("abc") == 1
+    assert manifest.release_image("abc") == 0
+    assert [image["path"] for image in manifest.to_dict()["images"]] == ["b.png"]
+
+
+def test_repeated_image_blocks_share_one_file(store):
+    block = {"image": _png_bytes((0, 0, 255)), "ext": "png", "bbox": (0, 0, 10, 10)}
+
+    elements = [_process_image_block(block, store.root_dir, f"image_{i}", store) for i in range(5)]
+
+    assert len({element.image_file for element in elements}) == 1
+    assert store.get_statistics()["writes"] == 1
+
+
+def test_document_scope_releases_its_references(store):
+    shared, own = _png_bytes((10, 10, 10)), _png_bytes((20, 20, 20))
+    outside = store.put_bytes(shared, "png")
+
+    with store.document_scope() as scope:
+        store.put_bytes(shared, "png")
+        store.put_bytes(shared, "png")
+        stored = store.put_bytes(own, "png")
+        assert scope.get_refcount(outside.content_hash) == 2
+        assert store.manifest.get_refcount(outside.content_hash) == 3
+
+    assert store.manifest.get_refcount(outside.content_hash) == 1
+    assert store.manifest.get_refcount(stored.content_hash) == 0
+    assert os.path.exists(stored.path)
+
+
+def test_repeated_extractions_do_not_accumulate_references(tmp_path):
+    from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+
+    doc = fitz.open()
+    doc.new_page().insert_image(fitz.Rect(0, 0, 50, 50), stream=_png_bytes((0, 128, 0)))
+    pdf = doc.tobytes()
+    doc.close()
+    store = ContentAddressedAssetStore(str(tmp_path / "images"))
+
+    for _ in range(3):
+        extract_pdf_content(pdf, asset_store=store)
+
+    assert store.manifest.images == []
+    assert store.get_statistics()["writes"] == 1
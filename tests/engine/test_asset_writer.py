@@ -0,0 +1,258 @@
+"""
+Tests for the background asset writer used during extraction.
+"""
+
+import io
+import os
+import threading
+
+import pymupdf as fitz
+import pytest
+from PIL import Image
+
+from pdfrebuilder.engine.asset_store import ContentAddressedAssetStore
+from pdfrebuilder.engine.asset_writer import (
+    AssetWriteError,
+    AssetWriteFailure,
+    BackgroundAssetWriter,
+    remove_failed_images,
+)
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.models.universal_idm import BoundingBox, ImageElement, Layer, LayerType, PageUnit, UniversalDocument
+from pdfrebuilder.settings import settings
+
+
+def _png_bytes(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _failing_produce() -> bytes:
+    raise OSError("disk full")
+
+
+def test_flush_waits_for_queued_writes(tmp_path):
+    release = threading.Event()
+
+    def slow_produce(index):
+        def produce():
+            release.wait(5)
+            return bytes([index]) * 10
+
+        return produce
+
+    with BackgroundAssetWriter(max_workers=2, max_queued=4, fsync=True) as writer:
+        for index in range(4):
+            writer.submit(str(tmp_path / "nested" / f"asset_{index}.bin"), slow_produce(index))
+        assert writer.get_statistics()["pending"] == 4
+        release.set()
+
+        assert writer.flush() == []
+        stats = writer.get_statistics()
+
+    assert stats["written"] == 4 and stats["pending"] == 0
+    assert stats["bytes_written"] == 40
+    assert sorted(p.name for p in (tmp_path / "nested").iterdir()) == [f"asset_{i}.bin" for i in range(4)]
+
+
+def test_failures_are_reported_per_asset(tmp_path):
+    writer = BackgroundAssetWriter(max_workers=1, fsync=False)
+    writer.submit(str(tmp_path / "ok.bin"), lambda: b"ok")
+    writer.submit(str(tmp_path / "bad.bin"), _failing_produce, label="image_3")
+
+    with pytest.raises(AssetWriteError, match="image_3") as excinfo:
+        writer.flush(raise_on_error=True)
+    writer.close()
+
+    [failure] = excinfo.value.failures
+    assert failure.path == str(tmp_path / "bad.bin")
+    assert isinstance(failure.error, OSError)
+    assert (tmp_path / "ok.bin").read_bytes() == b"ok"
+    assert not (tmp_path / "bad.bin").exists()
+
+
+def test_store_deduplicates_while_writes_are_queued(tmp_path):
+    store = ContentAddressedAssetStore(str(tmp_path / "images"))
+    data = _png_bytes((255, 0, 0))
+
+    with BackgroundAssetWriter(fsync=False) as writer:
+        first = store.put_bytes(data, "png", writer=writer)
+        second = store.put_bytes(data, "png", writer=writer)
+        writer.flush()
+
+    assert first.path == second.path
+    assert first.written and not second.written
+    assert store.get_statistics()["writes"] == 1
+    assert store.get_statistics()["bytes_written"] == len(data)
+    with open(first.path, "rb") as f:
+        assert f.read() == data
+
+
+def test_failed_write_releases_store_references(tmp_path):
+    # The store root sits under a regular file, so the writer thread cannot create it
+    (tmp_path / "blocker").write_text("")
+    store = ContentAddressedAssetStore(str(tmp_path / "blocker" / "images"))
+
+    with BackgroundAssetWriter(fsync=False) as writer:
+        stored = store.put_bytes(_png_bytes((0, 0, 255)), "png", writer=writer)
+        failures = writer.flush()
+
+    assert [failure.path for failure in failures] == [stored.path]
+    assert store.get_statistics()["writes"] == 0
+    assert store.manifest.get_refcount(stored.content_hash) == 0
+
+
+def test_image_paths_match_with_and_without_writer(tmp_path):
+    image = Image.new("RGB", (4, 4), (0, 128, 255))
+    sync_store = ContentAddressedAssetStore(str(tmp_path / "sync"))
+    async_store = ContentAddressedAssetStore(str(tmp_path / "async"))
+
+    sync_stored = sync_store.put_image(image, "png")
+    with BackgroundAssetWriter(fsync=False) as writer:
+        async_stored = async_store.put_image(image, "png", writer=writer)
+
+    assert async_stored.content_hash == sync_stored.content_hash
+    assert os.path.relpath(async_stored.path, tmp_path / "async") == os.path.relpath(
+        sync_stored.path, tmp_path / "sync"
+    )
+    with open(async_stored.path, "rb") as async_file, open(sync_stored.path, "rb") as sync_file:
+        assert async_file.read() == sync_file.read()
+
+
+def test_images_are_encoded_on_the_writer_threads(tmp_path, monkeypatch):
+    encoded_on = []
+    save = Image.Image.save
+
+    def recording_save(image, *args, **kwargs):
+        encoded_on.append(threading.current_thread().name)
+        return save(image, *args, **kwargs)
+
+    monkeypatch.setattr(Image.Image, "save", recording_save)
+    store = ContentAddressedAssetStore(str(tmp_path / "images"))
+    image = Image.new("RGB", (4, 4), (0, 128, 255))
+
+    with BackgroundAssetWriter(fsync=False) as writer:
+        first = store.put_image(image, "png", writer=writer)
+        second = store.put_image(image.copy(), "png", writer=writer)
+
+    # The repeat is recognised from its pixels without being encoded
+    assert first.path == second.path
+    assert len(encoded_on) == 1 and encoded_on[0].startswith("asset-writer")
+
+
+def test_failed_images_are_removed_from_document():
+    layer = Layer(layer_id="base", layer_name="Base", layer_type=LayerType.BASE, bbox=BoundingBox(0, 0, 100, 100))
+    layer.content = [
+        ImageElement(id="image_0", bbox=BoundingBox(0, 0, 10, 10), image_file="images/a.png"),
+        ImageElement(id="image_1", bbox=BoundingBox(0, 0, 10, 10), image_file="images/b.png"),
+    ]
+    document = UniversalDocument(document_structure=[PageUnit(size=(100, 100), layers=[layer])])
+    removed = remove_failed_images(document, [AssetWriteFailure(path="images/a.png", error=OSError())])
+
+    assert removed == 1
+    assert [element.id for element in layer.content] == ["image_1"]
+
+
+def test_async_extraction_matches_sync(tmp_path, monkeypatch):
+    doc = fitz.open()
+    for page_num in range(3):
+        page = doc.new_page()
+        page.insert_text((50, 50), f"Page {page_num}")
+        page.insert_image(fitz.Rect(100, 100, 200, 200), stream=_png_bytes((page_num * 80, 0, 0)))
+    pdf = tmp_path / "images.pdf"
+    doc.save(str(pdf))
+    doc.close()
+
+    monkeypatch.setattr(settings, "image_dir", str(tmp_path / "sync"))
+    sync_doc = extract_pdf_content(str(pdf))
+    monkeypatch.setattr(settings, "image_dir", str(tmp_path / "async"))
+    monkeypatch.setattr(settings.processing, "async_asset_writes", True)
+    async_doc = extract_pdf_content(str(pdf))
+
+    def files(root):
+        return sorted((p.relative_to(root).as_posix(), p.read_bytes()) for p in root.rglob("img_*") if p.is_file())
+
+    assert files(tmp_path / "sync") == files(tmp_path / "async")
+    assert len(files(tmp_path / "async")) == 3
+
+    def image_elements(document):
+        return [
+            (element.id, element.bbox.to_list())
+            for unit in document.document_structure
+            for element in unit.layers[0].content
+            if isinstance(element, ImageElement)
+        ]
+
+    assert image_elements(async_doc) == image_elements(sync_doc)
+
+
+def test_failed_extraction_closes_the_writer(tmp_path, monkeypatch):
+    from pdfrebuilder.engine import extract_pdf_content_fitz
+
+    doc = fitz.open()
+    for page_num in range(2):
+        doc.new_page().insert_image(fitz.Rect(0, 0, 50, 50), stream=_png_bytes((page_num * 80, 0, 0)))
+    pdf = tmp_path / "images.pdf"
+    doc.save(str(pdf))
+    doc.close()
+
+    store_image = extract_pdf_content_fitz._store_xref_image
+    calls = []
+
+    def fail_on_second_page(*args, **kwargs):
+        calls.append(None)
+        if len(calls) == 2:
+            raise RuntimeError("broken image")
+        return store_image(*args, **kwargs)
+
+    monkeypatch.setattr(settings, "image_dir", str(tmp_path / "images"))
+    monkeypatch.setattr(settings.processing, "async_asset_writes", True)
+    monkeypatch.setattr(extract_pdf_content_fitz, "_store_xref_image", fail_on_second_page)
+
+    with pytest.raises(RuntimeError, match="broken image"):
+        extract_pdf_content(str(pdf))
+
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("asset-writer")]
+
+
+class _FakeWandImage:
+    """The part of ``wand.image.Image`` the Wand extractor uses to store a layer"""
+
+    def __init__(self, color):
+        self.color = color
+        self.format = "png"
+        self.size = (4, 4)
+        self.alpha_channel = False
+        self.colorspace = "srgb"
+        self.signature = repr(color)
+        self.closed = False
+
+    def clone(self):
+        return _FakeWandImage(self.color)
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def make_blob(self, image_format):
+        return _png_bytes(self.color)
+
+
+def test_wand_layers_are_stored_through_the_writer(tmp_path):
+    from pdfrebuilder.engine.extract_wand_content import _extract_layer_as_image
+
+    store = ContentAddressedAssetStore(str(tmp_path / "images"))
+    with BackgroundAssetWriter(fsync=False) as writer:
+        first = _extract_layer_as_image(_FakeWandImage((255, 0, 0)), 0, "layer_0", [0, 0, 4, 4], {}, store, writer)
+        second = _extract_layer_as_image(_FakeWandImage((255, 0, 0)), 1, "layer_1", [0, 0, 4, 4], {}, store, writer)
+
+    assert first.image_file == second.image_file
+    with open(first.image_file, "rb") as f:
+        assert f.read() == _png_bytes((255, 0, 0))
+    assert store.get_statistics()["writes"] == 1
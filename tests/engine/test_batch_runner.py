@@ -0,0 +1,134 @@
+"""
+Tests for directory-scale batch modification with a resumable manifest.
+"""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from pdfrebuilder.engine import batch_runner
+from pdfrebuilder.engine.batch_runner import BatchManifest, BatchOperation, expand_batch_inputs, run_batch
+from pdfrebuilder.models.universal_idm import (
+    BoundingBox,
+    Color,
+    FontDetails,
+    Layer,
+    PageUnit,
+    TextElement,
+    UniversalDocument,
+)
+
+
+def _write_layout(path, text):
+    element = TextElement(
+        id="text_0",
+        bbox=BoundingBox(0, 0, 200, 20),
+        text=text,
+        font_details=FontDetails(name="Helvetica", size=12, color=Color(0, 0, 0)),
+    )
+    layer = Layer(layer_id="page_0_base_layer", layer_name="Page Content", content=[element])
+    document = UniversalDocument(document_structure=[PageUnit(size=(612, 792), layers=[layer])])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document.to_dict()))
+
+
+@pytest.fixture
+def layouts(tmp_path):
+    input_dir = tmp_path / "layouts"
+    for i in range(4):
+        _write_layout(input_dir / ("nested" if i % 2 else "") / f"doc_{i}.json", f"Hello OLD {i}")
+    return input_dir
+
+
+def _read_text(path):
+    data = json.loads(path.read_text())
+    return data["document_structure"][0]["layers"][0]["content"][0]["text"]
+
+
+def test_expand_batch_inputs_accepts_directories_and_globs(layouts):
+    assert len(expand_batch_inputs([str(layouts)])) == 4
+    assert len(expand_batch_inputs([str(layouts / "*.json")])) == 2
+
+
+def test_unknown_operation_rejected():
+    with pytest.raises(ValueError):
+        BatchOperation(kind="explode")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_replace(layouts, tmp_path, workers):
+    output_dir = tmp_path / "out"
+    operation = BatchOperation(kind="replace", replacements=[("OLD", "NEW")])
+
+    report = run_batch([str(layouts)], str(output_dir), operation, workers=workers)
+
+    assert report.processed == 4
+    assert report.failed == 0
+    assert _read_text(output_dir / "nested" / "doc_1.json") == "Hello NEW 1"
+
+    results = json.loads((output_dir / "batch_results.json").read_text())
+    assert results["summary"]["modified_elements"] == 4
+    assert len(results["files"]) == 4
+
+
+def test_run_batch_resumes_from_manifest(layouts, tmp_path):
+    output_dir = tmp_path / "out"
+    operation = BatchOperation(kind="replace", replacements=[("OLD", "NEW")])
+    run_batch([str(layouts)], str(output_dir), operation, workers=1)
+
+    # Touch one input: only that file should be redone
+    changed = layouts / "doc_0.json"
+    _write_layout(changed, "Hello OLD again")
+
+    with patch.object(batch_runner, "process_batch_file", wraps=batch_runner.process_batch_file) as process:
+        report = run_batch([str(layouts)], str(output_dir), operation, workers=1)
+
+    assert report.resumed == 3
+    assert report.processed == 1
+    assert process.call_count == 1
+    assert _read_text(output_dir / "doc_0.json") == "Hello NEW again"
+
+
+def test_manifest_appends_one_line_per_file_and_survives_a_torn_line(layouts, tmp_path, monkeypatch):
+    output_dir = tmp_path / "out"
+    operation = BatchOperation(kind="replace", replacements=[("OLD", "NEW")])
+    run_batch([str(layouts)], str(output_dir), operation, workers=1)
+    manifest_path = output_dir / "batch_manifest.jsonl"
+
+    lines = manifest_path.read_text().splitlines()
+    assert len(lines) == 5
+    assert json.loads(lines[0])["operation_signature"] == operation.signature()
+    assert {json.loads(line)["file"] for line in lines[1:]} == {str(path.resolve()) for path in layouts.rglob("*.json")}
+
+    # A crash mid-append leaves a partial last line; that file is redone and the rest resumed,
+    # also when the inputs are given relative to another working directory
+    manifest_path.write_text("\n".join(lines[:-1]) + "\n" + lines[-1][: len(lines[-1]) // 2])
+    monkeypatch.chdir(layouts)
+    report = run_batch(["."], str(output_dir), operation, workers=1)
+
+    assert (report.resumed, report.processed) == (3, 1)
+    assert len(manifest_path.read_text().splitlines()) == 5
+
+
+def test_manifest_from_other_operation_is_discarded(layouts, tmp_path):
+    output_dir = tmp_path / "out"
+    run_batch([str(layouts)], str(output_dir), BatchOperation(kind="replace", replacements=[("OLD", "NEW")]), workers=1)
+
+    other = BatchOperation(kind="replace", replacements=[("OLD", "OTHER")])
+    manifest = BatchManifest.load(output_dir / "batch_manifest.jsonl", other.signature())
+
+    assert manifest.entries == {}
+
+
+def test_failed_files_are_reported_and_retried(layouts, tmp_path):
+    (layouts / "broken.json").write_text("{not json")
+    output_dir = tmp_path / "out"
+    operation = BatchOperation(kind="replace", replacements=[("OLD", "NEW")])
+
+    report = run_batch([str(layouts)], str(output_dir), operation, workers=1)
+    assert report.failed == 1
+
+    report = run_batch([str(layouts)], str(output_dir), operation, workers=1)
+    assert report.resumed == 4
+    assert report.processed == 1
@@ -0,0 +1,87 @@
+"""
+Tests for pooled PDF engine instances and concurrent rendering.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pymupdf as fitz
+import pytest
+
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine.asset_store import InMemoryAssetStore
+from pdfrebuilder.engine.engine_pool import EnginePool, EnginePoolTimeout
+from pdfrebuilder.engine.engine_selector import PDFEngineSelector
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.pdf_engine_selector import lease_pdf_engine
+
+
+class _Engine:
+    pass
+
+
+def test_pool_reuses_instances_and_enforces_max_size():
+    pool = EnginePool(_Engine, max_size=2)
+
+    first, second = pool.checkout(), pool.checkout()
+    with pytest.raises(EnginePoolTimeout):
+        pool.checkout(timeout=0.01)
+    pool.checkin(first)
+
+    assert pool.checkout(timeout=0.01) is first
+    pool.checkin(second, discard=True)
+    assert pool.checkout(timeout=0.01) is not second
+    with pytest.raises(ValueError, match="not checked out"):
+        pool.checkin(_Engine())
+    assert pool.get_statistics()["created"] == 3
+
+
+def test_waiting_checkout_gets_returned_instance():
+    pool = EnginePool(_Engine, max_size=1)
+    engine = pool.checkout()
+    received = []
+
+    waiter = threading.Thread(target=lambda: received.append(pool.checkout(timeout=5)))
+    waiter.start()
+    while pool.get_statistics()["waits"] == 0:
+        time.sleep(0.001)
+    pool.checkin(engine)
+    waiter.join(5)
+
+    assert received == [engine]
+    assert pool.get_statistics()["waits"] == 1
+
+
+def test_get_engine_isolates_threads():
+    selector = PDFEngineSelector()
+    main_engine = selector.get_engine("pymupdf")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other_engine = executor.submit(selector.get_engine, "pymupdf").result()
+
+    assert selector.get_engine("pymupdf") is main_engine
+    assert other_engine is not main_engine
+
+
+def _layout(text: str) -> dict:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return extract_pdf_content(data, asset_store=InMemoryAssetStore()).to_dict()
+
+
+@pytest.mark.parametrize("engine_name", ["pymupdf", "reportlab"])
+def test_concurrent_renders_do_not_interfere(engine_name):
+    layouts = {f"Document {index}": _layout(f"Document {index}") for index in range(8)}
+
+    def render(text):
+        with lease_pdf_engine(engine_name, {}, timeout=30) as engine:
+            return text, recreate_pdf_from_layout(layouts[text], engine=engine, engine_config={})
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(render, layouts))
+
+    for text, output in results:
+        with fitz.open(stream=output, filetype="pdf") as result:
+            assert result[0].get_text().strip() == text
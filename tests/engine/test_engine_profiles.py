@@ -0,0 +1,199 @@
+"""
+Tests for benchmark-driven automatic engine selection.
+"""
+
+import json
+import time
+
+import pymupdf as fitz
+from typer.testing import CliRunner
+
+from pdfrebuilder.cli.main import app
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine.asset_store import InMemoryAssetStore
+from pdfrebuilder.engine.engine_profiles import (
+    DocumentFeatures,
+    EngineChoice,
+    EngineProfiles,
+    benchmark_engines,
+    choose_engine,
+    get_engine_profiles,
+)
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.pdf_engine_selector import choose_pdf_engine, get_default_pdf_engine
+
+ENGINES = {
+    "reportlab": {"text": True, "drawings": True, "images": True},
+    "pymupdf": {"text": True, "drawings": True, "images": True, "overlay_mode": True},
+}
+
+
+def _layout(pages=1, rects=0):
+    doc = fitz.open()
+    for index in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {index}")
+        for offset in range(rects):
+            page.draw_rect(fitz.Rect(100 + offset, 100, 200 + offset, 200), color=(0, 0, 1))
+    data = doc.tobytes()
+    doc.close()
+    return extract_pdf_content(data, asset_store=InMemoryAssetStore()).to_dict()
+
+
+def test_features_describe_layout():
+    text = DocumentFeatures.from_layout(_layout(pages=3))
+    assert (text.page_count, text.text_elements, text.image_elements) == (3, 3, 0)
+    assert text.profile_key == "pages:2-10/text"
+    assert text.required_features() == {"text"}
+
+    vector = DocumentFeatures.from_layout(_layout(rects=10), template="original.pdf")
+    assert vector.vector_elements >= 10
+    assert vector.profile_key == "pages:1/vector/template"
+    assert vector.required_features() == {"text", "drawings", "overlay_mode"}
+
+
+def test_profiles_predict_and_persist(tmp_path):
+    path = tmp_path / "profiles.json"
+    features = DocumentFeatures(page_count=2, text_elements=8)
+    profiles = EngineProfiles(path)
+    assert profiles.predict("reportlab", features) is None
+
+    profiles.record("reportlab", features, 0.5)
+    profiles.save()
+
+    reloaded = EngineProfiles(path)
+    assert reloaded.predict("reportlab", features) == 0.5
+    # Unmeasured buckets use the engine's overall throughput
+    assert reloaded.predict("reportlab", DocumentFeatures(page_count=20, image_elements=180)) == 10.0
+
+    path.write_text("not json")
+    assert EngineProfiles(path).get_profiles() == {}
+
+
+def test_choose_engine_picks_fastest_capable_engine(tmp_path):
+    profiles = EngineProfiles(tmp_path / "profiles.json")
+    plain = DocumentFeatures(page_count=1, text_elements=4)
+    overlay = DocumentFeatures(page_count=1, text_elements=4, template_overlay=True)
+
+    assert choose_engine(plain, ENGINES, profiles, "reportlab").engine == "reportlab"
+
+    profiles.record("reportlab", plain, 0.5)
+    profiles.record("pymupdf", plain, 0.1)
+    choice = choose_engine(plain, ENGINES, profiles, "reportlab")
+    assert (choice.engine, choice.predicted_seconds) == ("pymupdf", 0.1)
+
+    profiles.record("reportlab", overlay, 0.01)
+    assert choose_engine(overlay, ENGINES, profiles, "reportlab").engine == "pymupdf"
+
+
+def test_auto_render_uses_and_refines_profiles(tmp_path):
+    path = tmp_path / "profiles.json"
+    layout = _layout(pages=2)
+    features = DocumentFeatures.from_layout(layout)
+    profiles = EngineProfiles(path)
+    profiles.record("pymupdf", features, 0.001)
+    profiles.record("reportlab", features, 1.0)
+    profiles.save()
+    engine_config = {"default_engine": "auto", "auto": {"profiles_path": str(path)}}
+
+    assert choose_pdf_engine(layout, engine_config).engine == "pymupdf"
+    output = recreate_pdf_from_layout(layout, engine_config=engine_config)
+
+    with fitz.open(stream=output, filetype="pdf") as result:
+        assert result[1].get_text().strip() == "Page 1"
+    # The render only schedules the save
+    assert json.loads(path.read_text())["engines"]["pymupdf"][features.profile_key]["runs"] == 1
+    get_engine_profiles(str(path)).save()
+    saved = json.loads(path.read_text())["engines"]
+    assert saved["pymupdf"][features.profile_key]["runs"] == 2
+    assert saved["reportlab"][features.profile_key]["runs"] == 1
+
+
+def test_benchmark_builds_profiles_from_corpus(tmp_path):
+    corpus = tmp_path / "layout.json"
+    corpus.write_text(json.dumps(_layout(rects=5)))
+    profiles = EngineProfiles(tmp_path / "profiles.json")
+
+    results = benchmark_engines([str(corpus)], profiles, repeat=1)
+
+    assert sorted(result["engine"] for result in results) == ["pymupdf", "reportlab"]
+    saved = EngineProfiles(tmp_path / "profiles.json").get_profiles()
+    assert set(saved) == {"pymupdf", "reportlab"}
+
+
+def test_saves_from_several_processes_add_up(tmp_path):
+    path = tmp_path / "profiles.json"
+    features = DocumentFeatures(page_count=1, text_elements=4)
+    first, second = EngineProfiles(path), EngineProfiles(path)
+
+    first.record("reportlab", features, 0.5)
+    second.record("reportlab", features, 0.25)
+    second.record("pymupdf", features, 0.1)
+    first.save()
+    second.save()
+    first.save()
+
+    saved = EngineProfiles(path).get_profiles()
+    assert saved["reportlab"][features.profile_key]["runs"] == 2
+    assert saved["reportlab"][features.profile_key]["seconds"] == 0.75
+    assert saved["pymupdf"][features.profile_key]["runs"] == 1
+    # A save also picks up what the other process added
+    assert first.get_profiles() == saved
+
+
+def test_save_later_batches_renders_into_one_write(tmp_path):
+    path = tmp_path / "profiles.json"
+    features = DocumentFeatures(page_count=1, text_elements=4)
+    profiles = EngineProfiles(path, save_delay=0.05)
+
+    for _ in range(3):
+        profiles.record("reportlab", features, 0.1)
+        profiles.save_later()
+    assert not path.exists()
+
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert json.loads(path.read_text())["engines"]["reportlab"][features.profile_key]["runs"] == 3
+
+
+def _runs(profiles, engine):
+    return sum(profile["runs"] for profile in profiles.get_profiles().get(engine, {}).values())
+
+
+def test_cli_auto_renders_refine_profiles_incrementally_too(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.json"
+    monkeypatch.setattr("pdfrebuilder.engine.engine_profiles.default_profiles_path", lambda: path)
+    layout = _layout(pages=3)
+    config, output = tmp_path / "layout.json", tmp_path / "out.pdf"
+    command = ["generate", "--config", str(config), "--output", str(output), "--output-engine", "auto"]
+    profiles = get_engine_profiles(str(path))
+
+    config.write_text(json.dumps(layout))
+    result = CliRunner().invoke(app, [*command, "--incremental"])
+    assert result.exit_code == 0, result.output
+    engine = next(iter(profiles.get_profiles()))
+    assert _runs(profiles, engine) == 1
+
+    layout["document_structure"][1]["layers"][0]["content"][0]["text"] = "Changed"
+    config.write_text(json.dumps(layout))
+    result = CliRunner().invoke(app, [*command, "--incremental"])
+    assert result.exit_code == 0, result.output
+
+    # The incremental render re-renders and records only the changed page
+    assert _runs(profiles, engine) == 2
+    assert "pages:1/text" in profiles.get_profiles()[engine]
+
+
+def test_auto_render_records_the_engine_that_rendered(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.json"
+    monkeypatch.setattr(
+        "pdfrebuilder.core.recreate_pdf_from_config.choose_pdf_engine",
+        lambda *args: EngineChoice("no-such-engine", None, "test"),
+    )
+    engine_config = {"default_engine": "auto", "auto": {"profiles_path": str(path)}}
+
+    recreate_pdf_from_layout(_layout(), engine_config=engine_config)
+
+    # The chosen engine could not be created, so the default engine rendered
+    assert set(get_engine_profiles(str(path)).get_profiles()) == {get_default_pdf_engine(engine_config).engine_name}
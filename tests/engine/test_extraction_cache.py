@@ -0,0 +1,94 @@
+"""
+Tests for incremental re-extraction through the page extraction cache.
+"""
+
+import pymupdf as fitz
+import pytest
+
+from pdfrebuilder.engine.document_parser import parse_document
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.extraction_cache import ExtractionCache
+from pdfrebuilder.settings import settings
+
+
+def _write_pdf(path, texts):
+    doc = fitz.open()
+    for text in texts:
+        page = doc.new_page()
+        page.insert_text((50, 50), text)
+        page.draw_rect(fitz.Rect(40, 100, 200, 160), color=(0, 0, 1), fill=(1, 1, 0))
+    doc.save(str(path))
+    doc.close()
+
+
+@pytest.fixture(autouse=True)
+def image_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_dir", str(tmp_path / "images"))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(tmp_path / "cache")
+
+
+def test_unchanged_document_is_served_from_cache(tmp_path, cache):
+    pdf = tmp_path / "catalogue.pdf"
+    _write_pdf(pdf, ["Page A", "Page B", "Page C"])
+
+    first = extract_pdf_content(str(pdf), cache=cache)
+    second = extract_pdf_content(str(pdf), cache=cache)
+
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert second.to_dict() == first.to_dict()
+
+
+def test_only_edited_pages_are_reextracted(tmp_path, cache):
+    pdf = tmp_path / "catalogue.pdf"
+    _write_pdf(pdf, ["Page A", "Page B", "Page C"])
+    extract_pdf_content(str(pdf), cache=cache)
+
+    _write_pdf(pdf, ["Page A", "Page B edited", "Page C"])
+    document = extract_pdf_content(str(pdf), cache=cache)
+
+    assert cache.hits == 2
+    assert cache.misses == 4
+    texts = [el.text for el in document.document_structure[1].layers[0].content if el.type.value == "text"]
+    assert texts == ["Page B edited"]
+
+
+def test_moved_pages_are_renumbered(tmp_path, cache):
+    pdf = tmp_path / "catalogue.pdf"
+    _write_pdf(pdf, ["Page A", "Page B"])
+    extract_pdf_content(str(pdf), cache=cache)
+
+    _write_pdf(pdf, ["Cover", "Page A", "Page B"])
+    document = extract_pdf_content(str(pdf), cache=cache)
+
+    assert cache.hits == 2
+    page = document.document_structure[2]
+    assert page.page_number == 2
+    assert page.layers[0].layer_id == "page_2_base_layer"
+
+
+def test_extraction_flags_are_part_of_the_key(tmp_path, cache):
+    pdf = tmp_path / "catalogue.pdf"
+    _write_pdf(pdf, ["Page A"])
+    extract_pdf_content(str(pdf), cache=cache)
+
+    flags = {"include_text": False, "include_images": True, "include_drawings": True}
+    document = extract_pdf_content(str(pdf), extraction_flags=flags, cache=cache)
+
+    assert cache.hits == 0
+    assert all(el.type.value != "text" for el in document.document_structure[0].layers[0].content)
+
+
+def test_cache_passed_to_one_parse_leaves_settings_alone(tmp_path, cache):
+    pdf = tmp_path / "catalogue.pdf"
+    _write_pdf(pdf, ["Page A", "Page B"])
+
+    parse_document(str(pdf), cache=cache)
+    parse_document(str(pdf), cache=cache)
+    parse_document(str(pdf))
+
+    assert settings.processing.extraction_cache is False
+    assert (cache.hits, cache.misses) == (2, 2)
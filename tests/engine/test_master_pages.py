@@ -0,0 +1,245 @@
+"""
+Tests for master-page detection and shared-layer rendering.
+"""
+
+import json
+
+import pymupdf as fitz
+
+from pdfrebuilder.core.generate_debug_pdf_layers import generate_debug_pdf_layers
+from pdfrebuilder.core.pdf_engine import FitzPDFEngine
+from pdfrebuilder.engine.batch_modifier import BatchModifier
+from pdfrebuilder.engine.master_pages import detect_master_content
+from pdfrebuilder.engine.reportlab_engine import ReportLabEngine
+from pdfrebuilder.font.font_validator import FontValidator
+from pdfrebuilder.models.schema_validator import SchemaValidator
+from pdfrebuilder.models.universal_idm import (
+    BoundingBox,
+    Color,
+    DrawingCommand,
+    DrawingElement,
+    FontDetails,
+    Layer,
+    LayerType,
+    PageUnit,
+    TextElement,
+    UniversalDocument,
+)
+
+
+def _text(element_id, text, y):
+    return TextElement(
+        id=element_id,
+        bbox=BoundingBox(50, y, 300, y + 15),
+        text=text,
+        font_details=FontDetails(name="Helvetica", size=10, color=Color(0, 0, 0)),
+    )
+
+
+def _frame(element_id):
+    rect = BoundingBox(20, 20, 592, 772)
+    return DrawingElement(
+        id=element_id,
+        bbox=rect,
+        color=Color(0, 0, 1),
+        drawing_commands=[DrawingCommand(cmd="rect", bbox=rect)],
+    )
+
+
+def _document(page_count=6):
+    pages = []
+    for i in range(page_count):
+        content = [_text(f"text_{i}_body", f"Body of page {i}", 300)]
+        content.insert(0, _text(f"text_{i}_header", "ACME Corp Quarterly Report", 40))
+        if i > 0:  # cover page has no frame
+            content.insert(0, _frame(f"drawing_{i}"))
+        layer = Layer(layer_id=f"page_{i}_base_layer", layer_name="Page Content", content=content)
+        pages.append(PageUnit(size=(612, 792), layers=[layer], page_number=i))
+    return UniversalDocument(document_structure=pages)
+
+
+def test_repeated_content_is_hoisted_by_page_set():
+    document = _document()
+
+    stats = detect_master_content(document)
+
+    assert stats == {"shared_layers": 2, "hoisted_elements": 2, "removed_occurrences": 11}
+    assert all(layer.layer_type == LayerType.MASTER for layer in document.shared_layers)
+    cover, inner = document.document_structure[0], document.document_structure[1]
+    # The frame is drawn before the header it overlaps, so its shared layer comes first
+    assert isinstance(document.shared_layers[0].content[0], DrawingElement)
+    assert cover.shared_layer_refs == ["master_1"]
+    assert inner.shared_layer_refs == ["master_0", "master_1"]
+    assert [element.text for element in inner.layers[0].content] == ["Body of page 1"]
+
+
+def _highlight(element_id, page_idx):
+    rect = BoundingBox(40, 35, 320, 60)
+    return DrawingElement(
+        id=element_id,
+        bbox=rect,
+        fill=Color(1, 1, page_idx / 10),
+        drawing_commands=[DrawingCommand(cmd="rect", bbox=rect)],
+    )
+
+
+def test_repeated_content_drawn_over_page_content_stays_on_the_page():
+    document = _document(page_count=4)
+    for i, page in enumerate(document.document_structure):
+        page.layers[0].content.insert(0, _highlight(f"highlight_{i}", i))
+        page.layers[0].content.append(_text(f"text_{i}_footer", "Confidential", 775))
+
+    detect_master_content(document)
+
+    # A page-specific highlight under the header would end up on top of a hoisted header
+    hoisted = [element for layer in document.shared_layers for element in layer.content]
+    assert [element.text for element in hoisted if isinstance(element, TextElement)] == ["Confidential"]
+    for i, page in enumerate(document.document_structure):
+        texts = [element.text for element in page.layers[0].content if isinstance(element, TextElement)]
+        assert texts == ["ACME Corp Quarterly Report", f"Body of page {i}"]
+
+
+def test_short_documents_are_left_alone():
+    document = _document(page_count=2)
+
+    assert detect_master_content(document)["shared_layers"] == 0
+    assert not document.shared_layers
+
+
+def test_shared_layers_round_trip_and_validate():
+    document = _document()
+    detect_master_content(document)
+    data = document.to_dict()
+
+    restored = UniversalDocument.from_dict(data)
+
+    assert restored.to_dict() == data
+    _, errors = SchemaValidator().validate_document(data)
+    assert not [error for error in errors if "shared" in error]
+
+    data["document_structure"][0]["shared_layer_refs"] = ["missing"]
+    valid, errors = SchemaValidator().validate_document(data)
+    assert not valid
+    assert any("unknown shared layer: missing" in error for error in errors)
+
+
+def test_documents_without_shared_layers_serialize_unchanged():
+    data = _document().to_dict()
+
+    assert "shared_layers" not in data
+    assert "shared_layer_refs" not in data["document_structure"][0]
+
+
+def _page_texts(path):
+    with fitz.open(path) as doc:
+        return [page.get_text() for page in doc]
+
+
+def test_fitz_engine_places_shared_layer_on_every_page(tmp_path):
+    document = _document()
+    detect_master_content(document)
+    output = tmp_path / "out.pdf"
+
+    FitzPDFEngine().generate(document.to_dict(), str(output))
+
+    texts = _page_texts(output)
+    assert all("ACME Corp Quarterly Report" in text for text in texts)
+    assert all(f"Body of page {i}" in text for i, text in enumerate(texts))
+    with fitz.open(output) as doc:
+        assert len(doc[1].get_drawings()) == 1
+        assert doc[0].get_drawings() == []
+
+
+def test_reportlab_engine_defines_shared_layer_once(tmp_path):
+    document = _document()
+    detect_master_content(document)
+    output = tmp_path / "out.pdf"
+
+    ReportLabEngine().render(document, str(output))
+
+    texts = _page_texts(output)
+    assert all("ACME Corp Quarterly Report" in text for text in texts)
+    with fitz.open(output) as doc:
+        form_names = {xobject[1] for page in doc for xobject in page.get_xobjects()}
+    assert form_names == {"FormXob.shared_master_0", "FormXob.shared_master_1"}
+
+
+def _header_text(document):
+    return {
+        element.text
+        for layer in document.shared_layers
+        for element in layer.content
+        if isinstance(element, TextElement)
+    }
+
+
+def test_batch_replacement_reaches_shared_layers():
+    document = _document()
+    detect_master_content(document)
+
+    result = BatchModifier().batch_text_replacement(document, [("ACME", "Globex")], validate_fonts=False)
+
+    assert result.modified_elements == 1
+    assert _header_text(document) == {"Globex Corp Quarterly Report"}
+
+
+def test_page_filtered_replacement_only_changes_the_selected_pages():
+    document = _document()
+    detect_master_content(document)
+    header_layer = document.document_structure[0].shared_layer_refs[-1]
+
+    BatchModifier().batch_text_replacement(document, [("ACME", "Globex")], page_numbers=[2], validate_fonts=False)
+
+    assert _header_text(document) == {"ACME Corp Quarterly Report", "Globex Corp Quarterly Report"}
+    shared = {layer.layer_id: layer for layer in document.shared_layers}
+    for page in document.document_structure:
+        texts = {
+            element.text
+            for ref in page.shared_layer_refs
+            for element in shared[ref].content
+            if isinstance(element, TextElement)
+        }
+        assert texts == {"Globex Corp Quarterly Report" if page.page_number == 2 else "ACME Corp Quarterly Report"}
+        assert (header_layer in page.shared_layer_refs) == (page.page_number != 2)
+
+
+def test_unmatched_page_filtered_replacement_leaves_shared_layers_alone():
+    document = _document()
+    detect_master_content(document)
+    before = document.to_dict()
+
+    BatchModifier().batch_text_replacement(document, [("Nothing", "Else")], page_numbers=[2], validate_fonts=False)
+
+    assert document.to_dict() == before
+
+
+def test_font_validation_includes_shared_layers(tmp_path):
+    document = _document()
+    for page in document.document_structure:
+        page.layers[0].content[-2].font_details.name = "HeaderFont"
+    detect_master_content(document)
+
+    batch_result = BatchModifier().validate_document_fonts(document, check_licensing=False)
+    config_result = FontValidator(str(tmp_path)).validate_document_fonts(document.to_dict())
+
+    assert "HeaderFont" in batch_result["fonts_used"]
+    assert {"element_id": "master_1_0", "page_number": None} == {
+        key: value
+        for key, value in batch_result["elements_with_issues"][0].items()
+        if key in ("element_id", "page_number")
+    }
+    assert "HeaderFont" in config_result.fonts_required
+
+
+def test_debug_layers_include_shared_layers(tmp_path):
+    document = _document(page_count=3)
+    detect_master_content(document, min_pages=2)
+    assert not any(page.layers[0].content[:-1] for page in document.document_structure)
+    config, output = tmp_path / "layout.json", tmp_path / "debug.pdf"
+    config.write_text(json.dumps(document.to_dict()))
+
+    assert generate_debug_pdf_layers(str(config), str(output))
+
+    # Each page's hoisted header, the body of every page and the frames of pages 1 and 2
+    with fitz.open(output) as doc:
+        assert len(doc) == 8
@@ -0,0 +1,133 @@
+"""
+Tests for the metrics registry and its OpenMetrics, textfile and JSON-lines exports.
+"""
+
+import json
+
+import pymupdf as fitz
+from typer.testing import CliRunner
+
+from pdfrebuilder.cli.main import app
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine.asset_store import InMemoryAssetStore
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.metrics_export import (
+    MetricFamily,
+    MetricsRegistry,
+    create_default_registry,
+    json_lines,
+    merge_families,
+    render_text,
+    write_textfile,
+)
+from pdfrebuilder.engine.performance_metrics import get_performance_collector
+from pdfrebuilder.security.subprocess_utils import get_security_monitor
+
+
+def _samples(families, name):
+    return {
+        tuple(sorted(labels.items())): value
+        for family in families
+        for sample, labels, value in family.samples
+        if sample == name
+    }
+
+
+def test_openmetrics_and_textfile_formats(tmp_path):
+    registry = MetricsRegistry()
+    registry.counter("jobs", "Jobs run", ("status",)).inc(2, status="ok")
+    histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    text = render_text(registry.collect())
+    assert '# TYPE jobs counter\njobs_total{status="ok"} 2.0\n' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1.0\nlatency_seconds_bucket{le="1.0"} 2.0\n' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3.0\nlatency_seconds_count 3.0\nlatency_seconds_sum 5.55\n' in text
+    assert text.endswith("# EOF\n")
+
+    path = tmp_path / "metrics.prom"
+    write_textfile(registry.collect(), str(path))
+    textfile = path.read_text()
+    assert "# TYPE jobs_total counter\n" in textfile
+    assert "# EOF" not in textfile
+
+
+def test_json_lines_have_one_sample_per_line():
+    registry = MetricsRegistry()
+    registry.gauge("ratio", "A ratio", ("kind",)).set(0.25, kind="a")
+
+    records = [json.loads(line) for line in json_lines(registry.collect(), timestamp=10.0).splitlines()]
+
+    assert records == [{"labels": {"kind": "a"}, "metric": "ratio", "timestamp": 10.0, "type": "gauge", "value": 0.25}]
+
+
+def test_worker_families_are_merged_with_labels():
+    family = MetricFamily("renders", "counter", "Renders", [("renders_total", {"engine": "a"}, 1.0)])
+    restored = MetricFamily.from_dict(json.loads(json.dumps(family.to_dict())))
+
+    merged = merge_families([restored.with_labels(worker="1"), family.with_labels(worker="2")])
+
+    assert len(merged) == 1
+    assert [labels["worker"] for _, labels, _ in merged[0].samples] == ["1", "2"]
+
+
+def test_rendering_and_subprocess_metrics_are_aggregated():
+    doc = fitz.open()
+    for index in range(2):
+        doc.new_page().insert_text((72, 72), f"Page {index}")
+    layout = extract_pdf_content(doc.tobytes(), asset_store=InMemoryAssetStore()).to_dict()
+    doc.close()
+    registry = create_default_registry()
+    get_performance_collector().clear_history()
+
+    recreate_pdf_from_layout(layout, engine_name="reportlab", engine_config={})
+    first = registry.collect()
+    recreate_pdf_from_layout(layout, engine_name="reportlab", engine_config={})
+    get_security_monitor().metrics.record_command_execution(["true"], True, 0.02)
+    families = registry.collect()
+
+    assert _samples(first, "pdfrebuilder_pages_rendered_total")[(("engine", "reportlab"),)] == 2
+    assert _samples(families, "pdfrebuilder_pages_rendered_total")[(("engine", "reportlab"),)] == 4
+    assert _samples(families, "pdfrebuilder_pages_per_second")[(("engine", "reportlab"),)] > 0
+    assert _samples(families, "pdfrebuilder_page_render_duration_seconds_count")[(("engine", "reportlab"),)] == 4
+    assert _samples(families, "pdfrebuilder_subprocess_duration_seconds_count")[()] >= 1
+    cache_hits = _samples(families, "pdfrebuilder_cache_hits_total")
+    assert (("cache", "reportlab_fonts"),) in cache_hits
+
+
+def test_source_totals_are_exported_as_counters_that_survive_resets():
+    monitor = get_security_monitor()
+    monitor.metrics.reset_metrics()
+    registry = create_default_registry()
+    metrics = monitor.metrics
+    metrics.record_command_execution(["true"], True, 0.01)
+    metrics.record_command_execution(["false"], True, 0.01, outcome="failed")
+    metrics.record_command_execution(["rm"], False, 0.0, outcome="blocked")
+    first = registry.collect()
+
+    metrics.reset_metrics()
+    metrics.record_command_execution(["true"], True, 0.01)
+    families = registry.collect()
+
+    commands = {family.name: family for family in families}["pdfrebuilder_subprocess_commands"]
+    assert commands.type == "counter"
+    assert _samples(first, "pdfrebuilder_subprocess_commands_total") == {
+        (("result", "blocked"),): 1,
+        (("result", "failed"),): 1,
+        (("result", "success"),): 1,
+    }
+    assert _samples(families, "pdfrebuilder_subprocess_commands_total")[(("result", "success"),)] == 2
+    assert {family.name: family.type for family in families}["pdfrebuilder_cache_hits"] == "counter"
+
+
+def test_cli_writes_metrics_after_the_command(tmp_path):
+    textfile, jsonl = tmp_path / "cli.prom", tmp_path / "cli.jsonl"
+
+    result = CliRunner().invoke(
+        app, ["--metrics-textfile", str(textfile), "--metrics-jsonl", str(jsonl), "generate", "--help"]
+    )
+
+    assert result.exit_code == 0
+    assert textfile.exists()
+    assert jsonl.exists()
@@ -0,0 +1,210 @@
+"""
+Tests for the compact path encoding of extracted drawings.
+"""
+
+import pymupdf as fitz
+import pytest
+
+from pdfrebuilder.core.pdf_engine import FitzPDFEngine
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.path_encoding import (
+    build_reportlab_path,
+    commands_to_path,
+    encode_drawing_items,
+    pdf_path_operators,
+)
+from pdfrebuilder.engine.pymupdf_engine import PyMuPDFEngine
+from pdfrebuilder.engine.reportlab_engine import ReportLabEngine
+from pdfrebuilder.models.schema_validator import SchemaValidator
+from pdfrebuilder.models.universal_idm import (
+    BoundingBox,
+    DrawingCommand,
+    DrawingElement,
+    Layer,
+    LayerType,
+    PageUnit,
+    PathData,
+    UniversalDocument,
+)
+from pdfrebuilder.settings import settings
+
+
+def _write_vector_pdf(path):
+    doc = fitz.open()
+    page = doc.new_page()
+    shape = page.new_shape()
+    shape.draw_line((50, 50), (150, 50))
+    shape.draw_line((150, 50), (150, 120))
+    shape.draw_bezier((150, 120), (120, 160), (80, 160), (50, 120))
+    shape.finish(color=(1, 0, 0), fill=(0, 1, 0), closePath=True)
+    shape.draw_rect(fitz.Rect(200, 200, 300, 260))
+    shape.finish(color=None, fill=(0, 0, 1))
+    shape.commit()
+    doc.save(str(path))
+    doc.close()
+
+
+def _geometry(pdf_path):
+    with fitz.open(pdf_path) as doc:
+        return [
+            (tuple(round(v) for v in drawing["rect"]), [item[0] for item in drawing["items"]], drawing["fill"])
+            for drawing in doc[0].get_drawings()
+        ]
+
+
+@pytest.fixture(autouse=True)
+def image_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_dir", str(tmp_path / "images"))
+
+
+def test_drawing_items_are_encoded_as_opcodes_and_flat_coordinates():
+    items = [
+        ("l", fitz.Point(0, 0), fitz.Point(10, 0)),
+        ("c", fitz.Point(10, 0), fitz.Point(12, 3), fitz.Point(12, 7), fitz.Point(10, 10)),
+        ("l", fitz.Point(20, 20), fitz.Point(30, 20)),
+        ("re", fitz.Rect(1, 2, 3, 4), 1),
+        ("qu", fitz.Rect(5, 5, 6, 6).quad),
+    ]
+
+    path = encode_drawing_items(items, close_path=True)
+
+    assert path.ops == "MLCMLRMLLLZ"
+    assert path.coords[:4] == [0, 0, 10, 0]
+    assert path.is_valid()
+
+
+def test_path_operators_map_coordinates_through_the_matrix():
+    path = PathData(ops="MLCRZ", coords=[0, 0, 10, 0, 1, 1, 2, 2, 3, 3, 0, 10, 5, 5])
+
+    ops = pdf_path_operators(path, (1, 0, 0, -1, 0, 100))
+
+    assert ops == "0 100 m\n10 100 l\n1 99 2 98 3 97 c\n0 90 5 5 re\nh\n"
+
+
+def test_reportlab_path_flips_y():
+    calls = []
+
+    class Recorder:
+        def __getattr__(self, name):
+            return lambda *args: calls.append((name, args))
+
+    build_reportlab_path(Recorder(), PathData(ops="MLR", coords=[0, 0, 10, 0, 5, 5, 15, 25]), 100)
+
+    assert calls == [("moveTo", (0, 100)), ("lineTo", (10, 100)), ("rect", (5, 75, 10, 20))]
+
+
+def test_extraction_emits_compact_paths_that_round_trip(tmp_path):
+    source = tmp_path / "vector.pdf"
+    _write_vector_pdf(source)
+
+    document = extract_pdf_content(str(source))
+    drawings = [e for e in document.document_structure[0].layers[0].content if isinstance(e, DrawingElement)]
+
+    # MuPDF reports the closing segment of the first shape as an explicit line
+    assert [d.path.ops for d in drawings] == ["MLLCL", "R"]
+    assert all(d.drawing_commands == [] for d in drawings)
+    data = document.to_dict()
+    assert DrawingElement.from_dict(drawings[0].to_dict()).path == drawings[0].path
+    assert not [error for error in SchemaValidator().validate_document(data)[1] if "path" in error]
+
+    output = tmp_path / "rebuilt.pdf"
+    FitzPDFEngine().generate(data, str(output))
+    # The fitz renderer commits vectors with overlay=False, which reverses their stacking order
+    assert sorted(_geometry(output)) == sorted(_geometry(source))
+
+
+def test_reportlab_renders_compact_paths(tmp_path):
+    source = tmp_path / "vector.pdf"
+    _write_vector_pdf(source)
+    document = extract_pdf_content(str(source))
+    output = tmp_path / "reportlab.pdf"
+
+    ReportLabEngine().render(document, str(output))
+
+    assert _geometry(output) == _geometry(source)
+
+
+def test_pymupdf_engine_leaves_open_paths_open(tmp_path):
+    layer = Layer(layer_id="base", layer_name="Base", layer_type=LayerType.BASE, bbox=BoundingBox(0, 0, 595, 842))
+    layer.content = [
+        DrawingElement(
+            id="open",
+            bbox=[50, 50, 150, 120],
+            color=[1, 0, 0],
+            path=PathData(ops="MLL", coords=[50, 50, 150, 50, 150, 120]),
+        ),
+        DrawingElement(
+            id="closed",
+            bbox=[200, 50, 300, 120],
+            color=[0, 0, 1],
+            path=PathData(ops="MLLZ", coords=[200, 50, 300, 50, 300, 120]),
+        ),
+    ]
+    output = tmp_path / "open.pdf"
+
+    engine = PyMuPDFEngine()
+    engine.initialize({})
+    engine.render(UniversalDocument(document_structure=[PageUnit(size=(595, 842), layers=[layer])]), str(output))
+
+    with fitz.open(output) as doc:
+        drawings = sorted(doc[0].get_drawings(), key=lambda drawing: drawing["rect"].x0)
+    # MuPDF reports an explicit close as one more line segment back to the start
+    assert [[item[0] for item in drawing["items"]] for drawing in drawings] == [["l", "l"], ["l", "l", "l"]]
+    assert not any(drawing["closePath"] for drawing in drawings)
+
+
+def test_invalid_path_is_reported():
+    element = {"id": "d", "type": "drawing", "bbox": [0, 0, 1, 1], "path": {"ops": "ML", "coords": [0, 0]}}
+
+    errors = SchemaValidator()._validate_drawing_element(element, "element d")
+
+    assert errors == ["element d path has unknown opcodes or a coordinate count that does not match its ops"]
+
+
+def test_drawing_commands_are_converted_to_one_path():
+    commands = [
+        DrawingCommand(cmd="M", pts=[[0, 0]]),
+        DrawingCommand(cmd="L", pts=[[0, 0], [10, 0]]),
+        DrawingCommand(cmd="C", pts=[10, 0, 12, 3, 12, 7, 10, 10]),
+        DrawingCommand(cmd="L", pts=[0, 10]),
+        DrawingCommand(cmd="H"),
+        DrawingCommand(cmd="C", pts=[1, 1, 2, 2, 3, 3]),
+        DrawingCommand(cmd="rect", bbox=BoundingBox(20, 20, 30, 40)),
+        DrawingCommand(cmd="ellipse", bbox=BoundingBox(0, 0, 10, 20)),
+        DrawingCommand(cmd="arc", pts=[1, 2]),
+    ]
+
+    path = commands_to_path(commands)
+
+    assert path.ops == "MLCLZCRMCCCCZ"
+    assert path.coords[:8] == [0, 0, 10, 0, 12, 3, 12, 7]
+    assert path.coords[-2:] == [10, 10]  # The ellipse closes at its rightmost point
+    assert path.is_valid()
+
+
+def test_reportlab_draws_drawing_commands_as_a_single_path(tmp_path):
+    commands = [
+        {"cmd": "M", "pts": [50, 50]},
+        {"cmd": "L", "pts": [150, 50]},
+        {"cmd": "L", "pts": [150, 120]},
+        {"cmd": "C", "pts": [120, 160, 80, 160, 50, 120]},
+        {"cmd": "H"},
+        {"cmd": "rect", "bbox": [200, 200, 300, 260]},
+    ]
+    layer = Layer(layer_id="base", layer_name="Base", layer_type=LayerType.BASE, bbox=BoundingBox(0, 0, 595, 842))
+    layer.content = [
+        DrawingElement(
+            id="d", bbox=[50, 50, 300, 260], color=[1, 0, 0], fill=[0, 1, 0], drawing_commands=commands, width=2
+        )
+    ]
+    output = tmp_path / "commands.pdf"
+
+    ReportLabEngine().render(
+        UniversalDocument(document_structure=[PageUnit(size=(595, 842), layers=[layer])]), str(output)
+    )
+
+    with fitz.open(output) as doc:
+        [drawing] = doc[0].get_drawings()
+    assert [item[0] for item in drawing["items"]] == ["l", "l", "c", "l", "re"]
+    assert drawing["type"] == "fs" and drawing["fill"] == (0.0, 1.0, 0.0)
+    assert tuple(round(v) for v in drawing["rect"]) == (50, 50, 300, 260)
@@ -0,0 +1,77 @@
+"""
+Tests for per-document image extraction by xref in the fitz extractor.
+"""
+
+import io
+from unittest.mock import patch
+
+import pymupdf as fitz
+import pytest
+from PIL import Image
+
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.settings import settings
+
+
+def _image_bytes(color, fmt) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    logo = _image_bytes((255, 0, 0), "PNG")
+    photo = _image_bytes((0, 0, 255), "JPEG")
+    doc = fitz.open()
+    for page_num in range(3):
+        page = doc.new_page()
+        page.insert_text((50, 50), f"Heading {page_num}")
+        page.insert_image(fitz.Rect(100, 100, 200, 200), stream=logo)
+        page.insert_text((50, 300), "Body")
+        page.insert_image(fitz.Rect(300, 300, 400, 400), stream=photo)
+    path = tmp_path / "images.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+@pytest.fixture
+def image_dir(tmp_path, monkeypatch):
+    path = tmp_path / "images"
+    monkeypatch.setattr(settings, "image_dir", str(path))
+    return path
+
+
+def _elements(document, page_num):
+    return document.document_structure[page_num].layers[0].content
+
+
+def test_each_xref_extracted_once(pdf_path, image_dir):
+    with patch.object(
+        fitz.Document, "extract_image", autospec=True, side_effect=fitz.Document.extract_image
+    ) as extract_image:
+        document = extract_pdf_content(pdf_path)
+
+    assert extract_image.call_count == 2
+    image_files = {el.image_file for page in range(3) for el in _elements(document, page) if el.type.value == "image"}
+    assert len(image_files) == 2
+    assert len([p for p in image_dir.rglob("img_*") if p.is_file()]) == 2
+
+
+def test_jpeg_stream_passthrough_and_placement(pdf_path, image_dir):
+    document = extract_pdf_content(pdf_path)
+    images = [el for el in _elements(document, 1) if el.type.value == "image"]
+
+    assert [image.original_format for image in images] == ["png", "jpeg"]
+    assert images[1].bbox.to_list() == [300.0, 300.0, 400.0, 400.0]
+    assert images[1].transformation_matrix[0] == pytest.approx(100.0)
+    with open(images[1].image_file, "rb") as f:
+        assert f.read(2) == b"\xff\xd8"
+
+
+def test_element_ids_follow_content_order(pdf_path, image_dir):
+    document = extract_pdf_content(pdf_path)
+    ids = sorted(el.id for el in _elements(document, 0))
+
+    assert ids == ["image_1", "image_3", "text_0", "text_2"]
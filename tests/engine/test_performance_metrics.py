@@ -0,0 +1,124 @@
+"""
+Tests for resource sampling and stage spans in the performance collector.
+"""
+
+import json
+import time
+
+import pymupdf as fitz
+import pytest
+
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine.asset_store import InMemoryAssetStore
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.performance_metrics import PerformanceCollector, get_performance_collector
+
+MB = 1024 * 1024
+
+
+def test_peak_memory_is_sampled_during_rendering():
+    collector = PerformanceCollector(sample_interval=0.005)
+
+    with collector.measure_rendering("test"):
+        data = b"x" * (64 * MB)
+        time.sleep(0.1)
+        del data
+
+    metrics = collector.get_latest_metrics()
+    assert metrics.memory_peak - max(metrics.memory_start, metrics.memory_end) > 32 * MB
+    assert len(metrics.memory_samples) > 2
+    assert metrics.memory_samples[0]["t"] < metrics.memory_samples[-1]["t"]
+
+
+def test_sampler_timeline_is_bounded():
+    collector = PerformanceCollector(sample_interval=0.001, max_samples=8)
+
+    with collector.measure_rendering("test"):
+        time.sleep(0.1)
+
+    assert len(collector.get_latest_metrics().memory_samples) <= 8
+
+
+def test_history_is_bounded_and_new_metrics_are_tracked_by_position():
+    collector = PerformanceCollector(sample_interval=0, max_history=3)
+
+    for index in range(2):
+        with collector.measure_rendering(f"run{index}"):
+            pass
+    new, position = collector.get_metrics_since(0)
+    assert [m.engine_name for m in new] == ["run0", "run1"]
+
+    for index in range(2, 7):
+        with collector.measure_rendering(f"run{index}"):
+            pass
+
+    assert [m.engine_name for m in collector.get_metrics_history()] == ["run4", "run5", "run6"]
+    new, position = collector.get_metrics_since(position)
+    assert [m.engine_name for m in new] == ["run4", "run5", "run6"]
+    collector.clear_history()
+    with collector.measure_rendering("run7"):
+        pass
+    assert [m.engine_name for m in collector.get_metrics_since(position)[0]] == ["run7"]
+
+
+def test_cpu_percent_covers_the_rendering():
+    collector = PerformanceCollector(sample_interval=0)
+
+    with collector.measure_rendering("test"):
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    metrics = collector.get_latest_metrics()
+    assert metrics.cpu_percent > 0
+    assert metrics.memory_samples == []
+
+
+def test_stages_nest_and_are_ignored_outside_measurements():
+    collector = PerformanceCollector(sample_interval=0)
+
+    with collector.stage("orphan") as span:
+        assert span is None
+    with collector.measure_rendering("test"):
+        with collector.stage("page", page=0):
+            with collector.stage("text"):
+                pass
+        with collector.stage("page", page=1):
+            pass
+
+    metrics = collector.get_latest_metrics()
+    assert [stage.name for stage in metrics.stages] == ["page", "page"]
+    assert [child.name for child in metrics.stages[0].children] == ["text"]
+    assert [timing["page"] for timing in metrics.page_timings()] == [0, 1]
+
+
+def test_top_allocations_are_recorded():
+    collector = PerformanceCollector(sample_interval=0, trace_allocations=True, top_allocations=3)
+
+    with collector.measure_rendering("test"):
+        retained = [bytes(1024) for _ in range(2000)]
+
+    metrics = collector.get_latest_metrics()
+    assert 1 <= len(metrics.top_allocations) <= 3
+    assert any(__file__ in site["location"] for site in metrics.top_allocations)
+    assert metrics.traced_memory_peak >= 2000 * 1024
+    assert retained
+
+
+@pytest.mark.parametrize("engine_name", ["reportlab", "pymupdf"])
+def test_engine_stages_are_exported_in_report(engine_name, tmp_path):
+    doc = fitz.open()
+    for index in range(2):
+        doc.new_page().insert_text((72, 72), f"Page {index}")
+    layout = extract_pdf_content(doc.tobytes(), asset_store=InMemoryAssetStore()).to_dict()
+    doc.close()
+
+    recreate_pdf_from_layout(layout, engine_name=engine_name, engine_config={})
+    report_path = tmp_path / "report.json"
+    get_performance_collector().generate_report(str(report_path))
+
+    run = json.loads(report_path.read_text())["runs"][-1]
+    assert run["engine_name"] == engine_name
+    assert [stage["name"] for stage in run["stages"] if stage["name"] in ("page", "save")] == ["page", "page", "save"]
+    assert [timing["page"] for timing in run["page_timings"]] == [0, 1]
+    assert run["memory_peak"] >= run["memory_start"]
@@ -0,0 +1,136 @@
+"""
+Tests for the per-element render profiler and its hot-spot report.
+"""
+
+import json
+
+import pymupdf as fitz
+import pytest
+from typer.testing import CliRunner
+
+from pdfrebuilder.cli.main import app
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine.asset_store import InMemoryAssetStore
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.render_profiler import RenderProfiler, get_active_profiler, profile_rendering
+from pdfrebuilder.engine.validation_report import ValidationReport
+
+
+@pytest.fixture
+def layout():
+    doc = fitz.open()
+    for index in range(2):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {index}", fontname="helv")
+        page.insert_text((72, 120), "Second line", fontname="tiro")
+        page.draw_rect(fitz.Rect(100, 200, 300, 300), color=(1, 0, 0), fill=(0, 0, 1))
+    layout = extract_pdf_content(doc.tobytes(), asset_store=InMemoryAssetStore()).to_dict()
+    doc.close()
+    return layout
+
+
+@pytest.mark.parametrize("engine_name", ["reportlab", "pymupdf"])
+def test_profile_records_pages_elements_and_types(layout, engine_name):
+    with profile_rendering(RenderProfiler(page_budget_ms=0)) as profiler:
+        assert get_active_profiler() is profiler
+        recreate_pdf_from_layout(layout, engine_name=engine_name, engine_config={})
+    assert get_active_profiler() is None
+
+    report = profiler.report()
+    assert report["summary"]["pages"] == 2
+    assert report["summary"]["elements"] >= 4
+    assert [page["page"] for page in report["pages"]] == [0, 1]
+    assert {"text", "drawing"} <= {entry["type"] for entry in report["element_types"]}
+    assert len(report["pages_over_budget"]) == 2
+    slowest = [element["ms"] for element in report["slowest_elements"]]
+    assert slowest == sorted(slowest, reverse=True)
+
+
+def test_font_fallbacks_and_budget_are_ranked():
+    profiler = RenderProfiler(page_budget_ms=50, top=2)
+    profiler.start_page(0)
+    profiler.record_font("Missing", "Helvetica", 0.004, fallback=True)
+    profiler.record_font("Helvetica", "Helvetica", 0.0001, fallback=False)
+    for index, seconds in enumerate((0.001, 0.003, 0.002)):
+        profiler.record_element(f"t{index}", "text", "Missing", seconds)
+    profiler.end_page()
+    profiler._pages.append((1, 0.2))
+
+    report = profiler.report()
+
+    assert [element["element_id"] for element in report["slowest_elements"]] == ["t1", "t2"]
+    assert report["fallback_fonts"] == [
+        {
+            "font": "Missing",
+            "resolved": "Helvetica",
+            "elements": 3,
+            "render_ms": 6.0,
+            "resolution_ms": 4.0,
+            "fallback": True,
+        }
+    ]
+    assert report["pages_over_budget"] == [{"page": 1, "ms": 200.0, "elements": 0}]
+
+
+@pytest.mark.parametrize("engine_name", ["reportlab", "pymupdf"])
+def test_every_profiled_render_records_its_fonts(layout, engine_name):
+    for unit in layout["document_structure"]:
+        for layer in unit["layers"]:
+            for element in layer["content"]:
+                if element["type"] == "text":
+                    element["font_details"]["name"] = "NoSuchFont"
+
+    reports = []
+    for _ in range(2):
+        with profile_rendering() as profiler:
+            recreate_pdf_from_layout(layout, engine_name=engine_name, engine_config={})
+        reports.append(profiler.report())
+
+    # The second render resolves the font from caches and must still report the fallback
+    for report in reports:
+        assert [font["font"] for font in report["fallback_fonts"]] == ["NoSuchFont"]
+
+
+def test_rendering_outside_the_block_records_nothing(layout):
+    with profile_rendering() as profiler:
+        recreate_pdf_from_layout(layout, engine_name="reportlab", engine_config={})
+    recorded = profiler.report()["summary"]
+
+    recreate_pdf_from_layout(layout, engine_name="reportlab", engine_config={})
+
+    assert profiler.report()["summary"] == recorded
+
+
+def test_cli_writes_json_report_and_html_section(tmp_path, layout):
+    config, profile = tmp_path / "layout.json", tmp_path / "profile.json"
+    config.write_text(json.dumps(layout))
+
+    result = CliRunner().invoke(
+        app,
+        [
+            "generate",
+            "--config",
+            str(config),
+            "--output",
+            str(tmp_path / "out.pdf"),
+            "--output-engine",
+            "reportlab",
+            "--profile",
+            str(profile),
+            "--page-budget-ms",
+            "0",
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    report = json.loads(profile.read_text())
+    assert report["summary"]["pages"] == 2
+    assert report["summary"]["page_budget_ms"] == 0
+
+    html_path = tmp_path / "report.html"
+    ValidationReport(document_name="doc", results=[], metadata={"render_profile": report}).generate_html_report(
+        str(html_path)
+    )
+
+    html = html_path.read_text()
+    assert "<h2>Render Profile</h2>" in html
+    assert "<h3>Slowest Elements</h3>" in html
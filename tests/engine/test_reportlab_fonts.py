@@ -0,0 +1,104 @@
+"""
+Tests for the process-wide ReportLab font registry.
+"""
+
+import os
+import shutil
+
+import pymupdf as fitz
+import pytest
+import reportlab
+
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine import reportlab_engine
+from pdfrebuilder.engine.reportlab_engine import ReportLabEngine
+from pdfrebuilder.engine.reportlab_fonts import ReportLabFontRegistry, standard_font_for
+from pdfrebuilder.models.universal_idm import (
+    BoundingBox,
+    Color,
+    FontDetails,
+    Layer,
+    LayerType,
+    PageUnit,
+    TextElement,
+    UniversalDocument,
+)
+
+VERA = os.path.join(os.path.dirname(reportlab.__file__), "fonts", "Vera.ttf")
+FIXTURE_FONTS = os.path.join(os.path.dirname(__file__), "..", "fixtures", "fonts")
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    shutil.copy(VERA, tmp_path / "RegistryTestVera.ttf")
+    registry = ReportLabFontRegistry([str(tmp_path)])
+    monkeypatch.setattr(reportlab_engine, "get_reportlab_font_registry", lambda: registry)
+    return registry
+
+
+def _document(font_name, text="Hello fonts"):
+    layer = Layer(layer_id="base", layer_name="Base", layer_type=LayerType.BASE, bbox=BoundingBox(0, 0, 300, 300))
+    layer.content = [
+        TextElement(
+            id="text_0",
+            bbox=BoundingBox(50, 50, 250, 80),
+            raw_text=text,
+            text=text,
+            font_details=FontDetails(name=font_name, size=14, color=Color(0, 0, 0)),
+        )
+    ]
+    return UniversalDocument(document_structure=[PageUnit(size=(300, 300), page_number=0, layers=[layer])])
+
+
+def _render(document, **config):
+    engine = ReportLabEngine()
+    engine.initialize(config)
+    return recreate_pdf_from_layout(document.to_dict(), engine=engine, engine_config={})
+
+
+def _fonts(output):
+    with fitz.open(stream=output, filetype="pdf") as result:
+        return result[0].get_text().strip(), {font[3] for font in result[0].get_fonts()}
+
+
+def test_catalog_font_is_registered_once_and_subset(registry):
+    first = _render(_document("RegistryTestVera"))
+    second = _render(_document("RegistryTestVera"))
+
+    text, fonts = _fonts(second)
+    assert text == "Hello fonts"
+    assert any("+" in font and "Vera" in font for font in fonts)
+    assert first != b""
+    assert registry.get_statistics()["registered"] == 1
+
+
+def test_embed_fonts_disabled_uses_standard_font(registry):
+    embedded = _render(_document("RegistryTestVera"))
+    standard = _render(_document("RegistryTestVera"), embed_fonts=False)
+
+    text, fonts = _fonts(standard)
+    assert text == "Hello fonts"
+    assert not any("Vera" in font for font in fonts)
+    assert len(standard) < len(embedded)
+
+
+def test_unknown_font_falls_back_by_style(registry):
+    text, fonts = _fonts(_render(_document("NoSuchSerif-BoldItalic")))
+
+    assert text == "Hello fonts"
+    assert "Times-BoldItalic" in fonts
+    assert registry.get_statistics()["fallbacks"] == 1
+
+
+def test_unembeddable_font_file_falls_back():
+    registry = ReportLabFontRegistry([FIXTURE_FONTS])
+
+    assert registry.find_font_file("PublicSans-Bold") is not None
+    assert registry.resolve("PublicSans-Bold") == "Helvetica-Bold"
+    assert registry.get_statistics()["failures"] == 1
+
+
+def test_standard_font_names():
+    assert standard_font_for("helv") == "Helvetica"
+    assert standard_font_for("Courier-Bold") == "Courier-Bold"
+    assert standard_font_for("RobotoMono-Italic") == "Courier-Oblique"
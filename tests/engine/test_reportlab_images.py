@@ -0,0 +1,99 @@
+"""
+Tests for image rendering in the ReportLab engine.
+"""
+
+import io
+
+import pymupdf as fitz
+from PIL import Image
+
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine.reportlab_engine import ReportLabEngine
+from pdfrebuilder.engine.reportlab_images import ImageReaderCache, get_image_reader_cache
+from pdfrebuilder.models.universal_idm import BoundingBox, ImageElement, Layer, LayerType, PageUnit, UniversalDocument
+
+
+def _image_file(tmp_path, name, size, color):
+    path = tmp_path / name
+    Image.new("RGB", size, color).save(path)
+    return str(path)
+
+
+def _document(image_file, pages, bbox=(100, 100, 200, 200)):
+    units = []
+    for page_number in range(pages):
+        layer = Layer(layer_id="base", layer_name="Base", layer_type=LayerType.BASE, bbox=BoundingBox(0, 0, 300, 300))
+        layer.content = [ImageElement(id=f"image_{page_number}", bbox=BoundingBox(*bbox), image_file=image_file)]
+        units.append(PageUnit(size=(300, 300), page_number=page_number, layers=[layer]))
+    return UniversalDocument(document_structure=units)
+
+
+def _render(document, **config):
+    engine = ReportLabEngine()
+    engine.initialize(config)
+    return recreate_pdf_from_layout(document.to_dict(), engine=engine, engine_config={})
+
+
+def test_image_is_drawn_and_embedded_once(tmp_path):
+    image_file = _image_file(tmp_path, "red.png", (20, 20), (255, 0, 0))
+
+    output = _render(_document(image_file, pages=50))
+
+    with fitz.open(stream=output, filetype="pdf") as result:
+        assert len(result) == 50
+        assert {image[0] for page in result for image in page.get_images(full=True)} == {
+            result[0].get_images(full=True)[0][0]
+        }
+        pixmap = result[49].get_pixmap()
+        assert pixmap.pixel(150, 150) == (255, 0, 0)
+        assert pixmap.pixel(50, 50) == (255, 255, 255)
+
+
+def test_images_are_downsampled_to_output_dpi(tmp_path):
+    image_file = _image_file(tmp_path, "large.png", (1000, 500), (0, 0, 255))
+    document = _document(image_file, pages=1, bbox=(0, 0, 100, 50))
+
+    full = _render(document)
+    downsampled = _render(document, downsample_images=True, output_dpi=144)
+
+    with fitz.open(stream=full, filetype="pdf") as result:
+        assert result[0].get_images(full=True)[0][2:4] == (1000, 500)
+    with fitz.open(stream=downsampled, filetype="pdf") as result:
+        assert result[0].get_images(full=True)[0][2:4] == (200, 100)
+
+
+def test_decoded_images_are_shared_across_documents(tmp_path):
+    image_file = _image_file(tmp_path, "green.png", (16, 16), (0, 255, 0))
+    cache = get_image_reader_cache()
+    before = cache.get_statistics()
+
+    _render(_document(image_file, pages=3))
+    _render(_document(image_file, pages=3))
+
+    after = cache.get_statistics()
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+
+def test_cache_is_bounded_and_keyed_by_content():
+    cache = ImageReaderCache(max_entries=2)
+    encoded = []
+    for color in [(1, 0, 0), (2, 0, 0), (3, 0, 0)]:
+        buffer = io.BytesIO()
+        Image.new("RGB", (4, 4), color).save(buffer, format="PNG")
+        encoded.append(buffer.getvalue())
+
+    first = cache.get(encoded[0])
+    assert cache.get(bytes(encoded[0])) is first
+    cache.get(encoded[1])
+    cache.get(encoded[2])
+
+    assert cache.get_statistics()["entries"] == 2
+    assert cache.get(encoded[0]) is not first
+
+
+def test_missing_image_is_skipped(tmp_path):
+    output = _render(_document(str(tmp_path / "missing.png"), pages=1))
+
+    with fitz.open(stream=output, filetype="pdf") as result:
+        assert not any(page.get_images() for page in result)
@@ -0,0 +1,102 @@
+"""
+Tests for extraction and generation from in-memory streams.
+"""
+
+import io
+
+import pymupdf as fitz
+import pytest
+from PIL import Image
+
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine.asset_store import InMemoryAssetStore, read_memory_asset
+from pdfrebuilder.engine.document_parser import DocumentParsingError, parse_document_stream
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.pdf_engine_selector import get_pdf_engine
+from pdfrebuilder.models.universal_idm import ImageElement
+from pdfrebuilder.settings import settings
+
+
+def _pdf_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), (255, 0, 0)).save(buffer, format="PNG")
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Streamed")
+    page.insert_image(fitz.Rect(100, 100, 200, 200), stream=buffer.getvalue())
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+@pytest.fixture(autouse=True)
+def image_dir(tmp_path, monkeypatch):
+    path = tmp_path / "images"
+    monkeypatch.setattr(settings, "image_dir", str(path))
+    return path
+
+
+def _images(document):
+    return [el for unit in document.document_structure for el in unit.layers[0].content if isinstance(el, ImageElement)]
+
+
+def test_in_memory_store_never_touches_disk(tmp_path):
+    store = InMemoryAssetStore(str(tmp_path / "virtual"))
+
+    first = store.put_bytes(b"payload", "bin")
+    second = store.put_bytes(b"payload", "bin")
+
+    assert first.path == second.path and not second.written
+    assert read_memory_asset(first.path) == b"payload"
+    assert store.contains(first.content_hash, "bin")
+    assert not (tmp_path / "virtual").exists()
+
+
+def test_extract_from_bytes_with_in_memory_assets(image_dir):
+    store = InMemoryAssetStore()
+
+    document = extract_pdf_content(_pdf_bytes(), asset_store=store)
+
+    [image] = _images(document)
+    assert image.image_file in store.assets
+    assert not image_dir.exists()
+    assert [el.text for el in document.document_structure[0].layers[0].content if el.type.value == "text"] == [
+        "Streamed"
+    ]
+
+
+def test_parse_document_stream_detects_format():
+    document = parse_document_stream(io.BytesIO(_pdf_bytes()), asset_store=InMemoryAssetStore())
+    assert len(document.document_structure) == 1
+
+    with pytest.raises(DocumentParsingError, match="Unsupported stream format"):
+        parse_document_stream(b"not a document")
+    with pytest.raises(DocumentParsingError, match="cannot parse stream format 'pdf'"):
+        parse_document_stream(_pdf_bytes(), engine="psd-tools")
+
+
+@pytest.mark.parametrize("engine_name", ["pymupdf", "reportlab"])
+def test_round_trip_entirely_in_memory(engine_name, image_dir):
+    # Stored paths resolve only while the store is alive, so keep it until rendering is done
+    store = InMemoryAssetStore()
+    document = parse_document_stream(_pdf_bytes(), asset_store=store)
+
+    output = recreate_pdf_from_layout(document.to_dict(), engine=get_pdf_engine(engine_name, {}), engine_config={})
+
+    assert output[:5] == b"%PDF-"
+    with fitz.open(stream=output, filetype="pdf") as result:
+        assert "Streamed" in result[0].get_text()
+        assert len(result[0].get_images()) == 1
+    assert not image_dir.exists()
+
+
+def test_layout_rendered_to_writable_stream():
+    document = extract_pdf_content(_pdf_bytes(), asset_store=InMemoryAssetStore())
+    target = io.BytesIO()
+
+    result = recreate_pdf_from_layout(document.to_dict(), target, engine=get_pdf_engine("pymupdf", {}))
+
+    assert result is None
+    assert target.getvalue()[:5] == b"%PDF-"
+    with pytest.raises(ValueError, match="output path"):
+        recreate_pdf_from_layout(document.to_dict(), io.BytesIO(), incremental=True)
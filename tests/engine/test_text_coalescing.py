@@ -0,0 +1,126 @@
+"""
+Tests for span coalescing during PDF text extraction.
+"""
+
+import logging
+
+import pymupdf as fitz
+import pytest
+
+from pdfrebuilder.core.pdf_engine import FitzPDFEngine
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.text_coalescing import coalesce_line_spans, glyph_runs, offsets_for_text
+from pdfrebuilder.models.universal_idm import TextElement
+from pdfrebuilder.settings import settings
+
+# "Hello " and "World" differ only by a font-size jitter; "!" changes colour and "?" changes it back
+JITTER_CONTENT = (
+    b"BT /F1 12 Tf 72 700 Td [(Hel) -30 (lo )] TJ /F1 12.001 Tf [(Wor) 20 (ld)] TJ 0.5 g (!) Tj 0 g (?) Tj ET"
+)
+
+
+def _write_jitter_pdf(path):
+    doc = fitz.open()
+    page = doc.new_page()
+    font = doc.get_new_xref()
+    doc.update_object(font, "<</Type/Font/Subtype/Type1/BaseFont/Helvetica/Encoding/WinAnsiEncoding>>")
+    contents = doc.get_new_xref()
+    doc.update_object(contents, "<<>>")
+    doc.update_stream(contents, JITTER_CONTENT)
+    doc.xref_set_key(page.xref, "Contents", f"{contents} 0 R")
+    doc.xref_set_key(page.xref, "Resources", f"<</Font<</F1 {font} 0 R>>>>")
+    doc.save(str(path))
+    doc.close()
+
+
+def _char_origins(path):
+    with fitz.open(path) as doc:
+        return [
+            (char["c"], round(char["origin"][0], 1))
+            for block in doc[0].get_text("rawdict")["blocks"]
+            for line in block.get("lines", [])
+            for span in line["spans"]
+            for char in span["chars"]
+        ]
+
+
+def _span(text, x0, font="Helvetica", size=12.0, color=0, baseline=100.0):
+    chars = [{"c": c, "origin": (x0 + 6 * i, baseline)} for i, c in enumerate(text)]
+    return {"font": font, "size": size, "color": color, "flags": 0, "origin": (x0, baseline), "chars": chars}
+
+
+@pytest.fixture(autouse=True)
+def image_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_dir", str(tmp_path / "images"))
+
+
+def test_adjacent_spans_with_same_style_are_grouped():
+    spans = [
+        _span("Hel", 0),
+        _span("lo", 18, size=12.0004),
+        _span(" ", 30, font="Symbol"),
+        _span("World", 36),
+        _span("!", 66, color=0xFF0000),
+        _span(" ", 72),
+        _span("Up", 78, baseline=96),
+    ]
+
+    groups = coalesce_line_spans(spans)
+
+    assert [[s["chars"][0]["c"] for s in group] for group in groups] == [["H", "l", " ", "W"], ["!"], ["U"]]
+
+
+def test_spans_without_glyph_data_are_not_merged():
+    spans = [{"text": "Hel", "font": "Helvetica", "size": 12, "color": 0, "origin": (0, 10)} for _ in range(2)]
+
+    assert len(coalesce_line_spans(spans)) == 2
+
+
+def test_glyph_runs_split_where_positions_drift():
+    def measure(run):
+        return 5.0 * len(run)
+
+    assert glyph_runs("abcd", [0, 5, 10, 15], measure) == [(0, "abcd")]
+    assert glyph_runs("abcd", [0, 5, 12, 17], measure) == [(0, "ab"), (12, "cd")]
+    assert glyph_runs("ab cd", [0, 5, 10, 12, 17], None) == [(0, "ab"), (12, "cd")]
+
+
+def test_offsets_follow_space_normalisation():
+    assert offsets_for_text("ab", "a b", [0, 5, 10]) == [0, 10]
+    assert offsets_for_text("edited", "a b", [0, 5, 10]) is None
+
+
+def test_extraction_coalesces_spans_and_keeps_glyph_positions(tmp_path, monkeypatch, caplog):
+    pdf = tmp_path / "jitter.pdf"
+    _write_jitter_pdf(pdf)
+    source_origins = _char_origins(pdf)
+
+    plain = extract_pdf_content(str(pdf)).document_structure[0].layers[0].content
+    monkeypatch.setattr(settings.processing, "span_coalescing", True)
+    with caplog.at_level(logging.INFO):
+        coalesced = extract_pdf_content(str(pdf)).document_structure[0].layers[0].content
+
+    assert [element.text for element in plain] == ["Hello ", "World", "!", "?"]
+    assert [element.text for element in coalesced] == ["Hello World", "!", "?"]
+    assert "4 text spans -> 3 elements (25.0% reduction)" in caplog.text
+
+    merged = coalesced[0]
+    positions = [round(merged.bbox.x1 + offset, 1) for offset in merged.glyph_offsets]
+    assert positions == [x for _, x in source_origins[:11]]
+    assert TextElement.from_dict(merged.to_dict()).glyph_offsets == merged.glyph_offsets
+    assert "glyph_offsets" not in coalesced[1].to_dict()
+
+
+def test_coalesced_text_renders_at_original_positions(tmp_path, monkeypatch):
+    pdf = tmp_path / "jitter.pdf"
+    _write_jitter_pdf(pdf)
+    monkeypatch.setattr(settings.processing, "span_coalescing", True)
+    document = extract_pdf_content(str(pdf))
+    output = tmp_path / "rebuilt.pdf"
+
+    FitzPDFEngine().generate(document.to_dict(), str(output))
+
+    rebuilt = [(c, x) for c, x in _char_origins(output) if c != " "]
+    source = [(c, x) for c, x in _char_origins(pdf) if c != " "]
+    assert [c for c, _ in rebuilt] == [c for c, _ in source]
+    assert all(abs(a - b) <= 0.6 for (_, a), (_, b) in zip(rebuilt, source, strict=True))
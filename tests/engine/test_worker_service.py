@@ -0,0 +1,166 @@
+"""
+Tests for the long-running worker service and its client.
+"""
+
+import json
+import threading
+
+import pymupdf as fitz
+import pytest
+from typer.testing import CliRunner
+
+from pdfrebuilder.cli.main import app
+from pdfrebuilder.engine.worker_service import ServiceClient, ServiceError, WorkerPool, create_server
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = WorkerPool(workers=1, queue_size=0, job_timeout=60)
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Served")
+    path = tmp_path / "input.pdf"
+    doc.save(str(path))
+    doc.close()
+    return str(path)
+
+
+def _start(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def unix_address(pool, tmp_path):
+    server = _start(create_server(pool, socket_path=str(tmp_path / "service.sock")))
+    yield f"unix:{tmp_path / 'service.sock'}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_extract_and_generate_over_unix_socket(unix_address, pdf_path, tmp_path):
+    client = ServiceClient(unix_address)
+    layout_path, output_path = str(tmp_path / "layout.json"), str(tmp_path / "out.pdf")
+
+    extracted = client.submit({"id": "e1", "type": "extract", "input": pdf_path, "config": layout_path})
+    generated = client.submit(
+        {"id": "g1", "type": "generate", "config": layout_path, "output": output_path, "engine": "pymupdf"}
+    )
+
+    assert extracted["id"] == "e1" and extracted["status"] == "ok"
+    assert generated["status"] == "ok" and generated["worker"] == extracted["worker"]
+    with fitz.open(output_path) as doc:
+        assert "Served" in doc[0].get_text()
+
+
+def test_invalid_jobs_are_rejected(unix_address):
+    client = ServiceClient(unix_address)
+
+    assert client.submit({"id": "x", "type": "shutdown"})["status"] == "invalid"
+    missing = client.submit({"id": "m", "type": "extract", "input": "/nonexistent.pdf"})
+    assert missing["status"] == "error" and "not found" in missing["error"]
+
+
+def test_timed_out_job_gets_a_fresh_worker(pool, pdf_path):
+    first = pool.run({"id": "t0", "type": "extract", "input": pdf_path})
+    timed_out = pool.run({"id": "t1", "type": "extract", "input": pdf_path, "timeout": 0.001})
+    after = pool.run({"id": "t2", "type": "extract", "input": pdf_path})
+
+    assert timed_out["status"] == "timeout"
+    assert after["status"] == "ok" and after["worker"] != first["worker"]
+    assert pool.get_statistics()["restarted"] >= 1
+
+
+def test_failed_replacement_is_retried_by_the_next_job(pdf_path):
+    pool = WorkerPool(workers=1, queue_size=1, job_timeout=60)
+    start_worker = pool._start_worker
+    try:
+
+        def fail_to_start():
+            raise ServiceError("Worker did not finish warming up")
+
+        pool._start_worker = fail_to_start
+        timed_out = pool.run({"id": "t1", "type": "extract", "input": pdf_path, "timeout": 0.001})
+        failed = pool.run({"id": "t2", "type": "extract", "input": pdf_path})
+
+        assert timed_out["status"] == "timeout"
+        assert failed == {"id": "t2", "status": "error", "error": "Worker did not finish warming up"}
+        assert pool.get_statistics()["missing_workers"] == 1
+
+        pool._start_worker = start_worker
+        assert pool.run({"id": "t3", "type": "extract", "input": pdf_path})["status"] == "ok"
+        assert pool.get_statistics()["missing_workers"] == 0
+    finally:
+        pool._start_worker = start_worker
+        pool.close()
+
+
+def test_http_front_end_reports_backpressure(pool, pdf_path):
+    server = _start(create_server(pool, http_address="127.0.0.1:0"))
+    client = ServiceClient(f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        assert client.submit({"type": "extract", "input": pdf_path})["status"] == "ok"
+
+        # Occupy the only admission slot, as a long-running job would
+        pool._slots.acquire()
+        try:
+            busy = client.submit({"id": "b1", "type": "extract", "input": pdf_path})
+        finally:
+            pool._slots.release()
+        assert busy["status"] == "busy"
+        assert client.submit({"type": "stats"})["result"]["rejected"] >= 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_metrics_endpoint_labels_workers(pool, pdf_path, tmp_path):
+    import urllib.request
+
+    server = _start(create_server(pool, http_address="127.0.0.1:0"))
+    address = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        layout_path, output_path = str(tmp_path / "layout.json"), str(tmp_path / "out.pdf")
+        client = ServiceClient(address)
+        client.submit({"type": "extract", "input": pdf_path, "config": layout_path})
+        generated = client.submit({"type": "generate", "config": layout_path, "output": output_path})
+        assert "metrics" not in generated
+
+        with urllib.request.urlopen(f"{address}/metrics") as response:
+            content_type = response.headers["Content-Type"]
+            text = response.read().decode("utf-8")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert content_type.startswith("application/openmetrics-text")
+    assert 'pdfrebuilder_service_jobs_total{type="generate",status="ok"}' in text
+    assert f'worker="{generated["worker"]}"' in text
+    assert "pdfrebuilder_pages_rendered_total{" in text
+    assert text.endswith("# EOF\n")
+
+
+def test_client_subcommand(unix_address, pdf_path, tmp_path):
+    layout_path = tmp_path / "layout.json"
+    runner = CliRunner()
+
+    result = runner.invoke(
+        app, ["client", "--address", unix_address, "extract", "--input", pdf_path, "--config", str(layout_path)]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(layout_path.read_text())["document_structure"]
+
+    unreachable = runner.invoke(app, ["client", "--address", f"unix:{tmp_path / 'none.sock'}", "stats"])
+    assert unreachable.exit_code == 1
+
+
+def test_unreachable_service_raises(tmp_path):
+    with pytest.raises(ServiceError):
+        ServiceClient(f"unix:{tmp_path / 'missing.sock'}").submit({"type": "stats"})
@@ -0,0 +1,91 @@
+"""
+Tests for the bounded history and running aggregates of the font diagnostics trackers.
+"""
+
+from pdfrebuilder.font.utils import (
+    FallbackFontManager,
+    FontErrorReporter,
+    FontRegistrationResult,
+    FontRegistrationTracker,
+    font_diagnostics_scope,
+    get_font_registration_tracker,
+    track_font_registration,
+)
+from pdfrebuilder.utils.event_log import EventLog
+
+
+def _result(font_name, success=True, fallback=False, error=None):
+    return FontRegistrationResult(
+        success=success,
+        font_name=font_name,
+        actual_font_used="helv" if success else None,
+        fallback_used=fallback,
+        registration_method="standard_pdf",
+        error_message=error,
+    )
+
+
+def test_registration_history_is_bounded_but_counts_are_complete():
+    tracker = FontRegistrationTracker(history_size=5)
+
+    for index in range(50):
+        tracker.track_registration_attempt("Arial" if index % 3 else "Times", _result("Arial"))
+    for _ in range(3):
+        tracker.track_registration_attempt("Broken", _result("Broken", success=False, error="bad file"))
+
+    stats = tracker.get_registration_statistics()
+    assert stats["total_attempts"] == 53
+    assert stats["most_requested_fonts"][0] == {"font_name": "Arial", "count": 33}
+    assert stats["most_common_methods"] == [{"method": "standard_pdf", "count": 53}]
+    failures = tracker.get_failed_registrations_summary()
+    assert failures["failure_reasons"] == [{"reason": "bad file", "count": 3}]
+    assert len(failures["recent_failures"]) == 3
+    assert len(tracker._registration_attempts.recent()) == 5
+
+
+def test_error_reporter_keeps_recent_errors_and_full_counts():
+    reporter = FontErrorReporter(history_size=2)
+
+    for index in range(10):
+        reporter.report_registration_error(
+            "Font", Exception("need font file or buffer"), {"text": "x" * 1000, "index": index}, verbose=False
+        )
+    reporter.report_discovery_error("Other", ["/fonts"], {}, verbose=False)
+
+    summary = reporter.generate_error_summary()
+    assert summary["error_counts"] == {"registration": 10, "discovery": 1}
+    assert summary["need_font_file_errors"] == 10
+    assert summary["most_problematic_fonts"][0] == {"font_name": "Font", "error_count": 10}
+    recent = summary["error_details"]["registration"]
+    assert [error["context"]["index"] for error in recent] == [8, 9]
+    assert len(recent[0]["context"]["text"]) == 100
+
+
+def test_substitution_summary_uses_aggregates():
+    manager = FallbackFontManager()
+    manager._substitution_tracking = EventLog(history_size=3)
+
+    for index in range(10):
+        manager.track_substitution("Missing", "helv" if index < 7 else "tiro", f"e{index}", "not found")
+
+    summary = manager.get_substitution_summary()
+    assert summary["total_substitutions"] == 10
+    assert (summary["unique_original_fonts"], summary["unique_fallback_fonts"]) == (1, 2)
+    assert summary["most_common_fallback"] == {"font_name": "helv", "count": 7}
+    assert [sub["element_id"] for sub in summary["substitutions"]] == ["e7", "e8", "e9"]
+
+
+def test_diagnostics_scope_reports_only_its_own_events():
+    track_font_registration("Before", _result("Before"))
+    total_before = get_font_registration_tracker().get_registration_statistics()["total_attempts"]
+
+    with font_diagnostics_scope() as scope:
+        track_font_registration("During", _result("During", fallback=True))
+        track_font_registration("During", _result("During", success=False, error="missing"))
+    track_font_registration("After", _result("After"))
+
+    summary = scope.summary()
+    assert summary["registrations"] == 2
+    assert summary["registration_results"] == {"fallback": 1, "failed": 1}
+    assert summary["most_requested_fonts"] == [{"font_name": "During", "count": 2}]
+    assert get_font_registration_tracker().get_registration_statistics()["total_attempts"] == total_before + 3
@@ -407,10 +407,7 @@ def test_document_font_coverage_validation(self):
             f.write(b"OTTO\x00\x01\x00\x00" + b"\x00" * 100)
 
         # Mock font coverage - Arial covers basic Latin and accented, but not Chinese or emoji
-        def coverage_side_effect(font_path, text):
-            if "你好世界" in text or "🌍🚀💻" in text:
-                return False
-            return True
+        latin_codepoints = frozenset(range(0x250))
 
         with patch("pdfrebuilder.font.utils.TTFont") as mock_ttfont:
 
@@ -444,8 +441,8 @@ def getitem_side_effect(key):
             mock_ttfont.side_effect = create_mock_font
 
             with patch(
-                "pdfrebuilder.font.font_validator.font_covers_text",
-                side_effect=coverage_side_effect,
+                "pdfrebuilder.font.font_validator.font_codepoints",
+                return_value=latin_codepoints,
             ):
                 with patch.object(
                     self.font_validator,
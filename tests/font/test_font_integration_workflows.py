@@ -428,8 +428,8 @@ def test_document_font_validation_workflow(self):
         # Should fail validation due to missing fonts
         self.assertFalse(result.validation_passed)
 
-    @patch("pdfrebuilder.font.font_validator.font_covers_text")
-    def test_font_coverage_validation_workflow(self, mock_covers_text):
+    @patch("pdfrebuilder.font.font_validator.font_codepoints")
+    def test_font_coverage_validation_workflow(self, mock_codepoints):
         """Test font coverage validation workflow"""
         # Create a font file
         os.makedirs(self.test_fonts_dir, exist_ok=True)
@@ -438,7 +438,7 @@ def test_font_coverage_validation_workflow(self, mock_covers_text):
             f.write("dummy font content")
 
         # Mock coverage failure
-        mock_covers_text.return_value = False
+        mock_codepoints.return_value = frozenset()
 
         validator = FontValidator(self.test_fonts_dir)
 
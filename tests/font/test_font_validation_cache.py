@@ -0,0 +1,118 @@
+"""
+Tests for the memoised font validation shared by FontValidator and BatchModifier.
+"""
+
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+from pdfrebuilder.engine.batch_modifier import BatchModifier
+from pdfrebuilder.font.font_validator import FontValidationCache, FontValidator, charset_signature
+from pdfrebuilder.models.universal_idm import (
+    BoundingBox,
+    Color,
+    FontDetails,
+    Layer,
+    PageUnit,
+    TextElement,
+    UniversalDocument,
+)
+
+FIXTURE_FONT = os.path.join(os.path.dirname(__file__), "..", "fixtures", "fonts", "PublicSans-Regular.otf")
+
+
+@pytest.fixture
+def validator(tmp_path):
+    fonts_dir = tmp_path / "fonts"
+    fonts_dir.mkdir()
+    shutil.copy(FIXTURE_FONT, fonts_dir / "PublicSans-Regular.otf")
+    validator = FontValidator(str(fonts_dir))
+    validator.validation_cache.clear()
+    return validator
+
+
+def _document(texts: list[str], font_name: str) -> UniversalDocument:
+    elements = [
+        TextElement(
+            id=f"text_{i}",
+            bbox=BoundingBox(0, i * 20, 200, i * 20 + 15),
+            text=text,
+            font_details=FontDetails(name=font_name, size=12, color=Color(0, 0, 0)),
+        )
+        for i, text in enumerate(texts)
+    ]
+    layer = Layer(layer_id="page_0_base_layer", layer_name="Page Content", content=elements)
+    return UniversalDocument(document_structure=[PageUnit(size=(612, 792), layers=[layer])])
+
+
+def test_charset_signature_is_order_and_whitespace_insensitive():
+    assert charset_signature("ba a\n") == charset_signature("ab") == "ab"
+
+
+def test_cache_is_bounded():
+    cache = FontValidationCache(max_entries=2)
+    for i in range(3):
+        cache.put(("font", str(i), 1), None)  # type: ignore[arg-type]
+    assert cache.get_statistics()["entries"] == 2
+    assert cache.get(("font", "0", 1)) is None
+
+
+def test_repeated_checks_hit_cache(validator):
+    font_name = next(iter(validator.available_fonts))
+
+    with patch("pdfrebuilder.font.font_validator.font_codepoints", return_value=frozenset(map(ord, "Helo"))) as cmap:
+        first = validator.check_text_coverage(font_name, "Hello")
+        second = validator.check_text_coverage(font_name, "olleH")
+
+    assert first is second
+    assert cmap.call_count == 1
+    assert validator.validation_cache.hits == 1
+
+
+def test_cmap_is_parsed_once_per_font_and_catalog_generation(validator):
+    font_name = next(iter(validator.available_fonts))
+
+    with patch("pdfrebuilder.font.font_validator.font_codepoints", return_value=frozenset(map(ord, "Hi"))) as cmap:
+        checks = [validator.check_text_coverage(font_name, text) for text in ("Hi", "Hi!", "iH?", "Ho")]
+        assert cmap.call_count == 1
+
+        validator._refresh_available_fonts()
+        validator.check_text_coverage(font_name, "Hi")
+        assert cmap.call_count == 2
+
+    assert [check.missing_characters for check in checks] == [(), ("!",), ("?",), ("o",)]
+
+
+def test_catalog_refresh_invalidates_cached_checks(validator):
+    font_name = next(iter(validator.available_fonts))
+    validator.check_text_coverage(font_name, "Hello")
+
+    validator._refresh_available_fonts()
+    validator.check_text_coverage(font_name, "Hello")
+
+    assert validator.validation_cache.misses == 2
+
+
+def test_missing_glyphs_detected(validator):
+    font_name = next(iter(validator.available_fonts))
+    check = validator.check_text_coverage(font_name, "Hi 你好")
+
+    assert check.available
+    assert not check.covers_text
+    assert set(check.missing_characters) == {"你", "好"}
+
+
+def test_batch_font_warnings_are_aggregated(validator):
+    document = _document(["Dear NAME"] * 50, "MissingFont")
+    modifier = BatchModifier(font_validator=validator)
+
+    result = modifier.batch_text_replacement(document, [("NAME", "Ana")])
+
+    assert result.modified_elements == 50
+    assert result.font_warnings == ["Font 'MissingFont' not available (50 element(s))"]
+    summary = result.details["font_validation"]
+    assert summary["elements_with_issues"] == 50
+    assert summary["cache"]["misses"] == 1
+    assert summary["cache"]["hits"] == 49
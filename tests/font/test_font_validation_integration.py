@@ -117,9 +117,9 @@ def test_font_availability_checking(self):
         self.assertIn("helv", result.fonts_available)
         self.assertIn("NonExistentFont", result.fonts_missing)
 
-    @patch("pdfrebuilder.font.font_validator.font_covers_text")
+    @patch("pdfrebuilder.font.font_validator.font_codepoints")
     @patch("pdfrebuilder.font.font_validator.os.path.exists")
-    def test_font_coverage_checking(self, mock_exists, mock_covers_text):
+    def test_font_coverage_checking(self, mock_exists, mock_codepoints):
         """Test font coverage checking for text elements"""
         validator = FontValidator(self.fonts_dir)
         result = FontValidationResult()
@@ -127,7 +127,7 @@ def test_font_coverage_checking(self, mock_exists, mock_covers_text):
         # Mock font file existence
         mock_exists.return_value = True
         # Mock coverage failure
-        mock_covers_text.return_value = False
+        mock_codepoints.return_value = frozenset()
 
         # Mock _find_missing_characters to return some missing chars
         with patch.object(validator, "_find_missing_characters", return_value=["ñ", "ü"]):
@@ -0,0 +1,141 @@
+"""
+Tests for incremental regeneration through recreate_pdf_from_config.
+"""
+
+import json
+
+import pymupdf as fitz
+import pytest
+
+from pdfrebuilder.core.incremental_generation import manifest_path_for
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_config
+
+
+class PageWritingEngine:
+    """Minimal engine writing one page per unit with the unit's first text"""
+
+    engine_name = "fake"
+
+    def __init__(self):
+        self.rendered_units = 0
+
+    def render(self, config, output_path, original_pdf_for_template=None):
+        doc = fitz.open()
+        for unit in config["document_structure"]:
+            page = doc.new_page(width=unit["size"][0], height=unit["size"][1])
+            page.insert_text((72, 72), unit["layers"][0]["content"][0]["text"])
+            self.rendered_units += 1
+        doc.set_metadata({"title": config["metadata"]["title"]})
+        doc.save(output_path)
+        doc.close()
+
+
+def _layout(texts, title="Catalogue"):
+    return {
+        "version": "1.0",
+        "metadata": {"title": title},
+        "document_structure": [
+            {
+                "type": "page",
+                "page_number": i,
+                "size": [612, 792],
+                "layers": [
+                    {
+                        "layer_id": f"page_{i}_base_layer",
+                        "content": [{"id": "text_0", "type": "text", "text": text, "bbox": [72, 60, 300, 80]}],
+                    }
+                ],
+            }
+            for i, text in enumerate(texts)
+        ],
+    }
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / "layout.json", tmp_path / "out.pdf"
+
+
+def _generate(paths, texts, engine, template=None, **layout_kwargs):
+    config_path, output_path = paths
+    config_path.write_text(json.dumps(_layout(texts, **layout_kwargs)))
+    recreate_pdf_from_config(
+        str(config_path),
+        str(output_path),
+        engine=engine,
+        engine_config={},
+        original_pdf_for_template=template,
+        incremental=True,
+    )
+
+
+def _page_texts(output_path):
+    with fitz.open(output_path) as doc:
+        return [page.get_text().strip() for page in doc]
+
+
+def test_only_changed_pages_are_rendered(paths):
+    engine = PageWritingEngine()
+    texts = [f"Page {i}" for i in range(10)]
+    _generate(paths, texts, engine)
+    assert engine.rendered_units == 10
+    assert manifest_path_for(str(paths[1])).exists()
+
+    texts[3] = "Page 3 edited"
+    texts[7] = "Page 7 edited"
+    _generate(paths, texts, engine)
+
+    assert engine.rendered_units == 12
+    assert _page_texts(paths[1]) == texts
+    with fitz.open(paths[1]) as doc:
+        assert doc.metadata["title"] == "Catalogue"
+
+
+def test_unchanged_layout_keeps_output(paths):
+    engine = PageWritingEngine()
+    _generate(paths, ["A", "B"], engine)
+    _generate(paths, ["A", "B"], engine)
+
+    assert engine.rendered_units == 2
+
+
+def test_inserted_and_moved_pages_reuse_previous_output(paths):
+    engine = PageWritingEngine()
+    _generate(paths, ["A", "B", "C"], engine)
+    _generate(paths, ["New", "C", "A", "B"], engine)
+
+    assert engine.rendered_units == 4
+    assert _page_texts(paths[1]) == ["New", "C", "A", "B"]
+
+
+def test_moved_pages_are_rendered_again_with_a_template(paths, tmp_path):
+    template = tmp_path / "template.pdf"
+    with fitz.open() as doc:
+        for _ in range(3):
+            doc.new_page()
+        doc.save(template)
+    engine = PageWritingEngine()
+    _generate(paths, ["A", "B", "C"], engine, template=str(template))
+    _generate(paths, ["A", "C", "B"], engine, template=str(template))
+
+    # Page 0 kept its template page; B and C now sit on other template pages
+    assert engine.rendered_units == 5
+    assert _page_texts(paths[1]) == ["A", "C", "B"]
+
+
+def test_document_level_change_forces_full_render(paths):
+    engine = PageWritingEngine()
+    _generate(paths, ["A", "B"], engine)
+    _generate(paths, ["A", "B"], engine, title="Renamed")
+
+    assert engine.rendered_units == 4
+
+
+def test_modified_output_forces_full_render(paths):
+    engine = PageWritingEngine()
+    _generate(paths, ["A", "B"], engine)
+    paths[1].write_bytes(paths[1].read_bytes() + b"\n")
+
+    _generate(paths, ["A", "B"], engine)
+
+    assert engine.rendered_units == 4
@@ -2,11 +2,19 @@
 Tests for security modules functionality.
 """
 
+import subprocess
+import sys
 import tempfile
+import time
+from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pytest
+
 from pdfrebuilder.security.path_utils import get_safe_filename, is_safe_path, sanitize_path, validate_file_extension
+from pdfrebuilder.security.process_supervisor import supervise_process
 from pdfrebuilder.security.secure_execution import ExecutionResult, SecureExecutor, validate_command_safety
+from pdfrebuilder.security.subprocess_utils import ResourceLimitError, SecureSubprocessRunner, SecurityMetrics
 
 
 class TestPathUtils:
@@ -247,3 +255,106 @@ def teardown_method(self):
         import shutil
 
         shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class TestSecurityMetrics:
+    """Test the bounded security metrics history"""
+
+    def test_history_is_bounded_and_aggregates_cover_all_events(self):
+        """Per-event lists keep the latest entries; averages and maxima cover every event"""
+        metrics = SecurityMetrics(history_size=3)
+
+        for index in range(10):
+            metrics.record_command_execution(["echo", str(index)], index % 5 != 0, float(index))
+            metrics.record_memory_usage(float(index))
+            metrics.record_security_violation("blocked_command", {"index": index})
+            metrics.record_suspicious_pattern("rm -rf", ["rm", "-rf", str(index)])
+
+        report = metrics.get_security_report()
+        assert list(metrics.metrics["execution_times"]) == [7.0, 8.0, 9.0]
+        assert report["total_commands"] == 10
+        assert report["blocked_commands"] == 2
+        assert report["performance"] == {"avg_execution_time": 4.5, "max_memory_mb": 9.0, "avg_memory_mb": 4.5}
+        assert [v["index"] for v in report["security_violations"]] == [7, 8, 9]
+        assert report["security_violation_counts"] == {"blocked_command": 10}
+        assert len(report["suspicious_patterns"]["rm -rf"]) == 3
+
+        metrics.reset_metrics()
+        assert metrics.metrics["execution_times"].maxlen == 3
+        assert metrics.get_security_report()["total_commands"] == 0
+
+
+class TestProcessSupervision:
+    """Test event-driven supervision of monitored subprocesses"""
+
+    @pytest.fixture(autouse=True, params=[True, False], ids=["selector", "reader-threads"])
+    def pipes_selectable(self, request, monkeypatch):
+        """Run every case through the selector loop and the Windows reader-thread loop"""
+        monkeypatch.setattr("pdfrebuilder.security.process_supervisor.PIPES_SELECTABLE", request.param)
+
+    @staticmethod
+    def _popen(code):
+        return subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def test_output_larger_than_pipe_buffer_is_drained_and_spooled(self):
+        """A command writing megabytes completes without waiting for the timeout"""
+        process = self._popen("import sys\nsys.stdout.write('x' * 3_000_000)\nsys.stderr.write('done')")
+
+        result = supervise_process(process, timeout=30, spool_threshold=1024)
+
+        assert result.returncode == 0
+        assert len(result.stdout) == 3_000_000
+        assert result.stderr == b"done"
+        assert result.spooled
+        assert result.wall_time < 10
+
+    def test_output_beyond_the_limit_is_discarded(self):
+        process = self._popen("print('y' * 10_000)")
+
+        result = supervise_process(process, timeout=30, max_output_bytes=100)
+
+        assert result.stdout == b"y" * 100
+        assert result.stdout_discarded == 10_001 - 100
+
+    def test_fast_commands_are_not_sampled(self):
+        sampler = Mock(return_value={})
+
+        result = supervise_process(self._popen("pass"), timeout=30, sampler=sampler, sample_interval=5)
+
+        assert result.returncode == 0
+        sampler.assert_not_called()
+
+    def test_timeout_stops_the_process(self):
+        process = self._popen("import time\nprint('started', flush=True)\ntime.sleep(30)")
+        started = time.monotonic()
+
+        with pytest.raises(subprocess.TimeoutExpired) as excinfo:
+            supervise_process(process, timeout=0.5)
+
+        assert time.monotonic() - started < 10
+        assert process.poll() is not None
+        assert excinfo.value.output == b"started\n"
+
+    def test_memory_limit_stops_the_process(self, tmp_path):
+        """Samples run at the configured cadence and a limit violation reaches the caller"""
+        script = tmp_path / "idle.py"
+        script.write_text("import time\ntime.sleep(30)\n")
+        runner = SecureSubprocessRunner(
+            base_path=Path(tmp_path), max_memory_mb=1, enable_sandboxing=False, sample_interval=0.1
+        )
+
+        with pytest.raises(ResourceLimitError):
+            runner.run([sys.executable, str(script)], allow_custom_executables=True, timeout=30)
+
+        assert runner.get_execution_stats()["resource_violations"] == 1
+
+    def test_runner_decodes_text_and_honours_check(self, tmp_path):
+        script = tmp_path / "lines.py"
+        script.write_text("import sys\nsys.stdout.buffer.write(b'a\\r\\nb')\nsys.exit(3)\n")
+        runner = SecureSubprocessRunner(base_path=Path(tmp_path), enable_sandboxing=False)
+
+        result = runner.run([sys.executable, str(script)], allow_custom_executables=True)
+        assert (result.returncode, result.stdout) == (3, "a\nb")
+
+        with pytest.raises(subprocess.CalledProcessError):
+            runner.run([sys.executable, str(script)], allow_custom_executables=True, check=True)
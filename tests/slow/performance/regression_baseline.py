@@ -0,0 +1,225 @@
+"""
+Timing, result storage and baseline comparison for the regression benchmarks.
+
+Each benchmark gets one untimed warm-up run and keeps the best of several
+timed runs. To make a baseline recorded on one machine usable on another,
+and to follow load changes on shared machines, a small fixed calibration
+workload is timed right before every benchmark. Each timing is divided by
+that calibration time, and comparisons use these normalized timings. A
+benchmark regresses when its normalized time exceeds the baseline by more
+than the tolerance and it is also at least ``MIN_REGRESSION_SECONDS`` slower,
+so jitter on sub-millisecond benchmarks is not reported.
+
+Environment variables:
+
+- ``PDFREBUILDER_BENCHMARK_TOLERANCE``: allowed slowdown as a fraction (default 1.0, i.e. twice the
+  baseline, which absorbs the noise of shared runners; tighten it on dedicated machines)
+- ``PDFREBUILDER_BENCHMARK_REPEAT``: runs per benchmark (default 5)
+- ``PDFREBUILDER_BENCHMARK_BASELINE``: baseline file (default ``tests/fixtures/baseline_benchmarks.json``)
+- ``PDFREBUILDER_BENCHMARK_RESULTS``: results file (default ``tests/output/regression_benchmarks.json``)
+- ``PDFREBUILDER_UPDATE_BENCHMARK_BASELINE=1``: write this run's results as the new baseline
+"""
+
+import json
+import os
+import platform
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+import pymupdf as fitz
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_BASELINE = REPO_ROOT / "tests" / "fixtures" / "baseline_benchmarks.json"
+DEFAULT_RESULTS = REPO_ROOT / "tests" / "output" / "regression_benchmarks.json"
+DEFAULT_TOLERANCE = 1.0
+DEFAULT_REPEAT = 5
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def tolerance() -> float:
+    return float(os.environ.get("PDFREBUILDER_BENCHMARK_TOLERANCE", DEFAULT_TOLERANCE))
+
+
+def repeat() -> int:
+    return max(1, int(os.environ.get("PDFREBUILDER_BENCHMARK_REPEAT", DEFAULT_REPEAT)))
+
+
+def baseline_path() -> Path:
+    return Path(os.environ.get("PDFREBUILDER_BENCHMARK_BASELINE", DEFAULT_BASELINE))
+
+
+def results_path() -> Path:
+    return Path(os.environ.get("PDFREBUILDER_BENCHMARK_RESULTS", DEFAULT_RESULTS))
+
+
+def update_baseline_requested() -> bool:
+    return os.environ.get("PDFREBUILDER_UPDATE_BENCHMARK_BASELINE", "").lower() in ("1", "true", "yes")
+
+
+def _calibration_workload() -> None:
+    total = 0
+    for index in range(50_000):
+        total += index * index % 7
+    doc = fitz.open()
+    page = doc.new_page()
+    for line in range(10):
+        page.insert_text((36, 36 + line * 18), f"Calibration line {line} {total}", fontname="helv")
+    page.get_pixmap(dpi=72)
+    doc.tobytes(deflate=True)
+    doc.close()
+
+
+def calibrate(runs: int = 3) -> float:
+    """Best-of-runs seconds for a fixed mix of Python and PyMuPDF work on this machine"""
+    _calibration_workload()
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        _calibration_workload()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+@dataclass
+class Measurement:
+    """Timing of one benchmark"""
+
+    name: str
+    seconds: float
+    normalized: float
+    calibration: float
+    runs: list[float]
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Comparison:
+    """A measurement against its baseline entry"""
+
+    name: str
+    ratio: float | None
+    tolerance: float
+    delta_seconds: float = 0.0
+
+    @property
+    def regressed(self) -> bool:
+        return (
+            self.ratio is not None and self.ratio > 1 + self.tolerance and self.delta_seconds >= MIN_REGRESSION_SECONDS
+        )
+
+    def describe(self) -> str:
+        if self.ratio is None:
+            return f"{self.name}: no baseline entry"
+        change = (self.ratio - 1) * 100
+        return f"{self.name}: {change:+.1f}% against baseline (tolerance {self.tolerance * 100:.0f}%)"
+
+
+class RegressionBenchmarks:
+    """
+    Runs benchmarks, compares them with a baseline and stores the results.
+
+    Args:
+        baseline: Baseline document as written by ``to_dict``; empty for none
+        runs: Runs per benchmark; the fastest counts
+    """
+
+    def __init__(self, baseline: dict[str, Any] | None = None, runs: int = DEFAULT_REPEAT):
+        self.baseline = baseline or {}
+        self.runs = runs
+        self.measurements: dict[str, Measurement] = {}
+        self.comparisons: dict[str, Comparison] = {}
+
+    @classmethod
+    def from_environment(cls) -> "RegressionBenchmarks":
+        return cls(baseline=load_baseline(baseline_path()), runs=repeat())
+
+    def measure(
+        self,
+        name: str,
+        run: Callable[[Any], Any],
+        setup: Callable[[], Any] | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> Measurement:
+        """
+        Time ``run(setup())`` ``runs`` times after a warm-up run; setup is not timed.
+
+        Returns:
+            The measurement, also kept for ``to_dict``
+        """
+        run(setup() if setup else None)
+        calibration = calibrate()
+        timings = []
+        for _ in range(self.runs):
+            argument = setup() if setup else None
+            started = time.perf_counter()
+            run(argument)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        measurement = Measurement(
+            name=name,
+            seconds=round(best, 6),
+            normalized=round(best / calibration, 4),
+            calibration=round(calibration, 6),
+            runs=[round(timing, 6) for timing in timings],
+            metadata=metadata or {},
+        )
+        self.measurements[name] = measurement
+        return measurement
+
+    def compare(self, measurement: Measurement, allowed: float | None = None) -> Comparison:
+        """Compare a measurement's normalized time with the baseline entry of the same name"""
+        allowed = tolerance() if allowed is None else allowed
+        entry = self.baseline.get("benchmarks", {}).get(measurement.name)
+        ratio, delta = None, 0.0
+        if entry and entry.get("normalized"):
+            ratio = round(measurement.normalized / entry["normalized"], 4)
+            # Baseline seconds scaled to this machine
+            delta = measurement.seconds - entry["normalized"] * measurement.calibration
+        comparison = Comparison(measurement.name, ratio, allowed, delta)
+        self.comparisons[measurement.name] = comparison
+        return comparison
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "pymupdf": fitz.VersionBind,
+                "runs": self.runs,
+            },
+            "benchmarks": {
+                name: {
+                    **asdict(measurement),
+                    **(
+                        {"baseline_ratio": self.comparisons[name].ratio, "regressed": self.comparisons[name].regressed}
+                        if name in self.comparisons
+                        else {}
+                    ),
+                }
+                for name, measurement in sorted(self.measurements.items())
+            },
+        }
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    def save_baseline(self, path: Path) -> None:
+        """Write the measurements as a baseline, keeping entries this run did not measure"""
+        merged = dict(self.baseline.get("benchmarks", {}))
+        for name, measurement in self.to_dict()["benchmarks"].items():
+            merged[name] = {key: measurement[key] for key in ("seconds", "normalized", "calibration", "metadata")}
+        document = self.to_dict()
+        document["benchmarks"] = dict(sorted(merged.items()))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(document, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
@@ -0,0 +1,201 @@
+"""
+Deterministic synthetic documents for the regression benchmarks.
+
+Sample PDFs vary from checkout to checkout and say little about which kind of
+content got slower. ``CorpusSpec`` describes a document by the quantities that
+drive processing cost (pages, text spans, vector paths, placed and distinct
+images, distinct fonts and the Unicode coverage the text needs), and
+``generate_pdf`` builds it with PyMuPDF alone: built-in fonts, generated
+images, a seeded random layout and fixed metadata. The same spec always gives
+the same PDF bytes, so the benchmarks need no network and no sample files.
+"""
+
+import random
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import pymupdf as fitz
+
+from pdfrebuilder.engine.asset_store import InMemoryAssetStore
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+
+PAGE_SIZE = (612, 792)
+MARGIN = 36
+
+# PyMuPDF built-in fonts, used in this order as the distinct font count grows
+BUILTIN_FONTS = ("helv", "tiro", "cour", "hebo", "tibo", "cobo", "heit", "tiit", "coit", "hebi", "tibi", "cobi")
+
+# Text samples per Unicode coverage level; "cjk" spans are set in the built-in CJK font
+UNICODE_TEXT = {
+    "ascii": ["Quarterly report", "Total amount due", "Invoice 2024-118", "Page summary", "Shipping address"],
+    "latin1": ["Café crème brûlée", "Señor Müller", "Smørrebrød à la carte", "Über naïve façade", "Åland ½ £ ©"],
+    "cjk": ["中文文本测试", "日本語のテキスト", "한국어 텍스트", "数据 报告 2024", "東京 大阪 京都"],
+}
+CJK_FONT = "china-s"
+
+FIXED_METADATA = {
+    "title": "Synthetic benchmark document",
+    "author": "pdfrebuilder",
+    "producer": "pdfrebuilder synthetic corpus",
+    "creator": "pdfrebuilder synthetic corpus",
+    "creationDate": "D:20240101000000Z",
+    "modDate": "D:20240101000000Z",
+}
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    """
+    Shape of one synthetic document.
+
+    Args:
+        name: Scenario name used in benchmark results
+        pages: Number of pages
+        spans_per_page: Text spans placed on each page
+        paths_per_page: Vector paths (lines, rectangles, curves) drawn on each page
+        images_per_page: Image placements on each page
+        distinct_images: Different images the placements cycle through, so the rest are repeats
+        fonts: Distinct built-in fonts the text cycles through (up to ``len(BUILTIN_FONTS)``)
+        unicode: Coverage the text needs: ``ascii``, ``latin1`` or ``cjk`` (a quarter of the spans in CJK)
+        seed: Seed for positions, colours and text choice
+    """
+
+    name: str
+    pages: int = 1
+    spans_per_page: int = 20
+    paths_per_page: int = 0
+    images_per_page: int = 0
+    distinct_images: int = 1
+    fonts: int = 1
+    unicode: str = "ascii"
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.unicode not in UNICODE_TEXT:
+            raise ValueError(f"Unknown unicode coverage {self.unicode!r}, expected one of {sorted(UNICODE_TEXT)}")
+        if not 1 <= self.fonts <= len(BUILTIN_FONTS):
+            raise ValueError(f"fonts must be between 1 and {len(BUILTIN_FONTS)}")
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class SyntheticDocument:
+    """A generated PDF with its extracted layout; keeps the layout's in-memory images alive"""
+
+    spec: CorpusSpec
+    pdf: bytes
+    layout: dict[str, Any]
+    asset_store: InMemoryAssetStore = field(repr=False)
+
+
+def _image_png(index: int, size: int = 64) -> bytes:
+    """A small RGB gradient image, different for every index"""
+    samples = bytearray(size * size * 3)
+    for y in range(size):
+        for x in range(size):
+            offset = (y * size + x) * 3
+            samples[offset] = (x * 4 + index * 37) % 256
+            samples[offset + 1] = (y * 4 + index * 91) % 256
+            samples[offset + 2] = ((x + y) * 2 + index * 53) % 256
+    pixmap = fitz.Pixmap(fitz.csRGB, size, size, bytes(samples), False)
+    return pixmap.tobytes("png")
+
+
+def _rect(rng: random.Random, max_width: float, max_height: float) -> fitz.Rect:
+    width = rng.uniform(max_width / 4, max_width)
+    height = rng.uniform(max_height / 4, max_height)
+    x0 = rng.uniform(MARGIN, PAGE_SIZE[0] - MARGIN - width)
+    y0 = rng.uniform(MARGIN, PAGE_SIZE[1] - MARGIN - height)
+    return fitz.Rect(x0, y0, x0 + width, y0 + height)
+
+
+def _color(rng: random.Random) -> tuple[float, float, float]:
+    return (round(rng.random(), 2), round(rng.random(), 2), round(rng.random(), 2))
+
+
+def _draw_paths(page: fitz.Page, rng: random.Random, count: int) -> None:
+    shape = page.new_shape()
+    for index in range(count):
+        rect = _rect(rng, 160, 120)
+        kind = index % 3
+        if kind == 0:
+            shape.draw_rect(rect)
+        elif kind == 1:
+            shape.draw_line(rect.tl, rect.br)
+        else:
+            shape.draw_bezier(rect.bl, rect.tl, rect.br, rect.tr)
+        fill = _color(rng) if kind == 0 else None
+        shape.finish(color=_color(rng), fill=fill, width=round(rng.uniform(0.5, 3), 1))
+    shape.commit()
+
+
+def _insert_text(page: fitz.Page, rng: random.Random, spec: CorpusSpec, count: int) -> None:
+    line_height = max(10.0, (PAGE_SIZE[1] - 2 * MARGIN) / max(count, 1))
+    font_size = min(12.0, line_height * 0.8)
+    for index in range(count):
+        if spec.unicode == "cjk" and index % 4 == 3:
+            text, font = rng.choice(UNICODE_TEXT["cjk"]), CJK_FONT
+        else:
+            coverage = "latin1" if spec.unicode != "ascii" else "ascii"
+            text, font = rng.choice(UNICODE_TEXT[coverage]), BUILTIN_FONTS[index % spec.fonts]
+        x = MARGIN + rng.uniform(0, 200)
+        y = MARGIN + font_size + index * line_height
+        page.insert_text((x, y), f"{text} {index}", fontname=font, fontsize=font_size, color=_color(rng))
+
+
+def generate_pdf(spec: CorpusSpec) -> bytes:
+    """Build the PDF described by spec; identical specs give identical bytes"""
+    rng = random.Random(spec.seed)
+    images = [_image_png(index) for index in range(max(spec.distinct_images, 1))] if spec.images_per_page else []
+
+    doc = fitz.open()
+    try:
+        image_xrefs: dict[int, int] = {}
+        for _ in range(spec.pages):
+            page = doc.new_page(width=PAGE_SIZE[0], height=PAGE_SIZE[1])
+            _draw_paths(page, rng, spec.paths_per_page)
+            for placement in range(spec.images_per_page):
+                image_index = placement % len(images)
+                rect = _rect(rng, 120, 120)
+                if image_index in image_xrefs:
+                    page.insert_image(rect, xref=image_xrefs[image_index])
+                else:
+                    image_xrefs[image_index] = page.insert_image(rect, stream=images[image_index])
+            _insert_text(page, rng, spec, spec.spans_per_page)
+        doc.set_metadata(FIXED_METADATA)
+        return doc.tobytes(garbage=3, deflate=True, no_new_id=True)
+    finally:
+        doc.close()
+
+
+def generate_document(spec: CorpusSpec) -> SyntheticDocument:
+    """Build the PDF for spec and extract its layout, with images kept in memory"""
+    pdf = generate_pdf(spec)
+    asset_store = InMemoryAssetStore()
+    layout = extract_pdf_content(pdf, asset_store=asset_store).to_dict()
+    return SyntheticDocument(spec=spec, pdf=pdf, layout=layout, asset_store=asset_store)
+
+
+# Scenarios each stress one kind of content; "mixed" combines them
+SCENARIOS = {
+    spec.name: spec
+    for spec in (
+        CorpusSpec("text_heavy", pages=4, spans_per_page=120),
+        CorpusSpec("vector_heavy", pages=4, spans_per_page=10, paths_per_page=300),
+        CorpusSpec("repeated_images", pages=4, spans_per_page=10, images_per_page=12, distinct_images=2),
+        CorpusSpec("many_fonts", pages=4, spans_per_page=80, fonts=12, unicode="latin1"),
+        CorpusSpec("unicode_cjk", pages=4, spans_per_page=60, fonts=3, unicode="cjk"),
+        CorpusSpec(
+            "mixed",
+            pages=10,
+            spans_per_page=50,
+            paths_per_page=40,
+            images_per_page=4,
+            distinct_images=3,
+            fonts=4,
+            unicode="latin1",
+        ),
+    )
+}
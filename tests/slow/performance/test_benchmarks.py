@@ -329,18 +329,14 @@ def test_generate_benchmark_report(self):
         print(f"Benchmark results exported to: {report_file}")
 
     def test_performance_regression_detection(self):
-        """Test for performance regressions"""
-        # This would compare current performance against baseline
-        # and detect regressions
+        """The committed regression baseline covers every synthetic scenario"""
+        # The comparison itself runs in test_regression_benchmarks.py
+        from .synthetic_corpus import SCENARIOS
 
-        # Load baseline results if they exist
         baseline_file = "tests/fixtures/baseline_benchmarks.json"
-        if os.path.exists(baseline_file):
-            with open(baseline_file) as f:
-                baseline_results = json.load(f)
-
-            # Compare current results against baseline
-            # Flag any significant regressions
-            print("Performance regression detection would go here")
-        else:
-            print("No baseline benchmark file found, skipping regression detection")
+        with open(baseline_file) as f:
+            baseline_results = json.load(f)
+
+        measured = {name.rsplit("/", 1)[-1] for name in baseline_results["benchmarks"]}
+        assert measured == set(SCENARIOS)
+        assert all(entry["normalized"] > 0 for entry in baseline_results["benchmarks"].values())
@@ -0,0 +1,139 @@
+"""
+Regression benchmarks on the deterministic synthetic corpus.
+
+Times extraction, generation with each output engine, batch modification and
+visual validation for every scenario in ``synthetic_corpus.SCENARIOS``. Results
+are written as JSON, and each benchmark fails when it is slower than the
+committed baseline by more than the configured tolerance (see
+``regression_baseline`` for the environment variables).
+
+Run with::
+
+    pytest tests/slow/performance/test_regression_benchmarks.py
+
+and refresh the baseline after an intended change with
+``PDFREBUILDER_UPDATE_BENCHMARK_BASELINE=1``.
+"""
+
+import copy
+import logging
+
+import pytest
+
+from pdfrebuilder.core.recreate_pdf_from_config import recreate_pdf_from_layout
+from pdfrebuilder.engine.asset_store import InMemoryAssetStore
+from pdfrebuilder.engine.batch_modifier import BatchModifier, VariableSubstitution
+from pdfrebuilder.engine.extract_pdf_content_fitz import extract_pdf_content
+from pdfrebuilder.engine.visual_validator import VisualValidator
+from pdfrebuilder.models.universal_idm import UniversalDocument
+
+from .regression_baseline import (
+    RegressionBenchmarks,
+    baseline_path,
+    results_path,
+    update_baseline_requested,
+)
+from .synthetic_corpus import SCENARIOS, CorpusSpec, generate_document, generate_pdf
+
+pytestmark = pytest.mark.slow
+
+ENGINES = ["reportlab", "pymupdf"]
+
+
+@pytest.fixture(scope="module")
+def benchmarks():
+    benchmarks = RegressionBenchmarks.from_environment()
+    yield benchmarks
+    benchmarks.save(results_path())
+    if update_baseline_requested():
+        benchmarks.save_baseline(baseline_path())
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging(caplog):
+    """Time the work, not log output: earlier tests (e.g. CLI runs) may have set the root logger to INFO"""
+    caplog.set_level(logging.WARNING)
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return {name: generate_document(spec) for name, spec in SCENARIOS.items()}
+
+
+def _check(benchmarks, measurement):
+    comparison = benchmarks.compare(measurement)
+    print(comparison.describe())
+    if not update_baseline_requested():
+        assert not comparison.regressed, comparison.describe()
+
+
+def test_generator_is_deterministic():
+    spec = CorpusSpec("check", pages=2, spans_per_page=5, paths_per_page=5, images_per_page=3, fonts=3, unicode="cjk")
+
+    assert generate_pdf(spec) == generate_pdf(spec)
+    assert generate_pdf(spec) != generate_pdf(CorpusSpec(**{**spec.to_dict(), "seed": 1}))
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_extract_benchmark(benchmarks, corpus, scenario):
+    document = corpus[scenario]
+
+    measurement = benchmarks.measure(
+        f"extract/{scenario}",
+        lambda _: extract_pdf_content(document.pdf, asset_store=InMemoryAssetStore()),
+        metadata=document.spec.to_dict(),
+    )
+
+    _check(benchmarks, measurement)
+
+
+@pytest.mark.parametrize("engine_name", ENGINES)
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_generate_benchmark(benchmarks, corpus, scenario, engine_name):
+    document = corpus[scenario]
+
+    measurement = benchmarks.measure(
+        f"generate/{engine_name}/{scenario}",
+        lambda _: recreate_pdf_from_layout(document.layout, engine_name=engine_name, engine_config={}),
+        metadata=document.spec.to_dict(),
+    )
+
+    _check(benchmarks, measurement)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_batch_modifier_benchmark(benchmarks, corpus, scenario):
+    document = corpus[scenario]
+    modifier = BatchModifier()
+    replacements = [("Total", "Sum"), ("report", "summary"), ("Café", "Cafe"), ("数据", "资料")]
+    variables = [VariableSubstitution("customer", "ACME"), VariableSubstitution("date", "2024-01-01")]
+
+    def run(universal_document):
+        modifier.batch_text_replacement(universal_document, replacements)
+        modifier.variable_substitution(universal_document, variables)
+
+    measurement = benchmarks.measure(
+        f"batch_modifier/{scenario}",
+        run,
+        setup=lambda: UniversalDocument.from_dict(copy.deepcopy(document.layout)),
+        metadata=document.spec.to_dict(),
+    )
+
+    _check(benchmarks, measurement)
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_visual_validator_benchmark(benchmarks, corpus, scenario, tmp_path):
+    document = corpus[scenario]
+    original, generated = tmp_path / "original.pdf", tmp_path / "generated.pdf"
+    original.write_bytes(document.pdf)
+    generated.write_bytes(recreate_pdf_from_layout(document.layout, engine_name="reportlab", engine_config={}))
+    validator = VisualValidator({"rendering_dpi": 72, "generate_diff_images": True})
+
+    measurement = benchmarks.measure(
+        f"visual_validator/{scenario}",
+        lambda _: validator.validate(str(original), str(generated), str(tmp_path / "diff.png")),
+        metadata=document.spec.to_dict(),
+    )
+
+    _check(benchmarks, measurement)
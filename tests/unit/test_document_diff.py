@@ -0,0 +1,169 @@
+"""
+Tests for the structural diff and patch API over UniversalDocument.
+"""
+
+import json
+
+import pytest
+
+from pdfrebuilder.models.document_diff import DocumentPatch, PatchError, apply_patch, diff_documents
+from pdfrebuilder.models.universal_idm import (
+    BoundingBox,
+    Color,
+    FontDetails,
+    ImageElement,
+    Layer,
+    PageUnit,
+    TextElement,
+    UniversalDocument,
+)
+
+
+def _page(page_number, texts, image=None):
+    content = [
+        TextElement(
+            id=f"text_{i}",
+            bbox=BoundingBox(50, 50 + i * 20, 300, 65 + i * 20),
+            text=text,
+            font_details=FontDetails(name="Helvetica", size=12, color=Color(0, 0, 0)),
+        )
+        for i, text in enumerate(texts)
+    ]
+    if image:
+        content.append(ImageElement(id="image_0", bbox=BoundingBox(50, 400, 250, 600), image_file=image))
+    layer = Layer(layer_id=f"page_{page_number}_base_layer", layer_name="Page Content", content=content)
+    return PageUnit(size=(612, 792), layers=[layer], page_number=page_number)
+
+
+def _document(pages):
+    return UniversalDocument(document_structure=[_page(i, *page) for i, page in enumerate(pages)])
+
+
+def _roundtrip(base, target):
+    patch = diff_documents(base, target)
+    # Patches must survive JSON serialization
+    patch = DocumentPatch.from_dict(json.loads(json.dumps(patch.to_dict())))
+    assert apply_patch(base, patch).to_dict() == target.to_dict()
+    return patch
+
+
+def test_identical_documents_produce_empty_patch():
+    document = _document([(["A", "B"],), (["C"],)])
+    patch = diff_documents(document, _document([(["A", "B"],), (["C"],)]))
+
+    assert patch.is_empty()
+    assert patch.changed_units() == []
+
+
+def test_modified_element_reports_changed_fields():
+    base = _document([(["Hello", "World"],)])
+    target = _document([(["Hello", "World"],)])
+    target.document_structure[0].layers[0].content[1].text = "Everyone"
+    target.document_structure[0].layers[0].content[1].font_details.size = 14
+
+    patch = _roundtrip(base, target)
+
+    element = patch.units["modified"][0]["layers"]["modified"][0]["content"]["modified"][0]
+    assert element["id"] == "text_1"
+    assert {tuple(change["path"]) for change in element["fields"]} == {("text",), ("font_details", "size")}
+    assert patch.summary()["elements_modified"] == 1
+
+
+def test_added_removed_and_reordered_elements():
+    base = _document([(["A", "B", "C"],)])
+    target = _document([(["A", "B", "C"],)])
+    content = target.document_structure[0].layers[0].content
+    content.reverse()
+    content.pop()  # drop A
+    content.insert(1, TextElement(id="text_9", bbox=[0, 0, 10, 10], text="New"))
+
+    patch = _roundtrip(base, target)
+
+    summary = patch.summary()
+    assert summary["elements_added"] == 1
+    assert summary["elements_removed"] == 1
+
+
+def test_elements_match_by_content_when_ids_change():
+    base = _document([(["Title", "Body"], "images/logo.png")])
+    target = _document([(["Title", "Body"], "images/logo.png")])
+    for element in target.document_structure[0].layers[0].content:
+        element.id = f"renamed_{element.id}"
+
+    patch = _roundtrip(base, target)
+
+    summary = patch.summary()
+    assert summary["elements_added"] == summary["elements_removed"] == 0
+    assert summary["elements_modified"] == 3
+
+
+def test_inserted_page_only_reports_the_new_page_and_renumbering():
+    pages = [([f"Page {i}"],) for i in range(5)]
+    base = _document(pages)
+    target = _document([(["Cover"],), *pages])
+
+    patch = _roundtrip(base, target)
+
+    assert patch.summary()["units_added"] == 1
+    assert patch.changed_units()[0] == 0
+    assert patch.summary()["elements_modified"] == 0
+
+
+def test_document_fields_are_diffed():
+    base = _document([(["A"],)])
+    target = _document([(["A"],)])
+    target.metadata.title = "Renamed"
+
+    patch = _roundtrip(base, target)
+
+    assert patch.fields == [{"path": ["metadata", "title"], "old": None, "new": "Renamed"}]
+
+
+def _with_master(document, header):
+    document.shared_layers = [
+        Layer(
+            layer_id="master_0", layer_name="Master Content 1", content=_page(0, [header, "Footer"]).layers[0].content
+        )
+    ]
+    for unit in document.document_structure:
+        unit.shared_layer_refs = ["master_0"]
+    return document
+
+
+def test_shared_layers_are_diffed_per_element():
+    pages = [([f"Page {i}"],) for i in range(3)]
+    base = _with_master(_document(pages), "ACME")
+    target = _with_master(_document(pages), "Globex")
+
+    patch = _roundtrip(base, target)
+
+    assert patch.fields == [] and patch.units is None
+    [layer] = patch.shared_layers["modified"]
+    [element] = layer["content"]["modified"]
+    assert {"path": ["text"], "old": "ACME", "new": "Globex"} in element["fields"]
+    assert "Footer" not in json.dumps(patch.to_dict())
+    assert patch.summary()["elements_modified"] == 1
+
+    # Adding and dropping master content round-trips too
+    _roundtrip(_document(pages), base)
+    _roundtrip(base, _document(pages))
+
+
+def test_patch_must_fit_base_document():
+    base = _document([(["A", "B"],)])
+    target = _document([(["A", "B changed"],)])
+    patch = diff_documents(base, target)
+
+    with pytest.raises(PatchError):
+        apply_patch(_document([(["A"],)]), patch)
+
+
+def test_large_documents_diff_linearly():
+    pages = [([f"Page {i} line {j}" for j in range(20)],) for i in range(1000)]
+    base = _document(pages)
+    pages[500] = (["Edited"],)
+    target = _document(pages)
+
+    patch = _roundtrip(base, target)
+
+    assert patch.changed_units() == [500]
@@ -49,7 +49,7 @@ def test_parse_document_pdf_success(self, mock_extract_pdf):
         result = parse_document(self.sample_pdf, extraction_flags, engine="fitz")
 
         assert result == mock_document
-        mock_extract_pdf.assert_called_once_with(self.sample_pdf, extraction_flags)
+        mock_extract_pdf.assert_called_once_with(self.sample_pdf, extraction_flags, cache=None)
 
     def test_parse_document_file_not_found(self):
         """Test parsing non-existent document"""